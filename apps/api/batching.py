@@ -0,0 +1,53 @@
+"""
+Serialização de listas em lote para campos calculados (SerializerMethodField).
+
+Na listagem, ``BatchListSerializer`` chama uma vez por página os carregadores
+``batch_<fonte>`` do serializer filho (uma query cada, sobre todos os itens da página);
+os ``get_<campo>`` leem o resultado com ``batch_value``. Fora de listas (detalhe, create)
+``batch_value`` devolve ``MISSING`` e o método segue o caminho por objeto.
+"""
+
+from __future__ import annotations
+
+from django.db import models
+from rest_framework.serializers import ListSerializer
+
+MISSING = object()
+
+
+class BatchListSerializer(ListSerializer):
+    """Pré-carrega os campos em lote do filho antes de serializar a página."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.batch = self.child.load_batch(items)
+        try:
+            return super().to_representation(items)
+        finally:
+            self.child.batch = None
+
+
+class BatchFieldsMixin:
+    """
+    Mixin de ModelSerializer. ``batch_sources`` mapeia campo -> fonte; cada fonte tem um
+    ``batch_<fonte>(instances) -> {pk: valor}``. Só as fontes dos campos presentes (após
+    ``?fields=``) são carregadas; campos que dividem a fonte reaproveitam a mesma query.
+    """
+
+    batch_sources: dict[str, str] = {}
+    batch: dict | None = None
+
+    def load_batch(self, instances) -> dict:
+        loaded: dict[str, dict] = {}
+        if not instances:
+            return loaded
+        for name in self.fields:
+            source = self.batch_sources.get(name)
+            if source and source not in loaded:
+                loaded[source] = getattr(self, f"batch_{source}")(instances)
+        return loaded
+
+    def batch_value(self, source: str, obj, default=None):
+        if not self.batch or source not in self.batch:
+            return MISSING
+        return self.batch[source].get(obj.pk, default)
@@ -23,12 +23,13 @@ from datetime import datetime, timedelta
 from typing import Any
 
 from django.core.cache import cache
-from django.db.models import Q
+from django.db.models import Count, Max
 from django.utils import timezone
 
 from apps.brands.models import Brand
 from apps.jobs.models import ScheduledPost
 from apps.social.services.upload_post_analytics_client import (
+    UPLOAD_POST_MAX_IN_FLIGHT,
     fetch_post_analytics,
     fetch_profile_platforms_analytics,
     fetch_total_impressions,
@@ -40,6 +41,24 @@ logger = logging.getLogger(__name__)
 CACHE_TTL_SECONDS = 600
 POST_ANALYTICS_CACHE_TTL_SECONDS = 600
 POST_ANALYTICS_ERROR_CACHE_TTL_SECONDS = 120
+# Idade a partir da qual a task de snapshots (Beat a cada 600 s) volta à Upload Post por post.
+# Maior que o intervalo do Beat: sem isso cada execução refaria todas as chamadas.
+POST_ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("FACTORY_YOUTUBE_POST_ANALYTICS_MAX_AGE_SEC", "1800"))
+# Stale-while-revalidate: após o TTL "fresco" a entrada continua servível até o TTL
+# "stale", enquanto uma task Celery reconstrói o payload em background.
+VIDEOS_STALE_TTL_SECONDS = 6 * 60 * 60
+POST_ANALYTICS_STALE_TTL_SECONDS = 6 * 60 * 60
+VIDEOS_REFRESH_LOCK_TTL_SECONDS = 300
+DASHBOARD_STALE_TTL_SECONDS = 6 * 60 * 60
+# Linha agregada por brand (chamadas de profile/total-impressions) é reaproveitada entre
+# snapshots enquanto a brand não publicar nada novo no período e a linha tiver menos que isto.
+BRAND_LINE_MAX_AGE_SECONDS = int(os.getenv("FACTORY_YOUTUBE_BRAND_LINE_MAX_AGE_SEC", "3600"))
+# Períodos pré-calculados pela task periódica (precompute_factory_youtube_snapshots_task).
+SNAPSHOT_PERIODS = tuple(
+    p.strip()
+    for p in os.getenv("FACTORY_YOUTUBE_SNAPSHOT_PERIODS", "last_week,last_month").split(",")
+    if p.strip()
+)
 ALLOWED_PERIODS = frozenset({"last_day", "last_week", "last_month", "last_3months", "last_year"})
 PERIOD_TO_DAYS = {
     "last_day": 1,
@@ -101,14 +120,16 @@ def _dashboard_cache_key(
     period: str,
     include_top_posts: bool,
 ) -> str:
+    # v2: o valor passou a ser {"payload", "built_at"} (entradas antigas eram o payload puro).
     return (
-        f"factory_youtube_dash:{factory_id}:{brand_id or 'all'}:{period}:"
+        f"factory_youtube_dash:v2:{factory_id}:{brand_id or 'all'}:{period}:"
         f"{1 if include_top_posts else 0}"
     )
 
 
 def _videos_cache_key(factory_id: int, *, brand_id: int | None, period: str) -> str:
-    return f"factory_youtube_videos:{factory_id}:{brand_id or 'all'}:{period}"
+    # v2: o valor passou a ser {"payload", "built_at"} (entradas antigas eram o payload puro).
+    return f"factory_youtube_videos:v2:{factory_id}:{brand_id or 'all'}:{period}"
 
 
 def _videos_cache_key_with_ordering(
@@ -121,9 +142,17 @@ def _videos_cache_key_with_ordering(
     return f"{_videos_cache_key(factory_id, brand_id=brand_id, period=period)}:{ordering}"
 
 
+def _brand_line_cache_key(brand_id: int, *, period: str) -> str:
+    return f"factory_youtube_brand_line:{int(brand_id)}:{period}"
+
+
+def _refresh_lock_key(cache_key: str) -> str:
+    return f"{cache_key}:refreshing"
+
+
 def _post_analytics_cache_key(request_id: str, *, platform: str = "youtube") -> str:
     rid = str(request_id or "").strip()
-    return f"upload_post_post_analytics:{platform}:{rid}"
+    return f"upload_post_post_analytics:v2:{platform}:{rid}"
 
 
 def _safe_int(v: Any) -> int:
@@ -386,10 +415,7 @@ def _scheduled_posts_scope_queryset(
     posted_after: datetime | None = None,
 ):
     qs = (
-        ScheduledPost.objects.filter(status="DONE", posted_at__isnull=False)
-        .filter(
-            Q(job__brand__factory_id=factory_id) | Q(auto_cut_corte__analysis__brand__factory_id=factory_id),
-        )
+        ScheduledPost.objects.filter(factory_id=factory_id, status="DONE", posted_at__isnull=False)
         .select_related(
             "job__brand",
             "auto_cut_corte__analysis__brand",
@@ -399,9 +425,7 @@ def _scheduled_posts_scope_queryset(
         )
     )
     if brand_id:
-        qs = qs.filter(
-            Q(job__brand_id=brand_id) | Q(auto_cut_corte__analysis__brand_id=brand_id),
-        )
+        qs = qs.filter(brand_id=brand_id)
     if posted_after is not None:
         qs = qs.filter(posted_at__gte=posted_after)
     return qs.order_by("-posted_at", "-id")
@@ -411,20 +435,41 @@ def _fetch_post_analytics_cached(
     request_id: str,
     *,
     platform: str = "youtube",
-) -> tuple[dict[str, Any] | None, str | None]:
+    allow_stale: bool = False,
+    max_age_s: float | None = None,
+) -> tuple[dict[str, Any] | None, str | None, bool]:
+    """
+    Analytics de um post com cache stale-while-revalidate.
+
+    Retorna ``(data, error, stale)``. Com ``allow_stale=True`` uma entrada vencida (mas
+    dentro de POST_ANALYTICS_STALE_TTL_SECONDS) é devolvida sem chamar a API; sem isso a
+    API é consultada e, se falhar, a última resposta válida continua sendo usada.
+    ``max_age_s`` substitui POST_ANALYTICS_CACHE_TTL_SECONDS como limite de "fresco".
+    """
     rid = str(request_id or "").strip()
     if not rid:
-        return None, "request_id vazio"
+        return None, "request_id vazio", False
 
     cache_key = _post_analytics_cache_key(rid, platform=platform)
     cached = cache.get(cache_key)
+    now_ts = time.time()
     if cached is not None:
-        return cached.get("data"), cached.get("error")
+        if cached.get("error"):
+            fresh_ttl = POST_ANALYTICS_ERROR_CACHE_TTL_SECONDS
+        else:
+            fresh_ttl = POST_ANALYTICS_CACHE_TTL_SECONDS if max_age_s is None else max_age_s
+        if now_ts - float(cached.get("fetched_at") or 0) < fresh_ttl:
+            return cached.get("data"), cached.get("error"), False
+        if allow_stale and cached.get("data") is not None:
+            return cached.get("data"), cached.get("error"), True
 
     data, err = fetch_post_analytics(rid, platform=platform)
-    ttl = POST_ANALYTICS_ERROR_CACHE_TTL_SECONDS if err else POST_ANALYTICS_CACHE_TTL_SECONDS
-    cache.set(cache_key, {"data": data, "error": err}, ttl)
-    return data, err
+    if err and cached is not None and cached.get("data") is not None:
+        # Falha na revalidação: mantém a última resposta válida (sem reescrever o cache).
+        return cached.get("data"), cached.get("error"), True
+    ttl = POST_ANALYTICS_ERROR_CACHE_TTL_SECONDS if err else POST_ANALYTICS_STALE_TTL_SECONDS
+    cache.set(cache_key, {"data": data, "error": err, "fetched_at": now_ts}, ttl)
+    return data, err, False
 
 
 def _post_has_youtube_platform(post: ScheduledPost) -> bool:
@@ -515,6 +560,23 @@ def _collect_one_brand(
     return line
 
 
+def _top_post_entry(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "request_id": row.get("request_id") or f"scheduled-post:{row.get('scheduled_post_id')}",
+        "brand_id": row.get("brand_id"),
+        "title": row.get("published_title"),
+        "posted_at": row.get("published_at"),
+        "views": row.get("views"),
+        "likes": row.get("likes"),
+        "comments": row.get("comments"),
+        "shares": row.get("shares"),
+        "post_url": row.get("post_url"),
+        "engagement_score": row.get("engagement_total"),
+        "fetch_error": row.get("fetch_error"),
+        "platform_error": row.get("platform_error"),
+    }
+
+
 def _build_top_posts(
     factory_id: int,
     *,
@@ -525,6 +587,8 @@ def _build_top_posts(
     top_n: int = 10,
     engagement_n: int = 5,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    from apps.api.video_ranking import rank_video_rows
+
     payload = build_factory_youtube_videos(
         factory_id,
         brand_id=brand_id,
@@ -532,72 +596,71 @@ def _build_top_posts(
         force_refresh=force_refresh,
     )
     results = payload.get("results") or []
-    top_posts = [
-        {
-            "request_id": row.get("request_id") or f"scheduled-post:{row.get('scheduled_post_id')}",
-            "brand_id": row.get("brand_id"),
-            "title": row.get("published_title"),
-            "posted_at": row.get("published_at"),
-            "views": row.get("views"),
-            "likes": row.get("likes"),
-            "comments": row.get("comments"),
-            "shares": row.get("shares"),
-            "post_url": row.get("post_url"),
-            "engagement_score": row.get("engagement_total"),
-            "fetch_error": row.get("fetch_error"),
-            "platform_error": row.get("platform_error"),
-        }
-        for row in results[:limit_fetch]
-        if row.get("views") is not None
-    ][:top_n]
-    top_posts_engagement = sorted(
-        [
-            {
-                "request_id": row.get("request_id") or f"scheduled-post:{row.get('scheduled_post_id')}",
-                "brand_id": row.get("brand_id"),
-                "title": row.get("published_title"),
-                "posted_at": row.get("published_at"),
-                "views": row.get("views"),
-                "likes": row.get("likes"),
-                "comments": row.get("comments"),
-                "shares": row.get("shares"),
-                "post_url": row.get("post_url"),
-                "engagement_score": row.get("engagement_total"),
-                "fetch_error": row.get("fetch_error"),
-                "platform_error": row.get("platform_error"),
-            }
-            for row in results
-            if row.get("engagement_total") is not None and not row.get("fetch_error")
-        ],
-        key=lambda x: (x.get("engagement_score") or 0),
-        reverse=True,
-    )[:engagement_n]
+    top_posts = [_top_post_entry(row) for row in results[:limit_fetch] if row.get("views") is not None][
+        :top_n
+    ]
+    engagement_rows = [
+        row for row in results if row.get("engagement_total") is not None and not row.get("fetch_error")
+    ]
+    top_posts_engagement = [
+        _top_post_entry(row)
+        for row in rank_video_rows(engagement_rows, ordering="engagement", limit=engagement_n)
+    ]
     return top_posts, top_posts_engagement
 
 
-def build_factory_youtube_videos(
+def _schedule_background_refresh(task_name: str, args: list[Any], *, cache_key: str) -> bool:
+    """Enfileira a reconstrução em background (uma por chave, via lock no cache)."""
+    lock_key = _refresh_lock_key(cache_key)
+    if not cache.add(lock_key, 1, VIDEOS_REFRESH_LOCK_TTL_SECONDS):
+        return False
+    try:
+        from apps.api import tasks as api_tasks
+
+        getattr(api_tasks, task_name).delay(*args)
+    except Exception:
+        cache.delete(lock_key)
+        logger.warning(
+            "[FactoryYouTubeDashboard] falha ao agendar %s args=%s",
+            task_name,
+            args,
+            exc_info=True,
+        )
+        return False
+    return True
+
+
+def _schedule_videos_refresh(
     factory_id: int,
     *,
-    brand_id: int | None = None,
-    period: str | None = None,
-    ordering: str | None = None,
-    force_refresh: bool = False,
-) -> dict[str, Any]:
-    period_norm = period if period in ALLOWED_PERIODS else "last_month"
-    ordering_norm = normalize_video_ordering(ordering)
-    cache_key = _videos_cache_key_with_ordering(
-        factory_id,
-        brand_id=brand_id,
-        period=period_norm,
-        ordering=ordering_norm,
+    brand_id: int | None,
+    period: str,
+    ordering: str,
+    cache_key: str,
+) -> bool:
+    return _schedule_background_refresh(
+        "refresh_factory_youtube_videos_task",
+        [factory_id, brand_id, period, ordering],
+        cache_key=cache_key,
     )
-    if force_refresh:
-        cache.delete(cache_key)
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
 
-    posted_after = _period_window_start(period_norm)
+
+def _collect_video_rows(
+    factory_id: int,
+    *,
+    brand_id: int | None,
+    period: str,
+    allow_stale_analytics: bool,
+    analytics_max_age_s: float | None = None,
+) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Uma linha por vídeo YouTube publicado no período, com métricas por post e derivadas
+    (sem ordenação). Retorna ``(rows, usou_metricas_vencidas)``.
+    """
+    from apps.api.video_ranking import score_video_rows
+
+    used_stale_analytics = False
+    posted_after = _period_window_start(period)
     qs = _scheduled_posts_scope_queryset(
         factory_id,
         brand_id=brand_id,
@@ -634,7 +697,7 @@ def build_factory_youtube_videos(
             "engagement_rate": None,
             "views_per_day": None,
             "days_since_post": days_since_post,
-            "recency_factor": _recency_factor(days_since_post, period_norm),
+            "recency_factor": None,
             "viral_score": None,
             "published_at": post.posted_at.isoformat() if post.posted_at else None,
             "post_url": post_url,
@@ -650,18 +713,26 @@ def build_factory_youtube_videos(
         if request_id and has_api_key:
             upload_post_rows.append((post, row))
 
-    def _fetch_one(item: tuple[ScheduledPost, dict[str, Any]]) -> tuple[dict[str, Any], dict[str, Any] | None, str | None]:
+    def _fetch_one(
+        item: tuple[ScheduledPost, dict[str, Any]],
+    ) -> tuple[dict[str, Any], dict[str, Any] | None, str | None, bool]:
         _post, row = item
-        data, err = _fetch_post_analytics_cached(str(row.get("request_id") or ""), platform="youtube")
-        return row, data, err
+        data, err, stale = _fetch_post_analytics_cached(
+            str(row.get("request_id") or ""),
+            platform="youtube",
+            allow_stale=allow_stale_analytics,
+            max_age_s=analytics_max_age_s,
+        )
+        return row, data, err, stale
 
     if upload_post_rows:
-        # Serial: o throttle já é thread-safe, mas o rate limit da Upload Post é agressivo —
-        # um worker só reduz risco de burst e mantém o cooldown global efetivo.
-        with ThreadPoolExecutor(max_workers=1) as pool:
+        # O ritmo contra a Upload Post é imposto pelo token bucket compartilhado do cliente;
+        # aqui só limitamos as requisições simultâneas ao pool HTTP do processo.
+        with ThreadPoolExecutor(max_workers=UPLOAD_POST_MAX_IN_FLIGHT) as pool:
             futs = [pool.submit(_fetch_one, item) for item in upload_post_rows]
             for fut in as_completed(futs):
-                row, data, err = fut.result()
+                row, data, err, stale = fut.result()
+                used_stale_analytics = used_stale_analytics or stale
                 if err or not data:
                     row["analytics_status"] = "fetch_error"
                     row["fetch_error"] = err
@@ -689,13 +760,6 @@ def build_factory_youtube_videos(
                     row["comments"],
                     row["shares"],
                 )
-                row["views_per_day"] = _views_per_day(row["views"], row["days_since_post"])
-                row["engagement_rate"] = _engagement_rate(row["engagement_total"], row["views"])
-                row["viral_score"] = _viral_score(
-                    views_per_day=row["views_per_day"],
-                    engagement_rate=row["engagement_rate"],
-                    recency_factor=row["recency_factor"],
-                )
 
                 has_any_metric = any(
                     v is not None
@@ -713,9 +777,26 @@ def build_factory_youtube_videos(
                 else:
                     row["analytics_status"] = "available" if has_any_metric else "no_metrics_returned"
 
-    ordered = _sort_video_rows(rows, ordering=ordering_norm)
-    for row in ordered:
-        row.pop("_sort_published_ts", None)
+    score_video_rows(rows, period=period)
+    return rows, used_stale_analytics
+
+
+def _videos_payload(
+    rows: list[dict[str, Any]],
+    *,
+    factory_id: int,
+    brand_id: int | None,
+    period: str,
+    ordering: str,
+) -> dict[str, Any]:
+    from apps.api.video_ranking import rank_video_rows
+
+    # Ordenação em lote (colunas NumPy); cópia por ordenação porque as linhas são
+    # compartilhadas entre as ordenações do snapshot.
+    ordered = [
+        {k: v for k, v in row.items() if k != "_sort_published_ts"}
+        for row in rank_video_rows(rows, ordering=ordering)
+    ]
 
     upload_post_available = sum(
         1
@@ -731,9 +812,10 @@ def build_factory_youtube_videos(
         "scope": {
             "factory_id": factory_id,
             "brand_id": brand_id,
-            "period": period_norm,
+            "period": period,
             "platform": "youtube",
         },
+        "as_of": timezone.now().isoformat(),
         "count": len(ordered),
         "results": ordered,
         "meta": {
@@ -741,17 +823,125 @@ def build_factory_youtube_videos(
             "upload_post_source_videos": upload_post_source_count,
             "youtube_api_no_analytics_videos": native_without_analytics,
             "total_videos": len(ordered),
-            "ordering": ordering_norm,
+            "ordering": ordering,
             "available_orderings": list(AVAILABLE_VIDEO_ORDERINGS),
             "default_ordering": "views",
             "viral_score_description": "Combina views/dia, taxa de engajamento e recencia.",
             "viral_score_weights": VIRAL_SCORE_WEIGHTS,
         },
     }
-    cache.set(cache_key, payload, CACHE_TTL_SECONDS)
     return payload
 
 
+def build_factory_youtube_videos(
+    factory_id: int,
+    *,
+    brand_id: int | None = None,
+    period: str | None = None,
+    ordering: str | None = None,
+    force_refresh: bool = False,
+    background: bool = False,
+) -> dict[str, Any]:
+    """
+    Lista de vídeos YouTube da factory com métricas por post.
+
+    Servida do cache: dentro de CACHE_TTL_SECONDS devolve o payload direto; depois disso
+    (até VIDEOS_STALE_TTL_SECONDS) devolve o payload anterior e agenda a reconstrução em
+    background. ``force_refresh`` reconstrói na hora; ``background`` é usado pela task
+    de refresh (revalida todas as métricas e libera o lock ao terminar).
+    """
+    period_norm = period if period in ALLOWED_PERIODS else "last_month"
+    ordering_norm = normalize_video_ordering(ordering)
+    cache_key = _videos_cache_key_with_ordering(
+        factory_id,
+        brand_id=brand_id,
+        period=period_norm,
+        ordering=ordering_norm,
+    )
+    if force_refresh:
+        cache.delete(cache_key)
+    if not background:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if time.time() - float(cached.get("built_at") or 0) >= CACHE_TTL_SECONDS:
+                _schedule_videos_refresh(
+                    factory_id,
+                    brand_id=brand_id,
+                    period=period_norm,
+                    ordering=ordering_norm,
+                    cache_key=cache_key,
+                )
+            return cached["payload"]
+
+    # Em request síncrona (cache vazio) aceita métricas vencidas por post para responder
+    # rápido; a revalidação fica para a task em background.
+    rows, used_stale_analytics = _collect_video_rows(
+        factory_id,
+        brand_id=brand_id,
+        period=period_norm,
+        allow_stale_analytics=not (background or force_refresh),
+    )
+    payload = _videos_payload(
+        rows,
+        factory_id=factory_id,
+        brand_id=brand_id,
+        period=period_norm,
+        ordering=ordering_norm,
+    )
+    cache.set(cache_key, {"payload": payload, "built_at": time.time()}, VIDEOS_STALE_TTL_SECONDS)
+    if background:
+        cache.delete(_refresh_lock_key(cache_key))
+    elif used_stale_analytics:
+        _schedule_videos_refresh(
+            factory_id,
+            brand_id=brand_id,
+            period=period_norm,
+            ordering=ordering_norm,
+            cache_key=cache_key,
+        )
+    return payload
+
+
+def build_factory_youtube_video_snapshots(
+    factory_id: int,
+    *,
+    brand_id: int | None = None,
+    period: str | None = None,
+) -> int:
+    """
+    Snapshot da lista de vídeos em todas as AVAILABLE_VIDEO_ORDERINGS (task periódica).
+
+    As linhas vêm do banco uma vez e são ordenadas em memória para cada ordenação; só as
+    métricas por post mais velhas que POST_ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS voltam à
+    Upload Post. Retorna o número de vídeos.
+    """
+    period_norm = period if period in ALLOWED_PERIODS else "last_month"
+    rows, _ = _collect_video_rows(
+        factory_id,
+        brand_id=brand_id,
+        period=period_norm,
+        allow_stale_analytics=False,
+        analytics_max_age_s=POST_ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS,
+    )
+    built_at = time.time()
+    for ordering in AVAILABLE_VIDEO_ORDERINGS:
+        cache_key = _videos_cache_key_with_ordering(
+            factory_id,
+            brand_id=brand_id,
+            period=period_norm,
+            ordering=ordering,
+        )
+        payload = _videos_payload(
+            rows,
+            factory_id=factory_id,
+            brand_id=brand_id,
+            period=period_norm,
+            ordering=ordering,
+        )
+        cache.set(cache_key, {"payload": payload, "built_at": built_at}, VIDEOS_STALE_TTL_SECONDS)
+    return len(rows)
+
+
 def _empty_dashboard(
     factory_id: int,
     period_norm: str,
@@ -790,6 +980,69 @@ def _empty_dashboard(
     }
 
 
+def _brand_activity_fingerprints(brand_ids: list[int], *, period: str) -> dict[int, str]:
+    """
+    Assinatura de publicações por brand no período (uma query agregada).
+
+    Muda quando a brand publica (ou perde) posts DONE na janela; usada para decidir
+    quais linhas por brand precisam voltar à Upload Post no refresh incremental.
+    """
+    if not brand_ids:
+        return {}
+    rows = (
+        ScheduledPost.objects.filter(
+            brand_id__in=brand_ids,
+            status="DONE",
+            posted_at__gte=_period_window_start(period),
+        )
+        .values("brand_id")
+        .annotate(n=Count("id"), last_id=Max("id"))
+        .order_by()
+    )
+    return {int(r["brand_id"]): f"{r['n']}:{r['last_id']}" for r in rows}
+
+
+def _collect_brand_lines(
+    brands: list[Brand],
+    *,
+    period: str,
+    incremental: bool,
+) -> tuple[list[dict[str, Any]], int]:
+    """
+    Linhas por brand para o resumo. Com ``incremental`` reaproveita a linha em cache de
+    brands sem publicações novas (mesma assinatura) e com menos de BRAND_LINE_MAX_AGE_SECONDS.
+
+    Retorna ``(linhas, quantidade recalculada)``.
+    """
+    fingerprints = _brand_activity_fingerprints([b.id for b in brands], period=period)
+    lines: list[dict[str, Any]] = []
+    collected = 0
+    for b in brands:
+        fingerprint = fingerprints.get(b.id, "0:")
+        line_key = _brand_line_cache_key(b.id, period=period)
+        if incremental:
+            cached = cache.get(line_key)
+            if (
+                cached is not None
+                and cached.get("fingerprint") == fingerprint
+                and time.time() - float(cached.get("collected_at") or 0) < BRAND_LINE_MAX_AGE_SECONDS
+            ):
+                lines.append(cached["line"])
+                continue
+        if collected > 0 and _BRAND_EXTRA_DELAY_SEC > 0:
+            time.sleep(_BRAND_EXTRA_DELAY_SEC)
+        line = _collect_one_brand(b, period=period)
+        collected += 1
+        if not line.get("error"):
+            cache.set(
+                line_key,
+                {"line": line, "fingerprint": fingerprint, "collected_at": time.time()},
+                DASHBOARD_STALE_TTL_SECONDS,
+            )
+        lines.append(line)
+    return lines, collected
+
+
 def build_factory_youtube_dashboard(
     factory_id: int,
     *,
@@ -797,7 +1050,16 @@ def build_factory_youtube_dashboard(
     period: str | None = None,
     include_top_posts: bool = True,
     force_refresh: bool = False,
+    background: bool = False,
 ) -> dict[str, Any]:
+    """
+    Resumo YouTube da factory (snapshot em cache com ``as_of``).
+
+    O snapshot é mantido pela task periódica; dentro de CACHE_TTL_SECONDS é devolvido
+    direto e, vencido (até DASHBOARD_STALE_TTL_SECONDS), é devolvido enquanto uma task
+    reconstrói em background. ``force_refresh`` recalcula tudo na hora; nos demais casos
+    só as brands com publicações novas voltam à Upload Post.
+    """
     period_norm = period if period in ALLOWED_PERIODS else "last_month"
     if not get_upload_post_api_key():
         return _empty_dashboard(
@@ -815,9 +1077,16 @@ def build_factory_youtube_dashboard(
     )
     if force_refresh:
         cache.delete(cache_key)
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
+    if not background:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if time.time() - float(cached.get("built_at") or 0) >= CACHE_TTL_SECONDS:
+                _schedule_background_refresh(
+                    "refresh_factory_youtube_dashboard_task",
+                    [factory_id, brand_id, period_norm, include_top_posts],
+                    cache_key=cache_key,
+                )
+            return cached["payload"]
 
     brands_qs = Brand.objects.filter(factory_id=factory_id).order_by("name")
     if brand_id:
@@ -834,10 +1103,12 @@ def build_factory_youtube_dashboard(
     sum_subs = 0
     sum_videos = 0
 
-    for i, b in enumerate(brands):
-        if i > 0 and _BRAND_EXTRA_DELAY_SEC > 0:
-            time.sleep(_BRAND_EXTRA_DELAY_SEC)
-        row = _collect_one_brand(b, period=period_norm)
+    lines, brands_collected = _collect_brand_lines(
+        brands,
+        period=period_norm,
+        incremental=not force_refresh,
+    )
+    for row in lines:
         # cópia segura para resposta (sem objeto ORM)
         clean = {k: v for k, v in row.items() if k != "youtube_profile_block"}
         if row.get("youtube_profile_block"):
@@ -907,6 +1178,7 @@ def build_factory_youtube_dashboard(
             "avg_views_per_video": round(sum_views / sum_videos, 2) if sum_videos and sum_views else None,
             "subscriber_growth": None,
         },
+        "as_of": timezone.now().isoformat(),
         "timeseries": timeseries,
         "brands": brand_rows,
         "top_posts": top_posts,
@@ -917,6 +1189,7 @@ def build_factory_youtube_dashboard(
             "date_range_note": date_range_note,
             "has_period_metrics": has_period_metrics,
             "has_subscriber_data": has_subscriber_data,
+            "brands_refreshed": brands_collected,
             "subscriber_growth_unavailable": True,
             "timeseries_note": (
                 "Série diária: soma dos per_day do Upload Post por canal; "
@@ -925,7 +1198,9 @@ def build_factory_youtube_dashboard(
         },
     }
 
-    cache.set(cache_key, out, CACHE_TTL_SECONDS)
+    cache.set(cache_key, {"payload": out, "built_at": time.time()}, DASHBOARD_STALE_TTL_SECONDS)
+    if background:
+        cache.delete(_refresh_lock_key(cache_key))
     return out
 
 
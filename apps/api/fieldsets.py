@@ -0,0 +1,97 @@
+"""
+Sparse fieldsets (``?fields=id,title,status``) para as listagens grandes da API.
+
+O parâmetro corta os campos do serializer e vira ``.only()`` no queryset; colunas pesadas
+(JSON grande, transcrições) que a resposta não usa ficam sempre em ``.defer()``.
+"""
+
+from __future__ import annotations
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.serializers import ListSerializer
+
+
+def _select_related_paths(tree, prefix: str = "") -> list[str]:
+    paths: list[str] = []
+    for name, children in (tree or {}).items():
+        path = f"{prefix}{name}"
+        nested = _select_related_paths(children, f"{path}__")
+        paths.extend(nested or [path])
+    return paths
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin de ViewSet: ``fields=`` em GET e ``deferred_heavy_fields``.
+
+    ``sparse_field_sources`` mapeia campos calculados do serializer (SerializerMethodField,
+    ``source`` aninhado) para as colunas/relações de que dependem. ``id`` e os campos de
+    ``keyset_ordering`` são sempre carregados.
+    """
+
+    fields_query_param = "fields"
+    deferred_heavy_fields: tuple[str, ...] = ()
+    sparse_field_sources: dict[str, tuple[str, ...]] = {}
+
+    def requested_fields(self) -> list[str] | None:
+        if self.request.method not in ("GET", "HEAD"):
+            return None
+        raw = self.request.query_params.get(self.fields_query_param) or ""
+        names = [name.strip() for name in raw.split(",") if name.strip()]
+        return names or None
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.requested_fields()
+        if requested:
+            target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+            allowed = {"id", *requested}
+            for name in list(target.fields):
+                if name not in allowed:
+                    target.fields.pop(name)
+        return serializer
+
+    def _sparse_columns(self, model, requested: list[str]) -> set[str]:
+        serializer_fields = self.get_serializer_class()().fields
+        columns = {model._meta.pk.name}
+        columns.update(name.lstrip("-") for name in (getattr(self, "keyset_ordering", None) or ()))
+        for name in requested:
+            if name in self.sparse_field_sources:
+                columns.update(self.sparse_field_sources[name])
+                continue
+            field = serializer_fields.get(name)
+            if field is None or field.source == "*":
+                continue
+            columns.add(field.source.split(".", 1)[0])
+        concrete = set()
+        for name in columns:
+            root = name.split("__", 1)[0]
+            try:
+                model._meta.get_field(root)
+            except FieldDoesNotExist:
+                continue
+            concrete.add(name)
+        return concrete
+
+    def apply_sparse_fieldset(self, qs):
+        if self.request.method not in ("GET", "HEAD"):
+            return qs
+        requested = self.requested_fields()
+        if not requested:
+            return qs.defer(*self.deferred_heavy_fields) if self.deferred_heavy_fields else qs
+
+        columns = self._sparse_columns(qs.model, requested)
+        roots = {name.split("__", 1)[0] for name in columns}
+        if isinstance(qs.query.select_related, dict):
+            # Relação fora do fieldset não pode ser deferida e atravessada ao mesmo tempo.
+            kept = [p for p in _select_related_paths(qs.query.select_related) if p.split("__", 1)[0] in roots]
+            qs = qs.select_related(None)
+            if kept:
+                qs = qs.select_related(*kept)
+        qs = qs.only(*sorted(name for name in columns if "__" not in name))
+        heavy = [
+            name
+            for name in self.deferred_heavy_fields
+            if name not in columns and ("__" not in name or name.split("__", 1)[0] in roots)
+        ]
+        return qs.defer(*heavy) if heavy else qs
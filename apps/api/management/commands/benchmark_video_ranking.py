@@ -0,0 +1,104 @@
+"""Micro-benchmark of the dashboard video ranking: per-row Python path vs NumPy columns."""
+
+from __future__ import annotations
+
+import copy
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.factory_youtube_dashboard import AVAILABLE_VIDEO_ORDERINGS, _sort_video_rows
+from apps.api.video_ranking import (
+    NUMPY_AVAILABLE,
+    _score_video_rows_scalar,
+    rank_video_rows,
+    score_video_rows,
+)
+
+
+def _synthetic_rows(count: int, *, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    now_ts = time.time()
+    for i in range(count):
+        has_metrics = rng.random() > 0.1
+        views = rng.randint(0, 2_000_000) if has_metrics else None
+        likes = rng.randint(0, 50_000) if has_metrics else None
+        comments = rng.randint(0, 5_000) if has_metrics else None
+        days = round(rng.uniform(0, 30), 2)
+        rows.append(
+            {
+                "scheduled_post_id": i + 1,
+                "views": views,
+                "likes": likes,
+                "comments": comments,
+                "shares": None,
+                "engagement_total": None if likes is None else likes + comments,
+                "days_since_post": days,
+                "_sort_published_ts": now_ts - days * 86400.0,
+            }
+        )
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Compare the per-row and vectorized viral score/ranking paths on synthetic video rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Number of synthetic rows.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per path (best time is reported).")
+        parser.add_argument("--top", type=int, default=10, help="Top-k size for the argpartition path.")
+        parser.add_argument("--period", default="last_month", help="Period used for the recency factor.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not NUMPY_AVAILABLE:
+            raise CommandError("numpy is not installed; only the per-row path is available.")
+
+        base = _synthetic_rows(max(1, options["rows"]), seed=options["seed"])
+        period = options["period"]
+        repeat = max(1, options["repeat"])
+        top = max(1, options["top"])
+
+        def best_of(fn) -> float:
+            best = float("inf")
+            for _ in range(repeat):
+                rows = copy.deepcopy(base)
+                started = time.perf_counter()
+                fn(rows)
+                best = min(best, time.perf_counter() - started)
+            return best * 1000.0
+
+        self.stdout.write(f"rows={len(base)} repeat={repeat} top={top} period={period}")
+        for ordering in AVAILABLE_VIDEO_ORDERINGS:
+            scalar_rows = copy.deepcopy(base)
+            _score_video_rows_scalar(scalar_rows, period=period)
+            expected = [r["scheduled_post_id"] for r in _sort_video_rows(scalar_rows, ordering=ordering)]
+            vector_rows = copy.deepcopy(base)
+            score_video_rows(vector_rows, period=period)
+            got = [r["scheduled_post_id"] for r in rank_video_rows(vector_rows, ordering=ordering)]
+            got_top = [
+                r["scheduled_post_id"] for r in rank_video_rows(vector_rows, ordering=ordering, limit=top)
+            ]
+
+            scalar_ms = best_of(
+                lambda rows, o=ordering: _sort_video_rows(
+                    _score_video_rows_scalar(rows, period=period) or rows, ordering=o
+                )
+            )
+            vector_ms = best_of(
+                lambda rows, o=ordering: rank_video_rows(
+                    score_video_rows(rows, period=period) or rows, ordering=o
+                )
+            )
+            top_ms = best_of(
+                lambda rows, o=ordering: rank_video_rows(
+                    score_video_rows(rows, period=period) or rows, ordering=o, limit=top
+                )
+            )
+            same = "ok" if got == expected and got_top == expected[:top] else "MISMATCH"
+            self.stdout.write(
+                f"{ordering:<16} per-row={scalar_ms:8.2f}ms vectorized={vector_ms:8.2f}ms "
+                f"top{top}={top_ms:8.2f}ms speedup={scalar_ms / max(vector_ms, 1e-9):5.1f}x {same}"
+            )
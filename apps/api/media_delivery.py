@@ -0,0 +1,146 @@
+"""
+Entrega de arquivos de mídia autenticados (download de jobs, preview/download de cortes).
+
+A autorização continua na view (``get_object``); aqui só a resposta:
+- ETag/Last-Modified e respostas condicionais (304/412);
+- ``Range: bytes=`` (um intervalo) com 206/416, para os players de preview buscarem trechos;
+- com ``settings.MEDIA_ACCEL_REDIRECT`` o proxy (nginx ``X-Accel-Redirect`` ou
+  ``X-Sendfile``) envia os bytes e o worker do gunicorn fica livre na hora.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+MEDIA_RANGE_CHUNK_SIZE = 512 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(st: os.stat_result) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None | bool:
+    """
+    (início, fim inclusivo) do header Range; ``None`` para ignorar (header ausente ou
+    vários intervalos: responde o arquivo inteiro) e ``False`` se não satisfazível.
+    """
+    match = _RANGE_RE.match(header.strip().replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag: str, last_modified: int) -> bool:
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _iter_range(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(MEDIA_RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _accel_response(path: Path, content_type: str) -> HttpResponse | None:
+    mode = getattr(settings, "MEDIA_ACCEL_REDIRECT", "")
+    if mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = str(path)
+        return response
+    if mode == "x-accel-redirect":
+        try:
+            relative = path.resolve().relative_to(Path(settings.MEDIA_ROOT).resolve())
+        except ValueError:
+            return None  # fora do MEDIA_ROOT: o location interno do nginx não alcança
+        prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/_protected_media/").rstrip("/")
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = f"{prefix}/{quote(relative.as_posix())}"
+        return response
+    return None
+
+
+def serve_media_file(
+    request,
+    path: str | os.PathLike,
+    *,
+    filename: str | None = None,
+    as_attachment: bool = True,
+    content_type: str | None = None,
+) -> HttpResponse:
+    """Resposta para ``path`` (já autorizado pela view) com Range, ETag e offload opcional."""
+    path = Path(path)
+    st = path.stat()
+    size = st.st_size
+    etag = _etag(st)
+    last_modified = int(st.st_mtime)
+    content_type = content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    def _with_headers(response: HttpResponse) -> HttpResponse:
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Accept-Ranges"] = "bytes"
+        if filename:
+            response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+        return response
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return _with_headers(conditional)
+
+    accel = _accel_response(path, content_type)
+    if accel is not None:
+        # O proxy trata Range/condicionais sobre o arquivo real.
+        return _with_headers(accel)
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and request.method in ("GET", "HEAD") and _if_range_matches(request, etag, last_modified):
+        byte_range = _parse_range(range_header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return _with_headers(response)
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        return _with_headers(response)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(path, start, length), status=206, content_type=content_type)
+    response["Content-Length"] = str(length)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return _with_headers(response)
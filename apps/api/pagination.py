@@ -1,9 +1,119 @@
-"""Paginação padrão para listagens da API (page / page_size)."""
+"""Paginação padrão para listagens da API (page / page_size, ou cursor keyset com ?cursor=)."""
 
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 25
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+def _encode_cursor(values: list) -> str:
+    raw = [v.isoformat() if hasattr(v, "isoformat") else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token: str, model, ordering: tuple[str, ...]) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(raw, list) or len(raw) != len(ordering):
+            raise ValueError("cursor com tamanho inesperado")
+        values = [
+            model._meta.get_field(name.lstrip("-")).to_python(v) for name, v in zip(ordering, raw, strict=True)
+        ]
+    except (ValueError, TypeError, UnicodeDecodeError, binascii.Error, ValidationError) as exc:
+        raise NotFound("Cursor inválido.") from exc
+    if any(v is None for v in values):
+        raise NotFound("Cursor inválido.")
+    return values
+
+
+def keyset_filter(ordering: tuple[str, ...], values: list) -> Q:
+    """
+    Linhas estritamente depois de ``values`` na ordem ``ordering``.
+
+    Para ``("-scheduled_at", "-id")``: ``scheduled_at < v0 OR (scheduled_at = v0 AND id < v1)``.
+    """
+    condition = Q()
+    equal_prefix: dict = {}
+    for name, value in zip(ordering, values, strict=True):
+        field = name.lstrip("-")
+        lookup = "lt" if name.startswith("-") else "gt"
+        condition |= Q(**equal_prefix, **{f"{field}__{lookup}": value})
+        equal_prefix[field] = value
+    return condition
+
+
+class KeysetPagination(StandardResultsSetPagination):
+    """
+    Paginação por cursor (keyset), ativada com ``?cursor=`` (vazio na primeira página).
+
+    Ordena por ``view.keyset_ordering`` (coberto por índice, ex. ``("-scheduled_at", "-id")``)
+    e continua a partir da última linha da página anterior, sem OFFSET nem COUNT: páginas
+    profundas do histórico custam o mesmo que a primeira. A resposta traz ``next`` /
+    ``next_cursor`` (nulos na última página) e ``results``.
+
+    Sem ``cursor`` mantém a paginação por página; com ``page_mode = False`` devolve a
+    lista inteira, como nas views que não paginavam.
+    """
+
+    cursor_query_param = "cursor"
+    page_mode = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            if not self.page_mode:
+                return None
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        ordering = tuple(getattr(view, "keyset_ordering", None) or ("-id",))
+        qs = queryset.order_by(*ordering)
+        token = request.query_params.get(self.cursor_query_param) or ""
+        if token:
+            qs = qs.filter(keyset_filter(ordering, _decode_cursor(token, queryset.model, ordering)))
+
+        page_size = self.get_page_size(request) or self.page_size
+        rows = list(qs[: page_size + 1])
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_cursor = _encode_cursor([getattr(last, name.lstrip("-")) for name in ordering])
+        return rows
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.next_cursor:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "next_cursor": self.next_cursor,
+                "results": data,
+            }
+        )
+
+
+class OptionalKeysetPagination(KeysetPagination):
+    """Keyset só quando pedido (``?cursor=``); sem ele a listagem continua inteira."""
+
+    page_mode = False
@@ -31,14 +31,19 @@ from apps.jobs.models import (
 from apps.mediahub.models import SourceVideo
 from apps.social.services.secret_crypto import encrypt_secret, is_secret_configured
 
+from .batching import MISSING, BatchFieldsMixin, BatchListSerializer
+
 User = get_user_model()
 
 
-class FactorySerializer(serializers.ModelSerializer):
+class FactorySerializer(BatchFieldsMixin, serializers.ModelSerializer):
     has_youtube_check_credential = serializers.SerializerMethodField(read_only=True)
 
+    batch_sources = {"has_youtube_check_credential": "youtube_check_credentials"}
+
     class Meta:
         model = Factory
+        list_serializer_class = BatchListSerializer
         fields = [
             "id",
             "name",
@@ -65,7 +70,19 @@ class FactorySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at", "updated_at", "has_youtube_check_credential"]
 
+    def batch_youtube_check_credentials(self, instances):
+        from apps.brands.models import FactoryYouTubeCheckCredential
+        with_credential = set(
+            FactoryYouTubeCheckCredential.objects.filter(factory__in=instances)
+            .exclude(refresh_token="")
+            .values_list("factory_id", flat=True)
+        )
+        return {f.pk: f.pk in with_credential for f in instances}
+
     def get_has_youtube_check_credential(self, obj):
+        batched = self.batch_value("youtube_check_credentials", obj, False)
+        if batched is not MISSING:
+            return batched
         from apps.brands.models import FactoryYouTubeCheckCredential
         return FactoryYouTubeCheckCredential.objects.filter(
             factory=obj,
@@ -410,7 +427,7 @@ class JobCutInlineSerializer(serializers.ModelSerializer):
         return super().to_internal_value(data)
 
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(BatchFieldsMixin, serializers.ModelSerializer):
     cut_ids = serializers.ListField(
         child=serializers.IntegerField(),
         write_only=True,
@@ -420,8 +437,11 @@ class JobSerializer(serializers.ModelSerializer):
     scheduled_summary = serializers.SerializerMethodField(read_only=True)
     can_delete = serializers.SerializerMethodField(read_only=True)
 
+    batch_sources = {"output_url": "output_urls", "scheduled_summary": "scheduled_summaries"}
+
     class Meta:
         model = Job
+        list_serializer_class = BatchListSerializer
         fields = [
             "id",
             "name",
@@ -452,7 +472,32 @@ class JobSerializer(serializers.ModelSerializer):
             "created_at", "started_at", "finished_at",
         ]
 
+    def batch_output_urls(self, instances):
+        outputs = RenderOutput.objects.filter(job__in=instances).exclude(file="").only("job_id", "file")
+        return {out.job_id: out.file.url for out in outputs}
+
+    def batch_scheduled_summaries(self, instances):
+        from django.db.models import Count, Q
+
+        rows = (
+            ScheduledPost.objects.filter(job__in=instances)
+            .values("job_id")
+            .annotate(
+                total=Count("id"),
+                posted=Count("id", filter=Q(status="DONE")),
+                pending=Count("id", filter=Q(status__in=("PENDING", "POSTING"))),
+            )
+            .order_by()
+        )
+        return {
+            row["job_id"]: {"total": row["total"], "posted": row["posted"], "pending": row["pending"]}
+            for row in rows
+        }
+
     def get_output_url(self, obj):
+        batched = self.batch_value("output_urls", obj)
+        if batched is not MISSING:
+            return batched
         try:
             out = obj.output
             if out and out.file:
@@ -462,6 +507,9 @@ class JobSerializer(serializers.ModelSerializer):
         return None
 
     def get_scheduled_summary(self, obj):
+        batched = self.batch_value("scheduled_summaries", obj)
+        if batched is not MISSING:
+            return batched
         posts = obj.scheduled_posts.all()
         if not posts:
             return None
@@ -502,12 +550,15 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class ScheduledPostSerializer(serializers.ModelSerializer):
+class ScheduledPostSerializer(BatchFieldsMixin, serializers.ModelSerializer):
     job = serializers.PrimaryKeyRelatedField(queryset=Job.objects.all(), required=False, allow_null=True)
     job_name = serializers.SerializerMethodField(read_only=True)
 
+    batch_sources = {"job_name": "job_names"}
+
     class Meta:
         model = ScheduledPost
+        list_serializer_class = BatchListSerializer
         fields = [
             "id",
             "job",
@@ -527,7 +578,30 @@ class ScheduledPostSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["status", "error", "created_at", "posted_at"]
 
+    def batch_job_names(self, instances):
+        """Só nome do job / título da sugestão (sem carregar as linhas com JSON pesado)."""
+        job_ids = {p.job_id for p in instances if p.job_id}
+        corte_ids = {p.auto_cut_corte_id for p in instances if not p.job_id and p.auto_cut_corte_id}
+        job_names = dict(Job.objects.filter(id__in=job_ids).values_list("id", "name")) if job_ids else {}
+        titles = (
+            dict(AutoCutCorte.objects.filter(id__in=corte_ids).values_list("id", "suggestion__title"))
+            if corte_ids
+            else {}
+        )
+        names = {}
+        for p in instances:
+            if p.job_id:
+                names[p.pk] = job_names.get(p.job_id) or f"Job #{p.job_id}"
+            elif p.auto_cut_corte_id:
+                names[p.pk] = titles.get(p.auto_cut_corte_id) or f"Corte #{p.auto_cut_corte_id}"
+            else:
+                names[p.pk] = "-"
+        return names
+
     def get_job_name(self, obj):
+        batched = self.batch_value("job_names", obj)
+        if batched is not MISSING:
+            return batched
         if obj.job_id:
             return obj.job.name or f"Job #{obj.job.id}"
         if obj.auto_cut_corte_id:
@@ -680,13 +754,21 @@ class AutoCutAnalysisSerializer(serializers.ModelSerializer):
         read_only_fields = ["status", "progress", "progress_message", "transcript", "error", "created_at"]
 
 
-class VideoInventoryItemSerializer(serializers.ModelSerializer):
+def _has_youtube_id(external_ids) -> bool:
+    external_ids = external_ids or {}
+    return bool(str(external_ids.get("YT") or external_ids.get("YTB") or "").strip())
+
+
+class VideoInventoryItemSerializer(BatchFieldsMixin, serializers.ModelSerializer):
     source_display_name = serializers.SerializerMethodField(read_only=True)
     status_message = serializers.SerializerMethodField(read_only=True)
     scheduled_post_id = serializers.SerializerMethodField(read_only=True)
 
+    batch_sources = {"status_message": "latest_schedules", "scheduled_post_id": "latest_schedules"}
+
     class Meta:
         model = VideoInventoryItem
+        list_serializer_class = BatchListSerializer
         fields = [
             "id",
             "factory",
@@ -710,6 +792,19 @@ class VideoInventoryItemSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def batch_latest_schedules(self, instances):
+        """Agendamento mais recente de cada item: (scheduled_post_id, tem ID do YouTube)."""
+        latest: dict[int, tuple] = {}
+        rows = (
+            FactoryPostingSchedule.objects.filter(inventory_item__in=instances)
+            .order_by("inventory_item_id", "-id")
+            .values_list("inventory_item_id", "scheduled_post_id", "scheduled_post__external_ids")
+        )
+        for item_id, post_id, external_ids in rows:
+            if item_id not in latest:
+                latest[item_id] = (post_id, _has_youtube_id(external_ids))
+        return latest
+
     def _latest_posting_schedule(self, obj):
         prefetched = getattr(obj, "_prefetched_objects_cache", {}) or {}
         schedules = prefetched.get("posting_schedules")
@@ -729,18 +824,22 @@ class VideoInventoryItemSerializer(serializers.ModelSerializer):
         Mensagem de detalhe para status Postando: "Na fila" ou "Aguardando confirmação".
         """
         if obj.status in ("SCHEDULED", "POSTING"):
-            schedule = self._latest_posting_schedule(obj)
-            post = getattr(schedule, "scheduled_post", None) if schedule else None
-            external_ids = getattr(post, "external_ids", None) or {}
-            has_yt_id = bool(
-                str(external_ids.get("YT") or external_ids.get("YTB") or "").strip()
-            )
             if obj.status == "POSTING":
                 return "Enviando..."
+            batched = self.batch_value("latest_schedules", obj, (None, False))
+            if batched is not MISSING:
+                has_yt_id = batched[1]
+            else:
+                schedule = self._latest_posting_schedule(obj)
+                post = getattr(schedule, "scheduled_post", None) if schedule else None
+                has_yt_id = _has_youtube_id(getattr(post, "external_ids", None))
             return "Aguardando confirmação" if has_yt_id else "Na fila"
         return None
 
     def get_scheduled_post_id(self, obj):
+        batched = self.batch_value("latest_schedules", obj, (None, False))
+        if batched is not MISSING:
+            return batched[0]
         schedule = self._latest_posting_schedule(obj)
         return getattr(schedule, "scheduled_post_id", None) if schedule else None
 
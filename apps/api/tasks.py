@@ -0,0 +1,118 @@
+"""Tasks de background do dashboard (refresh de payloads em cache e snapshots periódicos)."""
+
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.cache import cache
+
+from apps.common.task_observability import instrument_celery_task
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_LOCK_KEY = "factory_youtube_snapshots:running"
+_SNAPSHOT_LOCK_TTL_SECONDS = 30 * 60
+
+
+@shared_task(soft_time_limit=900, time_limit=960)
+@instrument_celery_task
+def refresh_factory_youtube_videos_task(
+    factory_id: int,
+    brand_id: int | None = None,
+    period: str | None = None,
+    ordering: str | None = None,
+):
+    """Reconstrói a lista de vídeos YouTube da factory (stale-while-revalidate)."""
+    from apps.api.factory_youtube_dashboard import build_factory_youtube_videos
+
+    payload = build_factory_youtube_videos(
+        factory_id,
+        brand_id=brand_id,
+        period=period,
+        ordering=ordering,
+        background=True,
+    )
+    return {"factory_id": factory_id, "brand_id": brand_id, "count": payload.get("count") or 0}
+
+
+@shared_task(soft_time_limit=900, time_limit=960)
+@instrument_celery_task
+def refresh_factory_youtube_dashboard_task(
+    factory_id: int,
+    brand_id: int | None = None,
+    period: str | None = None,
+    include_top_posts: bool = True,
+):
+    """Reconstrói o resumo YouTube da factory (stale-while-revalidate, incremental por brand)."""
+    from apps.api.factory_youtube_dashboard import build_factory_youtube_dashboard
+
+    payload = build_factory_youtube_dashboard(
+        factory_id,
+        brand_id=brand_id,
+        period=period,
+        include_top_posts=include_top_posts,
+        background=True,
+    )
+    return {
+        "factory_id": factory_id,
+        "brand_id": brand_id,
+        "brands_refreshed": (payload.get("meta") or {}).get("brands_refreshed"),
+    }
+
+
+@shared_task(soft_time_limit=1500, time_limit=1560)
+@instrument_celery_task
+def precompute_factory_youtube_snapshots_task(factory_id: int | None = None):
+    """
+    Roda via Beat: pré-calcula os snapshots do dashboard YouTube de cada factory ativa
+    (resumo + lista de vídeos em todas as ordenações) para os SNAPSHOT_PERIODS.
+
+    As views passam a responder do cache com ``as_of``; só brands com publicações novas
+    (ver _collect_brand_lines) e métricas por post vencidas voltam à Upload Post.
+    """
+    from apps.api.factory_youtube_dashboard import (
+        SNAPSHOT_PERIODS,
+        build_factory_youtube_dashboard,
+        build_factory_youtube_video_snapshots,
+    )
+    from apps.brands.models import Factory
+    from apps.social.services.upload_post_analytics_client import get_upload_post_api_key
+
+    if not get_upload_post_api_key():
+        return {"skipped": "no_api_key"}
+    if not cache.add(_SNAPSHOT_LOCK_KEY, 1, _SNAPSHOT_LOCK_TTL_SECONDS):
+        return {"skipped": "already_running"}
+
+    factories = Factory.objects.filter(is_active=True).order_by("id")
+    if factory_id:
+        factories = factories.filter(id=factory_id)
+    built = 0
+    brands_refreshed = 0
+    try:
+        for fid in factories.values_list("id", flat=True):
+            for period in SNAPSHOT_PERIODS:
+                try:
+                    build_factory_youtube_video_snapshots(fid, period=period)
+                    for include_top_posts in (False, True):
+                        payload = build_factory_youtube_dashboard(
+                            fid,
+                            period=period,
+                            include_top_posts=include_top_posts,
+                            background=True,
+                        )
+                        brands_refreshed += int((payload.get("meta") or {}).get("brands_refreshed") or 0)
+                    built += 1
+                except SoftTimeLimitExceeded:
+                    # Estourou o soft limit: para aqui (o finally libera o lock).
+                    raise
+                except Exception:
+                    logger.exception(
+                        "[FactoryYouTubeDashboard] snapshot falhou factory_id=%s period=%s",
+                        fid,
+                        period,
+                    )
+    finally:
+        cache.delete(_SNAPSHOT_LOCK_KEY)
+    return {"snapshots": built, "brands_refreshed": brands_refreshed}
@@ -0,0 +1,42 @@
+"""Helper de teste: listagens da API com número de queries independente do tamanho da página."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+
+class ListQueryCountMixin:
+    """
+    ``assertListQueryCount(url, add_row, expected=N)`` cria linhas com ``add_row(i)`` até
+    cada tamanho em ``sizes``, faz GET em ``url`` e exige exatamente ``expected`` queries
+    em todos os tamanhos (N+1 aparece como contagem crescente).
+    """
+
+    def assertListQueryCount(
+        self,
+        url: str,
+        add_row: Callable[[int], object],
+        *,
+        expected: int,
+        sizes: tuple[int, ...] = (1, 6),
+    ) -> None:
+        counts: dict[int, int] = {}
+        created = 0
+        for size in sizes:
+            while created < size:
+                add_row(created)
+                created += 1
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK, res.content[:300])
+            counts[size] = len(ctx.captured_queries)
+        self.assertEqual(
+            counts,
+            {size: expected for size in sizes},
+            "queries por tamanho de página: "
+            + "; ".join(q["sql"][:120] for q in ctx.captured_queries),
+        )
@@ -2,20 +2,37 @@
 
 from __future__ import annotations
 
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from hashlib import sha256
+from pathlib import Path
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.auto_cuts.models import AutoCutAnalysis, AutoCutCorte, AutoCutSuggestion
 from apps.brands.models import Brand, Factory
+from apps.cuts.models import Cut
 from apps.jobs.models import (
     FactoryPostingSchedule,
+    Job,
     PostedVideoLog,
     ScheduledPost,
     VideoInventoryItem,
 )
+from apps.mediahub.models import ResumableUpload
+from apps.mediahub.services import resumable_upload
 
 User = get_user_model()
 
@@ -136,3 +153,428 @@ class VideoInventoryMarkPostedTests(TestCase):
         self.assertEqual(log.posted_at, custom_posted_at)
         self.assertTrue(log.metadata_snapshot["manual_post"])
         self.assertEqual(log.metadata_snapshot["manual_posted_at"], custom_posted_at.isoformat())
+
+
+class KeysetPaginationAndSparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="keyset-user", password="securepass1")
+        self.client.force_authenticate(user=self.user)
+        self.factory = Factory.objects.create(name="Factory Keyset")
+        self.brand = Brand.objects.create(name="Brand Keyset", slug="brand-keyset", factory=self.factory)
+        self.job = Job.objects.create(user=self.user, brand=self.brand, name="Job Keyset", status="DONE")
+        base = timezone.now()
+        # Dois posts no mesmo instante: o desempate por id precisa manter a ordem estável.
+        self.posts = [
+            ScheduledPost.objects.create(
+                job=self.job,
+                platforms=["YTB"],
+                scheduled_at=base - timedelta(hours=i // 2),
+                title=f"Post {i}",
+                external_ids={"YTB": f"vid{i}", "raw": "x" * 500},
+            )
+            for i in range(5)
+        ]
+
+    def _walk(self, url: str) -> list[int]:
+        seen: list[int] = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            seen.extend(row["id"] for row in res.data["results"])
+            url = res.data["next"]
+        return seen
+
+    def test_cursor_walks_scheduled_posts_in_keyset_order_without_gaps(self):
+        expected = [
+            p.id for p in sorted(self.posts, key=lambda p: (p.scheduled_at, p.id), reverse=True)
+        ]
+
+        self.assertEqual(self._walk("/api/scheduled-posts/?cursor=&page_size=2"), expected)
+
+    def test_invalid_cursor_returns_404(self):
+        res = self.client.get("/api/scheduled-posts/?cursor=not-a-cursor")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_still_works_without_cursor(self):
+        res = self.client.get("/api/scheduled-posts/?page=1&page_size=2")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 5)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_fields_param_limits_payload_and_loaded_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/scheduled-posts/?cursor=&fields=title,status")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data["results"][0]), {"id", "title", "status"})
+        select = next(q["sql"] for q in ctx.captured_queries if 'FROM "jobs_scheduledpost"' in q["sql"])
+        self.assertNotIn('"description"', select)
+        self.assertNotIn('"external_ids"', select)
+
+    def test_heavy_json_is_deferred_by_default(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/scheduled-posts/?cursor=")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("description", res.data["results"][0])
+        select = next(q["sql"] for q in ctx.captured_queries if 'FROM "jobs_scheduledpost"' in q["sql"])
+        self.assertNotIn('"external_ids"', select)
+
+    def test_inventory_cursor_with_sparse_fields(self):
+        for i in range(3):
+            VideoInventoryItem.objects.create(
+                factory=self.factory,
+                brand=self.brand,
+                video_type="SHORT",
+                title=f"Item {i}",
+            )
+
+        res = self.client.get("/api/video-inventory/?cursor=&page_size=2&fields=title,source_display_name")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data["results"][0]), {"id", "title", "source_display_name"})
+        self.assertEqual(res.data["results"][0]["title"], "Item 2")
+        self.assertIsNotNone(res.data["next_cursor"])
+
+    def test_posted_videos_stay_unpaginated_without_cursor(self):
+        for i in range(3):
+            PostedVideoLog.objects.create(
+                factory=self.factory,
+                brand=self.brand,
+                external_video_id=f"yt{i}",
+                posted_at=timezone.now() - timedelta(days=i),
+            )
+
+        res = self.client.get("/api/posted-videos/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 3)
+
+        page = self.client.get("/api/posted-videos/?cursor=&page_size=2")
+        self.assertEqual([row["external_video_id"] for row in page.data["results"]], ["yt0", "yt1"])
+        rest = self.client.get(page.data["next"])
+        self.assertEqual([row["external_video_id"] for row in rest.data["results"]], ["yt2"])
+        self.assertIsNone(rest.data["next"])
+
+    def test_corte_fields_prune_unused_joins_and_defer_transcript(self):
+        analysis = AutoCutAnalysis.objects.create(
+            user=self.user,
+            brand=self.brand,
+            name="Live longa",
+            status="done",
+            transcript="t" * 1000,
+        )
+        suggestion = AutoCutSuggestion.objects.create(
+            analysis=analysis,
+            cut_type="short",
+            start_tc="0:00",
+            end_tc="0:10",
+            title="Sugestão",
+            raw_data={"big": "y" * 1000},
+        )
+        AutoCutCorte.objects.create(analysis=analysis, suggestion=suggestion)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/auto-cut-cortes/?cursor=&fields=format")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0], {"id": res.data["results"][0]["id"], "format": "vertical"})
+        select = next(q["sql"] for q in ctx.captured_queries if 'FROM "auto_cuts_autocutcorte"' in q["sql"])
+        self.assertNotIn('"auto_cuts_autocutanalysis"."name"', select)
+        self.assertNotIn('"auto_cuts_autocutsuggestion"', select)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/auto-cut-cortes/?cursor=")
+        self.assertEqual(res.data["results"][0]["analysis_name"], "Live longa")
+        self.assertEqual(res.data["results"][0]["suggestion"]["title"], "Sugestão")
+        select = next(q["sql"] for q in ctx.captured_queries if 'FROM "auto_cuts_autocutcorte"' in q["sql"])
+        self.assertNotIn('"transcript"', select)
+        self.assertNotIn('"raw_data"', select)
+
+
+class VideoInventoryDownloadMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="download-user", password="securepass1")
+        self.client.force_authenticate(user=self.user)
+        self.factory = Factory.objects.create(name="Factory Download")
+        self.brand = Brand.objects.create(name="Brand Download", slug="brand-download", factory=self.factory)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_streams_stored_zip_with_content_length(self):
+        analysis = AutoCutAnalysis.objects.create(brand=self.brand, name="Live", status="done")
+        suggestion = AutoCutSuggestion.objects.create(
+            analysis=analysis, cut_type="short", start_tc="0:00", end_tc="0:10", title="Sugestão"
+        )
+        corte = AutoCutCorte.objects.create(analysis=analysis, suggestion=suggestion)
+        corte.file.save("corte.mp4", ContentFile(b"\x00video" * 5000), save=True)
+        inventory = VideoInventoryItem.objects.create(
+            factory=self.factory,
+            brand=self.brand,
+            auto_cut_corte=corte,
+            video_type="SHORT",
+            title="Meu corte",
+        )
+
+        res = self.client.get(f"/api/video-inventory/{inventory.id}/download-media/")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        body = b"".join(res.streaming_content)
+        self.assertEqual(int(res["Content-Length"]), len(body))
+        self.assertIn("Meu corte_midias.zip", res["Content-Disposition"])
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read("Meu corte.mp4"), b"\x00video" * 5000)
+            self.assertIn("Meu corte", zf.read("Meu corte_descricao.txt").decode("utf-8"))
+
+    def test_corte_download_serves_byte_ranges_to_owner(self):
+        analysis = AutoCutAnalysis.objects.create(user=self.user, brand=self.brand, name="Live", status="done")
+        suggestion = AutoCutSuggestion.objects.create(
+            analysis=analysis, cut_type="short", start_tc="0:00", end_tc="0:10", title="Corte bom"
+        )
+        corte = AutoCutCorte.objects.create(analysis=analysis, suggestion=suggestion)
+        corte.file.save("corte.mp4", ContentFile(b"0123456789" * 100), save=True)
+
+        res = self.client.get(f"/api/auto-cut-cortes/{corte.id}/download/?inline=1", HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(res.streaming_content), b"0123456789")
+        self.assertTrue(res["Content-Disposition"].startswith("inline"))
+
+        other = User.objects.create_user(username="other-download", password="securepass1")
+        self.client.force_authenticate(user=other)
+        res = self.client.get(f"/api/auto-cut-cortes/{corte.id}/download/")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@mock.patch(
+    "apps.jobs.services.ffmpeg.ffprobe_video_info",
+    return_value={"duration": 12.5, "width": 1080, "height": 1920},
+)
+class ResumableUploadTests(TestCase):
+    payload = bytes(range(256)) * 40
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="upload-user", password="securepass1")
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _create(self, target="cut"):
+        res = self.client.post(
+            "/api/uploads/",
+            {"target": target, "filename": "meu corte.mp4", "length": len(self.payload)},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res
+
+    def _patch(self, upload_id, offset, body):
+        return self.client.generic(
+            "PATCH",
+            f"/api/uploads/{upload_id}/",
+            body,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_resumes_from_offset_and_finalizes_cut_in_place(self, _probe):
+        created = self._create()
+        upload_id = created.data["id"]
+        self.assertEqual(created["Upload-Offset"], "0")
+        self.assertTrue(created["Location"].endswith(f"/api/uploads/{upload_id}/"))
+
+        res = self._patch(upload_id, 0, self.payload[:4000])
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(res["Upload-Offset"], "4000")
+
+        # Outro worker: o estado do SHA-256 em memória se perdeu e é refeito do disco.
+        resumable_upload._HASHERS.clear()
+        res = self._patch(upload_id, 0, self.payload)
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res["Upload-Offset"], "4000")
+
+        res = self.client.head(f"/api/uploads/{upload_id}/")
+        self.assertEqual(res["Upload-Offset"], "4000")
+        self.assertEqual(res["Cache-Control"], "no-store")
+
+        res = self._patch(upload_id, 4000, self.payload[4000:])
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        upload = ResumableUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.status, "complete")
+        self.assertEqual(upload.sha256, sha256(self.payload).hexdigest())
+
+        res = self.client.post("/api/cuts/upload/", {"upload_id": upload_id}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        cut = Cut.objects.get(pk=res.data["id"])
+        self.assertEqual(cut.file.name, upload.file_name)
+        self.assertTrue(cut.file.name.startswith("cuts/"))
+        self.assertEqual(cut.format, "vertical")
+        self.assertEqual(cut.name, "meu corte.mp4")
+        self.assertEqual(Path(cut.file.path).read_bytes(), self.payload)
+        self.assertEqual(ResumableUpload.objects.get(pk=upload_id).status, "consumed")
+
+        # Já consumido: não cria um segundo corte apontando para o mesmo arquivo.
+        res = self.client.post("/api/cuts/upload/", {"upload_id": upload_id}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tus_headers_create_job_upload(self, _probe):
+        res = self.client.post(
+            "/api/uploads/",
+            HTTP_UPLOAD_LENGTH=str(len(self.payload)),
+            HTTP_UPLOAD_METADATA="filename dmlkZW8ubXA0,target am9i",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["target"], "job")
+        self.assertEqual(res.data["filename"], "video.mp4")
+        upload_id = res.data["id"]
+        self.assertEqual(self._patch(upload_id, 0, self.payload).status_code, status.HTTP_204_NO_CONTENT)
+
+        # Upload de job não serve para corte.
+        res = self.client.post("/api/cuts/upload/", {"upload_id": upload_id}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post("/api/jobs/upload/", {"upload_id": upload_id, "name": "Pronto"}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        job = Job.objects.get(pk=res.data["id"])
+        self.assertTrue(job.output.file.name.startswith("exports/"))
+
+    def test_rejects_wrong_content_type_oversized_chunk_and_foreign_user(self, _probe):
+        upload_id = self._create().data["id"]
+
+        res = self.client.patch(f"/api/uploads/{upload_id}/", {"x": 1}, format="json", HTTP_UPLOAD_OFFSET="0")
+        self.assertEqual(res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        res = self._patch(upload_id, 0, self.payload + b"extra")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self._patch("not-a-uuid", 0, b"abc")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        other = User.objects.create_user(username="other-upload", password="securepass1")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.head(f"/api/uploads/{upload_id}/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delete_and_stale_cleanup_remove_partial_file(self, _probe):
+        upload_id = self._create().data["id"]
+        self._patch(upload_id, 0, self.payload[:100])
+        path = resumable_upload.upload_path(ResumableUpload.objects.get(pk=upload_id))
+        self.assertTrue(path.exists())
+
+        res = self.client.delete(f"/api/uploads/{upload_id}/")
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(path.exists())
+
+        stale_id = self._create().data["id"]
+        ResumableUpload.objects.filter(pk=stale_id).update(updated_at=timezone.now() - timedelta(days=3))
+        self.assertEqual(resumable_upload.discard_stale_uploads(), 1)
+        self.assertFalse(ResumableUpload.objects.filter(pk=stale_id).exists())
+
+    def test_concurrent_patch_is_locked_until_claim_expires(self, _probe):
+        upload_id = self._create().data["id"]
+        ResumableUpload.objects.filter(pk=upload_id).update(claim_token="x" * 32, claimed_at=timezone.now())
+
+        res = self._patch(upload_id, 0, self.payload[:100])
+        self.assertEqual(res.status_code, status.HTTP_423_LOCKED)
+        self.assertEqual(ResumableUpload.objects.get(pk=upload_id).upload_offset, 0)
+
+        # Reserva de um processo que morreu: expira e o PATCH seguinte assume.
+        ResumableUpload.objects.filter(pk=upload_id).update(claimed_at=timezone.now() - timedelta(hours=1))
+        res = self._patch(upload_id, 0, self.payload[:100])
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        upload = ResumableUpload.objects.get(pk=upload_id)
+        self.assertEqual((upload.upload_offset, upload.claim_token, upload.claimed_at), (100, "", None))
+
+    def test_failed_target_creation_keeps_upload_reusable(self, _probe):
+        upload_id = self._create().data["id"]
+        self._patch(upload_id, 0, self.payload)
+
+        with mock.patch.object(Cut.objects, "create", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                self.client.post("/api/cuts/upload/", {"upload_id": upload_id}, format="json")
+        self.assertEqual(ResumableUpload.objects.get(pk=upload_id).status, "complete")
+
+        res = self.client.post("/api/cuts/upload/", {"upload_id": upload_id}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_late_probe_runs_outside_the_create_transaction(self, _probe):
+        upload_id = self._create().data["id"]
+        self._patch(upload_id, 0, self.payload)
+        ResumableUpload.objects.filter(pk=upload_id).update(probe=None)
+        depth = []
+        baseline = len(connection.atomic_blocks)
+        _probe.side_effect = lambda path: depth.append(len(connection.atomic_blocks)) or _probe.return_value
+
+        res = self.client.post("/api/cuts/upload/", {"upload_id": upload_id}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(depth, [baseline])
+        self.assertEqual(ResumableUpload.objects.get(pk=upload_id).probe["duration"], 12.5)
+
+    def test_client_disconnect_keeps_bytes_read_so_far(self, _probe):
+        upload_id = self._create().data["id"]
+
+        class DroppedStream(io.BytesIO):
+            def read(self, size=-1):
+                if self.tell():
+                    raise OSError("connection reset")
+                return super().read(1000)
+
+        upload = resumable_upload.append_chunk(
+            upload_id, user=self.user, offset=0, stream=DroppedStream(self.payload), content_length=None
+        )
+
+        self.assertEqual((upload.upload_offset, upload.status, upload.claim_token), (1000, "uploading", ""))
+
+    def test_disk_write_error_fails_without_moving_offset(self, _probe):
+        upload_id = self._create().data["id"]
+        self._patch(upload_id, 0, self.payload[:1000])
+        cached = resumable_upload._HASHERS[upload_id][1].hexdigest()
+        real_open = open
+
+        class FullDisk:
+            def __init__(self, fh):
+                self.fh = fh
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.fh.close()
+
+            def seek(self, pos):
+                self.fh.seek(pos)
+
+            def write(self, block):
+                raise OSError(28, "No space left on device")
+
+        with mock.patch(
+            "apps.mediahub.services.resumable_upload.open",
+            side_effect=lambda *a, **kw: FullDisk(real_open(*a, **kw)),
+            create=True,
+        ):
+            with self.assertRaises(OSError):
+                self._patch(upload_id, 1000, self.payload[1000:])
+
+        upload = ResumableUpload.objects.get(pk=upload_id)
+        self.assertEqual((upload.upload_offset, upload.claim_token), (1000, ""))
+        self.assertEqual(resumable_upload._HASHERS[upload_id][1].hexdigest(), cached)
+        res = self._patch(upload_id, 1000, self.payload[1000:])
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(ResumableUpload.objects.get(pk=upload_id).sha256, sha256(self.payload).hexdigest())
@@ -142,6 +142,110 @@ class FactoryYoutubeDashboardAggregationTests(TestCase):
         self.assertEqual(data["scope"]["brand_id"], self.b1.id)
 
 
+    @patch("apps.api.factory_youtube_dashboard.fetch_post_analytics")
+    @patch("apps.api.factory_youtube_dashboard.fetch_total_impressions")
+    @patch("apps.api.factory_youtube_dashboard.fetch_profile_platforms_analytics")
+    @patch("apps.api.factory_youtube_dashboard.get_upload_post_api_key")
+    def test_incremental_refresh_only_recollects_changed_brands(
+        self,
+        mock_key,
+        mock_prof,
+        mock_tot,
+        mock_post,
+    ):
+        mock_key.return_value = "test-key"
+        mock_prof.return_value = ({"youtube": {"followers": 10}}, None)
+        mock_tot.return_value = ({"success": True, "metrics": {"views": 20, "video_count": 1}}, None)
+        mock_post.return_value = (None, None)
+
+        from apps.api.factory_youtube_dashboard import build_factory_youtube_dashboard
+
+        first = build_factory_youtube_dashboard(self.factory_a.id, include_top_posts=False)
+        self.assertEqual(first["meta"]["brands_refreshed"], 2)
+        self.assertIsNotNone(first["as_of"])
+
+        mock_prof.reset_mock()
+        unchanged = build_factory_youtube_dashboard(
+            self.factory_a.id,
+            include_top_posts=False,
+            background=True,
+        )
+        self.assertEqual(unchanged["meta"]["brands_refreshed"], 0)
+        self.assertEqual(unchanged["summary"]["total_views"], 40)
+        mock_prof.assert_not_called()
+
+        job = Job.objects.create(brand=self.b1, name="Novo", status="DONE")
+        ScheduledPost.objects.create(
+            job=job,
+            platforms=["YTB"],
+            scheduled_at=timezone.now(),
+            status="DONE",
+            posted_at=timezone.now(),
+        )
+        changed = build_factory_youtube_dashboard(
+            self.factory_a.id,
+            include_top_posts=False,
+            background=True,
+        )
+        self.assertEqual(changed["meta"]["brands_refreshed"], 1)
+        self.assertEqual(mock_prof.call_args.args[0], f"brand_{self.b1.id}")
+
+    @patch("apps.api.factory_youtube_dashboard.fetch_post_analytics")
+    @patch("apps.api.factory_youtube_dashboard.fetch_total_impressions")
+    @patch("apps.api.factory_youtube_dashboard.fetch_profile_platforms_analytics")
+    @patch("apps.api.factory_youtube_dashboard.get_upload_post_api_key")
+    def test_precompute_task_warms_snapshots_for_active_factories(
+        self,
+        mock_key,
+        mock_prof,
+        mock_tot,
+        mock_post,
+    ):
+        mock_key.return_value = "test-key"
+        mock_prof.return_value = ({"youtube": {"followers": 10}}, None)
+        mock_tot.return_value = ({"success": True, "metrics": {"views": 20, "video_count": 1}}, None)
+        mock_post.return_value = (None, None)
+
+        from apps.api.factory_youtube_dashboard import build_factory_youtube_dashboard
+        from apps.api.tasks import precompute_factory_youtube_snapshots_task
+
+        with patch(
+            "apps.social.services.upload_post_analytics_client.get_upload_post_api_key",
+            return_value="test-key",
+        ):
+            result = precompute_factory_youtube_snapshots_task(self.factory_a.id)
+        self.assertEqual(result["snapshots"], 2)
+
+        mock_prof.reset_mock()
+        mock_tot.reset_mock()
+        data = build_factory_youtube_dashboard(self.factory_a.id, period="last_week", include_top_posts=False)
+        mock_prof.assert_not_called()
+        mock_tot.assert_not_called()
+        self.assertEqual(data["summary"]["total_views"], 40)
+        self.assertIsNotNone(data["as_of"])
+
+    def test_precompute_task_stops_on_soft_time_limit_and_releases_lock(self):
+        from celery.exceptions import SoftTimeLimitExceeded
+
+        from apps.api.tasks import _SNAPSHOT_LOCK_KEY, precompute_factory_youtube_snapshots_task
+
+        with (
+            patch(
+                "apps.social.services.upload_post_analytics_client.get_upload_post_api_key",
+                return_value="test-key",
+            ),
+            patch(
+                "apps.api.factory_youtube_dashboard.build_factory_youtube_video_snapshots",
+                side_effect=SoftTimeLimitExceeded(),
+            ) as mock_snapshots,
+            self.assertRaises(SoftTimeLimitExceeded),
+        ):
+            precompute_factory_youtube_snapshots_task()
+
+        mock_snapshots.assert_called_once()
+        self.assertIsNone(cache.get(_SNAPSHOT_LOCK_KEY))
+
+
 class FactoryYoutubeDashboardEndpointTests(TestCase):
     def setUp(self):
         cache.clear()
@@ -613,3 +717,100 @@ class FactoryYoutubeVideosEndpointTests(TestCase):
         self.assertEqual(row["post_url"], "https://www.youtube.com/watch?v=native-video-id")
         self.assertIsNone(row["views"])
         self.assertIsNone(row["viral_score"])
+
+    def test_stale_payload_is_served_and_refresh_scheduled_once(self):
+        from apps.api import factory_youtube_dashboard as dash
+
+        first = self._build_payload(ordering="views")
+        stale_now = dash.time.time() + dash.CACHE_TTL_SECONDS + 1
+        with (
+            patch("apps.api.factory_youtube_dashboard.time.time", return_value=stale_now),
+            patch("apps.api.factory_youtube_dashboard.fetch_post_analytics") as mock_fetch,
+            patch("apps.api.tasks.refresh_factory_youtube_videos_task.delay") as mock_delay,
+        ):
+            again = dash.build_factory_youtube_videos(self.factory.id, period="last_month", ordering="views")
+            dash.build_factory_youtube_videos(self.factory.id, period="last_month", ordering="views")
+
+        self.assertEqual(again, first)
+        mock_fetch.assert_not_called()
+        mock_delay.assert_called_once_with(self.factory.id, None, "last_month", "views")
+
+    def test_background_refresh_revalidates_post_analytics(self):
+        from apps.api import factory_youtube_dashboard as dash
+
+        self._build_payload(ordering="views")
+        stale_now = dash.time.time() + dash.POST_ANALYTICS_CACHE_TTL_SECONDS + 1
+        with (
+            patch("apps.api.factory_youtube_dashboard.get_upload_post_api_key", return_value="test-key"),
+            patch("apps.api.factory_youtube_dashboard.time.time", return_value=stale_now),
+            patch(
+                "apps.api.factory_youtube_dashboard.fetch_post_analytics",
+                side_effect=self._mock_post_analytics,
+            ) as mock_fetch,
+        ):
+            payload = dash.build_factory_youtube_videos(
+                self.factory.id,
+                period="last_month",
+                ordering="views",
+                background=True,
+            )
+
+        self.assertEqual(mock_fetch.call_count, 4)
+        self.assertEqual(payload["count"], 5)
+
+    def test_video_snapshots_build_rows_once_and_refetch_only_old_analytics(self):
+        from apps.api import factory_youtube_dashboard as dash
+
+        def _snapshot(now_ts):
+            with (
+                patch("apps.api.factory_youtube_dashboard.get_upload_post_api_key", return_value="test-key"),
+                patch("apps.api.factory_youtube_dashboard.time.time", return_value=now_ts),
+                patch(
+                    "apps.api.factory_youtube_dashboard.fetch_post_analytics",
+                    side_effect=self._mock_post_analytics,
+                ) as mock_fetch,
+                patch.object(
+                    dash, "_scheduled_posts_scope_queryset", wraps=dash._scheduled_posts_scope_queryset
+                ) as mock_scope,
+            ):
+                dash.build_factory_youtube_video_snapshots(self.factory.id, period="last_month")
+            self.assertEqual(mock_scope.call_count, 1)
+            return mock_fetch.call_count
+
+        now_ts = dash.time.time()
+        self.assertEqual(_snapshot(now_ts), 4)
+        for ordering in dash.AVAILABLE_VIDEO_ORDERINGS:
+            cached = cache.get(
+                dash._videos_cache_key_with_ordering(
+                    self.factory.id, brand_id=None, period="last_month", ordering=ordering
+                )
+            )
+            self.assertEqual(cached["payload"]["meta"]["ordering"], ordering)
+            self.assertEqual(cached["payload"]["count"], 5)
+            self.assertNotIn("_sort_published_ts", cached["payload"]["results"][0])
+
+        # Próxima execução do Beat: métricas com 10 min ainda não são vencidas para o snapshot.
+        self.assertEqual(_snapshot(now_ts + dash.POST_ANALYTICS_CACHE_TTL_SECONDS + 1), 0)
+        self.assertEqual(_snapshot(now_ts + dash.POST_ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS + 1), 4)
+
+    def test_failed_revalidation_keeps_last_good_post_analytics(self):
+        from apps.api import factory_youtube_dashboard as dash
+
+        with patch(
+            "apps.api.factory_youtube_dashboard.fetch_post_analytics",
+            side_effect=self._mock_post_analytics,
+        ):
+            dash._fetch_post_analytics_cached("req-top")
+        stale_now = dash.time.time() + dash.POST_ANALYTICS_CACHE_TTL_SECONDS + 1
+        with (
+            patch("apps.api.factory_youtube_dashboard.time.time", return_value=stale_now),
+            patch(
+                "apps.api.factory_youtube_dashboard.fetch_post_analytics",
+                return_value=(None, "Rate limit (429)"),
+            ),
+        ):
+            data, err, stale = dash._fetch_post_analytics_cached("req-top")
+
+        self.assertTrue(stale)
+        self.assertIsNone(err)
+        self.assertEqual(data["platforms"]["youtube"]["post_metrics"]["views"], 1000)
@@ -0,0 +1,137 @@
+"""Número fixo de queries nas listagens (campos calculados em lote por página)."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.auto_cuts.models import AutoCutAnalysis, AutoCutCorte, AutoCutSuggestion
+from apps.brands.models import Brand, Factory, FactoryYouTubeCheckCredential
+from apps.jobs.models import (
+    FactoryPostingSchedule,
+    Job,
+    PostedVideoLog,
+    RenderOutput,
+    ScheduledPost,
+    VideoInventoryItem,
+)
+
+from .query_counts import ListQueryCountMixin
+
+User = get_user_model()
+
+
+class ListEndpointQueryCountTests(ListQueryCountMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="counts", password="securepass1")
+        self.client.force_authenticate(user=self.user)
+        self.factory = Factory.objects.create(name="F counts")
+        self.brand = Brand.objects.create(name="B counts", slug="b-counts", factory=self.factory)
+        self.now = timezone.now()
+
+    def _inventory_item(self, i: int, status: str = "SCHEDULED") -> VideoInventoryItem:
+        return VideoInventoryItem.objects.create(
+            factory=self.factory,
+            brand=self.brand,
+            video_type="SHORT",
+            title=f"Vídeo {i}",
+            status=status,
+        )
+
+    def _schedule(self, item: VideoInventoryItem, i: int, external_ids: dict) -> FactoryPostingSchedule:
+        job = Job.objects.create(user=self.user, brand=self.brand, name=f"J{i}")
+        post = ScheduledPost.objects.create(
+            job=job,
+            platforms=["YT"],
+            scheduled_at=self.now + timedelta(hours=i),
+            external_ids=external_ids,
+        )
+        return FactoryPostingSchedule.objects.create(
+            factory=self.factory,
+            brand=self.brand,
+            inventory_item=item,
+            video_type="SHORT",
+            scheduled_at=post.scheduled_at,
+            scheduled_post=post,
+        )
+
+    def test_factories(self):
+        def add_row(i):
+            factory = Factory.objects.create(name=f"F{i}")
+            if i % 2:
+                FactoryYouTubeCheckCredential.objects.create(factory=factory, refresh_token="rt")
+
+        # lista + credenciais em lote
+        self.assertListQueryCount("/api/factories/", add_row, expected=2)
+        res = self.client.get("/api/factories/")
+        flags = {row["name"]: row["has_youtube_check_credential"] for row in res.data}
+        self.assertEqual((flags["F0"], flags["F1"]), (False, True))
+
+    def test_jobs(self):
+        def add_row(i):
+            job = Job.objects.create(user=self.user, brand=self.brand, name=f"Job {i}", status="DONE")
+            RenderOutput.objects.create(job=job).file.save(f"out{i}.mp4", ContentFile(b"x"), save=True)
+            ScheduledPost.objects.create(job=job, platforms=["YT"], scheduled_at=self.now, status="DONE")
+            ScheduledPost.objects.create(job=job, platforms=["YT"], scheduled_at=self.now)
+
+        # count + página + outputs + resumo dos agendamentos
+        self.assertListQueryCount("/api/jobs/", add_row, expected=4)
+        row = self.client.get("/api/jobs/").data["results"][0]
+        self.assertEqual(row["scheduled_summary"], {"total": 2, "posted": 1, "pending": 1})
+        self.assertTrue(row["output_url"].endswith(".mp4"))
+
+    def test_video_inventory(self):
+        def add_row(i):
+            item = self._inventory_item(i)
+            self._schedule(item, i, {"YT": "abc"} if i % 2 else {})
+
+        # count + página + agendamento mais recente em lote
+        self.assertListQueryCount("/api/video-inventory/", add_row, expected=3)
+        rows = {row["title"]: row for row in self.client.get("/api/video-inventory/").data["results"]}
+        self.assertEqual(rows["Vídeo 0"]["status_message"], "Na fila")
+        self.assertEqual(rows["Vídeo 1"]["status_message"], "Aguardando confirmação")
+        self.assertIsNotNone(rows["Vídeo 1"]["scheduled_post_id"])
+
+    def test_factory_schedules(self):
+        def add_row(i):
+            self._schedule(self._inventory_item(i, status="POSTED"), i, {"YT": f"v{i}"})
+
+        self.assertListQueryCount("/api/factory-schedules/", add_row, expected=2)
+
+    def test_scheduled_posts(self):
+        def add_row(i):
+            job = Job.objects.create(user=self.user, brand=self.brand, name=f"Job {i}")
+            ScheduledPost.objects.create(job=job, platforms=["YT"], scheduled_at=self.now + timedelta(hours=i))
+
+        # página + nomes dos jobs em lote
+        self.assertListQueryCount("/api/scheduled-posts/?cursor=", add_row, expected=2)
+
+    def test_auto_cut_cortes(self):
+        analysis = AutoCutAnalysis.objects.create(user=self.user, brand=self.brand, name="Live")
+
+        def add_row(i):
+            suggestion = AutoCutSuggestion.objects.create(
+                analysis=analysis, cut_type="short", start_tc="0:00", end_tc="0:10", title=f"S{i}"
+            )
+            AutoCutCorte.objects.create(analysis=analysis, suggestion=suggestion)
+
+        self.assertListQueryCount("/api/auto-cut-cortes/?cursor=", add_row, expected=1)
+
+    def test_posted_videos(self):
+        def add_row(i):
+            PostedVideoLog.objects.create(
+                factory=self.factory,
+                brand=self.brand,
+                inventory_item=self._inventory_item(i, status="POSTED"),
+                external_platform="YT",
+                external_video_id=f"v{i}",
+                posted_at=self.now,
+            )
+
+        self.assertListQueryCount("/api/posted-videos/", add_row, expected=1)
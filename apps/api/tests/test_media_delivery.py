@@ -0,0 +1,94 @@
+"""Entrega de mídia autenticada: Range (206/416), ETag/304 e offload para o proxy."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.api.media_delivery import serve_media_file
+
+
+class ServeMediaFileTests(SimpleTestCase):
+    def setUp(self):
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.path = self.media_root / "exports" / "job_1.mp4"
+        self.path.parent.mkdir()
+        self.payload = bytes(range(256)) * 40
+        self.path.write_bytes(self.payload)
+        self.rf = RequestFactory()
+
+    def _get(self, **headers):
+        return serve_media_file(self.rf.get("/download/", headers=headers), self.path, filename="Meu job.mp4")
+
+    def test_full_response_has_validators_and_accepts_ranges(self):
+        res = self._get()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), self.payload)
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+        self.assertIn("attachment", res["Content-Disposition"])
+
+    def test_range_request_returns_partial_content(self):
+        res = self._get(Range="bytes=100-199")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(res["Content-Range"], f"bytes 100-199/{len(self.payload)}")
+        self.assertEqual(res["Content-Length"], "100")
+        self.assertEqual(b"".join(res.streaming_content), self.payload[100:200])
+
+    def test_suffix_and_open_ended_ranges(self):
+        tail = self._get(Range="bytes=-10")
+        self.assertEqual(b"".join(tail.streaming_content), self.payload[-10:])
+
+        rest = self._get(Range=f"bytes={len(self.payload) - 5}-")
+        self.assertEqual(b"".join(rest.streaming_content), self.payload[-5:])
+
+    def test_unsatisfiable_range_returns_416(self):
+        res = self._get(Range=f"bytes={len(self.payload)}-")
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(self.payload)}")
+
+    def test_suffix_range_on_empty_file_returns_416(self):
+        self.path.write_bytes(b"")
+
+        res = self._get(Range="bytes=-10")
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], "bytes */0")
+
+    def test_stale_if_range_ignores_range(self):
+        res = self._get(Range="bytes=0-9", **{"If-Range": '"outdated"'})
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_matching_etag_returns_304(self):
+        etag = self._get()["ETag"]
+
+        res = self._get(**{"If-None-Match": etag})
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_x_accel_redirect_offloads_to_proxy(self):
+        with override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_ACCEL_REDIRECT="x-accel-redirect",
+            MEDIA_ACCEL_REDIRECT_PREFIX="/_protected_media/",
+        ):
+            res = self._get(Range="bytes=0-9")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["X-Accel-Redirect"], "/_protected_media/exports/job_1.mp4")
+        self.assertEqual(res.content, b"")
+
+    def test_x_sendfile_uses_absolute_path(self):
+        with override_settings(MEDIA_ACCEL_REDIRECT="x-sendfile"):
+            res = self._get()
+
+        self.assertEqual(res["X-Sendfile"], str(self.path))
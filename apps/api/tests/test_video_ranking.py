@@ -0,0 +1,86 @@
+"""Ranking vetorizado das linhas de vídeo: paridade com o caminho por linha."""
+
+from __future__ import annotations
+
+import copy
+import random
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.api.factory_youtube_dashboard import AVAILABLE_VIDEO_ORDERINGS, _sort_video_rows
+from apps.api.video_ranking import (
+    _score_video_rows_scalar,
+    rank_video_rows,
+    score_video_rows,
+)
+
+
+def _rows(count: int = 300, *, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        has_metrics = rng.random() > 0.2
+        views = rng.choice([0, 10, 100, rng.randint(0, 500_000)]) if has_metrics else None
+        likes = rng.randint(0, 3_000) if has_metrics else None
+        days = rng.choice([None, 0.0, round(rng.uniform(0, 40), 2)])
+        rows.append(
+            {
+                "scheduled_post_id": i + 1,
+                "views": views,
+                "engagement_total": likes,
+                "likes": likes,
+                "comments": None,
+                "days_since_post": days,
+                # Empates de publicação e posts sem data forçam os critérios de desempate.
+                "_sort_published_ts": 0 if days is None else 1_700_000_000 - (i % 17) * 3600,
+            }
+        )
+    return rows
+
+
+class VideoRankingParityTests(SimpleTestCase):
+    def setUp(self):
+        self.base = _rows()
+
+    def test_scores_match_per_row_path(self):
+        expected = copy.deepcopy(self.base)
+        _score_video_rows_scalar(expected, period="last_week")
+        got = copy.deepcopy(self.base)
+        score_video_rows(got, period="last_week")
+
+        fields = ("recency_factor", "views_per_day", "engagement_rate", "viral_score")
+        for exp_row, got_row in zip(expected, got, strict=True):
+            self.assertEqual({f: got_row[f] for f in fields}, {f: exp_row[f] for f in fields})
+
+    def test_every_ordering_matches_per_row_sort(self):
+        rows = copy.deepcopy(self.base)
+        score_video_rows(rows, period="last_month")
+        for ordering in AVAILABLE_VIDEO_ORDERINGS:
+            with self.subTest(ordering=ordering):
+                expected = [r["scheduled_post_id"] for r in _sort_video_rows(rows, ordering=ordering)]
+                got = [r["scheduled_post_id"] for r in rank_video_rows(rows, ordering=ordering)]
+                self.assertEqual(got, expected)
+
+    def test_top_k_matches_head_of_full_sort_including_ties(self):
+        rows = copy.deepcopy(self.base)
+        score_video_rows(rows, period="last_month")
+        for ordering in AVAILABLE_VIDEO_ORDERINGS:
+            expected = [r["scheduled_post_id"] for r in _sort_video_rows(rows, ordering=ordering)]
+            for k in (1, 5, 37, len(rows) + 5):
+                with self.subTest(ordering=ordering, k=k):
+                    got = [r["scheduled_post_id"] for r in rank_video_rows(rows, ordering=ordering, limit=k)]
+                    self.assertEqual(got, expected[:k])
+
+    def test_falls_back_to_per_row_path_without_numpy(self):
+        rows = copy.deepcopy(self.base)
+        with patch("apps.api.video_ranking.np", None):
+            score_video_rows(rows, period="last_month")
+            ranked = rank_video_rows(rows, ordering="viral_score", limit=3)
+
+        expected = copy.deepcopy(self.base)
+        _score_video_rows_scalar(expected, period="last_month")
+        self.assertEqual(
+            [r["scheduled_post_id"] for r in ranked],
+            [r["scheduled_post_id"] for r in _sort_video_rows(expected, ordering="viral_score")[:3]],
+        )
@@ -0,0 +1,54 @@
+"""ZIP em streaming (stored + data descriptors + ZIP64) para downloads de mídia."""
+
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from apps.api.zipstream import StreamingZip, ZipMember
+
+
+class StreamingZipTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.video = self.tmp / "corte.mp4"
+        self.video.write_bytes(bytes(range(256)) * 4099)
+
+    def _members(self) -> list[ZipMember]:
+        return [
+            ZipMember("Título_descricao.txt", data="título\ndescrição".encode()),
+            ZipMember("Título.mp4", path=self.video),
+        ]
+
+    def test_archive_is_valid_and_length_is_exact(self):
+        archive = StreamingZip(self._members(), chunk_size=1000)
+        body = b"".join(archive)
+
+        self.assertEqual(len(body), len(archive))
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ["Título_descricao.txt", "Título.mp4"])
+            self.assertEqual(zf.read("Título.mp4"), self.video.read_bytes())
+            self.assertTrue(all(i.compress_type == zipfile.ZIP_STORED for i in zf.infolist()))
+
+    def test_zip64_layout_is_readable(self):
+        archive = StreamingZip(self._members(), force_zip64=True)
+        body = b"".join(archive)
+
+        self.assertEqual(len(body), len(archive))
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read("Título_descricao.txt").decode(), "título\ndescrição")
+
+    def test_file_shrinking_mid_stream_raises(self):
+        archive = StreamingZip(self._members())
+        self.video.write_bytes(b"short")
+
+        with self.assertRaises(OSError):
+            b"".join(archive)
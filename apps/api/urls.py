@@ -19,6 +19,7 @@ from .views import (
     JobViewSet,
     PostedVideoLogViewSet,
     RegisterViewSet,
+    ResumableUploadViewSet,
     ScheduledPostViewSet,
     SearchChannelViewSet,
     SourceVideoViewSet,
@@ -43,6 +44,7 @@ router.register("auto-cut-cortes", AutoCutCorteViewSet, basename="auto-cut-corte
 router.register("video-inventory", VideoInventoryItemViewSet, basename="video-inventory")
 router.register("factory-schedules", FactoryPostingScheduleViewSet, basename="factory-schedule")
 router.register("posted-videos", PostedVideoLogViewSet, basename="posted-videos")
+router.register("uploads", ResumableUploadViewSet, basename="resumable-upload")
 
 urlpatterns = [
     path("dashboard-metrics/", DashboardMetricsView.as_view(), name="dashboard-metrics"),
@@ -0,0 +1,166 @@
+"""
+Ranking vetorizado das linhas de vídeo do dashboard YouTube da factory.
+
+As métricas derivadas (views/dia, taxa de engajamento, recência, viral score) e a
+ordenação são calculadas em colunas NumPy de uma vez, em vez de uma chamada Python
+por linha. ``rank_video_rows(..., limit=k)`` usa ``argpartition`` para separar os
+k primeiros antes de ordenar só os candidatos.
+
+Semântica idêntica ao caminho por linha de ``factory_youtube_dashboard`` (que segue
+como fallback quando o NumPy não está instalado): nulos vão para o fim e os empates
+são desfeitos por publicação mais recente, views e scheduled_post_id.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # e.g. image not rebuilt after requirements.txt change
+    np = None
+
+from apps.api.factory_youtube_dashboard import (
+    _ORDERING_PRIMARY_FIELD,
+    PERIOD_TO_DAYS,
+    VIRAL_SCORE_ENGAGEMENT_RATE_CAP,
+    VIRAL_SCORE_VIEWS_PER_DAY_LOG_CAP,
+    VIRAL_SCORE_WEIGHTS,
+    _engagement_rate,
+    _recency_factor,
+    _sort_video_rows,
+    _views_per_day,
+    _viral_score,
+    normalize_video_ordering,
+)
+
+NUMPY_AVAILABLE = np is not None
+
+
+def _column(rows: list[dict[str, Any]], field: str, *, default: float = math.nan):
+    """Coluna float64 de ``field``; ``None`` vira ``default`` (NaN marca ausência)."""
+    return np.fromiter(
+        (default if row.get(field) is None else float(row[field]) for row in rows),
+        dtype=np.float64,
+        count=len(rows),
+    )
+
+
+def _to_optional_list(values, ndigits: int) -> list[float | None]:
+    # round() do Python (arredondamento correto em decimal) em vez do np.round
+    # (multiplica/divide por 10**n), para o score bater com o caminho por linha.
+    return [None if math.isnan(v) else round(v, ndigits) for v in values.tolist()]
+
+
+def _score_video_rows_scalar(rows: list[dict[str, Any]], *, period: str) -> None:
+    for row in rows:
+        row["recency_factor"] = _recency_factor(row.get("days_since_post"), period)
+        row["views_per_day"] = _views_per_day(row.get("views"), row.get("days_since_post"))
+        row["engagement_rate"] = _engagement_rate(row.get("engagement_total"), row.get("views"))
+        row["viral_score"] = _viral_score(
+            views_per_day=row["views_per_day"],
+            engagement_rate=row["engagement_rate"],
+            recency_factor=row["recency_factor"],
+        )
+
+
+def score_video_rows(rows: list[dict[str, Any]], *, period: str) -> None:
+    """
+    Preenche ``recency_factor``, ``views_per_day``, ``engagement_rate`` e ``viral_score``
+    de todas as linhas (in-place) a partir de ``views``, ``engagement_total`` e
+    ``days_since_post``.
+    """
+    if not rows:
+        return
+    if np is None:
+        _score_video_rows_scalar(rows, period=period)
+        return
+
+    views = _column(rows, "views")
+    engagement_total = _column(rows, "engagement_total")
+    days = _column(rows, "days_since_post")
+    period_days = max(float(PERIOD_TO_DAYS.get(period, PERIOD_TO_DAYS["last_month"])), 1.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        views_per_day = np.round(views / np.maximum(np.nan_to_num(days, nan=0.0), 1.0), 2)
+        engagement_rate = np.round(engagement_total / np.maximum(views, 1.0), 4)
+        recency = np.round(np.clip(1.0 - np.minimum(days, period_days) / period_days, 0.0, 1.0), 4)
+
+        vpd_component = np.where(
+            views_per_day <= 0,
+            0.0,
+            np.clip(np.log10(views_per_day + 1.0) / VIRAL_SCORE_VIEWS_PER_DAY_LOG_CAP, 0.0, 1.0),
+        )
+        er_component = np.clip(engagement_rate / VIRAL_SCORE_ENGAGEMENT_RATE_CAP, 0.0, 1.0)
+
+        weighted_sum = VIRAL_SCORE_WEIGHTS["views_per_day"] * vpd_component
+        total_weight = np.full(len(rows), VIRAL_SCORE_WEIGHTS["views_per_day"])
+        for name, component in (("engagement_rate", er_component), ("recency_factor", recency)):
+            present = ~np.isnan(component)
+            weighted_sum = weighted_sum + np.where(present, VIRAL_SCORE_WEIGHTS[name] * component, 0.0)
+            total_weight = total_weight + np.where(present, VIRAL_SCORE_WEIGHTS[name], 0.0)
+        # Sem views/dia o score fica nulo (NaN propaga por vpd_component).
+        viral_score = (weighted_sum / total_weight) * 100.0
+
+    columns = {
+        "recency_factor": _to_optional_list(recency, 4),
+        "views_per_day": _to_optional_list(views_per_day, 2),
+        "engagement_rate": _to_optional_list(engagement_rate, 4),
+        "viral_score": _to_optional_list(viral_score, 1),
+    }
+    for i, row in enumerate(rows):
+        for field, values in columns.items():
+            row[field] = values[i]
+
+
+def _sort_keys(rows: list[dict[str, Any]], ordering: str):
+    """
+    (chave primária "maior é melhor" com -inf para nulos, chaves do ``np.lexsort``).
+
+    As chaves do lexsort vão da menos para a mais significativa, espelhando a tupla de
+    ``_sort_video_rows``.
+    """
+    published_ts = _column(rows, "_sort_published_ts", default=0.0)
+    views = _column(rows, "views", default=0.0)
+    scheduled_post_id = _column(rows, "scheduled_post_id", default=0.0)
+    if ordering == "recent":
+        missing = published_ts == 0.0
+        primary = np.where(missing, -np.inf, published_ts)
+        keys = (-scheduled_post_id, -views, -published_ts, missing)
+    else:
+        values = _column(rows, _ORDERING_PRIMARY_FIELD.get(ordering, "views"))
+        missing = np.isnan(values)
+        primary = np.where(missing, -np.inf, values)
+        keys = (-scheduled_post_id, -views, -published_ts, -np.where(missing, 0.0, values), missing)
+    return primary, keys
+
+
+def rank_video_rows(
+    rows: list[dict[str, Any]],
+    *,
+    ordering: str,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Ordena as linhas pela ``ordering`` (ver AVAILABLE_VIDEO_ORDERINGS).
+
+    Com ``limit`` devolve só os ``limit`` primeiros: ``argpartition`` na chave primária
+    escolhe os candidatos (incluindo empates no corte) e só eles passam pelo lexsort.
+    """
+    ordering_norm = normalize_video_ordering(ordering)
+    if np is None or not rows:
+        ordered = _sort_video_rows(rows, ordering=ordering_norm)
+        return ordered if limit is None else ordered[: max(limit, 0)]
+    if limit is not None and limit <= 0:
+        return []
+
+    primary, keys = _sort_keys(rows, ordering_norm)
+    if limit is None or limit >= len(rows):
+        order = np.lexsort(keys)
+    else:
+        top = np.argpartition(-primary, limit - 1)[:limit]
+        threshold = primary[top].min()
+        candidates = np.flatnonzero(primary >= threshold)
+        order = candidates[np.lexsort(tuple(key[candidates] for key in keys))][:limit]
+    return [rows[i] for i in order.tolist()]
@@ -1,7 +1,5 @@
-import io
 import os
 import re
-import zipfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -9,9 +7,10 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, transaction
 from django.db.models import Q
-from django.http import FileResponse
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from django.utils.http import content_disposition_header
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
@@ -45,7 +44,9 @@ from apps.jobs.tasks import burn_subtitles_task, generate_subtitles_task, proces
 from apps.mediahub.models import SourceVideo
 from apps.social.services.youtube_description import build_youtube_description
 
-from .pagination import StandardResultsSetPagination
+from .fieldsets import SparseFieldsetMixin
+from .media_delivery import serve_media_file
+from .pagination import KeysetPagination, OptionalKeysetPagination, StandardResultsSetPagination
 from .serializers import (
     AutoCutAnalysisSerializer,
     AutoCutCorteSerializer,
@@ -65,6 +66,7 @@ from .serializers import (
     UserRegisterSerializer,
     VideoInventoryItemSerializer,
 )
+from .zipstream import StreamingZip, ZipMember
 
 User = get_user_model()
 
@@ -620,6 +622,140 @@ class SourceVideoViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+def _parse_tus_metadata(header):
+    """``Upload-Metadata: filename <base64>,target <base64>`` -> dict."""
+    import base64
+    import binascii
+
+    meta = {}
+    for item in (header or "").split(","):
+        parts = item.strip().split(" ", 1)
+        if not parts[0]:
+            continue
+        try:
+            meta[parts[0]] = base64.b64decode(parts[1]).decode("utf-8") if len(parts) > 1 else ""
+        except (binascii.Error, UnicodeDecodeError):
+            continue
+    return meta
+
+
+class ResumableUploadViewSet(viewsets.ViewSet):
+    """
+    Upload retomável (estilo tus 1.0): POST cria, HEAD/GET devolvem o ``Upload-Offset``,
+    PATCH (``application/offset+octet-stream``) grava bytes a partir do offset, DELETE cancela.
+    Os bytes vão direto para o diretório final do model; concluído, o upload é usado via
+    ``upload_id`` em /cuts/upload/ e /jobs/upload/ ou ``upload_ids`` em /auto-cuts/upload-ready-cuts/.
+    """
+    parser_classes = [JSONParser, FormParser]
+
+    TUS_VERSION = "1.0.0"
+
+    def _payload(self, upload):
+        return {
+            "id": str(upload.pk),
+            "target": upload.target,
+            "filename": upload.filename,
+            "upload_length": upload.upload_length,
+            "upload_offset": upload.upload_offset,
+            "status": upload.status,
+            "sha256": upload.sha256 or None,
+        }
+
+    def _with_tus_headers(self, response, upload):
+        response["Tus-Resumable"] = self.TUS_VERSION
+        response["Upload-Offset"] = str(upload.upload_offset)
+        response["Upload-Length"] = str(upload.upload_length)
+        response["Cache-Control"] = "no-store"
+        return response
+
+    def create(self, request):
+        from apps.mediahub.services.resumable_upload import ResumableUploadError, create_upload
+
+        meta = _parse_tus_metadata(request.headers.get("Upload-Metadata"))
+        target = request.data.get("target") or meta.get("target") or ""
+        filename = request.data.get("filename") or meta.get("filename") or ""
+        length = _parse_positive_int(request.headers.get("Upload-Length") or request.data.get("length"))
+        if not length:
+            return Response(
+                {"error": "Informe o tamanho do arquivo (Upload-Length ou length)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            upload = create_upload(user=request.user, target=target, filename=filename, length=length)
+        except ResumableUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        response = Response(self._payload(upload), status=status.HTTP_201_CREATED)
+        response["Location"] = request.build_absolute_uri(f"{upload.pk}/")
+        return self._with_tus_headers(response, upload)
+
+    def retrieve(self, request, pk=None):
+        from apps.mediahub.services.resumable_upload import get_user_upload
+
+        upload = get_user_upload(pk, user=request.user)
+        if upload is None:
+            return Response({"error": "Upload não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        return self._with_tus_headers(Response(self._payload(upload)), upload)
+
+    def partial_update(self, request, pk=None):
+        """Recebe um chunk; o corpo é lido em streaming (sem request.data nem arquivo temporário)."""
+        from apps.mediahub.models import ResumableUpload
+        from apps.mediahub.services.resumable_upload import (
+            ResumableUploadError,
+            UploadBusy,
+            UploadOffsetMismatch,
+            append_chunk,
+        )
+
+        if request.content_type.split(";")[0].strip() != "application/offset+octet-stream":
+            return Response(
+                {"error": "Content-Type deve ser application/offset+octet-stream."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        offset_raw = request.headers.get("Upload-Offset", "")
+        if not offset_raw.isdigit():
+            return Response({"error": "Upload-Offset inválido."}, status=status.HTTP_400_BAD_REQUEST)
+        content_length = _parse_positive_int(request.META.get("CONTENT_LENGTH"))
+        stream = request.stream
+        if stream is None:
+            content_length = 0
+        try:
+            upload = append_chunk(
+                pk,
+                user=request.user,
+                offset=int(offset_raw),
+                stream=stream,
+                content_length=content_length,
+            )
+        except ResumableUpload.DoesNotExist:
+            return Response({"error": "Upload não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        except UploadOffsetMismatch as e:
+            response = Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+            response["Upload-Offset"] = str(e.expected)
+            response["Tus-Resumable"] = self.TUS_VERSION
+            return response
+        except UploadBusy as e:
+            return Response({"error": str(e)}, status=status.HTTP_423_LOCKED)
+        except ResumableUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._with_tus_headers(Response(status=status.HTTP_204_NO_CONTENT), upload)
+
+    def destroy(self, request, pk=None):
+        from apps.mediahub.services.resumable_upload import discard_upload, get_user_upload
+
+        upload = get_user_upload(pk, user=request.user)
+        if upload is None:
+            return Response({"error": "Upload não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        if upload.status == "consumed":
+            return Response(
+                {"error": "Upload já foi usado; apague o corte/job correspondente."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        discard_upload(upload)
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        response["Tus-Resumable"] = self.TUS_VERSION
+        return response
+
+
 class CutViewSet(viewsets.ModelViewSet):
     """Cortes de vídeo."""
     queryset = Cut.objects.all()
@@ -628,8 +764,6 @@ class CutViewSet(viewsets.ModelViewSet):
     parser_classes = [JSONParser, MultiPartParser, FormParser]
 
     def get_queryset(self):
-        from django.db.models import Q
-
         qs = super().get_queryset()
         source = self.request.query_params.get("source")
         if source:
@@ -655,65 +789,49 @@ class CutViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"])
     def upload(self, request):
-        """Upload de corte pronto. Analisa vídeo (duração, formato) e salva."""
-        import tempfile
-        from pathlib import Path
+        """
+        Upload de corte pronto. Analisa vídeo (duração, formato) e salva.
+        Aceita ``file`` (multipart) ou ``upload_id`` de um upload retomável (/uploads/).
+        """
+        from apps.jobs.services.ffmpeg import seconds_to_tc
 
-        from apps.jobs.services.ffmpeg import ffprobe_video_info, seconds_to_tc
+        source = _uploaded_video(request)
+        if isinstance(source, Response):
+            return source
+        # Upload retomável consumido e corte criados juntos: se o create falhar, o upload não fica órfão.
+        with transaction.atomic():
+            source = _consume_uploaded_video(request, source, target="cut")
+            if isinstance(source, Response):
+                return source
+            file_value, original_name, info = source
 
-        file_obj = request.FILES.get("file")
-        if not file_obj:
-            return Response({"error": "Envie o arquivo de vídeo."}, status=status.HTTP_400_BAD_REQUEST)
+            name = request.data.get("name", "") or original_name
+            format_hint = request.data.get("format")  # "vertical" ou "horizontal", opcional
 
-        name = request.data.get("name", "") or file_obj.name
-        format_hint = request.data.get("format")  # "vertical" ou "horizontal", opcional
+            duration = info["duration"]
+            width = info["width"]
+            height = info["height"]
 
-        tmp_path = None
-        try:
-            if hasattr(file_obj, "temporary_file_path"):
-                tmp_path = Path(file_obj.temporary_file_path())
+            if width and height:
+                is_vertical = height > width
             else:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    for chunk in file_obj.chunks():
-                        f.write(chunk)
-                    tmp_path = Path(f.name)
-                file_obj.seek(0)
-            info = ffprobe_video_info(tmp_path)
-        except Exception as e:
-            if tmp_path and tmp_path.exists() and not hasattr(file_obj, "temporary_file_path"):
-                tmp_path.unlink(missing_ok=True)
-            return Response({"error": f"Não foi possível analisar o vídeo: {e}"}, status=status.HTTP_400_BAD_REQUEST)
-        finally:
-            if tmp_path and tmp_path.exists() and not hasattr(file_obj, "temporary_file_path"):
-                try:
-                    tmp_path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-
-        duration = info["duration"]
-        width = info["width"]
-        height = info["height"]
-
-        if width and height:
-            is_vertical = height > width
-        else:
-            is_vertical = format_hint != "horizontal"
-
-        if format_hint:
-            is_vertical = format_hint == "vertical"
-
-        brand_id = request.data.get("brand")
-        cut = Cut.objects.create(
-            user=request.user,
-            source=None,
-            brand_id=brand_id or None,
-            name=name,
-            start_tc="00:00:00",
-            end_tc=seconds_to_tc(duration),
-            format="vertical" if is_vertical else "horizontal",
-            duration=duration,
-            file=file_obj,
-        )
+                is_vertical = format_hint != "horizontal"
+
+            if format_hint:
+                is_vertical = format_hint == "vertical"
+
+            brand_id = request.data.get("brand")
+            cut = Cut.objects.create(
+                user=request.user,
+                source=None,
+                brand_id=brand_id or None,
+                name=name,
+                start_tc="00:00:00",
+                end_tc=seconds_to_tc(duration),
+                format="vertical" if is_vertical else "horizontal",
+                duration=duration,
+                file=file_value,
+            )
         serializer = CutSerializer(cut, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -770,68 +888,46 @@ class JobViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"])
     def upload(self, request):
-        """Upload de vídeo pronto. Analisa (duração, formato) e cria Job com output para agendar."""
-        import tempfile
-        from pathlib import Path
-
-        from apps.jobs.services.ffmpeg import ffprobe_video_info
-
-        file_obj = request.FILES.get("file")
-        if not file_obj:
-            return Response({"error": "Envie o arquivo de vídeo."}, status=status.HTTP_400_BAD_REQUEST)
-
-        name = request.data.get("name", "") or file_obj.name
-        format_hint = request.data.get("format")
-
-        tmp_path = None
-        try:
-            if hasattr(file_obj, "temporary_file_path"):
-                tmp_path = Path(file_obj.temporary_file_path())
+        """
+        Upload de vídeo pronto. Analisa (duração, formato) e cria Job com output para agendar.
+        Aceita ``file`` (multipart) ou ``upload_id`` de um upload retomável (/uploads/).
+        """
+        source = _uploaded_video(request)
+        if isinstance(source, Response):
+            return source
+        with transaction.atomic():
+            source = _consume_uploaded_video(request, source, target="job")
+            if isinstance(source, Response):
+                return source
+            file_value, original_name, info = source
+
+            name = request.data.get("name", "") or original_name
+            format_hint = request.data.get("format")
+
+            width = info["width"]
+            height = info["height"]
+            if width and height:
+                make_vertical = height > width
             else:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    for chunk in file_obj.chunks():
-                        f.write(chunk)
-                    tmp_path = Path(f.name)
-                file_obj.seek(0)
-            info = ffprobe_video_info(tmp_path)
-        except Exception as e:
-            if tmp_path and tmp_path.exists() and not hasattr(file_obj, "temporary_file_path"):
-                try:
-                    tmp_path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-            return Response({"error": f"Não foi possível analisar o vídeo: {e}"}, status=status.HTTP_400_BAD_REQUEST)
-        finally:
-            if tmp_path and tmp_path.exists() and not hasattr(file_obj, "temporary_file_path"):
-                try:
-                    tmp_path.unlink(missing_ok=True)
-                except OSError:
-                    pass
-
-        width = info["width"]
-        height = info["height"]
-        if width and height:
-            make_vertical = height > width
-        else:
-            make_vertical = format_hint != "horizontal"
-        if format_hint:
-            make_vertical = format_hint == "vertical"
-
-        brand_id = request.data.get("brand")
-        job = Job.objects.create(
-            user=request.user,
-            brand_id=brand_id or None,
-            name=name or f"Upload {file_obj.name}",
-            status="DONE",
-            make_vertical=make_vertical,
-        )
-        RenderOutput.objects.create(job=job, file=file_obj)
+                make_vertical = format_hint != "horizontal"
+            if format_hint:
+                make_vertical = format_hint == "vertical"
+
+            brand_id = request.data.get("brand")
+            job = Job.objects.create(
+                user=request.user,
+                brand_id=brand_id or None,
+                name=name or f"Upload {original_name}",
+                status="DONE",
+                make_vertical=make_vertical,
+            )
+            RenderOutput.objects.create(job=job, file=file_value)
         serializer = JobSerializer(job, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["get"], url_path="download")
     def download(self, request, pk=None):
-        """Baixa o vídeo com o nome do job no arquivo."""
+        """Baixa o vídeo com o nome do job no arquivo (aceita Range e requisições condicionais)."""
         job = self.get_object()
         try:
             out = job.output
@@ -854,8 +950,7 @@ class JobViewSet(viewsets.ModelViewSet):
         safe_name = "".join(c for c in (job.name or f"Job {job.id}") if c not in r'\/:*?"<>|').strip() or f"job_{job.id}"
         if not safe_name.lower().endswith(".mp4"):
             safe_name += ".mp4"
-        response = FileResponse(open(file_path, "rb"), as_attachment=True, filename=safe_name)
-        return response
+        return serve_media_file(request, file_path, filename=safe_name)
 
     @action(detail=True, methods=["post"], url_path="generate-subtitles")
     def generate_subtitles(self, request, pk=None):
@@ -968,32 +1063,27 @@ class JobViewSet(viewsets.ModelViewSet):
         return Response({"status": "queued", "job_id": job.id})
 
 
-class ScheduledPostViewSet(viewsets.ModelViewSet):
-    """Agendamento de postagens."""
+class ScheduledPostViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    """Agendamento de postagens. Aceita ``?cursor=`` (keyset) e ``?fields=``."""
     queryset = ScheduledPost.objects.all()
     serializer_class = ScheduledPostSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-scheduled_at", "-id")
+    deferred_heavy_fields = ("external_ids",)
+    sparse_field_sources = {"job_name": ("job", "auto_cut_corte")}
 
     def get_queryset(self):
         qs = super().get_queryset()
+        # Escopo denormalizado da origem (job ou corte): sem OR entre caminhos de JOIN.
         if self.request.user.is_authenticated:
-            qs = qs.filter(
-                Q(job__user=self.request.user)
-                | Q(auto_cut_corte__analysis__user=self.request.user)
-            )
+            qs = qs.filter(owner_user=self.request.user)
         factory = self.request.query_params.get("factory")
         if factory:
-            qs = qs.filter(
-                Q(job__brand__factory_id=factory)
-                | Q(auto_cut_corte__analysis__brand__factory_id=factory)
-            )
+            qs = qs.filter(factory_id=factory)
         brand = self.request.query_params.get("brand")
         if brand:
-            qs = qs.filter(
-                Q(job__brand_id=brand)
-                | Q(auto_cut_corte__analysis__brand_id=brand)
-            )
-        return qs
+            qs = qs.filter(brand_id=brand)
+        return self.apply_sparse_fieldset(qs)
 
     @action(detail=True, methods=["post"], url_path="reschedule")
     def reschedule(self, request, pk=None):
@@ -1090,17 +1180,27 @@ class ScheduledPostViewSet(viewsets.ModelViewSet):
         )
 
 
-class VideoInventoryItemViewSet(viewsets.ReadOnlyModelViewSet):
-    """Banco de vídeos por brand/factory."""
-    pagination_class = StandardResultsSetPagination
+class VideoInventoryItemViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    """Banco de vídeos por brand/factory. Aceita ``?cursor=`` (keyset) e ``?fields=``."""
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
+    deferred_heavy_fields = (
+        "auto_cut_corte__subtitle_segments",
+        "auto_cut_corte__analysis__transcript",
+        "auto_cut_corte__analysis__transcript_segments",
+    )
+    sparse_field_sources = {
+        "source_display_name": ("auto_cut_corte", "source_asset_id"),
+        "status_message": ("status",),
+        "scheduled_post_id": (),
+    }
     queryset = VideoInventoryItem.objects.all().select_related(
         "brand", "factory",
         "auto_cut_corte",
         "auto_cut_corte__analysis",
         "auto_cut_corte__analysis__source",
-    ).prefetch_related(
-        "posting_schedules__scheduled_post",
     )
+    # status_message / scheduled_post_id: uma query por página (VideoInventoryItemSerializer.batch_latest_schedules).
     serializer_class = VideoInventoryItemSerializer
 
     def get_queryset(self):
@@ -1117,7 +1217,7 @@ class VideoInventoryItemViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(status=status_filter)
         if video_type in ("SHORT", "LONG"):
             qs = qs.filter(video_type=video_type)
-        return qs.order_by("-created_at")
+        return self.apply_sparse_fieldset(qs.order_by("-created_at"))
 
     @action(detail=True, methods=["post"], url_path="remove-awaiting")
     def remove_awaiting(self, request, pk=None):
@@ -1341,37 +1441,38 @@ class VideoInventoryItemViewSet(viewsets.ReadOnlyModelViewSet):
             description_override=inventory.description,
         )
         final_title = (inventory.title or "").strip() or "Vídeo"
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-            # Txt com título e descrição prontos para copiar e colar no YouTube
-            txt_lines = [
-                "=== TÍTULO (copie para o campo Título) ===",
-                final_title,
-                "",
-                "=== DESCRIÇÃO (copie e cole no YouTube) ===",
-                full_description,
-            ]
-            zf.writestr(f"{safe_title}_descricao.txt", "\n".join(txt_lines).encode("utf-8"))
-            if has_video:
-                try:
-                    fp = Path(corte.file.path)
-                    if fp.exists():
-                        ext = fp.suffix.lower() if fp.suffix else ".mp4"
-                        zf.write(fp, arcname=f"{safe_title}{ext}")
-                except Exception:
-                    pass
-            if has_thumb:
-                try:
-                    fp = Path(corte.thumbnail.path)
-                    if fp.exists():
-                        ext = fp.suffix.lower() if fp.suffix else ".jpg"
-                        zf.write(fp, arcname=f"{safe_title}_thumb{ext}")
-                except Exception:
-                    pass
-        zip_buffer.seek(0)
+        # Txt com título e descrição prontos para copiar e colar no YouTube
+        txt_lines = [
+            "=== TÍTULO (copie para o campo Título) ===",
+            final_title,
+            "",
+            "=== DESCRIÇÃO (copie e cole no YouTube) ===",
+            full_description,
+        ]
+        members = [ZipMember(f"{safe_title}_descricao.txt", data="\n".join(txt_lines).encode("utf-8"))]
+        if has_video:
+            try:
+                fp = Path(corte.file.path)
+                if fp.exists():
+                    ext = fp.suffix.lower() if fp.suffix else ".mp4"
+                    members.append(ZipMember(f"{safe_title}{ext}", path=fp))
+            except Exception:
+                pass
+        if has_thumb:
+            try:
+                fp = Path(corte.thumbnail.path)
+                if fp.exists():
+                    ext = fp.suffix.lower() if fp.suffix else ".jpg"
+                    members.append(ZipMember(f"{safe_title}_thumb{ext}", path=fp))
+            except Exception:
+                pass
+        # ZIP em streaming (entradas stored): memória constante no worker e tamanho exato
+        # conhecido antes do primeiro byte.
+        archive = StreamingZip(members)
         filename = f"{safe_title}_midias.zip"
-        response = FileResponse(zip_buffer, as_attachment=True, filename=filename)
-        response["Content-Type"] = "application/zip"
+        response = StreamingHttpResponse(archive, content_type="application/zip")
+        response["Content-Length"] = str(len(archive))
+        response["Content-Disposition"] = content_disposition_header(True, filename)
         return response
 
     @action(detail=True, methods=["post"], url_path="mark-posted")
@@ -1483,10 +1584,12 @@ class FactoryPostingScheduleViewSet(viewsets.ReadOnlyModelViewSet):
         return qs.order_by("scheduled_at", "id")
 
 
-class PostedVideoLogViewSet(viewsets.ReadOnlyModelViewSet):
-    """Histórico de vídeos já postados por brand."""
+class PostedVideoLogViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    """Histórico de vídeos já postados por brand. Aceita ``?cursor=`` (keyset) e ``?fields=``."""
     queryset = PostedVideoLog.objects.all().select_related("factory", "brand", "inventory_item")
     serializer_class = PostedVideoLogSerializer
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ("-posted_at", "-id")
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -1496,7 +1599,7 @@ class PostedVideoLogViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(factory_id=factory)
         if brand:
             qs = qs.filter(brand_id=brand)
-        return qs.order_by("-posted_at", "-id")
+        return self.apply_sparse_fieldset(qs.order_by("-posted_at", "-id"))
 
 
 class AutoCutAnalysisViewSet(viewsets.ModelViewSet):
@@ -1508,7 +1611,6 @@ class AutoCutAnalysisViewSet(viewsets.ModelViewSet):
     http_method_names = ["get", "post", "head", "options", "delete"]
 
     def get_queryset(self):
-        from django.db.models import Q
         qs = super().get_queryset()
         if self.request.user.is_authenticated:
             # Inclui jobs do usuário OU do auto-fetch (user=None)
@@ -1676,11 +1778,13 @@ class AutoCutAnalysisViewSet(viewsets.ModelViewSet):
     def upload_ready_cuts(self, request):
         """
         Upload de cortes prontos: vários vídeos em um único job (ordem = ordem dos arquivos).
-        Campos: files[], brand (obrigatório), name (nome do job, obrigatório),
+        Campos: files[] (ou upload_ids[] de uploads retomáveis, target=ready_cut),
+        brand (obrigatório), name (nome do job, obrigatório),
         transcribe (true/false), create_long_video (true/false), vertical_mode,
         titles_language (pt|en — idioma dos títulos gerados pela LLM).
         """
         files = request.FILES.getlist("files") or request.FILES.getlist("file")
+        upload_ids = _request_list(request, "upload_ids")
         brand_id = request.data.get("brand") or request.POST.get("brand")
         job_name = (request.data.get("name") or request.POST.get("name") or "").strip()
         vertical_mode = (request.data.get("vertical_mode") or request.POST.get("vertical_mode") or "zoom_crop").strip().lower()
@@ -1735,35 +1839,53 @@ class AutoCutAnalysisViewSet(viewsets.ModelViewSet):
                 {"error": "Informe o nome do job (name)."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if not files:
+        if not files and not upload_ids:
             return Response(
                 {"error": "Envie pelo menos um arquivo de vídeo (files ou file)."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         from apps.auto_cuts.models import AutoCutAnalysis, AutoCutReadyChunk
         from apps.auto_cuts.tasks import analyze_auto_cuts_task
-
-        analysis = AutoCutAnalysis(
-            user=request.user,
-            brand_id=brand_id,
-            target_brand_id=brand_id,
-            name=job_name,
-            is_ready_cuts=True,
-            vertical_mode=vertical_mode,
-            ready_cuts_transcribe=transcribe,
-            ready_cuts_create_long_video=create_long,
-            ready_cuts_long_fade_duration=0.5,
-            ready_cuts_titles_language=titles_language,
-            long_overlay_enabled=long_overlay_enabled,
-            long_overlay_asset_id=long_overlay_asset_id if long_overlay_enabled else None,
+        from apps.mediahub.services.resumable_upload import (
+            ResumableUploadError,
+            consume_upload,
+            probe_upload,
         )
-        analysis.save()
-        for i, file_obj in enumerate(files):
-            AutoCutReadyChunk.objects.create(
-                analysis=analysis,
-                order_index=i,
-                file=file_obj,
-            )
+
+        for upload_id in upload_ids:
+            probe_upload(upload_id, user=request.user)
+        # Consumo dos uploads e criação da analysis numa transação só: se algo falhar,
+        # os uploads voltam a "complete" (podem ser reenviados ou limpos pelo cleanup).
+        try:
+            with transaction.atomic():
+                uploads = [
+                    consume_upload(upload_id, user=request.user, target="ready_cut") for upload_id in upload_ids
+                ]
+                analysis = AutoCutAnalysis(
+                    user=request.user,
+                    brand_id=brand_id,
+                    target_brand_id=brand_id,
+                    name=job_name,
+                    is_ready_cuts=True,
+                    vertical_mode=vertical_mode,
+                    ready_cuts_transcribe=transcribe,
+                    ready_cuts_create_long_video=create_long,
+                    ready_cuts_long_fade_duration=0.5,
+                    ready_cuts_titles_language=titles_language,
+                    long_overlay_enabled=long_overlay_enabled,
+                    long_overlay_asset_id=long_overlay_asset_id if long_overlay_enabled else None,
+                )
+                analysis.save()
+                # Arquivos resumíveis já estão em auto_cuts/ready_chunks/: o FileField só aponta para eles.
+                chunk_files = list(files) + [upload.file_name for upload in uploads]
+                for i, file_value in enumerate(chunk_files):
+                    AutoCutReadyChunk.objects.create(
+                        analysis=analysis,
+                        order_index=i,
+                        file=file_value,
+                    )
+        except ResumableUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         analyze_auto_cuts_task.delay(analysis.id)
         data = AutoCutAnalysisSerializer(
             AutoCutAnalysis.objects.prefetch_related("ready_chunks").get(pk=analysis.pk),
@@ -2014,16 +2136,30 @@ class AutoCutSuggestionViewSet(viewsets.ViewSet):
         )
 
 
-class AutoCutCorteViewSet(viewsets.ModelViewSet):
-    """Cortes do auto-cuts. Lista finalizados (tabela) e permite atualizar/deletar."""
+class AutoCutCorteViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    """
+    Cortes do auto-cuts. Lista finalizados (tabela) e permite atualizar/deletar.
+    Aceita ``?cursor=`` (keyset) e ``?fields=``.
+    """
     queryset = AutoCutCorte.objects.all()
     serializer_class = AutoCutCorteSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
+    deferred_heavy_fields = (
+        "suggestion__raw_data",
+        "analysis__transcript",
+        "analysis__transcript_segments",
+    )
+    sparse_field_sources = {
+        "analysis_id": ("analysis",),
+        "analysis_name": ("analysis",),
+        "file_url": ("file",),
+        "thumbnail_url": ("thumbnail",),
+    }
     http_method_names = ["get", "patch", "delete", "post", "head", "options"]
     parser_classes = [JSONParser, MultiPartParser, FormParser]
 
     def get_queryset(self):
-        from django.db.models import Q
         qs = super().get_queryset()
         if self.request.user.is_authenticated:
             qs = qs.filter(Q(analysis__user=self.request.user) | Q(analysis__user__isnull=True))
@@ -2046,7 +2182,7 @@ class AutoCutCorteViewSet(viewsets.ModelViewSet):
         fmt = self.request.query_params.get("format")
         if fmt in ("vertical", "horizontal"):
             qs = qs.filter(format=fmt)
-        return qs.select_related("suggestion", "analysis").order_by("-created_at")
+        return self.apply_sparse_fieldset(qs.select_related("suggestion", "analysis").order_by("-created_at"))
 
     def partial_update(self, request, *args, **kwargs):
         """Atualiza corte. Aceita title e thumbnail para publicação no YouTube."""
@@ -2117,6 +2253,32 @@ class AutoCutCorteViewSet(viewsets.ModelViewSet):
                     pass
         return super().destroy(request, *args, **kwargs)
 
+    @action(detail=True, methods=["get"], url_path="download")
+    def download(self, request, pk=None):
+        """
+        Vídeo do corte para preview (``?inline=1``) ou download, com Range e ETag.
+        A permissão é checada aqui; com MEDIA_ACCEL_REDIRECT o proxy envia os bytes.
+        """
+        corte = self.get_object()
+        try:
+            file_path = Path(corte.file.path) if corte.file and corte.file.name else None
+        except Exception:
+            file_path = None
+        if not file_path or not file_path.exists():
+            return Response(
+                {"error": "Arquivo do corte não encontrado."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        title = (getattr(corte.suggestion, "title", "") or "").strip() or f"corte_{corte.id}"
+        safe_name = "".join(c for c in title if c not in r'\/:*?"<>|').strip() or f"corte_{corte.id}"
+        safe_name += file_path.suffix.lower() or ".mp4"
+        return serve_media_file(
+            request,
+            file_path,
+            filename=safe_name,
+            as_attachment=request.query_params.get("inline") != "1",
+        )
+
     @action(detail=True, methods=["post"], url_path="schedule")
     def schedule(self, request, pk=None):
         """
@@ -2181,6 +2343,78 @@ class AutoCutCorteViewSet(viewsets.ModelViewSet):
         )
 
 
+def _request_list(request, key):
+    """Lista de valores de ``key`` em JSON (lista) ou form/multipart (campo repetido)."""
+    if hasattr(request.data, "getlist"):
+        return [v for v in request.data.getlist(key) if v]
+    value = request.data.get(key)
+    if isinstance(value, list):
+        return [v for v in value if v]
+    return [value] if value else []
+
+
+def _uploaded_video(request):
+    """
+    Vídeo enviado para /cuts/upload/ ou /jobs/upload/: ``file`` (multipart) ou ``upload_id``
+    de um upload retomável já concluído (arquivo no diretório final).
+    Faz a parte lenta (cópia temporária, ffprobe) fora de transação e retorna
+    ``(upload_id, arquivo multipart, info do ffprobe)`` para ``_consume_uploaded_video``,
+    ou uma Response de erro.
+    """
+    import tempfile
+
+    from apps.jobs.services.ffmpeg import ffprobe_video_info
+    from apps.mediahub.services.resumable_upload import probe_upload
+
+    upload_id = request.data.get("upload_id")
+    if upload_id and not request.FILES.get("file"):
+        probe_upload(upload_id, user=request.user)
+        return upload_id, None, None
+
+    file_obj = request.FILES.get("file")
+    if not file_obj:
+        return Response({"error": "Envie o arquivo de vídeo."}, status=status.HTTP_400_BAD_REQUEST)
+
+    tmp_path = None
+    try:
+        if hasattr(file_obj, "temporary_file_path"):
+            tmp_path = Path(file_obj.temporary_file_path())
+        else:
+            with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+                for chunk in file_obj.chunks():
+                    f.write(chunk)
+                tmp_path = Path(f.name)
+            file_obj.seek(0)
+        info = ffprobe_video_info(tmp_path)
+    except Exception as e:
+        return Response({"error": f"Não foi possível analisar o vídeo: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+    finally:
+        if tmp_path and tmp_path.exists() and not hasattr(file_obj, "temporary_file_path"):
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+    return None, file_obj, info
+
+
+def _consume_uploaded_video(request, source, *, target):
+    """
+    Segunda metade de ``_uploaded_video``, dentro do ``transaction.atomic()`` que cria o model:
+    consome o upload retomável. Retorna ``(valor do FileField, nome original, info do ffprobe)``
+    ou uma Response de erro.
+    """
+    from apps.mediahub.services.resumable_upload import ResumableUploadError, consume_upload
+
+    upload_id, file_obj, info = source
+    if file_obj is not None:
+        return file_obj, file_obj.name, info
+    try:
+        upload = consume_upload(upload_id, user=request.user, target=target, require_probe=True)
+    except ResumableUploadError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return upload.file_name, upload.filename, upload.probe
+
+
 def _parse_positive_int(val):
     if val is None or val == "":
         return None
@@ -2246,6 +2480,7 @@ class DashboardMetricsView(APIView):
 class FactoryYoutubeDashboardView(APIView):
     """
     YouTube via Upload Post: resumo agregado por factory (assinantes, views no período, série, top vídeos).
+    Responde do snapshot pré-calculado (``as_of`` = instante do cálculo).
     GET /api/dashboard/factory/<factory_id>/youtube-summary/?period=last_month&brand=<id>&refresh=1
     """
 
@@ -2321,5 +2556,6 @@ class FactoryYoutubeVideosView(APIView):
                 "results": page or [],
                 "meta": payload.get("meta") or {},
                 "scope": payload.get("scope") or {},
+                "as_of": payload.get("as_of"),
             }
         )
@@ -0,0 +1,253 @@
+"""
+ZIP em streaming para downloads de mídia (sem montar o arquivo em memória).
+
+Entradas *stored* (vídeo/imagem já são comprimidos; DEFLATE só gasta CPU), CRC-32
+calculado durante a leitura e gravado em data descriptors, ZIP64 quando um membro ou
+o próprio arquivo passa de 4 GiB. Como nada é comprimido, o tamanho final é conhecido
+antes do primeiro byte (``len(stream)``) e vira ``Content-Length``.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+_ZIP32_LIMIT = 0xFFFFFFFF
+_ZIP16_LIMIT = 0xFFFF
+_FLAG_DATA_DESCRIPTOR = 0x0008
+_FLAG_UTF8 = 0x0800
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_DESCRIPTOR32 = struct.Struct("<IIII")
+_DESCRIPTOR64 = struct.Struct("<IIQQ")
+_EOCD = struct.Struct("<IHHHHIIH")
+_EOCD64 = struct.Struct("<IQHHIIQQQQ")
+_EOCD64_LOCATOR = struct.Struct("<IIQI")
+
+
+def _dos_datetime(mtime: float) -> tuple[int, int]:
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+@dataclass
+class ZipMember:
+    """Membro do ZIP: arquivo em disco (``path``) ou conteúdo pequeno em memória (``data``)."""
+
+    arcname: str
+    path: Path | None = None
+    data: bytes | None = None
+    size: int = field(init=False)
+    mtime: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        if (self.path is None) == (self.data is None):
+            raise ValueError("ZipMember precisa de path ou data (exatamente um).")
+        if self.path is not None:
+            st = Path(self.path).stat()
+            self.size = st.st_size
+            self.mtime = st.st_mtime
+        else:
+            self.size = len(self.data)
+            self.mtime = time.time()
+
+
+@dataclass
+class _Entry:
+    member: ZipMember
+    name: bytes
+    offset: int
+    zip64: bool
+    dos_time: int
+    dos_date: int
+    crc: int = 0
+
+
+class StreamingZip:
+    """
+    Iterável de ``bytes`` com o ZIP completo; ``len()`` devolve o tamanho exato.
+
+    ``force_zip64`` grava todos os membros no formato ZIP64 (útil em testes).
+    """
+
+    def __init__(
+        self,
+        members: list[ZipMember],
+        *,
+        chunk_size: int = ZIP_CHUNK_SIZE,
+        force_zip64: bool = False,
+    ) -> None:
+        self.chunk_size = max(int(chunk_size), 1)
+        self._entries: list[_Entry] = []
+        offset = 0
+        for member in members:
+            name = member.arcname.encode("utf-8")
+            zip64 = force_zip64 or member.size >= _ZIP32_LIMIT or offset >= _ZIP32_LIMIT
+            dos_time, dos_date = _dos_datetime(member.mtime)
+            self._entries.append(_Entry(member, name, offset, zip64, dos_time, dos_date))
+            offset += self._local_header_size(name, zip64) + member.size + self._descriptor_size(zip64)
+        self._central_offset = offset
+        self._central_size = sum(self._central_header_size(e) for e in self._entries)
+        self._zip64_end = (
+            force_zip64
+            or len(self._entries) >= _ZIP16_LIMIT
+            or self._central_offset >= _ZIP32_LIMIT
+            or self._central_size >= _ZIP32_LIMIT
+        )
+        self._size = (
+            self._central_offset
+            + self._central_size
+            + (_EOCD64.size + _EOCD64_LOCATOR.size if self._zip64_end else 0)
+            + _EOCD.size
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _local_header_size(name: bytes, zip64: bool) -> int:
+        return _LOCAL_HEADER.size + len(name) + (20 if zip64 else 0)
+
+    @staticmethod
+    def _descriptor_size(zip64: bool) -> int:
+        return _DESCRIPTOR64.size if zip64 else _DESCRIPTOR32.size
+
+    @staticmethod
+    def _central_extra(entry: _Entry) -> bytes:
+        values = []
+        if entry.zip64:
+            values += [entry.member.size, entry.member.size]
+        if entry.zip64 or entry.offset >= _ZIP32_LIMIT:
+            values.append(entry.offset)
+        if not values:
+            return b""
+        return struct.pack(f"<HH{len(values)}Q", 0x0001, 8 * len(values), *values)
+
+    def _central_header_size(self, entry: _Entry) -> int:
+        return _CENTRAL_HEADER.size + len(entry.name) + len(self._central_extra(entry))
+
+    def _local_header(self, entry: _Entry) -> bytes:
+        flags = _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8
+        if entry.zip64:
+            # Tamanhos reais vão no data descriptor de 64 bits; o extra só marca o formato.
+            extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+            sizes = (_ZIP32_LIMIT, _ZIP32_LIMIT)
+            version = _VERSION_ZIP64
+        else:
+            extra = b""
+            sizes = (0, 0)
+            version = _VERSION_DEFAULT
+        header = _LOCAL_HEADER.pack(
+            0x04034B50,
+            version,
+            flags,
+            0,
+            entry.dos_time,
+            entry.dos_date,
+            0,
+            *sizes,
+            len(entry.name),
+            len(extra),
+        )
+        return header + entry.name + extra
+
+    def _member_chunks(self, entry: _Entry) -> Iterator[bytes]:
+        member = entry.member
+        crc = 0
+        if member.data is not None:
+            crc = zlib.crc32(member.data)
+            yield member.data
+        else:
+            remaining = member.size
+            with open(member.path, "rb") as fh:
+                while remaining > 0:
+                    chunk = fh.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        # O tamanho já foi anunciado no Content-Length: não dá para encurtar.
+                        raise OSError(f"{member.path} encolheu durante o download")
+                    remaining -= len(chunk)
+                    crc = zlib.crc32(chunk, crc)
+                    yield chunk
+        entry.crc = crc
+
+    def _descriptor(self, entry: _Entry) -> bytes:
+        size = entry.member.size
+        if entry.zip64:
+            return _DESCRIPTOR64.pack(0x08074B50, entry.crc, size, size)
+        return _DESCRIPTOR32.pack(0x08074B50, entry.crc, size, size)
+
+    def _central_header(self, entry: _Entry) -> bytes:
+        extra = self._central_extra(entry)
+        size32 = _ZIP32_LIMIT if entry.zip64 else entry.member.size
+        offset32 = _ZIP32_LIMIT if (entry.zip64 or entry.offset >= _ZIP32_LIMIT) else entry.offset
+        version = _VERSION_ZIP64 if extra else _VERSION_DEFAULT
+        header = _CENTRAL_HEADER.pack(
+            0x02014B50,
+            (3 << 8) | version,
+            version,
+            _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+            0,
+            entry.dos_time,
+            entry.dos_date,
+            entry.crc,
+            size32,
+            size32,
+            len(entry.name),
+            len(extra),
+            0,
+            0,
+            0,
+            0o100644 << 16,
+            offset32,
+        )
+        return header + entry.name + extra
+
+    def _end_records(self) -> bytes:
+        count = len(self._entries)
+        out = b""
+        if self._zip64_end:
+            eocd64_offset = self._central_offset + self._central_size
+            out += _EOCD64.pack(
+                0x06064B50,
+                _EOCD64.size - 12,
+                (3 << 8) | _VERSION_ZIP64,
+                _VERSION_ZIP64,
+                0,
+                0,
+                count,
+                count,
+                self._central_size,
+                self._central_offset,
+            )
+            out += _EOCD64_LOCATOR.pack(0x07064B50, 0, eocd64_offset, 1)
+        out += _EOCD.pack(
+            0x06054B50,
+            0,
+            0,
+            min(count, _ZIP16_LIMIT),
+            min(count, _ZIP16_LIMIT),
+            min(self._central_size, _ZIP32_LIMIT),
+            min(self._central_offset, _ZIP32_LIMIT),
+            0,
+        )
+        return out
+
+    def __iter__(self) -> Iterator[bytes]:
+        for entry in self._entries:
+            yield self._local_header(entry)
+            yield from self._member_chunks(entry)
+            yield self._descriptor(entry)
+        yield b"".join(self._central_header(entry) for entry in self._entries) + self._end_records()
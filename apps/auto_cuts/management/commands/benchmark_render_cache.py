@@ -0,0 +1,103 @@
+"""Micro-benchmark of thumbnail composition with cold vs warm render-asset caches."""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from apps.auto_cuts.services import thumbnail, vertical_reformat
+from apps.auto_cuts.services.render_cache import clear_render_caches
+
+_TITLES = [
+    "COMO ELE PERDEU TUDO",
+    "O SEGREDO QUE NINGUÉM CONTA",
+    "A VERDADE SOBRE O MERCADO",
+    "ISSO MUDOU MINHA VIDA",
+]
+
+
+def _clear_all() -> None:
+    clear_render_caches()
+    thumbnail._fit_text_layout.cache_clear()
+
+
+class Command(BaseCommand):
+    help = "Compose synthetic thumbnails/overlays with the render caches cleared per cut (cold) and kept (warm)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cuts", type=int, default=24, help="Thumbnails composed per run.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best time is reported).")
+        parser.add_argument("--width", type=int, default=1280)
+        parser.add_argument("--height", type=int, default=720)
+
+    def handle(self, *args, **options):
+        cuts = max(1, options["cuts"])
+        repeat = max(1, options["repeat"])
+        w, h = options["width"], options["height"]
+        frame = np.random.default_rng(7).integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            logo_path = tmp / "logo.png"
+            template_path = tmp / "template.png"
+            Image.new("RGBA", (1200, 1200), (255, 255, 255, 200)).save(logo_path)
+            Image.new("RGBA", (1920, 1080), (0, 0, 0, 60)).save(template_path)
+            styles = [
+                thumbnail.ThumbnailStyle(
+                    is_short=i % 2 == 1,
+                    text=_TITLES[i % len(_TITLES)],
+                    font="impact",
+                    band_color=(225, 46, 32),
+                    text_color=(10, 10, 10),
+                    stroke_color=(255, 235, 220),
+                    logo_path=str(logo_path),
+                    template_path=str(template_path),
+                )
+                for i in range(cuts)
+            ]
+
+            def best_of(cold: bool, fn) -> float:
+                best = float("inf")
+                for _ in range(repeat):
+                    _clear_all()
+                    started = time.perf_counter()
+                    for i in range(cuts):
+                        if cold:
+                            _clear_all()
+                        fn(i)
+                    best = min(best, time.perf_counter() - started)
+                return best * 1000.0
+
+            self.stdout.write(f"cuts={cuts} repeat={repeat} frame={w}x{h} titles={len(_TITLES)}")
+
+            def compose(i: int) -> None:
+                thumbnail.compose_thumbnail(styles[i], frame)
+
+            cold_ms = best_of(True, compose)
+            warm_ms = best_of(False, compose)
+            self.stdout.write(
+                f"{'thumbnail':<16} cold={cold_ms:8.2f}ms warm={warm_ms:8.2f}ms "
+                f"per-cut={warm_ms / cuts:6.2f}ms speedup={cold_ms / max(warm_ms, 1e-9):5.1f}x"
+            )
+
+            if not vertical_reformat._get_emoji_font_path() or not vertical_reformat._get_text_font_path():
+                self.stdout.write(f"{'text_overlay':<16} skipped (colored emoji fonts not found)")
+                return
+            overlay_png = tmp / "overlay.png"
+
+            def overlay(i: int) -> None:
+                vertical_reformat._render_text_overlay_pillow(
+                    overlay_png, _TITLES[i % len(_TITLES)], "Siga para mais", 1400, 1544
+                )
+
+            cold_ms = best_of(True, overlay)
+            warm_ms = best_of(False, overlay)
+            self.stdout.write(
+                f"{'text_overlay':<16} cold={cold_ms:8.2f}ms warm={warm_ms:8.2f}ms "
+                f"per-cut={warm_ms / cuts:6.2f}ms speedup={cold_ms / max(warm_ms, 1e-9):5.1f}x"
+            )
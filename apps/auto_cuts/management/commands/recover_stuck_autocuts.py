@@ -5,6 +5,7 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 
 from apps.auto_cuts.services.recovery import (
+    DEFAULT_PROBE_WORKERS,
     DEFAULT_RECOVERY_COOLDOWN,
     DEFAULT_STUCK_AFTER,
     recover_stuck_autocut_analyses,
@@ -39,6 +40,12 @@ class Command(BaseCommand):
             default=None,
             help="Maximum number of analyses to scan in one run.",
         )
+        parser.add_argument(
+            "--probe-workers",
+            type=int,
+            default=DEFAULT_PROBE_WORKERS,
+            help="Threads used to check media files on disk while planning the sweep.",
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
@@ -61,6 +68,7 @@ class Command(BaseCommand):
             analysis_id=options.get("analysis_id"),
             dry_run=bool(options.get("dry_run")),
             force=bool(options.get("force")),
+            probe_workers=max(1, int(options["probe_workers"])),
         )
 
         if not results:
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_cuts', '0032_autocutanalysis_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='autocutcorte',
+            index=models.Index(fields=['created_at', 'id'], name='autocut_corte_created_id_idx'),
+        ),
+    ]
@@ -343,6 +343,10 @@ class AutoCutCorte(models.Model):
 
     class Meta:
         ordering = ["analysis", "suggestion"]
+        indexes = [
+            # Paginação keyset da API (cursor em created_at, id).
+            models.Index(fields=["created_at", "id"], name="autocut_corte_created_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Corte #{self.id} – {self.suggestion.title or self.suggestion.start_tc}"
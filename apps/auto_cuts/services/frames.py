@@ -0,0 +1,83 @@
+"""
+Extração de vários frames de um mesmo vídeo num único processo FFmpeg.
+
+Cada timestamp vira uma entrada ``-ss t -i fonte`` (seek rápido por entrada, só decodifica
+o GOP necessário) mapeada para uma saída PNG própria com ``-frames:v 1``. Assim N capas de
+uma mesma fonte custam um processo (abre o contêiner, sobe o decoder) em vez de N. Os PNGs
+ficam num diretório temporário só até serem lidos; o chamador recebe arrays RGB em memória.
+"""
+
+from __future__ import annotations
+
+import logging
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from PIL import Image
+
+from apps.jobs.services.ffmpeg import (
+    resilient_decode_options,
+    resilient_input_demuxer_flags,
+    run_cmd,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _frames_per_process() -> int:
+    return max(1, int(getattr(settings, "THUMBNAIL_FRAMES_PER_PROCESS", 16)))
+
+
+def _frames_cmd(video_path: Path, timestamps: Sequence[float], out_dir: Path) -> list[str]:
+    cmd = [settings.FFMPEG_BIN, "-y", *resilient_decode_options()]
+    for ts in timestamps:
+        cmd += ["-ss", f"{max(0.0, float(ts)):.3f}", *resilient_input_demuxer_flags(), "-i", str(video_path)]
+    # PNG e não MJPEG: alguns builds falham no encoder JPEG com dimensões ímpares.
+    for idx in range(len(timestamps)):
+        cmd += ["-map", f"{idx}:v:0", "-frames:v", "1", "-vcodec", "png", str(out_dir / f"frame_{idx}.png")]
+    return cmd
+
+
+def _read_frame(path: Path) -> np.ndarray | None:
+    if not path.exists() or path.stat().st_size < 32:
+        return None
+    try:
+        with Image.open(path) as img:
+            return np.asarray(img.convert("RGB"))
+    except OSError:
+        return None
+
+
+def extract_frames(video_path: Path, timestamps: Sequence[float]) -> list[np.ndarray | None]:
+    """
+    Devolve um frame RGB (``H x W x 3``, uint8) por timestamp, na mesma ordem. Instantes sem
+    frame (ex.: além do fim do vídeo) voltam como ``None``; os demais não são afetados.
+    Timestamps são agrupados em até ``THUMBNAIL_FRAMES_PER_PROCESS`` entradas por processo.
+    """
+    frames: list[np.ndarray | None] = [None] * len(timestamps)
+    if not timestamps:
+        return frames
+    # Ordem crescente: os seeks percorrem o arquivo para a frente (page cache, disco).
+    order = sorted(range(len(timestamps)), key=lambda i: float(timestamps[i]))
+    per_process = _frames_per_process()
+    for offset in range(0, len(order), per_process):
+        batch = order[offset : offset + per_process]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out_dir = Path(tmpdir)
+            res = run_cmd(_frames_cmd(video_path, [timestamps[i] for i in batch], out_dir), operation="thumbnail_frames")
+            for idx, frame_index in enumerate(batch):
+                frames[frame_index] = _read_frame(out_dir / f"frame_{idx}.png")
+        missing = sum(1 for i in batch if frames[i] is None)
+        if missing:
+            logger.warning(
+                "[THUMB] %d/%d frames sem saída em %s (rc=%s): %s",
+                missing,
+                len(batch),
+                video_path.name,
+                res.returncode,
+                (res.stderr or "").strip()[-500:],
+            )
+    return frames
@@ -1,5 +1,6 @@
 """Cliente Grok API (xAI) para análise de cortes virais."""
 
+import hashlib
 import json
 import logging
 import os
@@ -10,10 +11,12 @@ from functools import lru_cache
 from pathlib import Path
 from time import perf_counter
 
+from apps.auto_cuts.services.llm_executor import is_rate_limit_error
 from apps.common.metrics import (
     grok_cost_usd_total,
     grok_request_duration_ms,
     grok_requests_total,
+    grok_response_cache_total,
     grok_tokens_total,
 )
 
@@ -1516,50 +1519,158 @@ def _execute_grok_chat_completion(
     return response
 
 
+GROK_BASE_URL = "https://api.x.ai/v1"
+_JSON_OBJECT_PROBE_TTL_SECONDS = 24 * 60 * 60
+_json_object_unsupported_models: set[str] = set()
+
+
+@lru_cache(maxsize=8)
+def _get_grok_client(api_key: str):
+    """Cliente OpenAI por API key, reaproveitado no processo (conexões TLS keep-alive do httpx)."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, base_url=GROK_BASE_URL)
+
+
+def _grok_cache():
+    """Cache ``grok`` (Redis em prod, disco em dev) ou None se não configurado."""
+    from django.core.cache import InvalidCacheBackendError, caches
+
+    try:
+        return caches["grok"]
+    except InvalidCacheBackendError:
+        return None
+
+
+def _grok_response_cache_ttl() -> int:
+    from django.conf import settings
+
+    return max(0, int(getattr(settings, "GROK_RESPONSE_CACHE_TTL", 0) or 0))
+
+
+def grok_response_cache_key(model_name: str, system: str, user: str) -> str:
+    payload = json.dumps([_normalize_grok_model_name(model_name), system, user], ensure_ascii=False)
+    return "grok:response:v1:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_call(method: str, *args):
+    cache = _grok_cache()
+    if cache is None:
+        return None
+    try:
+        return getattr(cache, method)(*args)
+    except Exception as e:
+        # Cache é otimização: Redis fora do ar não pode derrubar a análise.
+        logger.warning("[FLUXO/Grok] cache %s falhou: %s", method, e)
+        return None
+
+
+def forget_grok_response(system: str, user: str) -> None:
+    """Descarta a resposta em cache quando o chamador a rejeita (JSON inválido, mínimo não atingido)."""
+    model_name = os.getenv("GROK_MODEL", "grok-4-1-fast-reasoning")
+    _cache_call("delete", grok_response_cache_key(model_name, system, user))
+
+
+def _json_object_supported(model_name: str) -> bool:
+    model = _normalize_grok_model_name(model_name)
+    if model in _json_object_unsupported_models:
+        return False
+    if _cache_call("get", f"grok:json_object_unsupported:{model}"):
+        _json_object_unsupported_models.add(model)
+        return False
+    return True
+
+
+def _is_json_object_rejection(exc: BaseException) -> bool:
+    """400/422 que fala de ``response_format``/``json_object`` (e não de contexto, mensagem, etc.)."""
+    if getattr(exc, "status_code", None) not in (400, 422):
+        return False
+    text = f"{getattr(exc, 'body', '') or ''} {exc}".lower()
+    return "response_format" in text or "json_object" in text
+
+
+def _mark_json_object_unsupported(model_name: str) -> None:
+    model = _normalize_grok_model_name(model_name)
+    _json_object_unsupported_models.add(model)
+    _cache_call("set", f"grok:json_object_unsupported:{model}", True, _JSON_OBJECT_PROBE_TTL_SECONDS)
+
+
 def call_grok_chat(
     system: str,
     user: str,
     api_key: str | None = None,
     *,
     operation: str = "chat",
+    use_cache: bool = True,
 ) -> str:
-    """Chama Grok API e retorna o conteúdo da resposta."""
-    import os
-
-    from openai import OpenAI
+    """
+    Chama Grok API e retorna o conteúdo da resposta.
 
+    Respostas ficam no cache ``grok`` por GROK_RESPONSE_CACHE_TTL (chave = hash de modelo +
+    prompts): retries da task e reruns de recovery reaproveitam a resposta sem pagar tokens.
+    """
     key = api_key or os.getenv("XAI_API_KEY")
     if not key:
         raise ValueError("XAI_API_KEY não configurada")
 
-    client = OpenAI(api_key=key, base_url="https://api.x.ai/v1")
+    model_name = os.getenv("GROK_MODEL", "grok-4-1-fast-reasoning")
+    ttl = _grok_response_cache_ttl() if use_cache else 0
+    cache_key = grok_response_cache_key(model_name, system, user)
+    if ttl:
+        cached = _cache_call("get", cache_key)
+        grok_response_cache_total.labels(operation=operation, result="hit" if cached else "miss").inc()
+        if cached:
+            logger.info("[FLUXO/Grok] Resposta do cache (%s, %d chars).", operation, len(cached))
+            return cached
+
+    client = _get_grok_client(key)
     messages = [
         {"role": "system", "content": system},
         {"role": "user", "content": user},
     ]
-    model_name = os.getenv("GROK_MODEL", "grok-4-1-fast-reasoning")
 
-    # Força JSON object na resposta quando suportado pela API.
-    try:
-        resp = _execute_grok_chat_completion(
-            client,
-            model_name=model_name,
-            messages=messages,
-            operation=operation,
-            response_format={"type": "json_object"},
-        )
-    except Exception as e:
-        logger.warning(
-            "[FLUXO/Grok] response_format=json_object não suportado (%s). Tentando sem response_format.",
-            e,
-        )
+    # Força JSON object na resposta quando suportado; a recusa fica lembrada por modelo.
+    resp = None
+    if _json_object_supported(model_name):
+        try:
+            resp = _execute_grok_chat_completion(
+                client,
+                model_name=model_name,
+                messages=messages,
+                operation=operation,
+                response_format={"type": "json_object"},
+            )
+        except Exception as e:
+            if is_rate_limit_error(e):
+                # 429 não é falta de suporte a json_object: quem chama decide o backoff.
+                raise
+            # Só a recusa do response_format fica lembrada: um prompt grande demais não desliga o json_object.
+            if _is_json_object_rejection(e):
+                _mark_json_object_unsupported(model_name)
+            logger.warning(
+                "[FLUXO/Grok] Chamada com response_format=json_object falhou (%s). Tentando sem response_format.",
+                e,
+            )
+    if resp is None:
         resp = _execute_grok_chat_completion(
             client,
             model_name=model_name,
             messages=messages,
             operation=operation,
         )
-    return resp.choices[0].message.content or ""
+    content = resp.choices[0].message.content or ""
+    if ttl and _is_json_response(content):
+        _cache_call("set", cache_key, content, ttl)
+    return content
+
+
+def _is_json_response(content: str) -> bool:
+    """Só respostas com JSON extraível vão para o cache (as demais falham no chamador)."""
+    try:
+        _extract_json(content)
+    except ValueError:
+        return False
+    return True
 
 
 def _build_context_block(
@@ -1701,16 +1812,21 @@ def analyze_chunks_in_one_request(
         operation=GROK_OPERATION_ANALYZE_CHUNKS,
     )
     logger.info("[FLUXO/Grok] Resposta recebida (%d chars). Extraindo JSON...", len(content or ""))
-    parsed = _extract_json(content)
-    if not isinstance(parsed, dict):
-        raise ValueError("Resposta inválida do Grok: raiz do JSON deve ser objeto.")
-    _validate_minimum_items(
-        parsed,
-        prompt_version=pv,
-        enforce_minimum=enforce_minimum,
-        allowed_theme_categories=allowed_theme_categories,
-        brand_only=brand_only,
-    )
+    try:
+        parsed = _extract_json(content)
+        if not isinstance(parsed, dict):
+            raise ValueError("Resposta inválida do Grok: raiz do JSON deve ser objeto.")
+        _validate_minimum_items(
+            parsed,
+            prompt_version=pv,
+            enforce_minimum=enforce_minimum,
+            allowed_theme_categories=allowed_theme_categories,
+            brand_only=brand_only,
+        )
+    except Exception:
+        # Resposta rejeitada não pode voltar do cache no retry da task.
+        forget_grok_response(system_prompt, user)
+        raise
     from apps.auto_cuts.services.metadata_sanitizer import sanitize_payload
     sanitize_payload(parsed)
     _save_grok_response_json(parsed, analysis_id=analysis_id)
@@ -1825,6 +1941,7 @@ Retorne JSON com: virality_score (1-10), title (SEMPRE com 1-3 emojis), thumbnai
     )
     parsed = _extract_json(content)
     if not isinstance(parsed, dict):
+        forget_grok_response(system, user)
         return {
             "virality_score": 5,
             "title": "Vídeo",
@@ -1866,10 +1983,9 @@ def analyze_ready_cuts_batch_titles_from_transcripts(
         operation=GROK_OPERATION_READY_CUTS_TITLES_FROM_TRANSCRIPTS,
     )
     parsed = _extract_json(content)
-    if not isinstance(parsed, dict):
-        return {}
-    titles = parsed.get("titles")
+    titles = parsed.get("titles") if isinstance(parsed, dict) else None
     if not isinstance(titles, dict):
+        forget_grok_response(system, user)
         return {}
     from apps.auto_cuts.services.metadata_sanitizer import sanitize_clip
     out: dict[str, str] = {}
@@ -1900,10 +2016,9 @@ def analyze_ready_cuts_batch_titles_from_job_name(
         operation=GROK_OPERATION_READY_CUTS_TITLES_FROM_JOB_NAME,
     )
     parsed = _extract_json(content)
-    if not isinstance(parsed, dict):
-        return [f"{name} #{i+1}" for i in range(n)]
-    titles = parsed.get("titles")
+    titles = parsed.get("titles") if isinstance(parsed, dict) else None
     if not isinstance(titles, list):
+        forget_grok_response(system, user)
         return [f"{name} #{i+1}" for i in range(n)]
     from apps.auto_cuts.services.metadata_sanitizer import sanitize_clip
     cleaned = []
@@ -0,0 +1,176 @@
+"""
+Execução concorrente e limitada de chamadas ao LLM (Grok/xAI).
+
+Cada chamada roda numa thread própria. Um semáforo por API key (compartilhado pelo processo
+inteiro, então tasks concorrentes no mesmo worker dividem o mesmo limite) segura no máximo
+``GROK_MAX_IN_FLIGHT`` requisições em voo. Respostas 429 são refeitas com backoff
+exponencial + jitter (respeitando ``Retry-After`` quando vier), com o semáforo liberado
+durante a espera. Os resultados voltam na ordem de entrada. Métricas de custo/tokens
+continuam sendo registradas por ``_observe_grok_request_metrics`` em cada tentativa.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+from apps.common.metrics import grok_rate_limited_total
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SEMAPHORES: dict[tuple[str, int], threading.BoundedSemaphore] = {}
+_SEMAPHORES_LOCK = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def max_in_flight() -> int:
+    return max(1, _env_int("GROK_MAX_IN_FLIGHT", 4))
+
+
+def _key_semaphore(api_key: str | None, limit: int) -> threading.BoundedSemaphore:
+    key = api_key or os.getenv("XAI_API_KEY") or ""
+    # Só o hash fica no processo; o limite entra na chave para mudanças de env valerem.
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    with _SEMAPHORES_LOCK:
+        sem = _SEMAPHORES.get((digest, limit))
+        if sem is None:
+            sem = _SEMAPHORES[(digest, limit)] = threading.BoundedSemaphore(limit)
+        return sem
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True para 429 do SDK openai (RateLimitError) ou qualquer erro com status_code 429."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+    except AttributeError:
+        return None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int, exc: BaseException) -> float:
+    base = max(0.0, _env_float("GROK_RATE_LIMIT_BACKOFF_SEC", 2.0))
+    cap = max(base, _env_float("GROK_RATE_LIMIT_BACKOFF_MAX_SEC", 60.0))
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        return min(cap, retry_after)
+    return min(cap, base * (2**attempt)) * random.uniform(0.5, 1.0)
+
+
+def call_with_rate_limit_retry(
+    fn: Callable[[], T],
+    *,
+    semaphore: threading.BoundedSemaphore | None = None,
+    operation: str = "chat",
+) -> T:
+    """Executa ``fn`` (dentro do semáforo, se houver) refazendo em 429 até GROK_RATE_LIMIT_MAX_RETRIES."""
+    retries = max(0, _env_int("GROK_RATE_LIMIT_MAX_RETRIES", 4))
+    attempt = 0
+    while True:
+        try:
+            if semaphore is None:
+                return fn()
+            with semaphore:
+                return fn()
+        except Exception as exc:
+            if attempt >= retries or not is_rate_limit_error(exc):
+                raise
+            wait_s = _backoff_seconds(attempt, exc)
+            grok_rate_limited_total.labels(operation=operation).inc()
+            logger.warning(
+                "[FLUXO/Grok] 429 em %s (tentativa %d/%d); aguardando %.1fs",
+                operation,
+                attempt + 1,
+                retries,
+                wait_s,
+            )
+            time.sleep(wait_s)
+            attempt += 1
+
+
+class _Skipped(Exception):
+    """Chamada não feita porque outra do mesmo lote já falhou."""
+
+
+def run_llm_calls(
+    calls: Sequence[Callable[[], T]],
+    *,
+    api_key: str | None = None,
+    operation: str = "chat",
+    limit: int | None = None,
+) -> list[T]:
+    """
+    Executa ``calls`` concorrentemente (no máximo ``limit`` em voo por API key) e devolve
+    os resultados na mesma ordem. Na primeira falha, as chamadas que ainda não começaram
+    (na fila ou esperando o semáforo) não são feitas; as que já estão em voo terminam, pois
+    a requisição HTTP não é interrompida. Relança o primeiro erro, na ordem de entrada,
+    entre as chamadas que chegaram a rodar.
+    """
+    if not calls:
+        return []
+    limit = max(1, limit or max_in_flight())
+    semaphore = _key_semaphore(api_key, limit)
+    failed = threading.Event()
+
+    def _run(fn: Callable[[], T]) -> T:
+        def guarded() -> T:
+            # Conferido já dentro do semáforo, logo antes da requisição.
+            if failed.is_set():
+                raise _Skipped()
+            return fn()
+
+        try:
+            return call_with_rate_limit_retry(guarded, semaphore=semaphore, operation=operation)
+        except BaseException:
+            failed.set()
+            raise
+
+    if len(calls) == 1 or limit == 1:
+        return [_run(fn) for fn in calls]
+
+    with ThreadPoolExecutor(max_workers=min(limit, len(calls)), thread_name_prefix="llm") as pool:
+        # copy_context: o correlation_id (log_event) segue para as threads.
+        futures = [pool.submit(contextvars.copy_context().run, _run, fn) for fn in calls]
+        wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            future.cancel()
+    for future in futures:
+        if future.cancelled():
+            continue
+        error = future.exception()
+        if error is not None and not isinstance(error, _Skipped):
+            raise error
+    return [f.result() for f in futures]
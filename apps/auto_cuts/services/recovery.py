@@ -3,7 +3,10 @@ from __future__ import annotations
 import logging
 import shutil
 import tempfile
-from dataclasses import dataclass
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import timedelta
 from enum import StrEnum
 from pathlib import Path
@@ -31,6 +34,7 @@ EARLY_STAGE_STATUSES = {"pending", "transcribing", "analyzing"}
 AUTO_RECOVERABLE_INVENTORY_STATUSES = {"AVAILABLE", "FAILED"}
 BLOCKING_INVENTORY_STATUSES = {"SCHEDULED", "POSTING", "POSTED"}
 MANUAL_ATTENTION_PREFIX = "Recovery manual required:"
+DEFAULT_PROBE_WORKERS = 16
 
 
 class AutoCutRecoveryStage(StrEnum):
@@ -68,6 +72,21 @@ class AutoCutRecoveryDecision:
     policy: AutoCutRecoveryPolicy
 
 
+@dataclass
+class AutoCutRecoveryFacts:
+    """Estado persistido que a decisao de recovery le, pre-carregado em lote por analysis."""
+
+    selected_cortes: list[AutoCutCorte] = field(default_factory=list)
+    inventory_items: list[VideoInventoryItem] = field(default_factory=list)
+    ready_chunks: dict[int, AutoCutReadyChunk] = field(default_factory=dict)
+    has_suggestions: bool = False
+    # Caminhos sondados que existem no disco (compartilhado entre as analyses do lote).
+    existing_paths: set[Path] = field(default_factory=set)
+
+    def exists(self, path: Path | None) -> bool:
+        return path is not None and path in self.existing_paths
+
+
 @dataclass(frozen=True)
 class AutoCutRecoveryResult:
     analysis_id: int
@@ -176,11 +195,11 @@ def _selected_cortes(analysis: AutoCutAnalysis) -> list[AutoCutCorte]:
     )
 
 
-def _analysis_inputs_available(analysis: AutoCutAnalysis) -> bool:
+def _analysis_inputs_available(analysis: AutoCutAnalysis, facts: AutoCutRecoveryFacts) -> bool:
     if bool(getattr(analysis, "is_ready_cuts", False)):
-        chunks = list(AutoCutReadyChunk.objects.filter(analysis=analysis))
-        return bool(chunks) and all(_path_exists(_file_path(ch.file)) for ch in chunks)
-    if _path_exists(_analysis_video_path(analysis)):
+        chunks = list(facts.ready_chunks.values())
+        return bool(chunks) and all(facts.exists(_file_path(ch.file)) for ch in chunks)
+    if facts.exists(_analysis_video_path(analysis)):
         return True
     return bool((getattr(analysis, "youtube_url", "") or "").strip())
 
@@ -192,22 +211,22 @@ def _inventory_items_for_cortes(cortes: list[AutoCutCorte]) -> list[VideoInvento
     return list(VideoInventoryItem.objects.filter(auto_cut_corte_id__in=corte_ids))
 
 
-def _blocking_inventory_items(cortes: list[AutoCutCorte]) -> list[VideoInventoryItem]:
-    return [
-        item
-        for item in _inventory_items_for_cortes(cortes)
-        if item.status in BLOCKING_INVENTORY_STATUSES
-    ]
+def _blocking_inventory_items(
+    cortes: list[AutoCutCorte], items: list[VideoInventoryItem] | None = None
+) -> list[VideoInventoryItem]:
+    if items is None:
+        items = _inventory_items_for_cortes(cortes)
+    return [item for item in items if item.status in BLOCKING_INVENTORY_STATUSES]
 
 
-def _corte_has_final_media(corte: AutoCutCorte) -> bool:
-    return bool(corte.is_finalized and _path_exists(_file_path(corte.file)))
+def _corte_has_final_media(corte: AutoCutCorte, exists=_path_exists) -> bool:
+    return bool(corte.is_finalized and exists(_file_path(corte.file)))
 
 
-def _analysis_has_inventory_gap(cortes: list[AutoCutCorte]) -> bool:
-    items_by_corte = {item.auto_cut_corte_id: item for item in _inventory_items_for_cortes(cortes)}
-    for corte in cortes:
-        if not _corte_has_final_media(corte):
+def _analysis_has_inventory_gap(facts: AutoCutRecoveryFacts) -> bool:
+    items_by_corte = {item.auto_cut_corte_id: item for item in facts.inventory_items}
+    for corte in facts.selected_cortes:
+        if not _corte_has_final_media(corte, facts.exists):
             return False
         item = items_by_corte.get(corte.id)
         if item is None or item.status == "FAILED":
@@ -215,16 +234,22 @@ def _analysis_has_inventory_gap(cortes: list[AutoCutCorte]) -> bool:
     return False
 
 
-def _ready_chunk_path_for_suggestion(
-    analysis: AutoCutAnalysis, suggestion: AutoCutSuggestion
-) -> Path | None:
+def _ready_chunk_id(suggestion: AutoCutSuggestion) -> int | None:
     raw = (getattr(suggestion, "source_asset_id", "") or "").strip()
     if not raw.startswith("ready_chunk:"):
         return None
     try:
-        ready_chunk_id = int(raw.split(":", 1)[1])
+        return int(raw.split(":", 1)[1])
     except (TypeError, ValueError):
         return None
+
+
+def _ready_chunk_path_for_suggestion(
+    analysis: AutoCutAnalysis, suggestion: AutoCutSuggestion
+) -> Path | None:
+    ready_chunk_id = _ready_chunk_id(suggestion)
+    if ready_chunk_id is None:
+        return None
     chunk = AutoCutReadyChunk.objects.filter(id=ready_chunk_id, analysis=analysis).first()
     if not chunk:
         return None
@@ -238,23 +263,104 @@ def _long_concat_source_path(analysis: AutoCutAnalysis, suggestion: AutoCutSugge
     return Path(settings.MEDIA_ROOT) / "auto_cuts" / "cortes" / f"job_{analysis.id}_long_concat.mp4"
 
 
-def _can_restore_corte_base(corte: AutoCutCorte) -> bool:
-    analysis = corte.analysis
+def _corte_base_source_paths(
+    analysis: AutoCutAnalysis, corte: AutoCutCorte, ready_chunks: dict[int, AutoCutReadyChunk]
+) -> list[Path | None]:
+    # Mesma ordem de preferencia de _restore_corte_base_media.
     suggestion = corte.suggestion
+    chunk = ready_chunks.get(_ready_chunk_id(suggestion))
+    return [
+        _file_path(chunk.file) if chunk else None,
+        _long_concat_source_path(analysis, suggestion),
+        _analysis_video_path(analysis),
+    ]
 
-    ready_chunk_path = _ready_chunk_path_for_suggestion(analysis, suggestion)
-    if _path_exists(ready_chunk_path):
-        return True
 
-    long_concat_path = _long_concat_source_path(analysis, suggestion)
-    if _path_exists(long_concat_path):
-        return True
+def _can_restore_corte_base(
+    analysis: AutoCutAnalysis, corte: AutoCutCorte, facts: AutoCutRecoveryFacts
+) -> bool:
+    return any(
+        facts.exists(path) for path in _corte_base_source_paths(analysis, corte, facts.ready_chunks)
+    )
 
-    return _path_exists(_analysis_video_path(analysis))
 
+def _can_rerun_finalization(analysis: AutoCutAnalysis, facts: AutoCutRecoveryFacts) -> bool:
+    cortes = facts.selected_cortes
+    return bool(cortes) and all(_can_restore_corte_base(analysis, corte, facts) for corte in cortes)
 
-def _can_rerun_finalization(analysis: AutoCutAnalysis, cortes: list[AutoCutCorte]) -> bool:
-    return bool(cortes) and all(_can_restore_corte_base(corte) for corte in cortes)
+
+def _recovery_probe_paths(analysis: AutoCutAnalysis, facts: AutoCutRecoveryFacts) -> set[Path]:
+    paths: set[Path | None] = {_analysis_video_path(analysis)}
+    if bool(getattr(analysis, "is_ready_cuts", False)):
+        paths.update(_file_path(chunk.file) for chunk in facts.ready_chunks.values())
+    for corte in facts.selected_cortes:
+        paths.add(_file_path(corte.file))
+        paths.update(_corte_base_source_paths(analysis, corte, facts.ready_chunks))
+    paths.discard(None)
+    return paths
+
+
+def _probe_existing_paths(paths: Iterable[Path], *, workers: int) -> set[Path]:
+    paths = list(paths)
+    if not paths:
+        return set()
+    workers = max(1, min(int(workers), len(paths)))
+    if workers == 1:
+        flags = [_path_exists(path) for path in paths]
+    else:
+        # exists() e I/O puro (NFS/volume montado); threads escondem a latencia de cada stat.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="autocut-recovery-probe") as pool:
+            flags = list(pool.map(_path_exists, paths))
+    return {path for path, found in zip(paths, flags, strict=True) if found}
+
+
+def load_recovery_facts(
+    analyses: Iterable[AutoCutAnalysis],
+    *,
+    probe_workers: int = DEFAULT_PROBE_WORKERS,
+) -> dict[int, AutoCutRecoveryFacts]:
+    """
+    Carrega cortes, inventario, ready chunks e sugestoes de todas as analyses em 4 consultas
+    e sonda os arquivos de midia num pool de threads. A decisao depois roda so em memoria.
+    """
+    analyses_by_id = {analysis.id: analysis for analysis in analyses}
+    facts = {analysis_id: AutoCutRecoveryFacts() for analysis_id in analyses_by_id}
+    if not facts:
+        return facts
+    analysis_ids = list(analyses_by_id)
+
+    corte_analysis_ids: dict[int, int] = {}
+    for corte in AutoCutCorte.objects.filter(
+        analysis_id__in=analysis_ids, user_wants_finalize=True
+    ).select_related("suggestion"):
+        corte.analysis = analyses_by_id[corte.analysis_id]
+        facts[corte.analysis_id].selected_cortes.append(corte)
+        corte_analysis_ids[corte.id] = corte.analysis_id
+
+    if corte_analysis_ids:
+        for item in VideoInventoryItem.objects.filter(auto_cut_corte_id__in=list(corte_analysis_ids)):
+            facts[corte_analysis_ids[item.auto_cut_corte_id]].inventory_items.append(item)
+
+    for chunk in AutoCutReadyChunk.objects.filter(analysis_id__in=analysis_ids).only(
+        "id", "analysis_id", "file"
+    ):
+        facts[chunk.analysis_id].ready_chunks[chunk.id] = chunk
+
+    for analysis_id in (
+        AutoCutSuggestion.objects.filter(analysis_id__in=analysis_ids)
+        .order_by()
+        .values_list("analysis_id", flat=True)
+        .distinct()
+    ):
+        facts[analysis_id].has_suggestions = True
+
+    paths: set[Path] = set()
+    for analysis_id, analysis in analyses_by_id.items():
+        paths.update(_recovery_probe_paths(analysis, facts[analysis_id]))
+    existing_paths = _probe_existing_paths(paths, workers=probe_workers)
+    for analysis_facts in facts.values():
+        analysis_facts.existing_paths = existing_paths
+    return facts
 
 
 def _mark_analysis_done(analysis: AutoCutAnalysis) -> None:
@@ -281,11 +387,15 @@ def _mark_analysis_manual_attention(analysis: AutoCutAnalysis, reason: str) -> N
     analysis.save(update_fields=["status", "progress_message", "error"])
 
 
-def decide_analysis_recovery_action(analysis: AutoCutAnalysis) -> AutoCutRecoveryDecision:
+def decide_analysis_recovery_action(
+    analysis: AutoCutAnalysis, facts: AutoCutRecoveryFacts | None = None
+) -> AutoCutRecoveryDecision:
+    if facts is None:
+        facts = load_recovery_facts([analysis])[analysis.id]
     status = getattr(analysis, "status", "") or ""
     policy_stage = AutoCutRecoveryStage.AMBIGUOUS
-    selected_cortes = _selected_cortes(analysis)
-    blocking_items = _blocking_inventory_items(selected_cortes)
+    selected_cortes = facts.selected_cortes
+    blocking_items = _blocking_inventory_items(selected_cortes, facts.inventory_items)
 
     if status == "done" and not selected_cortes:
         policy_stage = AutoCutRecoveryStage.COMPLETED
@@ -301,11 +411,11 @@ def decide_analysis_recovery_action(analysis: AutoCutAnalysis) -> AutoCutRecover
             policy_stage = AutoCutRecoveryStage.FETCH_PREPARE
         elif status == "transcribing":
             policy_stage = AutoCutRecoveryStage.TRANSCRIPTION
-        elif selected_cortes or AutoCutSuggestion.objects.filter(analysis=analysis).exists():
+        elif selected_cortes or facts.has_suggestions:
             policy_stage = AutoCutRecoveryStage.CUT_GENERATION
         else:
             policy_stage = AutoCutRecoveryStage.AI_ANALYSIS
-        if not _analysis_inputs_available(analysis):
+        if not _analysis_inputs_available(analysis, facts):
             return AutoCutRecoveryDecision(
                 stage=AutoCutRecoveryStage.AMBIGUOUS,
                 action=AutoCutRecoveryAction.MARK_MANUAL_ATTENTION,
@@ -347,16 +457,18 @@ def decide_analysis_recovery_action(analysis: AutoCutAnalysis) -> AutoCutRecover
                 policy=RECOVERY_POLICY_BY_STAGE[AutoCutRecoveryStage.FINALIZATION],
             )
 
-        missing_finalization = any(not _corte_has_final_media(corte) for corte in selected_cortes)
+        missing_finalization = any(
+            not _corte_has_final_media(corte, facts.exists) for corte in selected_cortes
+        )
         if missing_finalization:
-            if _can_rerun_finalization(analysis, selected_cortes):
+            if _can_rerun_finalization(analysis, facts):
                 return AutoCutRecoveryDecision(
                     stage=AutoCutRecoveryStage.FINALIZATION,
                     action=AutoCutRecoveryAction.RERUN_FINALIZATION,
                     reason="Cortes nao finalizaram por completo; reconstruir base e refinalizar com cleanup.",
                     policy=RECOVERY_POLICY_BY_STAGE[AutoCutRecoveryStage.FINALIZATION],
                 )
-            if _analysis_inputs_available(analysis):
+            if _analysis_inputs_available(analysis, facts):
                 return AutoCutRecoveryDecision(
                     stage=AutoCutRecoveryStage.FINALIZATION,
                     action=AutoCutRecoveryAction.RESTART_FROM_BEGINNING,
@@ -370,7 +482,7 @@ def decide_analysis_recovery_action(analysis: AutoCutAnalysis) -> AutoCutRecover
                 policy=RECOVERY_POLICY_BY_STAGE[AutoCutRecoveryStage.AMBIGUOUS],
             )
 
-        if _analysis_has_inventory_gap(selected_cortes):
+        if _analysis_has_inventory_gap(facts):
             return AutoCutRecoveryDecision(
                 stage=AutoCutRecoveryStage.INVENTORY_SYNC,
                 action=AutoCutRecoveryAction.RERUN_INVENTORY_SYNC,
@@ -617,10 +729,11 @@ def recover_autocut_analysis(
     cooldown: timedelta = DEFAULT_RECOVERY_COOLDOWN,
     dry_run: bool = False,
     force: bool = False,
+    facts: AutoCutRecoveryFacts | None = None,
 ) -> AutoCutRecoveryResult:
     current_now = now or timezone.now()
     status_before = analysis.status
-    decision = decide_analysis_recovery_action(analysis)
+    decision = decide_analysis_recovery_action(analysis, facts)
 
     if decision.action == AutoCutRecoveryAction.IGNORE:
         return AutoCutRecoveryResult(
@@ -684,10 +797,14 @@ def detect_recoverable_analyses(
 ) -> list[AutoCutAnalysis]:
     current_now = now or timezone.now()
     cutoff = current_now - stuck_after
-    qs = AutoCutAnalysis.objects.filter(
-        status__in=RECOVERABLE_ANALYSIS_STATUSES,
-        updated_at__lte=cutoff,
-    ).order_by("updated_at", "id")
+    qs = (
+        AutoCutAnalysis.objects.filter(
+            status__in=RECOVERABLE_ANALYSIS_STATUSES,
+            updated_at__lte=cutoff,
+        )
+        .select_related("source")
+        .order_by("updated_at", "id")
+    )
     if limit:
         qs = qs[:limit]
     return list(qs)
@@ -702,10 +819,11 @@ def recover_stuck_autocut_analyses(
     analysis_id: int | None = None,
     dry_run: bool = False,
     force: bool = False,
+    probe_workers: int = DEFAULT_PROBE_WORKERS,
 ) -> list[AutoCutRecoveryResult]:
     current_now = now or timezone.now()
     if analysis_id is not None:
-        analyses = list(AutoCutAnalysis.objects.filter(id=analysis_id))
+        analyses = list(AutoCutAnalysis.objects.filter(id=analysis_id).select_related("source"))
     else:
         analyses = detect_recoverable_analyses(
             now=current_now,
@@ -713,6 +831,16 @@ def recover_stuck_autocut_analyses(
             limit=limit,
         )
 
+    # O planejamento usa um snapshot do lote; as acoes (cleanup, sync) reconsultam o estado
+    # da propria analysis antes de mutar, entao o snapshot nunca e a fonte de escrita.
+    started = time.monotonic()
+    facts_by_id = load_recovery_facts(analyses, probe_workers=probe_workers)
+    logger.info(
+        "[RECOVERY] prefetched state for %s analyses in %.2fs",
+        len(analyses),
+        time.monotonic() - started,
+    )
+
     results: list[AutoCutRecoveryResult] = []
     for analysis in analyses:
         results.append(
@@ -722,6 +850,7 @@ def recover_stuck_autocut_analyses(
                 cooldown=cooldown,
                 dry_run=dry_run,
                 force=force,
+                facts=facts_by_id[analysis.id],
             )
         )
     return results
@@ -0,0 +1,114 @@
+"""
+Caches de renderização (Pillow) das capas e overlays de texto, por processo.
+
+- Fontes TrueType: LRU por (caminho, tamanho); ``ImageFont.truetype`` relê e interpreta o
+  arquivo inteiro a cada chamada. A busca na lista de candidatas também fica em cache.
+- Logo/modelo de capa já convertidos para RGBA e redimensionados: LRU por (caminho, mtime,
+  tamanho do arquivo, caixa, modo). Trocar o arquivo do asset muda o mtime e invalida.
+- PNGs de overlay renderizados: LRU de bytes por hash do conteúdo + estilo, para cortes com
+  o mesmo texto/estilo não redesenharem nem recodificarem 1080x1920.
+
+As imagens devolvidas são compartilhadas: quem usa só lê (paste/alpha_composite), nunca altera.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageFont
+
+_PNG_CACHE_MAX_ITEMS = 64
+
+
+@lru_cache(maxsize=256)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """``ImageFont.truetype`` com cache; erros (OSError) não são cacheados e sobem ao chamador."""
+    return ImageFont.truetype(path, size=size)
+
+
+@lru_cache(maxsize=256)
+def resolve_font(candidates: tuple[str, ...], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Primeira fonte de ``candidates`` que carrega no tamanho pedido; senão a fonte padrão do Pillow."""
+    for name in candidates:
+        try:
+            return load_font(name, size)
+        except Exception:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=64)
+def _scaled_rgba(path: str, mtime_ns: int, file_size: int, box: tuple[int, int], fit: bool) -> Image.Image:
+    with Image.open(path) as src:
+        img = src.convert("RGBA")
+    if fit:
+        img.thumbnail(box, Image.Resampling.LANCZOS)
+        return img
+    return img.resize(box, Image.Resampling.LANCZOS)
+
+
+def scaled_rgba(path: str | Path, box: tuple[int, int], *, fit: bool) -> Image.Image:
+    """
+    Imagem RGBA do arquivo ajustada à caixa: ``fit=True`` mantém proporção (logo),
+    ``fit=False`` estica para o tamanho exato (modelo de capa sobre o frame).
+    """
+    st = Path(path).stat()
+    return _scaled_rgba(str(path), st.st_mtime_ns, st.st_size, (int(box[0]), int(box[1])), fit)
+
+
+class _BytesLRU:
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_png_cache = _BytesLRU(_PNG_CACHE_MAX_ITEMS)
+
+
+def render_key(**parts) -> str:
+    """Chave estável (sha256) para conteúdo + estilo de um overlay."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_png(key: str, render: Callable[[], bytes | None]) -> bytes | None:
+    """PNG já renderizado para ``key`` ou o resultado de ``render()`` (guardado se não for None)."""
+    data = _png_cache.get(key)
+    if data is None:
+        data = render()
+        if data is not None:
+            _png_cache.put(key, data)
+    return data
+
+
+def clear_render_caches() -> None:
+    """Esvazia todos os caches (testes e benchmark de cache frio)."""
+    load_font.cache_clear()
+    resolve_font.cache_clear()
+    _scaled_rgba.cache_clear()
+    _png_cache.clear()
@@ -1,27 +1,31 @@
 from __future__ import annotations
 
+import io
 import logging
+import multiprocessing
 import re
-import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 from django.conf import settings
-from django.core.files import File
+from django.core.files.base import ContentFile
 from PIL import Image, ImageDraw, ImageFont
 
+from apps.auto_cuts.services.frames import extract_frames
+from apps.auto_cuts.services.render_cache import resolve_font, scaled_rgba
 from apps.brands.models import BrandAsset
-from apps.jobs.services.ffmpeg import (
-    ffprobe_duration,
-    resilient_decode_options,
-    resilient_input_demuxer_flags,
-    run_cmd,
-    tc_to_seconds,
-)
+from apps.jobs.services.ffmpeg import ffprobe_duration, tc_to_seconds
 
 logger = logging.getLogger(__name__)
 
 # Se o timestamp sugerido falhar (FFmpeg), usar este instante no ficheiro de vídeo do corte (relativo ou absoluto conforme o caso).
 THUMB_FALLBACK_SEC_IN_CUT = 5.0
+# YouTube limita thumbnail a 2MB.
+YT_THUMB_MAX_BYTES = 2 * 1024 * 1024
 
 HEX_COLOR_RE = re.compile(r"^#[0-9A-Fa-f]{6}$")
 
@@ -43,12 +47,7 @@ def _safe_font(preferred_font: str, size: int) -> ImageFont.FreeTypeFont | Image
     fonts_dir = Path(settings.MEDIA_ROOT) / "fonts"
     for font_name in list(candidates):
         candidates.append(str(fonts_dir / font_name))
-    for font_name in candidates:
-        try:
-            return ImageFont.truetype(font_name, size=size)
-        except Exception:
-            continue
-    return ImageFont.load_default()
+    return resolve_font(tuple(candidates), size)
 
 
 def _text_width(draw: ImageDraw.ImageDraw, text: str, font) -> int:
@@ -110,7 +109,32 @@ def _fit_text_into_box(
     *,
     absolute_min_font_size: int = 8,
 ) -> tuple[ImageFont.FreeTypeFont | ImageFont.ImageFont, list[str], int]:
-    floor = max(8, absolute_min_font_size)
+    # A medição só depende de fonte/tamanho, não da imagem: o layout é memoizado por texto + caixa.
+    font, lines, line_spacing = _fit_text_layout(
+        str(settings.MEDIA_ROOT),
+        text,
+        preferred_font,
+        max_width,
+        max_height,
+        initial_font_size,
+        min_font_size,
+        max(8, absolute_min_font_size),
+    )
+    return font, list(lines), line_spacing
+
+
+@lru_cache(maxsize=512)
+def _fit_text_layout(
+    media_root: str,
+    text: str,
+    preferred_font: str,
+    max_width: int,
+    max_height: int,
+    initial_font_size: int,
+    min_font_size: int,
+    floor: int,
+) -> tuple[ImageFont.FreeTypeFont | ImageFont.ImageFont, tuple[str, ...], int]:
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
     font_size = max(min_font_size, initial_font_size)
     while font_size >= floor:
         font = _safe_font(preferred_font, font_size)
@@ -124,62 +148,12 @@ def _fit_text_into_box(
             line_heights.append(max(1, bbox[3] - bbox[1]))
         text_h = sum(line_heights) + (len(lines) - 1) * line_spacing
         if text_h <= max_height:
-            return font, lines, line_spacing
+            return font, tuple(lines), line_spacing
         font_size -= 2
     font = _safe_font(preferred_font, floor)
     lines = _wrap_text(draw, text, font, max_width) or [text]
     line_spacing = max(4, int(floor * 0.2))
-    return font, lines, line_spacing
-
-
-def _extract_frame_at(video_path: Path, output_image_path: Path, sec: float) -> None:
-    """
-    Extrai um frame como PNG. Evita encoder MJPEG (.jpg), que em alguns builds/ffmpeg
-    falha (ff_frame_thread_encoder_init / dimensões ímpares) ao gerar a capa.
-    """
-    ts = max(0.0, float(sec))
-    cmd = [
-        settings.FFMPEG_BIN,
-        "-y",
-        *resilient_decode_options(),
-        "-ss",
-        f"{ts:.3f}",
-        *resilient_input_demuxer_flags(),
-        "-i",
-        str(video_path),
-        "-an",
-        "-sn",
-        "-dn",
-        "-frames:v",
-        "1",
-        "-vcodec",
-        "png",
-        str(output_image_path),
-    ]
-    res = run_cmd(cmd)
-    if not res.ok:
-        raise RuntimeError(f"frame extract failed: {res.stderr}")
-    if not output_image_path.exists() or output_image_path.stat().st_size < 32:
-        raise RuntimeError(f"frame extract produced no output: {output_image_path}")
-
-
-def _extract_frame_with_fallback(
-    video_path: Path,
-    output_image_path: Path,
-    primary_sec: float,
-    fallback_sec: float,
-) -> None:
-    """Tenta o instante principal; em erro, tenta fallback (ex. 5 s dentro do corte)."""
-    try:
-        _extract_frame_at(video_path, output_image_path, primary_sec)
-    except Exception as e:
-        logger.warning(
-            "[THUMB] Frame em %.2fs falhou (%s); a usar fallback %.2fs",
-            primary_sec,
-            e,
-            fallback_sec,
-        )
-        _extract_frame_at(video_path, output_image_path, fallback_sec)
+    return font, tuple(lines), line_spacing
 
 
 def _hex_to_rgb(hex_color: str, fallback: tuple[int, int, int]) -> tuple[int, int, int]:
@@ -191,275 +165,422 @@ def _hex_to_rgb(hex_color: str, fallback: tuple[int, int, int]) -> tuple[int, in
     return tuple(int(value[i : i + 2], 16) for i in (1, 3, 5))
 
 
-def generate_auto_thumbnail(corte, target_brand=None) -> bool:
+@dataclass(frozen=True)
+class ThumbnailStyle:
+    """Tudo que a composição da capa precisa; picklable para rodar no pool de processos."""
+
+    is_short: bool
+    text: str
+    font: str
+    band_color: tuple[int, int, int]
+    text_color: tuple[int, int, int]
+    stroke_color: tuple[int, int, int]
+    logo_path: str | None = None
+    template_path: str | None = None
+
+
+@dataclass
+class ThumbnailPlan:
+    """De onde tirar o frame da capa de um corte (resolvido no processo principal, com acesso ao banco)."""
+
+    corte: object
+    style: ThumbnailStyle
+    source_path: Path
+    ts_sec: float
+    # True = ficheiro é só o corte (timeline 0..duração); False = vídeo fonte completo (timestamps absolutos).
+    timeline_is_cut_only: bool
+    sug_start_sec: float
+    sug_end_sec: float
+
+    def fallback_sec(self) -> float:
+        """~5 s dentro do corte: relativo ao ficheiro se for só o corte; senão absoluto no vídeo fonte."""
+        if not self.timeline_is_cut_only and self.sug_end_sec > self.sug_start_sec:
+            cut_len = self.sug_end_sec - self.sug_start_sec
+            return self.sug_start_sec + min(THUMB_FALLBACK_SEC_IN_CUT, max(0.0, cut_len - 0.25))
+        try:
+            dur = ffprobe_duration(self.source_path)
+        except Exception:
+            dur = 0.0
+        return min(THUMB_FALLBACK_SEC_IN_CUT, max(0.0, dur - 0.25))
+
+    def on_source(self, source_path: Path) -> ThumbnailPlan:
+        """
+        Mesmo frame lido do vídeo fonte (timestamp absoluto). Só vale para cortes que são um
+        trim simples da fonte (extract_corte), em que o instante t do corte é start + t na fonte.
+        """
+        if not self.timeline_is_cut_only or self.sug_end_sec <= self.sug_start_sec:
+            return self
+        cut_len = self.sug_end_sec - self.sug_start_sec
+        ts_abs = self.sug_start_sec + max(0.0, min(self.ts_sec, cut_len - 0.25))
+        return replace(self, source_path=source_path, ts_sec=ts_abs, timeline_is_cut_only=False)
+
+
+def plan_auto_thumbnail(corte, target_brand=None) -> ThumbnailPlan | None:
     """
-    Gera thumbnail automática usando timestamp sugerido + logo + texto inferior.
+    Resolve cores, fonte, texto, logo/modelo da brand e o instante do frame de um corte.
     target_brand: quando fornecido (roteamento por theme), usa logo e cores dessa brand.
-    Retorna True se gerou, False se não conseguiu.
+    Retorna None quando não há vídeo de onde tirar o frame.
     """
-    try:
-        analysis = corte.analysis
-        # Prioridade: target_brand (roteamento por tema) > analysis.brand
-        # Quando target_brand existe, usar APENAS ela (nunca analysis) para evitar logo/cores da 1ª brand
-        brand = target_brand or getattr(analysis, "brand", None)
-
-        def _val(obj, attr, fallback):
-            v = (getattr(obj, attr, None) or "").strip()
-            return v if v else fallback
-
-        if target_brand:
-            selected_font = _val(target_brand, "thumbnail_font", "impact").lower()
-            band_color = _hex_to_rgb(_val(target_brand, "thumbnail_band_color", "#E12E20"), (225, 46, 32))
-            text_color = _hex_to_rgb(_val(target_brand, "thumbnail_text_color", "#0A0A0A"), (10, 10, 10))
-            stroke_color = _hex_to_rgb(_val(target_brand, "thumbnail_effect_color", "#FFEBDC"), (255, 235, 220))
-        else:
-            selected_font = (
-                _val(brand, "thumbnail_font", "") or _val(analysis, "thumbnail_font", "impact")
-            ).strip().lower()
-            band_color = _hex_to_rgb(
-                _val(brand, "thumbnail_band_color", "") or _val(analysis, "thumbnail_band_color", "#E12E20"),
-                (225, 46, 32),
-            )
-            text_color = _hex_to_rgb(
-                _val(brand, "thumbnail_text_color", "") or _val(analysis, "thumbnail_text_color", "#0A0A0A"),
-                (10, 10, 10),
-            )
-            stroke_color = _hex_to_rgb(
-                _val(brand, "thumbnail_effect_color", "") or _val(analysis, "thumbnail_stroke_color", "#FFEBDC"),
-                (255, 235, 220),
-            )
-        if selected_font not in {"anton", "bebas", "montserrat", "impact"}:
-            selected_font = "impact"
-        sug_start_sec = tc_to_seconds(corte.suggestion.start_tc or "")
-        sug_end_sec = tc_to_seconds(corte.suggestion.end_tc or "")
-        # True = ficheiro é só o corte (timeline 0..duração); False = vídeo fonte completo (timestamps absolutos).
-        timeline_is_cut_only = False
-        # Para Shorts (vertical): extrair frame do corte já extraído (formato 9:16, ideal para YouTube Shorts)
-        # Para Longs (horizontal): corte final (ex.: concat em cortes prontos sem vídeo na análise) ou vídeo original
-        is_short = (getattr(corte, "format", "") or "").lower() == "vertical"
-        raw_early = corte.suggestion.raw_data or {}
-        if is_short and corte.file:
-            try:
-                corte_path = Path(corte.file.path)
-                if corte_path.exists():
-                    source_video_path = corte_path
-                    timeline_is_cut_only = True
-                    # Cortes prontos: frame nos primeiros ~5s (padrão 2s); fallback 1s
-                    ts_sec = float(raw_early.get("thumbnail_frame_sec", 1.0))
-                    if ts_sec < 0:
-                        ts_sec = 1.0
-                else:
-                    source_video_path = None
-                    ts_sec = 0.0
-            except Exception:
+    analysis = corte.analysis
+    # Prioridade: target_brand (roteamento por tema) > analysis.brand
+    # Quando target_brand existe, usar APENAS ela (nunca analysis) para evitar logo/cores da 1ª brand
+    brand = target_brand or getattr(analysis, "brand", None)
+
+    def _val(obj, attr, fallback):
+        v = (getattr(obj, attr, None) or "").strip()
+        return v if v else fallback
+
+    if target_brand:
+        selected_font = _val(target_brand, "thumbnail_font", "impact").lower()
+        band_color = _hex_to_rgb(_val(target_brand, "thumbnail_band_color", "#E12E20"), (225, 46, 32))
+        text_color = _hex_to_rgb(_val(target_brand, "thumbnail_text_color", "#0A0A0A"), (10, 10, 10))
+        stroke_color = _hex_to_rgb(_val(target_brand, "thumbnail_effect_color", "#FFEBDC"), (255, 235, 220))
+    else:
+        selected_font = (
+            _val(brand, "thumbnail_font", "") or _val(analysis, "thumbnail_font", "impact")
+        ).strip().lower()
+        band_color = _hex_to_rgb(
+            _val(brand, "thumbnail_band_color", "") or _val(analysis, "thumbnail_band_color", "#E12E20"),
+            (225, 46, 32),
+        )
+        text_color = _hex_to_rgb(
+            _val(brand, "thumbnail_text_color", "") or _val(analysis, "thumbnail_text_color", "#0A0A0A"),
+            (10, 10, 10),
+        )
+        stroke_color = _hex_to_rgb(
+            _val(brand, "thumbnail_effect_color", "") or _val(analysis, "thumbnail_stroke_color", "#FFEBDC"),
+            (255, 235, 220),
+        )
+    if selected_font not in {"anton", "bebas", "montserrat", "impact"}:
+        selected_font = "impact"
+    sug_start_sec = tc_to_seconds(corte.suggestion.start_tc or "")
+    sug_end_sec = tc_to_seconds(corte.suggestion.end_tc or "")
+    timeline_is_cut_only = False
+    # Para Shorts (vertical): extrair frame do corte já extraído (formato 9:16, ideal para YouTube Shorts)
+    # Para Longs (horizontal): corte final (ex.: concat em cortes prontos sem vídeo na análise) ou vídeo original
+    is_short = (getattr(corte, "format", "") or "").lower() == "vertical"
+    raw_early = corte.suggestion.raw_data or {}
+    if is_short and corte.file:
+        try:
+            corte_path = Path(corte.file.path)
+            if corte_path.exists():
+                source_video_path = corte_path
+                timeline_is_cut_only = True
+                # Cortes prontos: frame nos primeiros ~5s (padrão 2s); fallback 1s
+                ts_sec = float(raw_early.get("thumbnail_frame_sec", 1.0))
+                if ts_sec < 0:
+                    ts_sec = 1.0
+            else:
                 source_video_path = None
-        elif not is_short and corte.file:
-            try:
-                corte_path = Path(corte.file.path)
-                if corte_path.exists():
-                    source_video_path = corte_path
-                    timeline_is_cut_only = True
-                    raw_h = corte.suggestion.raw_data or {}
-                    ts_raw = raw_h.get("thumbnail_moment_timestamp") or raw_h.get("start_timestamp") or corte.suggestion.start_tc
-                    ts_sec = tc_to_seconds(str(ts_raw))
-                    start_sec = tc_to_seconds(corte.suggestion.start_tc or "")
-                    end_sec = tc_to_seconds(corte.suggestion.end_tc or "")
-                    if end_sec > start_sec and (ts_sec < start_sec or ts_sec > end_sec):
-                        ts_sec = start_sec + ((end_sec - start_sec) / 2.0)
-                    # Ficheiro extraído começa em 0:00; a LLM devolve tempo absoluto no vídeo original.
-                    # Sem isto, o seek aponta para além da duração (ex. 938 s num MP4 de ~12 min) e não há frame.png.
-                    if end_sec > start_sec:
-                        ts_sec = ts_sec - start_sec
-                        cut_len = end_sec - start_sec
-                        ts_sec = max(0.0, min(ts_sec, cut_len - 0.25))
-                    else:
-                        ts_sec = 0.0
+                ts_sec = 0.0
+        except Exception:
+            source_video_path = None
+    elif not is_short and corte.file:
+        try:
+            corte_path = Path(corte.file.path)
+            if corte_path.exists():
+                source_video_path = corte_path
+                timeline_is_cut_only = True
+                raw_h = corte.suggestion.raw_data or {}
+                ts_raw = raw_h.get("thumbnail_moment_timestamp") or raw_h.get("start_timestamp") or corte.suggestion.start_tc
+                ts_sec = tc_to_seconds(str(ts_raw))
+                start_sec = tc_to_seconds(corte.suggestion.start_tc or "")
+                end_sec = tc_to_seconds(corte.suggestion.end_tc or "")
+                if end_sec > start_sec and (ts_sec < start_sec or ts_sec > end_sec):
+                    ts_sec = start_sec + ((end_sec - start_sec) / 2.0)
+                # Ficheiro extraído começa em 0:00; a LLM devolve tempo absoluto no vídeo original.
+                # Sem isto, o seek aponta para além da duração (ex. 938 s num MP4 de ~12 min) e não há frame.png.
+                if end_sec > start_sec:
+                    ts_sec = ts_sec - start_sec
+                    cut_len = end_sec - start_sec
+                    ts_sec = max(0.0, min(ts_sec, cut_len - 0.25))
                 else:
-                    source_video_path = None
-            except Exception:
+                    ts_sec = 0.0
+            else:
                 source_video_path = None
-        else:
+        except Exception:
             source_video_path = None
-        if not source_video_path:
-            source_video = analysis.video_file
-            if not source_video:
-                return False
-            source_video_path = Path(source_video.path)
-            if not source_video_path.exists():
-                return False
-            raw = corte.suggestion.raw_data or {}
-            ts_raw = raw.get("thumbnail_moment_timestamp") or raw.get("start_timestamp") or corte.suggestion.start_tc
-            ts_sec = tc_to_seconds(str(ts_raw))
-            start_sec = sug_start_sec
-            end_sec = sug_end_sec
-            if end_sec > start_sec and (ts_sec < start_sec or ts_sec > end_sec):
-                ts_sec = start_sec + ((end_sec - start_sec) / 2.0)
-
-        def _thumb_fallback_seek_sec() -> float:
-            """~5 s dentro do corte: relativo ao ficheiro se for só o corte; senão absoluto no vídeo fonte."""
-            try:
-                dur = ffprobe_duration(source_video_path)
-            except Exception:
-                dur = 0.0
-            if timeline_is_cut_only:
-                return min(THUMB_FALLBACK_SEC_IN_CUT, max(0.0, dur - 0.25))
-            if sug_end_sec > sug_start_sec:
-                cut_len = sug_end_sec - sug_start_sec
-                return sug_start_sec + min(THUMB_FALLBACK_SEC_IN_CUT, max(0.0, cut_len - 0.25))
-            return min(THUMB_FALLBACK_SEC_IN_CUT, max(0.0, dur - 0.25))
-
+    else:
+        source_video_path = None
+    if not source_video_path:
+        source_video = analysis.video_file
+        if not source_video:
+            return None
+        source_video_path = Path(source_video.path)
+        if not source_video_path.exists():
+            return None
         raw = corte.suggestion.raw_data or {}
-        if is_short:
+        ts_raw = raw.get("thumbnail_moment_timestamp") or raw.get("start_timestamp") or corte.suggestion.start_tc
+        ts_sec = tc_to_seconds(str(ts_raw))
+        start_sec = sug_start_sec
+        end_sec = sug_end_sec
+        if end_sec > start_sec and (ts_sec < start_sec or ts_sec > end_sec):
+            ts_sec = start_sec + ((end_sec - start_sec) / 2.0)
+
+    raw = corte.suggestion.raw_data or {}
+    if is_short:
+        thumb_text = (raw.get("thumbnail_text") or "").strip()
+        if not thumb_text:
+            fallback = (raw.get("suggested_title") or corte.suggestion.title or "").strip()
+            thumb_text = " ".join(fallback.split()[:4]).upper()[:28] or "DESTAQUE"
+        thumb_text = thumb_text.upper()
+    else:
+        # Vídeo longo (16:9): texto da capa = título completo, na faixa inferior (~20%).
+        thumb_text = (
+            (raw.get("suggested_title") or raw.get("title_suggestion") or corte.suggestion.title or "")
+            .strip()
+        )
+        if not thumb_text:
             thumb_text = (raw.get("thumbnail_text") or "").strip()
-            if not thumb_text:
-                fallback = (raw.get("suggested_title") or corte.suggestion.title or "").strip()
-                thumb_text = " ".join(fallback.split()[:4]).upper()[:28] or "DESTAQUE"
-            thumb_text = thumb_text.upper()
-        else:
-            # Vídeo longo (16:9): texto da capa = título completo, na faixa inferior (~20%).
-            thumb_text = (
-                (raw.get("suggested_title") or raw.get("title_suggestion") or corte.suggestion.title or "")
-                .strip()
-            )
-            if not thumb_text:
-                thumb_text = (raw.get("thumbnail_text") or "").strip()
-            if not thumb_text:
-                thumb_text = "DESTAQUE"
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmpdir_path = Path(tmpdir)
-            frame_path = tmpdir_path / "frame.png"
-            out_path = tmpdir_path / "thumb_final.jpg"
-            _extract_frame_with_fallback(
-                source_video_path,
-                frame_path,
-                ts_sec,
-                _thumb_fallback_seek_sec(),
-            )
-
-            img = Image.open(frame_path).convert("RGB")
+        if not thumb_text:
+            thumb_text = "DESTAQUE"
+
+    def _asset_path(asset_type: str) -> str | None:
+        if not brand or not getattr(brand, "id", None):
+            return None
+        asset = BrandAsset.objects.filter(brand=brand, asset_type=asset_type).order_by("id").first()
+        return asset.file.path if asset and asset.file else None
+
+    # Logo topo-esquerda (se houver) e modelo de capa (Thumb Shorts ou Thumb Longs) - usa target_brand ou analysis.brand
+    style = ThumbnailStyle(
+        is_short=is_short,
+        text=thumb_text,
+        font=selected_font,
+        band_color=band_color,
+        text_color=text_color,
+        stroke_color=stroke_color,
+        logo_path=_asset_path("LOGO"),
+        template_path=_asset_path("THUMB_SHORT" if is_short else "THUMB_LONG"),
+    )
+    return ThumbnailPlan(
+        corte=corte,
+        style=style,
+        source_path=source_video_path,
+        ts_sec=ts_sec,
+        timeline_is_cut_only=timeline_is_cut_only,
+        sug_start_sec=sug_start_sec,
+        sug_end_sec=sug_end_sec,
+    )
+
+
+def compose_thumbnail(style: ThumbnailStyle, frame: np.ndarray) -> bytes:
+    """Compõe a capa (recorte 9:16, logo, modelo/faixa, texto) sobre o frame e devolve o JPEG."""
+    img = Image.fromarray(frame).convert("RGB")
+    w, h = img.size
+    # Shorts (9:16): se o frame for horizontal (16:9), recorta o centro para 9:16
+    if style.is_short and w > h:
+        new_w = int(h * 9 / 16)
+        if new_w > 0 and new_w < w:
+            left = (w - new_w) // 2
+            img = img.crop((left, 0, left + new_w, h))
             w, h = img.size
-            # Shorts (9:16): se o frame for horizontal (16:9), recorta o centro para 9:16
-            if is_short and w > h:
-                new_w = int(h * 9 / 16)
-                if new_w > 0 and new_w < w:
-                    left = (w - new_w) // 2
-                    img = img.crop((left, 0, left + new_w, h))
-                    w, h = img.size
-            draw = ImageDraw.Draw(img)
+    draw = ImageDraw.Draw(img)
 
-            # Logo topo-esquerda (se houver) - usa target_brand ou analysis.brand
-            logo_asset = (
-                BrandAsset.objects.filter(brand=brand, asset_type="LOGO")
-                .order_by("id")
-                .first()
-                if brand and getattr(brand, "id", None)
-                else None
-            )
-            margin = max(16, int(w * 0.02))
-            if logo_asset and logo_asset.file:
-                try:
-                    logo = Image.open(logo_asset.file.path).convert("RGBA")
-                    max_logo_w = int(w * 0.22)
-                    max_logo_h = int(h * 0.22)
-                    logo.thumbnail((max_logo_w, max_logo_h), Image.Resampling.LANCZOS)
-                    img.paste(logo, (margin, margin), logo)
-                except Exception:
-                    pass
-
-            # Modelo de capa (Thumb Shorts ou Thumb Longs) - sobrepõe ao frame
-            thumb_asset_type = "THUMB_SHORT" if is_short else "THUMB_LONG"
-            thumb_asset = (
-                BrandAsset.objects.filter(brand=brand, asset_type=thumb_asset_type)
-                .order_by("id")
-                .first()
-                if brand and getattr(brand, "id", None)
-                else None
-            )
-            has_thumb_model = thumb_asset and thumb_asset.file
-
-            rect_h = max(1, int(h * 0.20))
-            rect_w = w
-            rect_x1 = 0
-            rect_y1 = h - rect_h
-            rect_x2 = rect_x1 + rect_w
-            rect_y2 = h
-
-            if has_thumb_model:
-                try:
-                    overlay_img = Image.open(thumb_asset.file.path).convert("RGBA")
-                    overlay_resized = overlay_img.resize((w, h), Image.Resampling.LANCZOS)
-                    img_rgba = img.convert("RGBA")
-                    img = Image.alpha_composite(img_rgba, overlay_resized).convert("RGB")
-                    draw = ImageDraw.Draw(img)
-                except Exception as e:
-                    logger.warning("[THUMB] Failed to apply template %s: %s", thumb_asset_type, e)
-                    has_thumb_model = False
-
-            if not has_thumb_model:
-                # Fixed bottom band at 20% of height (fallback when no template asset)
-                draw.rectangle([(rect_x1, rect_y1), (rect_x2, rect_y2)], fill=band_color)
-
-            # Texto totalmente contido na faixa (quebra + redução de fonte).
-            text_padding_x = max(20, int(w * 0.03))
-            text_padding_y = max(12, int(rect_h * 0.12))
-            text_max_width = max(120, w - (2 * text_padding_x))
-            text_max_height = max(24, rect_h - (2 * text_padding_y))
-            if is_short:
-                initial_font_size = max(26, int(w * 0.065))
-                min_font_size = max(14, int(w * 0.022))
-            else:
-                # Título longo: começar um pouco menor e permitir reduzir mais para caber na faixa.
-                initial_font_size = max(22, min(int(w * 0.05), int(rect_h * 0.38)))
-                min_font_size = max(10, int(w * 0.014))
-            font, lines, line_spacing = _fit_text_into_box(
-                draw=draw,
-                text=thumb_text,
-                preferred_font=selected_font,
-                max_width=text_max_width,
-                max_height=text_max_height,
-                initial_font_size=initial_font_size,
-                min_font_size=min_font_size,
+    margin = max(16, int(w * 0.02))
+    if style.logo_path:
+        try:
+            logo = scaled_rgba(style.logo_path, (int(w * 0.22), int(h * 0.22)), fit=True)
+            img.paste(logo, (margin, margin), logo)
+        except Exception:
+            pass
+
+    # Modelo de capa (Thumb Shorts ou Thumb Longs) - sobrepõe ao frame
+    has_thumb_model = bool(style.template_path)
+
+    rect_h = max(1, int(h * 0.20))
+    rect_w = w
+    rect_x1 = 0
+    rect_y1 = h - rect_h
+    rect_x2 = rect_x1 + rect_w
+    rect_y2 = h
+
+    if has_thumb_model:
+        try:
+            overlay_resized = scaled_rgba(style.template_path, (w, h), fit=False)
+            img_rgba = img.convert("RGBA")
+            img = Image.alpha_composite(img_rgba, overlay_resized).convert("RGB")
+            draw = ImageDraw.Draw(img)
+        except Exception as e:
+            logger.warning(
+                "[THUMB] Failed to apply template %s: %s", "THUMB_SHORT" if style.is_short else "THUMB_LONG", e
             )
+            has_thumb_model = False
+
+    if not has_thumb_model:
+        # Fixed bottom band at 20% of height (fallback when no template asset)
+        draw.rectangle([(rect_x1, rect_y1), (rect_x2, rect_y2)], fill=style.band_color)
+
+    # Texto totalmente contido na faixa (quebra + redução de fonte).
+    text_padding_x = max(20, int(w * 0.03))
+    text_padding_y = max(12, int(rect_h * 0.12))
+    text_max_width = max(120, w - (2 * text_padding_x))
+    text_max_height = max(24, rect_h - (2 * text_padding_y))
+    if style.is_short:
+        initial_font_size = max(26, int(w * 0.065))
+        min_font_size = max(14, int(w * 0.022))
+    else:
+        # Título longo: começar um pouco menor e permitir reduzir mais para caber na faixa.
+        initial_font_size = max(22, min(int(w * 0.05), int(rect_h * 0.38)))
+        min_font_size = max(10, int(w * 0.014))
+    font, lines, line_spacing = _fit_text_into_box(
+        draw=draw,
+        text=style.text,
+        preferred_font=style.font,
+        max_width=text_max_width,
+        max_height=text_max_height,
+        initial_font_size=initial_font_size,
+        min_font_size=min_font_size,
+    )
+
+    line_heights = []
+    for ln in lines:
+        bbox = draw.textbbox((0, 0), ln, font=font)
+        line_heights.append(max(1, bbox[3] - bbox[1]))
+    text_block_h = sum(line_heights) + (len(lines) - 1) * line_spacing
+    cursor_y = rect_y1 + max(0, (rect_h - text_block_h) // 2)
+    stroke_width = max(1, int(getattr(font, "size", min_font_size) * 0.08))
+    for ln, ln_h in zip(lines, line_heights, strict=True):
+        ln_w = _text_width(draw, ln, font)
+        tx = (w - ln_w) // 2
+        draw.text(
+            (tx, cursor_y),
+            ln,
+            font=font,
+            fill=style.text_color,
+            stroke_width=stroke_width,
+            stroke_fill=style.stroke_color,
+        )
+        cursor_y += ln_h + line_spacing
+
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=92, optimize=True)
+    # YouTube limita thumbnail a 2MB; reduz qualidade se necessário.
+    if buf.tell() > YT_THUMB_MAX_BYTES:
+        for q in (85, 75, 65):
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=q, optimize=True)
+            if buf.tell() <= YT_THUMB_MAX_BYTES:
+                break
+    return buf.getvalue()
 
-            line_heights = []
-            for ln in lines:
-                bbox = draw.textbbox((0, 0), ln, font=font)
-                line_heights.append(max(1, bbox[3] - bbox[1]))
-            text_block_h = sum(line_heights) + (len(lines) - 1) * line_spacing
-            cursor_y = rect_y1 + max(0, (rect_h - text_block_h) // 2)
-            stroke_width = max(1, int(getattr(font, "size", min_font_size) * 0.08))
-            for ln, ln_h in zip(lines, line_heights, strict=True):
-                ln_w = _text_width(draw, ln, font)
-                tx = (w - ln_w) // 2
-                draw.text(
-                    (tx, cursor_y),
-                    ln,
-                    font=font,
-                    fill=text_color,
-                    stroke_width=stroke_width,
-                    stroke_fill=stroke_color,
-                )
-                cursor_y += ln_h + line_spacing
-
-            img.save(out_path, format="JPEG", quality=92, optimize=True)
-            # YouTube limita thumbnail a 2MB; reduz qualidade se necessário.
-            YT_THUMB_MAX_BYTES = 2 * 1024 * 1024
-            if out_path.stat().st_size > YT_THUMB_MAX_BYTES:
-                for q in (85, 75, 65):
-                    img.save(out_path, format="JPEG", quality=q, optimize=True)
-                    if out_path.stat().st_size <= YT_THUMB_MAX_BYTES:
-                        break
-
-            # Substitui thumbnail antiga, se existir.
-            try:
-                if corte.thumbnail:
-                    corte.thumbnail.delete(save=False)
-            except Exception:
-                pass
-            with open(out_path, "rb") as f:
-                corte.thumbnail.save(f"autocut_{corte.id}.jpg", File(f), save=True)
-            return True
+
+def _compose_or_none(style: ThumbnailStyle, frame: np.ndarray) -> bytes | None:
+    try:
+        return compose_thumbnail(style, frame)
     except Exception as e:
-        logger.warning("[THUMB] Failed to generate thumbnail for cut %s: %s", getattr(corte, "id", "?"), e)
-        return False
+        logger.warning("[THUMB] Falha ao compor capa: %s", e)
+        return None
+
+
+def _thumbnail_workers() -> int:
+    return max(1, int(getattr(settings, "THUMBNAIL_WORKERS", 2)))
+
+
+def _compose_many(jobs: list[tuple[ThumbnailStyle, np.ndarray]]) -> list[bytes | None]:
+    """
+    Composição (Pillow, CPU) em pool de processos fork: o pickling de ThumbnailStyle + array é
+    barato perto do trabalho de fonte/alpha/JPEG. Sem fork disponível (ou worker daemônico que
+    não pode ter filhos), compõe no próprio processo.
+    """
+    workers = min(_thumbnail_workers(), len(jobs))
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        try:
+            ctx = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(_compose_or_none, style, frame) for style, frame in jobs]
+                return [f.result() for f in futures]
+        except (AssertionError, OSError, BrokenProcessPool) as e:
+            logger.warning("[THUMB] Pool de processos indisponível (%s); compondo no processo atual.", e)
+    return [_compose_or_none(style, frame) for style, frame in jobs]
+
+
+def _save_thumbnail(corte, data: bytes) -> None:
+    # Substitui thumbnail antiga, se existir.
+    try:
+        if corte.thumbnail:
+            corte.thumbnail.delete(save=False)
+    except Exception:
+        pass
+    corte.thumbnail.save(f"autocut_{corte.id}.jpg", ContentFile(data), save=True)
+
+
+def _extract_plan_frames(plans: list[ThumbnailPlan | None], timestamps: list[float | None]) -> list[np.ndarray | None]:
+    """Um extract_frames por vídeo fonte, com todos os timestamps daquela fonte."""
+    frames: list[np.ndarray | None] = [None] * len(plans)
+    by_source: dict[Path, list[int]] = {}
+    for i, plan in enumerate(plans):
+        if plan is not None and timestamps[i] is not None:
+            by_source.setdefault(plan.source_path, []).append(i)
+    for source_path, indexes in by_source.items():
+        try:
+            got = extract_frames(source_path, [timestamps[i] for i in indexes])
+        except Exception as e:
+            logger.warning("[THUMB] Extração de frames falhou em %s: %s", source_path.name, e)
+            continue
+        for i, frame in zip(indexes, got, strict=True):
+            frames[i] = frame
+    return frames
+
+
+def generate_auto_thumbnails(items, *, source_video: Path | None = None) -> list[bool]:
+    """
+    Gera as capas de vários cortes de uma vez. ``items``: pares (corte, target_brand).
+    Frames de uma mesma fonte saem de um único processo FFmpeg (mais um para os fallbacks);
+    a composição roda em até THUMBNAIL_WORKERS processos; o salvamento fica no processo atual.
+    source_video: vídeo do qual os cortes são trims simples (extract_corte); os frames são
+    lidos dele com timestamp absoluto, em vez de um processo por arquivo de corte.
+    Retorna, na ordem de ``items``, True para cada capa gerada.
+    """
+    items = list(items)
+    plans: list[ThumbnailPlan | None] = []
+    for corte, target_brand in items:
+        try:
+            plan = plan_auto_thumbnail(corte, target_brand=target_brand)
+        except Exception as e:
+            logger.warning("[THUMB] Failed to generate thumbnail for cut %s: %s", getattr(corte, "id", "?"), e)
+            plan = None
+        if plan is not None and source_video is not None:
+            plan = plan.on_source(source_video)
+        plans.append(plan)
+
+    frames = _extract_plan_frames(plans, [p.ts_sec if p else None for p in plans])
+    fallback_ts: list[float | None] = [None] * len(plans)
+    for i, plan in enumerate(plans):
+        if plan is not None and frames[i] is None:
+            fallback_ts[i] = plan.fallback_sec()
+            logger.warning(
+                "[THUMB] Frame em %.2fs falhou (cut %s); a usar fallback %.2fs",
+                plan.ts_sec,
+                getattr(plan.corte, "id", "?"),
+                fallback_ts[i],
+            )
+    if any(ts is not None for ts in fallback_ts):
+        for i, frame in enumerate(_extract_plan_frames(plans, fallback_ts)):
+            if frame is not None:
+                frames[i] = frame
+
+    ready = [i for i, frame in enumerate(frames) if frame is not None]
+    composed = _compose_many([(plans[i].style, frames[i]) for i in ready])
+    results = [False] * len(items)
+    for i, data in zip(ready, composed, strict=True):
+        corte = plans[i].corte
+        if data is None:
+            continue
+        try:
+            _save_thumbnail(corte, data)
+            results[i] = True
+        except Exception as e:
+            logger.warning("[THUMB] Failed to generate thumbnail for cut %s: %s", getattr(corte, "id", "?"), e)
+    for i, plan in enumerate(plans):
+        if plan is not None and frames[i] is None:
+            logger.warning("[THUMB] Failed to generate thumbnail for cut %s: no frame", getattr(plan.corte, "id", "?"))
+    return results
+
+
+def generate_auto_thumbnail(corte, target_brand=None) -> bool:
+    """
+    Gera thumbnail automática usando timestamp sugerido + logo + texto inferior.
+    target_brand: quando fornecido (roteamento por theme), usa logo e cores dessa brand.
+    Retorna True se gerou, False se não conseguiu.
+    """
+    return generate_auto_thumbnails([(corte, target_brand)])[0]
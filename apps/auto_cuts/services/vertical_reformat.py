@@ -8,14 +8,17 @@ Two modes:
 Title and extra text: rendered with Pillow for colored emojis (FFmpeg drawtext is monochrome only).
 """
 
+import io
 import logging
 import os
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 
 from django.conf import settings
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
+from apps.auto_cuts.services.render_cache import cached_png, load_font, render_key
 from apps.jobs.services.ffmpeg import (
     audio_encode_args,
     common_mp4_flags,
@@ -53,10 +56,11 @@ def _is_emoji_char(c: str) -> bool:
     return False
 
 
-def _get_text_emoji_runs(s: str) -> list[tuple[str, bool]]:
-    """Split text into runs (text, emoji). Returns [(run, is_emoji), ...]."""
+@lru_cache(maxsize=256)
+def _get_text_emoji_runs(s: str) -> tuple[tuple[str, bool], ...]:
+    """Split text into runs (text, emoji). Returns ((run, is_emoji), ...)."""
     if not s:
-        return []
+        return ()
     runs = []
     current = []
     current_is_emoji = None
@@ -70,7 +74,7 @@ def _get_text_emoji_runs(s: str) -> list[tuple[str, bool]]:
         current.append(c)
     if current:
         runs.append(("".join(current), current_is_emoji))
-    return runs
+    return tuple(runs)
 
 
 def _hex_to_pil_color(hex_color: str) -> tuple[int, int, int]:
@@ -81,6 +85,7 @@ def _hex_to_pil_color(hex_color: str) -> tuple[int, int, int]:
     return (255, 255, 255)
 
 
+@lru_cache(maxsize=1)
 def _get_emoji_font_path() -> Path | None:
     """Path to colored emoji font. Windows: Segoe UI Emoji."""
     if os.name == "nt":
@@ -97,6 +102,7 @@ def _get_emoji_font_path() -> Path | None:
     return None
 
 
+@lru_cache(maxsize=1)
 def _get_text_font_path() -> Path | None:
     """Path to regular text font."""
     if os.name == "nt":
@@ -121,6 +127,7 @@ def _render_text_overlay_pillow(
     """
     Render title and text to PNG with colored emojis (Pillow).
     Returns True if generated; False to fall back to drawtext.
+    The PNG is cached by content and style, so cuts sharing them reuse the same bytes.
     """
     emoji_font_path = _get_emoji_font_path()
     text_font_path = _get_text_font_path()
@@ -128,14 +135,61 @@ def _render_text_overlay_pillow(
         logger.warning("Colored emoji fonts not found; using drawtext.")
         return False
 
+    key = render_key(
+        kind="vertical_text_overlay",
+        size=(OUTPUT_W, OUTPUT_H),
+        title=title,
+        custom_text=custom_text,
+        y_title=y_title,
+        y_text=y_text,
+        font_size_title=font_size_title,
+        font_size_text=font_size_text,
+        title_color=title_color,
+        text_color=text_color,
+        fonts=(str(emoji_font_path), str(text_font_path)),
+    )
+    data = cached_png(
+        key,
+        lambda: _draw_text_overlay_png(
+            emoji_font_path,
+            text_font_path,
+            title,
+            custom_text,
+            y_title,
+            y_text,
+            font_size_title,
+            font_size_text,
+            title_color,
+            text_color,
+        ),
+    )
+    if data is None:
+        return False
+    output_path.write_bytes(data)
+    return True
+
+
+def _draw_text_overlay_png(
+    emoji_font_path: Path,
+    text_font_path: Path,
+    title: str,
+    custom_text: str,
+    y_title: int,
+    y_text: int,
+    font_size_title: int,
+    font_size_text: int,
+    title_color: str,
+    text_color: str,
+) -> bytes | None:
+    """Draw the transparent 1080x1920 overlay and return it as PNG bytes (None if fonts fail)."""
     try:
-        emoji_font = ImageFont.truetype(str(emoji_font_path), font_size_title)
-        emoji_font_small = ImageFont.truetype(str(emoji_font_path), font_size_text)
-        text_font = ImageFont.truetype(str(text_font_path), font_size_title)
-        text_font_small = ImageFont.truetype(str(text_font_path), font_size_text)
+        emoji_font = load_font(str(emoji_font_path), font_size_title)
+        emoji_font_small = load_font(str(emoji_font_path), font_size_text)
+        text_font = load_font(str(text_font_path), font_size_title)
+        text_font_small = load_font(str(text_font_path), font_size_text)
     except Exception as e:
         logger.warning("Failed to load fonts: %s", e)
-        return False
+        return None
 
     img = Image.new("RGBA", (OUTPUT_W, OUTPUT_H), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
@@ -169,8 +223,9 @@ def _render_text_overlay_pillow(
         y_custom = y_text if (title and title.strip()) else y_title
         _draw_text_line(custom_text.strip(), y_custom, font_size_text, txc, is_title=False)
 
-    img.save(output_path, "PNG")
-    return True
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
 
 
 def _hex_to_ffmpeg_color(hex_color: str) -> str:
@@ -410,6 +465,6 @@ def reformat_video_vertical(
                 str(output_path),
             ]
 
-        res = run_cmd(cmd)
+        res = run_cmd(cmd, operation="vertical_reformat")
         if not res.ok:
             raise RuntimeError(f"vertical reformat failed: {res.stderr}\nfilter_complex={filter_complex}")
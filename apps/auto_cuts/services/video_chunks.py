@@ -173,7 +173,7 @@ def extract_audio_chunk(
     an explicit mono ``pan`` keeps the graph stable. Opus/other codecs are decoded
     normally to PCM.
     """
-    import subprocess
+    from apps.jobs.services.ffmpeg import run_cmd
 
     # -ss before -i: fast input seek (long sources). No discardcorrupt/ignore_err here:
     # dropping AAC packets can desync the decoder; tolerating decode errors can yield
@@ -195,8 +195,8 @@ def extract_audio_chunk(
         "-f", "wav",
         str(output_path),
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
+    result = run_cmd(cmd, operation="extract_audio_chunk", total_s=duration_sec)
+    if not result.ok:
         raise RuntimeError(f"FFmpeg extract failed: {result.stderr}")
 
 
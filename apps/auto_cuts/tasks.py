@@ -4,6 +4,7 @@ import logging
 import os
 import shutil
 import tempfile
+from functools import partial
 from pathlib import Path
 
 from celery import shared_task
@@ -14,10 +15,12 @@ from django.db.utils import DatabaseError
 from django.utils import timezone
 
 from apps.auto_cuts.services.grok import (
+    GROK_OPERATION_READY_CUT_METADATA,
     analyze_chunks_in_one_request,
     analyze_ready_cut_metadata,
     analyze_ready_cuts_batch_titles_from_transcripts,
 )
+from apps.auto_cuts.services.llm_executor import run_llm_calls
 from apps.auto_cuts.services.transcript import (
     chunk_transcript,
     segments_to_transcript_with_timestamps,
@@ -43,7 +46,12 @@ from apps.jobs.services.ffmpeg import (
     normalize_video_to_canvas,
     seconds_to_tc,
 )
-from apps.jobs.services.subtitles import burn_subtitles, generate_subtitles, segments_to_srt
+from apps.jobs.services.subtitles import (
+    burn_subtitles,
+    generate_subtitles,
+    generate_subtitles_batch,
+    segments_to_srt,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -611,7 +619,7 @@ def _process_ready_cuts_batch_flow(analysis_id: int) -> None:
         AutoCutReadyChunk,
         AutoCutSuggestion,
     )
-    from apps.auto_cuts.services.thumbnail import generate_auto_thumbnail
+    from apps.auto_cuts.services.thumbnail import generate_auto_thumbnails
 
     analysis = AutoCutAnalysis.objects.filter(id=analysis_id).first()
     if not analysis:
@@ -652,20 +660,24 @@ def _process_ready_cuts_batch_flow(analysis_id: int) -> None:
             analysis.error = f"Arquivo ausente no chunk {i + 1}."
             analysis.save(update_fields=["status", "error"])
             return
-        dur = ffprobe_duration(vp)
-        ch.duration_seconds = dur
-        to_update = ["duration_seconds"]
-        if transcribe:
-            analysis.progress_message = f"Transcrevendo vídeo {i + 1}/{len(chunks)}..."
-            analysis.progress = 8 + int(35 * (i + 1) / max(len(chunks), 1))
-            analysis.save(update_fields=["progress_message", "progress"])
-            segs = generate_subtitles(vp, language=transcript_lang)
-            if not segs:
-                segs = []
-            ch.transcript_segments = segs
+        ch.duration_seconds = ffprobe_duration(vp)
+        ch.save(update_fields=["duration_seconds"])
+
+    if transcribe:
+        # Um carregamento do modelo e inferência em lote entre os cortes (janelas VAD de todos
+        # os arquivos no mesmo batch); segmentos voltam por corte.
+        analysis.progress_message = f"Transcrevendo {len(chunks)} vídeos em lote..."
+        analysis.progress = 10
+        analysis.save(update_fields=["progress_message", "progress"])
+        segs_by_chunk = generate_subtitles_batch(
+            [Path(ch.file.path) for ch in chunks], language=transcript_lang
+        )
+        for ch, segs in zip(chunks, segs_by_chunk, strict=True):
+            ch.transcript_segments = segs or []
             ch.transcript = segments_to_transcript_with_timestamps(segs) if segs else ""
-            to_update += ["transcript_segments", "transcript"]
-        ch.save(update_fields=to_update)
+            ch.save(update_fields=["transcript_segments", "transcript"])
+        analysis.progress = 43
+        analysis.save(update_fields=["progress"])
 
     analysis.progress_message = (
         "Gerando títulos com IA..."
@@ -687,16 +699,27 @@ def _process_ready_cuts_batch_flow(analysis_id: int) -> None:
     else:
         title_by_index = _titles_for_ready_cuts_no_transcript(chunks, analysis)
 
-    for i in range(len(chunks)):
-        if str(i) in title_by_index and (title_by_index[str(i)] or "").strip():
-            continue
-        ch = chunks[i]
-        if transcribe and (ch.transcript or "").strip():
-            md = analyze_ready_cut_metadata(
-                ch.transcript or "",
-                float(ch.duration_seconds or 0),
+    missing = [
+        i for i in range(len(chunks)) if not (title_by_index.get(str(i)) or "").strip()
+    ]
+    # Fallback por corte em paralelo (limite por API key + backoff em 429); ordem preservada.
+    llm_indexes = [i for i in missing if transcribe and (chunks[i].transcript or "").strip()]
+    metadata = run_llm_calls(
+        [
+            partial(
+                analyze_ready_cut_metadata,
+                chunks[i].transcript or "",
+                float(chunks[i].duration_seconds or 0),
                 titles_language=titles_lang,
             )
+            for i in llm_indexes
+        ],
+        operation=GROK_OPERATION_READY_CUT_METADATA,
+    )
+    metadata_by_index = dict(zip(llm_indexes, metadata, strict=True))
+    for i in missing:
+        if i in metadata_by_index:
+            md = metadata_by_index[i]
             title_by_index[str(i)] = (md.get("title") or f"Vídeo {i + 1}")[:200]
         else:
             base = _base_name_for_ready_cuts_no_transcript(chunks, analysis)
@@ -705,6 +728,7 @@ def _process_ready_cuts_batch_flow(analysis_id: int) -> None:
     AutoCutSuggestion.objects.filter(analysis=analysis).delete()
 
     rank_counter = 1
+    thumb_items = []
 
     def _thumb_text_from_title(title: str) -> str:
         words = (title or "").replace("\n", " ").split()
@@ -783,8 +807,7 @@ def _process_ready_cuts_batch_flow(analysis_id: int) -> None:
         )
         with open(long_path, "rb") as f:
             long_corte.file.save(long_path.name, File(f), save=True)
-        tb = _resolve_target_brand_for_suggestion(analysis, long_sug)
-        generate_auto_thumbnail(long_corte, target_brand=tb)
+        thumb_items.append((long_corte, _resolve_target_brand_for_suggestion(analysis, long_sug)))
 
     analysis.progress_message = "Criando cortes (shorts)..."
     analysis.progress = 72
@@ -839,9 +862,10 @@ def _process_ready_cuts_batch_flow(analysis_id: int) -> None:
         )
         with open(out_path, "rb") as f:
             corte.file.save(out_path.name, File(f), save=True)
-        tb = _resolve_target_brand_for_suggestion(analysis, sug)
-        generate_auto_thumbnail(corte, target_brand=tb)
+        thumb_items.append((corte, _resolve_target_brand_for_suggestion(analysis, sug)))
 
+    # Composição das capas em pool de processos (frames: um processo por arquivo de corte).
+    generate_auto_thumbnails(thumb_items)
     _queue_analysis_finalization(analysis)
     logger.info("[FLUXO] Ready cuts batch completed (analysis=%s, long=%s).", analysis_id, bool(create_long))
 
@@ -1163,7 +1187,7 @@ def analyze_auto_cuts_task(self, analysis_id: int) -> None:
         AutoCutSuggestion.objects.filter(analysis=analysis).delete()
         AutoCutCorte = __import__("apps.auto_cuts.models", fromlist=["AutoCutCorte"]).AutoCutCorte
         from apps.auto_cuts.services.extract import extract_corte
-        from apps.auto_cuts.services.thumbnail import generate_auto_thumbnail
+        from apps.auto_cuts.services.thumbnail import generate_auto_thumbnails
 
         video_path = Path(analysis.video_file.path)
         media_root = Path(settings.MEDIA_ROOT)
@@ -1390,6 +1414,7 @@ def analyze_auto_cuts_task(self, analysis_id: int) -> None:
         logger.info("[FLUXO] %d suggestions created. Starting video extraction...", len(suggestions_created))
         # 6. Extract video for each suggestion and create AutoCutCorte
         total_cortes = len(suggestions_created)
+        thumb_items = []
         for i, (sug, fmt) in enumerate(suggestions_created):
             analysis.progress_message = f"Extraindo corte {i + 1}/{total_cortes}..."
             analysis.progress = 85 + int(10 * (i + 1) / total_cortes)
@@ -1452,8 +1477,16 @@ def analyze_auto_cuts_task(self, analysis_id: int) -> None:
             )
             with open(out_path, "rb") as f:
                 corte.file.save(out_path.name, File(f), save=True)
-            target_brand = _resolve_target_brand_for_suggestion(analysis, sug)
-            generated_thumb = generate_auto_thumbnail(corte, target_brand=target_brand)
+            thumb_items.append((corte, _resolve_target_brand_for_suggestion(analysis, sug)))
+
+        # Capas em lote: todos os frames saem do vídeo fonte num só processo FFmpeg
+        # (cortes são trims de video_path) e a composição roda em pool de processos.
+        analysis.progress_message = "Gerando capas..."
+        if not _safe_save_analysis(analysis, ["progress_message"]):
+            logger.info("[FLUXO] Analysis %s deleted before thumbnails; aborting.", analysis_id)
+            return
+        thumbs = generate_auto_thumbnails(thumb_items, source_video=video_path)
+        for (corte, _tb), generated_thumb in zip(thumb_items, thumbs, strict=True):
             if generated_thumb:
                 logger.info("[FLUXO] Auto thumbnail generated for cut %s.", corte.id)
             else:
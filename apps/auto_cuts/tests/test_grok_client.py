@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.auto_cuts.services import grok
+
+
+def _response(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+@override_settings(GROK_RESPONSE_CACHE_TTL=60)
+class GrokClientReuseAndCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["grok"].clear()
+        grok._json_object_unsupported_models.clear()
+        grok._get_grok_client.cache_clear()
+
+    def test_client_is_reused_per_api_key(self):
+        self.assertIs(grok._get_grok_client("key-a"), grok._get_grok_client("key-a"))
+        self.assertIsNot(grok._get_grok_client("key-a"), grok._get_grok_client("key-b"))
+
+    def test_second_identical_call_is_served_from_cache(self):
+        with patch.object(grok, "_execute_grok_chat_completion", return_value=_response('{"ok": 1}')) as execute:
+            first = grok.call_grok_chat("system", "user", "test-key")
+            second = grok.call_grok_chat("system", "user", "test-key")
+            grok.call_grok_chat("system", "other user", "test-key")
+
+        self.assertEqual(first, second)
+        self.assertEqual(execute.call_count, 2)
+
+    def test_non_json_and_forgotten_responses_are_not_reused(self):
+        with patch.object(grok, "_execute_grok_chat_completion", return_value=_response("sem json")) as execute:
+            grok.call_grok_chat("system", "user", "test-key")
+            grok.call_grok_chat("system", "user", "test-key")
+        self.assertEqual(execute.call_count, 2)
+
+        with patch.object(grok, "_execute_grok_chat_completion", return_value=_response("{}")) as execute:
+            grok.call_grok_chat("system", "user", "test-key")
+            grok.forget_grok_response("system", "user")
+            grok.call_grok_chat("system", "user", "test-key")
+        self.assertEqual(execute.call_count, 2)
+
+    @override_settings(GROK_RESPONSE_CACHE_TTL=0)
+    def test_cache_disabled_by_ttl_zero(self):
+        with patch.object(grok, "_execute_grok_chat_completion", return_value=_response("{}")) as execute:
+            grok.call_grok_chat("system", "user", "test-key")
+            grok.call_grok_chat("system", "user", "test-key")
+        self.assertEqual(execute.call_count, 2)
+
+    def test_json_object_rejection_is_remembered_per_model(self):
+        def fake_execute(client, **kwargs):
+            if kwargs.get("response_format") is not None:
+                raise _BadRequest("response_format not supported")
+            return _response("{}")
+
+        with patch.object(grok, "_execute_grok_chat_completion", side_effect=fake_execute) as execute:
+            grok.call_grok_chat("system", "first", "test-key")
+            grok.call_grok_chat("system", "second", "test-key")
+
+        self.assertEqual(execute.call_count, 3)
+        self.assertNotIn("response_format", execute.call_args_list[2].kwargs)
+
+    def test_unrelated_bad_request_does_not_disable_json_object(self):
+        calls = []
+
+        def fake_execute(client, **kwargs):
+            calls.append(kwargs.get("response_format"))
+            if kwargs.get("response_format") is not None and len(calls) == 1:
+                raise _BadRequest("This model's maximum context length is 131072 tokens")
+            return _response("{}")
+
+        with patch.object(grok, "_execute_grok_chat_completion", side_effect=fake_execute):
+            grok.call_grok_chat("system", "huge", "test-key")
+            grok.call_grok_chat("system", "small", "test-key")
+
+        self.assertEqual(calls, [{"type": "json_object"}, None, {"type": "json_object"}])
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.auto_cuts.services import grok
+from apps.auto_cuts.services.llm_executor import _backoff_seconds, run_llm_calls
+
+
+class _RateLimited(Exception):
+    def __init__(self, retry_after: str | None = None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(
+            status_code=429,
+            headers={"retry-after": retry_after} if retry_after is not None else {},
+        )
+
+
+@patch.dict("os.environ", {"GROK_RATE_LIMIT_BACKOFF_SEC": "0", "GROK_RATE_LIMIT_MAX_RETRIES": "3"})
+class LlmExecutorTests(SimpleTestCase):
+    def test_results_keep_input_order_and_respect_in_flight_limit(self):
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def make(i: int):
+            def call():
+                with lock:
+                    state["in_flight"] += 1
+                    state["peak"] = max(state["peak"], state["in_flight"])
+                time.sleep(0.02 * (5 - i % 5))
+                with lock:
+                    state["in_flight"] -= 1
+                return i
+
+            return call
+
+        results = run_llm_calls([make(i) for i in range(10)], api_key="key-order", limit=3)
+
+        self.assertEqual(results, list(range(10)))
+        self.assertGreater(state["peak"], 1)
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_rate_limited_calls_are_retried(self):
+        attempts = {"n": 0}
+
+        def flaky():
+            attempts["n"] += 1
+            if attempts["n"] < 3:
+                raise _RateLimited()
+            return "ok"
+
+        self.assertEqual(run_llm_calls([flaky, lambda: "other"], api_key="key-retry"), ["ok", "other"])
+        self.assertEqual(attempts["n"], 3)
+
+    def test_first_error_in_input_order_is_raised_without_retry(self):
+        calls = {"n": 0}
+
+        def boom(msg: str):
+            def call():
+                calls["n"] += 1
+                raise ValueError(msg)
+
+            return call
+
+        def slow():
+            time.sleep(0.05)
+            return 1
+
+        with self.assertRaisesMessage(ValueError, "first"):
+            run_llm_calls([boom("first"), slow, boom("second")], api_key="key-errors", limit=2)
+        # "second" ainda não tinha começado: não é feita depois da primeira falha.
+        self.assertEqual(calls["n"], 1)
+
+    def test_pending_calls_are_not_made_after_a_failure(self):
+        made = {"n": 0}
+        lock = threading.Lock()
+
+        def ok():
+            with lock:
+                made["n"] += 1
+            time.sleep(0.02)
+            return 1
+
+        def boom():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            run_llm_calls([boom] + [ok] * 10, api_key="key-cancel", limit=2)
+        self.assertLess(made["n"], 3)
+
+    def test_retry_after_header_caps_backoff(self):
+        self.assertEqual(_backoff_seconds(0, _RateLimited(retry_after="1.5")), 1.5)
+
+    def test_call_grok_chat_does_not_retry_without_json_format_on_429(self):
+        with patch.object(grok, "_execute_grok_chat_completion", side_effect=_RateLimited()) as execute:
+            with self.assertRaises(_RateLimited):
+                grok.call_grok_chat("system", "user", "test-key", use_cache=False)
+        self.assertEqual(execute.call_count, 1)
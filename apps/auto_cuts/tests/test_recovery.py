@@ -7,13 +7,16 @@ from pathlib import Path
 from unittest.mock import patch
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from apps.auto_cuts.models import AutoCutAnalysis, AutoCutCorte, AutoCutSuggestion
 from apps.auto_cuts.services.recovery import (
     MANUAL_ATTENTION_PREFIX,
     AutoCutRecoveryAction,
+    decide_analysis_recovery_action,
     recover_autocut_analysis,
     recover_stuck_autocut_analyses,
 )
@@ -272,3 +275,57 @@ class AutoCutRecoveryTests(TestCase):
                 status="AVAILABLE",
             ).exists()
         )
+
+    def _create_stuck_batch(self) -> list[AutoCutAnalysis]:
+        early = self._create_analysis(status="analyzing")
+        self._create_suggestion(early)
+
+        finalizing = self._create_analysis(status="finalizing")
+        self._create_corte(finalizing, file_name="batch_partial.mp4")
+
+        resync = self._create_analysis(status="finalizing")
+        self._create_corte(resync, file_name="batch_final.mp4", is_finalized=True)
+
+        blocked = self._create_analysis(status="done")
+        corte = self._create_corte(blocked, file_name="batch_blocked.mp4")
+        self._create_inventory_item(corte, status="POSTED")
+
+        no_inputs = self._create_analysis(status="pending")
+        Path(no_inputs.file.path).unlink()
+
+        analyses = [early, finalizing, resync, blocked, no_inputs]
+        for analysis in analyses:
+            self._set_stale(analysis)
+        return analyses
+
+    def test_batch_sweep_matches_single_analysis_decisions(self):
+        analyses = self._create_stuck_batch()
+        expected = {a.id: decide_analysis_recovery_action(a).action.value for a in analyses}
+
+        results = recover_stuck_autocut_analyses(dry_run=True, probe_workers=4)
+
+        self.assertEqual({r.analysis_id: r.action for r in results}, expected)
+        self.assertEqual(
+            [expected[a.id] for a in analyses],
+            [
+                AutoCutRecoveryAction.RESTART_FROM_BEGINNING.value,
+                AutoCutRecoveryAction.RERUN_FINALIZATION.value,
+                AutoCutRecoveryAction.RERUN_INVENTORY_SYNC.value,
+                AutoCutRecoveryAction.MARK_MANUAL_ATTENTION.value,
+                AutoCutRecoveryAction.MARK_MANUAL_ATTENTION.value,
+            ],
+        )
+
+    def test_batch_sweep_query_count_does_not_grow_with_analyses(self):
+        self._create_stuck_batch()
+        with CaptureQueriesContext(connection) as small:
+            recover_stuck_autocut_analyses(dry_run=True, limit=1)
+
+        self._create_stuck_batch()
+        with CaptureQueriesContext(connection) as large:
+            results = recover_stuck_autocut_analyses(dry_run=True)
+
+        self.assertEqual(len(results), 10)
+        # 1 consulta das analyses + cortes, inventario, ready chunks e sugestoes.
+        self.assertEqual(len(large.captured_queries), 5)
+        self.assertLessEqual(len(small.captured_queries), len(large.captured_queries))
@@ -0,0 +1,88 @@
+"""Testes dos caches de renderização (fontes, logos redimensionados, layouts e PNGs de overlay)."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from PIL import Image, ImageDraw, ImageFont
+
+from apps.auto_cuts.services import render_cache, thumbnail, vertical_reformat
+
+
+class RenderCacheTests(SimpleTestCase):
+    def setUp(self):
+        render_cache.clear_render_caches()
+        thumbnail._fit_text_layout.cache_clear()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        render_cache.clear_render_caches()
+
+    def test_fonts_are_loaded_once_per_path_and_size(self):
+        default = ImageFont.load_default()
+        with patch.object(render_cache.ImageFont, "truetype", return_value=default) as truetype:
+            render_cache.load_font("a.ttf", 20)
+            render_cache.load_font("a.ttf", 20)
+            render_cache.load_font("a.ttf", 24)
+        self.assertEqual(truetype.call_count, 2)
+
+    def test_missing_fonts_resolve_to_default_once(self):
+        with patch.object(render_cache, "load_font", side_effect=OSError("missing")) as load_font:
+            first = render_cache.resolve_font(("x.ttf", "y.ttf"), 30)
+            second = render_cache.resolve_font(("x.ttf", "y.ttf"), 30)
+        self.assertIs(first, second)
+        self.assertEqual(load_font.call_count, 2)
+
+    def test_scaled_logo_is_reused_until_file_changes(self):
+        logo = self.tmp / "logo.png"
+        Image.new("RGBA", (400, 200), (255, 0, 0, 255)).save(logo)
+
+        first = render_cache.scaled_rgba(logo, (100, 100), fit=True)
+        self.assertIs(render_cache.scaled_rgba(logo, (100, 100), fit=True), first)
+        self.assertEqual(first.size, (100, 50))
+        self.assertEqual(render_cache.scaled_rgba(logo, (100, 100), fit=False).size, (100, 100))
+
+        Image.new("RGBA", (200, 400), (0, 255, 0, 255)).save(logo)
+        st = logo.stat()
+        os.utime(logo, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertEqual(render_cache.scaled_rgba(logo, (100, 100), fit=True).size, (50, 100))
+
+    def test_text_layout_is_memoized_and_returns_fresh_lists(self):
+        draw = ImageDraw.Draw(Image.new("RGB", (10, 10)))
+        args = dict(text="UM TITULO BEM LONGO PARA QUEBRAR", preferred_font="impact", max_width=120,
+                    max_height=200, initial_font_size=40, min_font_size=12)
+        font, lines, spacing = thumbnail._fit_text_into_box(draw=draw, **args)
+        lines.append("mutated")
+        again = thumbnail._fit_text_into_box(draw=draw, **args)
+
+        self.assertIs(again[0], font)
+        self.assertNotIn("mutated", again[1])
+        self.assertEqual(thumbnail._fit_text_layout.cache_info().hits, 1)
+
+    def test_text_overlay_png_is_rendered_once_per_content_and_style(self):
+        fonts = self.tmp / "emoji.ttf"
+        with (
+            patch.object(vertical_reformat, "_get_emoji_font_path", return_value=fonts),
+            patch.object(vertical_reformat, "_get_text_font_path", return_value=fonts),
+            patch.object(vertical_reformat, "_draw_text_overlay_png", return_value=b"png-bytes") as draw,
+        ):
+            for name in ("a.png", "b.png"):
+                self.assertTrue(
+                    vertical_reformat._render_text_overlay_pillow(self.tmp / name, "Título", "", 1400, 1544)
+                )
+            vertical_reformat._render_text_overlay_pillow(
+                self.tmp / "c.png", "Título", "", 1400, 1544, title_color="#FF0000"
+            )
+
+        self.assertEqual(draw.call_count, 2)
+        self.assertEqual((self.tmp / "b.png").read_bytes(), b"png-bytes")
+
+    def test_benchmark_command_runs(self):
+        call_command("benchmark_render_cache", cuts=2, repeat=1, width=320, height=180, stdout=open(os.devnull, "w"))
@@ -0,0 +1,134 @@
+"""Testes da extração de frames em lote (um processo FFmpeg por fonte) e da composição das capas."""
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from apps.auto_cuts.services import thumbnail
+from apps.auto_cuts.services.frames import extract_frames
+
+# Escreve um PNG 4x2 por saída, com a cor = timestamp*10 da entrada; sem frame além de 10 s.
+_FAKE_FFMPEG = """\
+#!{python}
+import sys
+from PIL import Image
+args = sys.argv[1:]
+with open({log!r}, "a") as log:
+    log.write("call\\n")
+seeks = [float(args[i + 1]) for i, a in enumerate(args) if a == "-ss"]
+outputs = [a for a in args if a.endswith(".png")]
+for ts, out in zip(seeks, outputs):
+    if ts < 10:
+        Image.new("RGB", (4, 2), (int(ts * 10), 0, 0)).save(out)
+"""
+
+
+def _style(is_short=False) -> thumbnail.ThumbnailStyle:
+    return thumbnail.ThumbnailStyle(
+        is_short=is_short,
+        text="UM TITULO DE TESTE",
+        font="impact",
+        band_color=(225, 46, 32),
+        text_color=(10, 10, 10),
+        stroke_color=(255, 235, 220),
+    )
+
+
+class ExtractFramesTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.log = self.tmp / "calls.log"
+        self.ffmpeg = self.tmp / "ffmpeg"
+        self.ffmpeg.write_text(textwrap.dedent(_FAKE_FFMPEG).format(python=sys.executable, log=str(self.log)))
+        os.chmod(self.ffmpeg, 0o755)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _calls(self) -> int:
+        return len(self.log.read_text().splitlines()) if self.log.exists() else 0
+
+    def test_all_timestamps_in_one_process_in_input_order(self):
+        with override_settings(FFMPEG_BIN=str(self.ffmpeg), THUMBNAIL_FRAMES_PER_PROCESS=16):
+            frames = extract_frames(self.tmp / "src.mp4", [5.0, 1.0, 12.0, 3.0])
+
+        self.assertEqual(self._calls(), 1)
+        self.assertIsNone(frames[2])
+        self.assertEqual([int(f[0, 0, 0]) for f in (frames[0], frames[1], frames[3])], [50, 10, 30])
+        self.assertEqual(frames[0].shape, (2, 4, 3))
+
+    def test_timestamps_are_split_per_process_limit(self):
+        with override_settings(FFMPEG_BIN=str(self.ffmpeg), THUMBNAIL_FRAMES_PER_PROCESS=2):
+            frames = extract_frames(self.tmp / "src.mp4", [1.0, 2.0, 3.0])
+
+        self.assertEqual(self._calls(), 2)
+        self.assertEqual([int(f[0, 0, 0]) for f in frames], [10, 20, 30])
+
+
+class ComposeThumbnailTests(SimpleTestCase):
+    def test_short_from_horizontal_frame_is_cropped_to_vertical(self):
+        data = thumbnail.compose_thumbnail(_style(is_short=True), np.zeros((360, 640, 3), dtype=np.uint8))
+
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.format, "JPEG")
+            self.assertEqual(img.size, (202, 360))
+
+
+@override_settings(THUMBNAIL_WORKERS=2)
+class GenerateAutoThumbnailsTests(SimpleTestCase):
+    def _plan(self, corte_id, ts, *, cut_only=True, start=100.0, end=160.0):
+        return thumbnail.ThumbnailPlan(
+            corte=SimpleNamespace(id=corte_id),
+            style=_style(),
+            source_path=Path(f"corte_{corte_id}.mp4"),
+            ts_sec=ts,
+            timeline_is_cut_only=cut_only,
+            sug_start_sec=start,
+            sug_end_sec=end,
+        )
+
+    def test_frames_come_from_shared_source_with_fallback_pass(self):
+        plans = {1: self._plan(1, 10.0), 2: self._plan(2, 90.0), 3: self._plan(3, 1.0, start=300.0, end=330.0)}
+        calls = []
+
+        def fake_extract(source, timestamps):
+            calls.append((source, list(timestamps)))
+            return [None if ts == 159.75 else np.full((36, 64, 3), 80, dtype=np.uint8) for ts in timestamps]
+
+        saved = {}
+        items = [(SimpleNamespace(id=i), None) for i in (1, 2, 3)]
+        with (
+            patch.object(thumbnail, "plan_auto_thumbnail", side_effect=lambda c, target_brand: plans[c.id]),
+            patch.object(thumbnail, "extract_frames", side_effect=fake_extract),
+            patch.object(thumbnail, "_save_thumbnail", side_effect=lambda c, data: saved.update({c.id: data})),
+        ):
+            results = thumbnail.generate_auto_thumbnails(items, source_video=Path("src.mp4"))
+
+        self.assertEqual(results, [True, True, True])
+        # 1 processo para os frames principais (timestamps absolutos, corte 2 limitado ao fim);
+        # 1 para o fallback do corte 2 (5 s dentro do corte).
+        self.assertEqual(calls, [(Path("src.mp4"), [110.0, 159.75, 301.0]), (Path("src.mp4"), [105.0])])
+        self.assertTrue(all(data[:2] == b"\xff\xd8" for data in saved.values()))
+
+    def test_cut_without_frame_is_reported_as_not_generated(self):
+        with (
+            patch.object(thumbnail, "plan_auto_thumbnail", side_effect=[None, self._plan(2, 1.0, cut_only=False)]),
+            patch.object(thumbnail, "extract_frames", side_effect=lambda s, ts: [None] * len(ts)),
+            patch.object(thumbnail, "_save_thumbnail") as save,
+        ):
+            results = thumbnail.generate_auto_thumbnails([(SimpleNamespace(id=1), None), (SimpleNamespace(id=2), None)])
+
+        self.assertEqual(results, [False, False])
+        save.assert_not_called()
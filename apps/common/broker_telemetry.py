@@ -0,0 +1,215 @@
+"""Celery broker telemetry for the Redis transport: ready, unacked, ETA-held and oldest age per queue.
+
+kombu's Redis transport keeps one list per queue (``LPUSH`` on publish, ``BRPOP`` on
+consume, so the oldest ready message sits at index -1). Messages with a non-zero priority
+go to ``<queue>\\x06\\x16<step>`` lists. Messages delivered to a worker but not yet
+acked, including ETA/countdown tasks that the worker holds until their time comes, live
+in the ``unacked`` hash as ``[payload, exchange, routing_key]``.
+
+A single pipelined round trip reads every ready list's ``LLEN`` and ``LINDEX -1``, plus
+``HLEN unacked``. The ``unacked`` hash is then read with ``HSCAN``, capped at
+``BROKER_TELEMETRY_UNACKED_SCAN_LIMIT`` entries. The oldest message age comes from the
+``x-enqueued-at-ms`` header that ``set_task_enqueue_timestamp`` adds on publish.
+
+Enqueue/dequeue rates are Prometheus counters (``queue_enqueued_total`` and
+``queue_dequeued_total``) updated by the Celery signal handlers; use ``rate()`` on them.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+
+from .queue_backlog import _is_redis_broker_url, get_broker_redis_client, get_observed_queue_names
+from .task_observability import TASK_ENQUEUED_AT_MS_HEADER
+
+logger = logging.getLogger(__name__)
+
+UNACKED_KEY = "unacked"
+PRIORITY_SEP = "\x06\x16"
+PRIORITY_STEPS = (3, 6, 9)
+
+
+@dataclass
+class QueueTelemetry:
+    ready: int = 0
+    unacked: int = 0
+    # Unacked messages whose ETA/countdown is still in the future (held by a worker, not running).
+    scheduled: int = 0
+    oldest_age_s: float | None = None
+
+
+def priority_queue_key(queue_name: str, step: int) -> str:
+    """Redis list holding ``queue_name`` messages of priority ``step`` (0 = the queue itself)."""
+    return f"{queue_name}{PRIORITY_SEP}{step}" if step else queue_name
+
+
+def _queue_keys(queue_name: str) -> list[str]:
+    return [queue_name, *(priority_queue_key(queue_name, step) for step in PRIORITY_STEPS)]
+
+
+def _decode(raw) -> dict | list | None:
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def _message_enqueued_at_ms(message) -> float | None:
+    if not isinstance(message, dict):
+        return None
+    for mapping in (message.get("headers"), message.get("properties")):
+        if isinstance(mapping, dict):
+            try:
+                return float(mapping[TASK_ENQUEUED_AT_MS_HEADER])
+            except (KeyError, TypeError, ValueError):
+                continue
+    return None
+
+
+def _eta_is_future(message, now_s: float) -> bool:
+    headers = message.get("headers") if isinstance(message, dict) else None
+    eta = headers.get("eta") if isinstance(headers, dict) else None
+    if not eta:
+        return False
+    try:
+        eta_dt = datetime.fromisoformat(str(eta))
+    except ValueError:
+        return False
+    if eta_dt.tzinfo is None:
+        return False
+    return eta_dt.timestamp() > now_s
+
+
+def _unacked_queue(entry) -> str:
+    if isinstance(entry, list) and len(entry) >= 3 and entry[2]:
+        return str(entry[2])
+    message = entry[0] if isinstance(entry, list) and entry else None
+    props = message.get("properties") if isinstance(message, dict) else None
+    delivery_info = props.get("delivery_info") if isinstance(props, dict) else None
+    return str((delivery_info or {}).get("routing_key") or "")
+
+
+def _scan_limit() -> int:
+    return max(0, int(getattr(settings, "BROKER_TELEMETRY_UNACKED_SCAN_LIMIT", 2000)))
+
+
+def collect_broker_telemetry(
+    *,
+    broker_url: str | None = None,
+    queue_names: Iterable[str] | None = None,
+    redis_client=None,
+    now_s: float | None = None,
+) -> dict[str, QueueTelemetry]:
+    """Per-queue telemetry from the Redis broker; {} for other brokers or when Redis is unreachable."""
+    resolved_broker_url = str(broker_url or getattr(settings, "CELERY_BROKER_URL", "") or "").strip()
+    if not resolved_broker_url or not _is_redis_broker_url(resolved_broker_url):
+        return {}
+    resolved_queue_names = tuple(queue_names or get_observed_queue_names())
+    if not resolved_queue_names:
+        return {}
+    now_s = time.time() if now_s is None else now_s
+
+    try:
+        client = redis_client if redis_client is not None else get_broker_redis_client(resolved_broker_url)
+        pipe = client.pipeline(transaction=False)
+        for queue_name in resolved_queue_names:
+            for key in _queue_keys(queue_name):
+                pipe.llen(key)
+                pipe.lindex(key, -1)
+        pipe.hlen(UNACKED_KEY)
+        replies = pipe.execute()
+    except Exception:
+        logger.warning("broker_telemetry_collection_failed", exc_info=True)
+        return {}
+
+    telemetry: dict[str, QueueTelemetry] = {}
+    pos = 0
+    for queue_name in resolved_queue_names:
+        item = telemetry[queue_name] = QueueTelemetry()
+        oldest_ms: float | None = None
+        for _key in _queue_keys(queue_name):
+            length, tail = replies[pos], replies[pos + 1]
+            pos += 2
+            item.ready += max(0, int(length or 0))
+            enqueued_ms = _message_enqueued_at_ms(_decode(tail))
+            if enqueued_ms is not None and (oldest_ms is None or enqueued_ms < oldest_ms):
+                oldest_ms = enqueued_ms
+        if oldest_ms is not None:
+            item.oldest_age_s = max(0.0, now_s - oldest_ms / 1000.0)
+
+    unacked_total = int(replies[pos] or 0)
+    limit = _scan_limit()
+    if unacked_total and limit:
+        scanned = 0
+        try:
+            for _tag, raw in client.hscan_iter(UNACKED_KEY, count=500):
+                entry = _decode(raw)
+                queue_name = _unacked_queue(entry)
+                if queue_name in telemetry:
+                    telemetry[queue_name].unacked += 1
+                    if isinstance(entry, list) and entry and _eta_is_future(entry[0], now_s):
+                        telemetry[queue_name].scheduled += 1
+                scanned += 1
+                if scanned >= limit:
+                    break
+        except Exception:
+            logger.warning("broker_telemetry_unacked_scan_failed", exc_info=True)
+        if scanned < unacked_total:
+            logger.debug("broker_telemetry_unacked_truncated", extra={"scanned": scanned, "total": unacked_total})
+    return telemetry
+
+
+class BrokerTelemetryCollector:
+    """Prometheus collector: queue_backlog plus unacked, ETA-held and oldest-message age per queue."""
+
+    def __init__(
+        self,
+        *,
+        broker_url: str | None = None,
+        queue_names: Iterable[str] | None = None,
+        telemetry_collector=collect_broker_telemetry,
+    ) -> None:
+        self._broker_url = broker_url
+        self._queue_names = tuple(queue_names) if queue_names is not None else None
+        self._telemetry_collector = telemetry_collector
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        from .queue_backlog import QUEUE_BACKLOG_METRIC_DESCRIPTION, QUEUE_BACKLOG_METRIC_NAME
+
+        telemetry = self._telemetry_collector(broker_url=self._broker_url, queue_names=self._queue_names)
+        backlog = GaugeMetricFamily(QUEUE_BACKLOG_METRIC_NAME, QUEUE_BACKLOG_METRIC_DESCRIPTION, labels=["queue_name"])
+        unacked = GaugeMetricFamily(
+            "queue_unacked",
+            "Messages delivered to workers but not acked yet (running, prefetched or ETA-held) per Celery queue",
+            labels=["queue_name"],
+        )
+        scheduled = GaugeMetricFamily(
+            "queue_scheduled",
+            "Unacked messages whose ETA/countdown is still in the future per Celery queue",
+            labels=["queue_name"],
+        )
+        oldest = GaugeMetricFamily(
+            "queue_oldest_message_age_seconds",
+            "Age of the oldest ready message per Celery queue (from the x-enqueued-at-ms header)",
+            labels=["queue_name"],
+        )
+        for queue_name, item in telemetry.items():
+            backlog.add_metric([queue_name], item.ready)
+            unacked.add_metric([queue_name], item.unacked)
+            scheduled.add_metric([queue_name], item.scheduled)
+            oldest.add_metric([queue_name], item.oldest_age_s or 0.0)
+        yield backlog
+        yield unacked
+        yield scheduled
+        yield oldest
@@ -72,12 +72,51 @@ task_duration_ms = Histogram(
     _task,
     buckets=_DURATION_MS_BUCKETS,
 )
+# Sampled task profiling (apps/common/task_profiling.py): only profiled executions.
+task_phase_duration_ms = Histogram(
+    "task_phase_duration_ms",
+    "Time per phase (subprocess, db, http, python) of profiled Celery task executions",
+    ("task_name", "phase"),
+    buckets=_DURATION_MS_BUCKETS,
+)
+task_profiles_captured_total = Counter(
+    "task_profiles_captured_total",
+    "Celery task executions captured by the sampled profiler",
+    ("task_name",),
+)
 queue_wait_ms = Histogram(
     "queue_wait_ms",
     "Approximate Celery queue wait time in milliseconds (enqueue to task start)",
     _task,
     buckets=_DURATION_MS_BUCKETS,
 )
+# Per-queue throughput (rate() of these); broker-side gauges live in apps/common/broker_telemetry.py.
+queue_enqueued_total = Counter(
+    "queue_enqueued_total",
+    "Celery messages published per queue",
+    ("queue_name",),
+)
+queue_dequeued_total = Counter(
+    "queue_dequeued_total",
+    "Celery messages taken from the queue and started by a worker",
+    ("queue_name",),
+)
+# Priority classes on the Redis broker (apps/jobs/services/task_priority.py).
+queue_priority_assigned_total = Counter(
+    "queue_priority_assigned_total",
+    "Celery messages published with a priority class (from brand inventory deficit and slot deadlines)",
+    ("queue_name", "priority_class"),
+)
+queue_priority_promoted_total = Counter(
+    "queue_priority_promoted_total",
+    "Messages moved up one priority step after waiting longer than the aging threshold",
+    ("queue_name", "from_class"),
+)
+posting_slots_total = Counter(
+    "posting_slots_total",
+    "Daily plan slots handled by the factory scheduler, by the brand's last auto-cut priority class",
+    ("priority_class", "outcome"),
+)
 
 # --- Transcription ---
 transcription_jobs_total = Counter(
@@ -163,6 +202,31 @@ upload_post_reconciliation_completed_total = Counter(
     "Upload Post reconciliation finished with a terminal decision (success or confirmed failure)",
 )
 
+# --- ffmpeg / ffprobe subprocesses (apps/jobs/services/ffmpeg_runner.py) ---
+ffmpeg_runs_total = Counter(
+    "ffmpeg_runs_total",
+    "ffmpeg/ffprobe invocations by operation and outcome (ok, error, timeout, stalled)",
+    ("operation", "outcome"),
+)
+ffmpeg_duration_ms = Histogram(
+    "ffmpeg_duration_ms",
+    "ffmpeg/ffprobe wall-clock duration in milliseconds",
+    ("operation",),
+    buckets=_DURATION_MS_BUCKETS,
+)
+ffmpeg_cpu_seconds = Histogram(
+    "ffmpeg_cpu_seconds",
+    "ffmpeg/ffprobe CPU time (user + system) per invocation, from rusage",
+    ("operation",),
+    buckets=(0.1, 1.0, 5.0, 30.0, 120.0, 600.0, 1_800.0, 7_200.0, float("inf")),
+)
+ffmpeg_max_rss_bytes = Histogram(
+    "ffmpeg_max_rss_bytes",
+    "ffmpeg/ffprobe peak resident set size per invocation, from rusage",
+    ("operation",),
+    buckets=(32e6, 128e6, 256e6, 512e6, 1e9, 2e9, 4e9, 8e9, float("inf")),
+)
+
 # --- Grok / xAI cost observability ---
 grok_requests_total = Counter(
     "grok_requests_total",
@@ -179,9 +243,25 @@ grok_cost_usd_total = Counter(
     "Estimated Grok API cost in USD",
     ("model",),
 )
+grok_rate_limited_total = Counter(
+    "grok_rate_limited_total",
+    "Grok API calls retried after HTTP 429 (rate limit)",
+    ("operation",),
+)
+grok_response_cache_total = Counter(
+    "grok_response_cache_total",
+    "Grok response cache lookups by result (hit, miss)",
+    ("operation", "result"),
+)
 grok_request_duration_ms = Histogram(
     "grok_request_duration_ms",
     "Grok API request duration in milliseconds",
     ("model",),
     buckets=_DURATION_MS_BUCKETS,
 )
+# Multiprocess store housekeeping (apps/common/metrics_compaction.py).
+prometheus_multiproc_compacted_files_total = Counter(
+    "prometheus_multiproc_compacted_files_total",
+    "Multiprocess .db files of dead processes folded into the archive (counter, histogram) or removed (gauge)",
+    ("kind",),
+)
@@ -0,0 +1,202 @@
+"""Compaction of prometheus_client multiprocess files left behind by dead processes.
+
+Every process writes its own ``<type>_<pid>.db`` files under ``PROMETHEUS_MULTIPROC_DIR``.
+Celery's ``max_tasks_per_child`` recycling keeps spawning new pids, so the directory grows
+without bound, and so does every scrape, which merges all files. Counter and histogram
+samples are plain sums across processes, so the files of dead pids can be folded into one
+``<type>_archive.db`` per type without changing the scrape output. Live-gauge files of dead
+pids are removed, which is what ``multiprocess.mark_process_dead`` does.
+
+Liveness is checked with ``os.kill(pid, 0)``, so a directory must only be written by
+processes in the same PID namespace as the compactor (one directory per container, as in
+``docker-compose.yml``). Set ``PROMETHEUS_MULTIPROC_COMPACT=0`` for layouts where several
+hosts or containers share one directory.
+
+Compaction holds an exclusive ``flock`` on ``<dir>/.compaction.lock``, and scrapes hold it
+shared (see ``multiproc_lock``). A scrape therefore never counts a value both in the archive
+and in the file it came from.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from .metrics import prometheus_multiproc_compacted_files_total
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TAG = "archive"
+LOCK_FILENAME = ".compaction.lock"
+# Types whose samples are summed across processes (``accumulate=True`` in the merge).
+_ADDITIVE_TYPES = ("counter", "histogram")
+
+_last_compaction_at: dict[str, float] = {}
+
+
+@dataclass
+class CompactionResult:
+    folded_files: int = 0
+    removed_gauge_files: int = 0
+    dead_pids: list[int] = field(default_factory=list)
+    skipped: bool = False
+
+
+def compaction_enabled() -> bool:
+    return os.environ.get("PROMETHEUS_MULTIPROC_COMPACT", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def file_pid(path: str) -> int | None:
+    """PID encoded in a multiprocess filename (``counter_123.db`` -> 123); None for archives."""
+    tail = os.path.basename(path)[:-3].rsplit("_", 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+@contextmanager
+def multiproc_lock(path: str, *, shared: bool, blocking: bool = True) -> Iterator[bool]:
+    """
+    ``flock`` on the directory's lock file; yields False when a non-blocking lock is busy.
+    Fails open (yields True without locking) where flock or the lock file is unavailable.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows dev: no compaction concurrency to guard against.
+        yield True
+        return
+    try:
+        fd = os.open(os.path.join(path, LOCK_FILENAME), os.O_RDWR | os.O_CREAT, 0o666)
+    except OSError:
+        yield True
+        return
+    try:
+        flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(fd, flags if blocking else flags | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _fold_into_archive(path: str, typ: str, files: list[str]) -> None:
+    from prometheus_client.mmap_dict import MmapedDict
+
+    totals: dict[str, float] = defaultdict(float)
+    archive = os.path.join(path, f"{typ}_{ARCHIVE_TAG}.db")
+    for source in ([archive] if os.path.exists(archive) else []) + files:
+        for key, value, _timestamp, _pos in MmapedDict.read_all_values_from_file(source):
+            totals[key] += value
+    # Hidden temp name: never matched by the ``*.db`` glob of a scrape.
+    tmp = os.path.join(path, f".{typ}_{ARCHIVE_TAG}.{os.getpid()}.tmp")
+    out = MmapedDict(tmp)
+    try:
+        for key, value in totals.items():
+            out.write_value(key, value, 0.0)
+    finally:
+        out.close()
+    os.replace(tmp, archive)
+
+
+def compact_multiproc_dir(
+    path: str,
+    *,
+    is_alive: Callable[[int], bool] = pid_alive,
+    blocking: bool = False,
+) -> CompactionResult:
+    """
+    Fold counter/histogram files of dead pids into ``<type>_archive.db`` and delete them,
+    then drop the live-gauge files of those pids. Skips (``skipped=True``) when another
+    process holds the directory lock and ``blocking`` is False.
+    """
+    result = CompactionResult()
+    if not path or not os.path.isdir(path):
+        return result
+    from prometheus_client import multiprocess
+
+    with multiproc_lock(path, shared=False, blocking=blocking) as locked:
+        if not locked:
+            result.skipped = True
+            return result
+        me = os.getpid()
+        dead: dict[int, list[str]] = defaultdict(list)
+        for f in glob.glob(os.path.join(path, "*.db")):
+            pid = file_pid(f)
+            if pid is None or pid == me or is_alive(pid):
+                continue
+            dead[pid].append(f)
+        if not dead:
+            return result
+
+        by_type: dict[str, list[str]] = defaultdict(list)
+        for files in dead.values():
+            for f in files:
+                typ = os.path.basename(f).split("_", 1)[0]
+                if typ in _ADDITIVE_TYPES:
+                    by_type[typ].append(f)
+        for typ, files in by_type.items():
+            _fold_into_archive(path, typ, files)
+            for f in files:
+                os.remove(f)
+            result.folded_files += len(files)
+            prometheus_multiproc_compacted_files_total.labels(kind=typ).inc(len(files))
+
+        for pid, files in dead.items():
+            live_gauges = [f for f in files if os.path.basename(f).startswith("gauge_live")]
+            multiprocess.mark_process_dead(pid, path)
+            result.removed_gauge_files += len(live_gauges)
+            if live_gauges:
+                prometheus_multiproc_compacted_files_total.labels(kind="gauge").inc(len(live_gauges))
+        result.dead_pids = sorted(dead)
+
+    if result.folded_files or result.removed_gauge_files:
+        logger.info(
+            "Compacted prometheus multiprocess dir %s: %d files folded, %d live-gauge files removed (%d dead pids)",
+            path,
+            result.folded_files,
+            result.removed_gauge_files,
+            len(result.dead_pids),
+        )
+    return result
+
+
+def maybe_compact_current_dir(*, min_interval_s: float = 0.0) -> CompactionResult | None:
+    """
+    Compact this process's ``PROMETHEUS_MULTIPROC_DIR`` (at most once per ``min_interval_s``).
+    Never raises: metrics housekeeping must not break a worker start or a scrape.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path or not compaction_enabled():
+        return None
+    now = time.monotonic()
+    last = _last_compaction_at.get(path)
+    if last is not None and now - last < min_interval_s:
+        return None
+    _last_compaction_at[path] = now
+    try:
+        return compact_multiproc_dir(path)
+    except Exception:
+        logger.warning("Prometheus multiprocess compaction failed for %s", path, exc_info=True)
+        return None
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 from collections.abc import Iterable
 
 from django.conf import settings
@@ -41,6 +42,25 @@ def _is_redis_broker_url(broker_url: str) -> bool:
     return broker_url.lower().startswith(("redis://", "rediss://", "unix://"))
 
 
+_REDIS_CLIENTS: dict[str, Redis] = {}
+_REDIS_CLIENTS_LOCK = threading.Lock()
+
+
+def get_broker_redis_client(broker_url: str) -> Redis:
+    """Process-wide client (own connection pool) per broker URL, reused across scrapes."""
+    with _REDIS_CLIENTS_LOCK:
+        client = _REDIS_CLIENTS.get(broker_url)
+        if client is None:
+            client = _REDIS_CLIENTS[broker_url] = Redis.from_url(
+                broker_url,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+                retry_on_timeout=False,
+                max_connections=4,
+            )
+        return client
+
+
 def collect_queue_backlog_samples(
     *,
     broker_url: str | None = None,
@@ -64,36 +84,23 @@ def collect_queue_backlog_samples(
         return {}
 
     client = redis_client
-    created_client = False
     if client is None:
         try:
-            client = Redis.from_url(
-                resolved_broker_url,
-                socket_connect_timeout=1,
-                socket_timeout=1,
-                retry_on_timeout=False,
-            )
-            created_client = True
+            client = get_broker_redis_client(resolved_broker_url)
         except Exception:
             logger.warning("queue_backlog_client_init_failed", exc_info=True)
             return {}
 
     backlog_by_queue: dict[str, int] = {}
-    try:
-        for queue_name in resolved_queue_names:
-            try:
-                backlog_by_queue[queue_name] = max(0, int(client.llen(queue_name) or 0))
-            except Exception:
-                logger.warning(
-                    "queue_backlog_queue_collection_failed",
-                    extra={"queue_name": queue_name},
-                    exc_info=True,
-                )
-    finally:
-        if created_client:
-            close = getattr(client, "close", None)
-            if callable(close):
-                close()
+    for queue_name in resolved_queue_names:
+        try:
+            backlog_by_queue[queue_name] = max(0, int(client.llen(queue_name) or 0))
+        except Exception:
+            logger.warning(
+                "queue_backlog_queue_collection_failed",
+                extra={"queue_name": queue_name},
+                exc_info=True,
+            )
 
     return backlog_by_queue
 
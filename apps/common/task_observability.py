@@ -8,10 +8,12 @@ from functools import wraps
 from time import perf_counter, time_ns
 
 from celery import current_task
-from celery.signals import before_task_publish, task_prerun
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_process_init
 from django.conf import settings
 
 from .metrics import (
+    queue_dequeued_total,
+    queue_enqueued_total,
     queue_wait_ms,
     task_duration_ms,
     task_failed_total,
@@ -216,17 +218,38 @@ def instrument_celery_task(func):
     return wrapper
 
 
-def _handle_before_task_publish(headers=None, properties=None, **kwargs) -> None:
+def _handle_before_task_publish(headers=None, properties=None, routing_key=None, **kwargs) -> None:
     set_task_enqueue_timestamp(headers=headers, properties=properties)
+    queue_name = str(routing_key or getattr(settings, "CELERY_TASK_DEFAULT_QUEUE", "") or "celery").strip()
+    queue_enqueued_total.labels(queue_name=queue_name).inc()
 
 
-def _handle_task_prerun(sender=None, task=None, **kwargs) -> None:
+def _handle_task_prerun(sender=None, task=None, task_id=None, **kwargs) -> None:
     task_obj = task if getattr(task, "request", None) is not None else None
     if task_obj is None and getattr(sender, "request", None) is not None:
         task_obj = sender
     if task_obj is None:
         return
     observe_task_queue_wait(task=task_obj)
+    queue_dequeued_total.labels(queue_name=resolve_task_observation_labels(task=task_obj)[1]).inc()
+    if getattr(settings, "TASK_PROFILE_SAMPLE_RATE", 0):
+        from .task_profiling import start_task_profile
+
+        task_name, queue_name = resolve_task_observation_labels(task=task_obj)
+        start_task_profile(task_id=task_id or "", task_name=task_name, queue_name=queue_name)
+
+
+def _handle_task_postrun(sender=None, task_id=None, state=None, **kwargs) -> None:
+    from .task_profiling import finish_task_profile
+
+    finish_task_profile(task_id or "", status=str(state or "UNKNOWN"))
+
+
+def _handle_worker_process_init(**kwargs) -> None:
+    # A new pool child usually means an old one exited (max_tasks_per_child): fold its metric files.
+    from .metrics_compaction import maybe_compact_current_dir
+
+    maybe_compact_current_dir()
 
 
 def register_celery_observability_signal_handlers() -> None:
@@ -236,4 +259,6 @@ def register_celery_observability_signal_handlers() -> None:
         return
     before_task_publish.connect(_handle_before_task_publish, weak=False)
     task_prerun.connect(_handle_task_prerun, weak=False)
+    task_postrun.connect(_handle_task_postrun, weak=False)
+    worker_process_init.connect(_handle_worker_process_init, weak=False)
     _SIGNAL_HANDLERS_REGISTERED = True
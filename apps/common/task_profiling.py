@@ -0,0 +1,287 @@
+"""Opt-in sampled profiling of Celery tasks (stack sampler or cProfile + per-phase timers).
+
+A fraction ``TASK_PROFILE_SAMPLE_RATE`` of the tasks (optionally only those listed in
+``TASK_PROFILE_TASKS``) is profiled between ``task_prerun`` and ``task_postrun``:
+
+- ``sampler`` mode: a background thread samples the task thread stack every
+  ``TASK_PROFILE_INTERVAL_MS`` and stores collapsed stacks (``a;b;c count``), ready for
+  flamegraph.pl / speedscope;
+- ``cprofile`` mode: deterministic cProfile, stored as the top of the pstats report.
+
+In both modes the time spent in subprocesses (ffmpeg/ffprobe), DB queries and outbound
+HTTP (requests / httplib2) is accounted per phase. The result goes to ``TaskProfile`` (admin)
+and to the ``task_phase_duration_ms`` histogram on ``/metrics/``. With a rate of 0 (default)
+nothing is installed and tasks run untouched.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .metrics import task_phase_duration_ms, task_profiles_captured_total
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("subprocess", "db", "http")
+_MAX_STACK_DEPTH = 128
+_MAX_DISTINCT_STACKS = 5000
+_PSTATS_LINES = 60
+
+_ACTIVE: ContextVar[TaskProfiler | None] = ContextVar("task_profiler", default=None)
+_PROFILERS: dict[str, TaskProfiler] = {}
+_HOOKS_INSTALLED = False
+_HOOKS_LOCK = threading.Lock()
+
+
+def _profile_settings() -> tuple[float, set[str], str, float]:
+    rate = float(getattr(settings, "TASK_PROFILE_SAMPLE_RATE", 0.0) or 0.0)
+    tasks = {t.strip() for t in getattr(settings, "TASK_PROFILE_TASKS", ()) if t and t.strip()}
+    mode = str(getattr(settings, "TASK_PROFILE_MODE", "sampler") or "sampler").strip().lower()
+    interval_ms = max(1.0, float(getattr(settings, "TASK_PROFILE_INTERVAL_MS", 5) or 5))
+    return rate, tasks, mode, interval_ms
+
+
+def should_profile(task_name: str) -> bool:
+    rate, tasks, _, _ = _profile_settings()
+    if rate <= 0:
+        return False
+    if tasks and task_name not in tasks and task_name.rsplit(".", 1)[-1] not in tasks:
+        return False
+    return rate >= 1 or random.random() < rate
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}"
+
+
+class _StackSampler:
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="task-profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            key = ";".join(reversed(labels))
+            if key in self.stacks or len(self.stacks) < _MAX_DISTINCT_STACKS:
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in sorted(self.stacks.items(), key=lambda kv: -kv[1]))
+
+
+class TaskProfiler:
+    """Profile of one task execution (active in the task thread between prerun and postrun)."""
+
+    def __init__(self, *, task_id: str, task_name: str, queue_name: str, mode: str, interval_ms: float):
+        self.task_id = task_id
+        self.task_name = task_name
+        self.queue_name = queue_name
+        self.mode = "cprofile" if mode == "cprofile" else "sampler"
+        self.interval_ms = interval_ms
+        self.phases: dict[str, dict[str, float]] = {p: {"calls": 0, "ms": 0.0} for p in PHASES}
+        self._phase_depth = 0
+        self._started_at = None
+        self._t0 = 0.0
+        self._token = None
+        self._profile: cProfile.Profile | None = None
+        self._sampler: _StackSampler | None = None
+        self._db_wrappers: list = []
+        self.duration_ms = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        # Nested phases (e.g. HTTP inside a subprocess wrapper) count only for the outermost one.
+        if self._phase_depth:
+            yield
+            return
+        self._phase_depth += 1
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self._phase_depth -= 1
+            bucket = self.phases[name]
+            bucket["calls"] += 1
+            bucket["ms"] += (perf_counter() - t0) * 1000.0
+
+    def _db_wrapper(self, execute, sql, params, many, context):
+        with self.phase("db"):
+            return execute(sql, params, many, context)
+
+    def start(self) -> None:
+        _install_phase_hooks()
+        self._started_at = timezone.now()
+        self._token = _ACTIVE.set(self)
+        for conn in connections.all():
+            conn.execute_wrappers.append(self._db_wrapper)
+            self._db_wrappers.append(conn)
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.interval_ms / 1000.0)
+            self._sampler.start()
+        self._t0 = perf_counter()
+
+    def stop(self) -> None:
+        self.duration_ms = (perf_counter() - self._t0) * 1000.0
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        for conn in self._db_wrappers:
+            try:
+                conn.execute_wrappers.remove(self._db_wrapper)
+            except ValueError:
+                pass
+        self._db_wrappers = []
+        if self._token is not None:
+            _ACTIVE.reset(self._token)
+            self._token = None
+
+    def profile_text(self) -> str:
+        if self._profile is not None:
+            buf = io.StringIO()
+            pstats.Stats(self._profile, stream=buf).sort_stats("cumulative").print_stats(_PSTATS_LINES)
+            return buf.getvalue()
+        if self._sampler is not None:
+            return self._sampler.collapsed()
+        return ""
+
+    def phase_summary(self) -> dict:
+        out = {p: {"calls": int(v["calls"]), "ms": round(v["ms"], 1)} for p, v in self.phases.items()}
+        accounted = sum(v["ms"] for v in self.phases.values())
+        out["python"] = {"calls": 0, "ms": round(max(0.0, self.duration_ms - accounted), 1)}
+        return out
+
+
+def _timed(phase: str, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _ACTIVE.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.phase(phase):
+            return func(*args, **kwargs)
+
+    wrapper._task_profile_phase = phase
+    return wrapper
+
+
+def profile_phase(name: str):
+    """Time a block as ``name`` in the active task profile (no-op outside profiled tasks)."""
+    profiler = _ACTIVE.get()
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def _install_phase_hooks() -> None:
+    """Wrap subprocess.run and the HTTP clients once (pass-through outside profiled tasks)."""
+    global _HOOKS_INSTALLED
+    with _HOOKS_LOCK:
+        if _HOOKS_INSTALLED:
+            return
+        if not hasattr(subprocess.run, "_task_profile_phase"):
+            subprocess.run = _timed("subprocess", subprocess.run)
+        try:
+            import requests
+        except ImportError:
+            requests = None
+        if requests is not None and not hasattr(requests.Session.request, "_task_profile_phase"):
+            requests.Session.request = _timed("http", requests.Session.request)
+        try:
+            import httplib2
+        except ImportError:
+            httplib2 = None
+        if httplib2 is not None and not hasattr(httplib2.Http.request, "_task_profile_phase"):
+            httplib2.Http.request = _timed("http", httplib2.Http.request)
+        _HOOKS_INSTALLED = True
+
+
+def start_task_profile(*, task_id: str, task_name: str, queue_name: str) -> TaskProfiler | None:
+    if not task_id or task_id in _PROFILERS or not should_profile(task_name):
+        return None
+    _, _, mode, interval_ms = _profile_settings()
+    profiler = TaskProfiler(
+        task_id=task_id,
+        task_name=task_name,
+        queue_name=queue_name,
+        mode=mode,
+        interval_ms=interval_ms,
+    )
+    profiler.start()
+    _PROFILERS[task_id] = profiler
+    return profiler
+
+
+def finish_task_profile(task_id: str, *, status: str):
+    """Stop the task profile (if any), persist TaskProfile and observe per-phase metrics."""
+    profiler = _PROFILERS.pop(task_id or "", None)
+    if profiler is None:
+        return None
+    profiler.stop()
+    phases = profiler.phase_summary()
+    for phase, values in phases.items():
+        task_phase_duration_ms.labels(task_name=profiler.task_name, phase=phase).observe(values["ms"])
+    task_profiles_captured_total.labels(task_name=profiler.task_name).inc()
+    try:
+        from apps.jobs.models import TaskProfile
+
+        record = TaskProfile.objects.create(
+            task_id=profiler.task_id[:255],
+            task_name=profiler.task_name[:255],
+            queue_name=profiler.queue_name[:64],
+            status=status[:16],
+            mode=profiler.mode,
+            started_at=profiler._started_at,
+            duration_ms=int(profiler.duration_ms),
+            db_queries=int(profiler.phases["db"]["calls"]),
+            samples=profiler._sampler.samples if profiler._sampler else 0,
+            phases=phases,
+            profile_text=profiler.profile_text(),
+        )
+        keep = int(getattr(settings, "TASK_PROFILE_KEEP", 500) or 0)
+        if keep > 0:
+            cutoff = list(TaskProfile.objects.order_by("-id").values_list("id", flat=True)[keep : keep + 1])
+            if cutoff:
+                TaskProfile.objects.filter(id__lte=cutoff[0]).delete()
+        return record
+    except Exception:
+        # Profiling is diagnostic only: never fail the task because of it.
+        logger.exception("task_profile_persist_failed", extra={"task_id": task_id})
+        return None
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib import admin, messages
+from django.http import HttpResponse
 
 from .models import (
     DailyPostingPlan,
@@ -15,6 +16,8 @@ from .models import (
     RenderOutput,
     ScheduledPost,
     StageExecution,
+    StagePerformanceDaily,
+    TaskProfile,
     VideoInventoryItem,
 )
 
@@ -116,6 +119,9 @@ class StageExecutionInline(admin.TabularInline):
         "started_at",
         "completed_at",
         "duration_ms",
+        "worker_host",
+        "encoder",
+        "media_seconds",
         "input_payload",
         "output_payload",
         "error_class",
@@ -181,8 +187,11 @@ class StageExecutionAdmin(admin.ModelAdmin):
         "started_at",
         "completed_at",
         "duration_ms",
+        "media_seconds",
+        "encoder",
+        "worker_host",
     )
-    list_filter = ("stage_name", "status", "queue_name")
+    list_filter = ("stage_name", "status", "queue_name", "encoder")
     search_fields = (
         "pipeline_execution__correlation_id",
         "=pipeline_execution__aggregate_id",
@@ -201,6 +210,9 @@ class StageExecutionAdmin(admin.ModelAdmin):
         "started_at",
         "completed_at",
         "duration_ms",
+        "worker_host",
+        "encoder",
+        "media_seconds",
         "input_payload",
         "output_payload",
         "error_class",
@@ -216,6 +228,59 @@ class StageExecutionAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(StagePerformanceDaily)
+class StagePerformanceDailyAdmin(admin.ModelAdmin):
+    list_display = (
+        "day",
+        "stage_name",
+        "worker_host",
+        "encoder",
+        "samples",
+        "failures",
+        "duration_p50_ms",
+        "duration_p95_ms",
+        "cost_p50",
+        "cost_p95",
+    )
+    list_filter = ("stage_name", "encoder", "worker_host")
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TaskProfile)
+class TaskProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "task_name",
+        "task_id",
+        "queue_name",
+        "status",
+        "mode",
+        "duration_ms",
+        "db_queries",
+        "created_at",
+    )
+    list_filter = ("task_name", "mode", "status")
+    search_fields = ("=task_id",)
+    readonly_fields = [f.name for f in TaskProfile._meta.fields]
+    actions = ["download_profile"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Baixar perfis (stacks colapsadas / pstats)")
+    def download_profile(self, request, queryset):
+        chunks = [
+            f"# {p.task_name} {p.task_id} mode={p.mode} duration_ms={p.duration_ms}\n{p.profile_text}"
+            for p in queryset
+        ]
+        response = HttpResponse("\n\n".join(chunks), content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="task_profiles.txt"'
+        return response
+
+
 @admin.register(DeadLetterJob)
 class DeadLetterJobAdmin(admin.ModelAdmin):
     list_display = ("id", "job_name", "aggregate_id", "status", "error_category", "created_at")
@@ -0,0 +1,73 @@
+"""Plano de concorrência por fila a partir do backlog do broker; opcionalmente aplica nos workers."""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.services.worker_autoscaling import BacklogScaler, apply_to_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Lê backlog, idade da mensagem mais antiga e custo por tarefa (task_duration_ms) de cada fila "
+        "e divide os orçamentos de CPU/RAM/NVENC do nó entre elas. Com --apply ajusta os workers prefork "
+        "via pool_grow/pool_shrink; com --watch repete com histerese."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apply", action="store_true", help="Envia pool_grow/pool_shrink aos workers")
+        parser.add_argument("--watch", type=float, default=0, help="Repete a cada N segundos (0 = uma vez)")
+        parser.add_argument("--format", choices=["text", "json"], default="text")
+
+    def handle(self, *args, **options):
+        if options["watch"] < 0:
+            raise CommandError("--watch deve ser >= 0.")
+        scaler = BacklogScaler()
+        if not scaler.profiles:
+            raise CommandError("AUTOSCALE_QUEUE_PROFILES está vazio.")
+        control = None
+        if options["apply"]:
+            from config.celery import app
+
+            control = app.control
+
+        while True:
+            slots = scaler.tick()
+            if not scaler.last_plan:
+                self.stderr.write("Telemetria do broker indisponível (broker Redis fora do ar ou não configurado).")
+            self._report(scaler, slots, options["format"])
+            if control is not None and slots:
+                for worker, current, target in apply_to_workers(control, slots):
+                    self.stdout.write(f"{worker}: {current} -> {target} processos")
+            if not options["watch"]:
+                return
+            time.sleep(options["watch"])
+
+    def _report(self, scaler, slots, fmt):
+        budget = scaler.budget
+        if fmt == "json":
+            payload = {
+                "budget": {"cpu": budget.cpu, "ram_mb": budget.ram_mb, "nvenc": budget.nvenc},
+                "queues": {
+                    queue_name: {
+                        "wanted": plan.wanted,
+                        "planned": plan.slots,
+                        "slots": slots.get(queue_name, plan.slots),
+                        "late": plan.late,
+                        "drain_s": round(plan.drain_s, 1),
+                        "limited_by": plan.limited_by,
+                        "task_sec": round(scaler.costs.cost_s.get(queue_name, 0.0), 1),
+                    }
+                    for queue_name, plan in scaler.last_plan.items()
+                },
+            }
+            self.stdout.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            return
+        self.stdout.write(f"Orçamento: cpu={budget.cpu:g} ram_mb={budget.ram_mb:.0f} nvenc={budget.nvenc or '-'}")
+        for queue_name, plan in scaler.last_plan.items():
+            flags = " ATRASADA" if plan.late else ""
+            limited = f" (limite: {plan.limited_by})" if plan.limited_by else ""
+            self.stdout.write(
+                f"{queue_name:<16} quer={plan.wanted} plano={plan.slots} aplicado={slots.get(queue_name, plan.slots)} "
+                f"drenagem={plan.drain_s:.0f}s{flags}{limited}"
+            )
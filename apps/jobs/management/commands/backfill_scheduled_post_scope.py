@@ -0,0 +1,59 @@
+"""Preenche owner_user/brand/factory de ScheduledPost e compara os planos de consulta."""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.brands.models import Factory
+from apps.jobs.models import ScheduledPost
+from apps.jobs.services.scheduled_post_scope import (
+    BACKFILL_BATCH_SIZE,
+    backfill_scheduled_post_scope,
+)
+
+
+class Command(BaseCommand):
+    help = "Preenche o escopo denormalizado (dono, brand, factory) de ScheduledPost a partir do job/corte"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recalcula todos os posts (não só os sem escopo), ex. após trocar a brand de jobs",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Mostra o plano das consultas antigas (OR entre JOINs) e novas (colunas + índices)",
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_scheduled_post_scope(batch_size=options["batch_size"], only_missing=not options["all"])
+        self.stdout.write(self.style.SUCCESS(f"Concluído. {updated} agendamento(s) atualizado(s)."))
+        if options["explain"]:
+            self._explain()
+
+    def _explain(self):
+        user = get_user_model().objects.order_by("id").first()
+        factory = Factory.objects.order_by("id").first()
+        if not user or not factory:
+            self.stdout.write("Sem usuário/factory para montar as consultas.")
+            return
+        queries = {
+            "listagem por dono (antes)": ScheduledPost.objects.filter(
+                Q(job__user=user) | Q(auto_cut_corte__analysis__user=user)
+            ).order_by("-scheduled_at", "-id")[:25],
+            "listagem por dono (depois)": ScheduledPost.objects.filter(owner_user=user).order_by(
+                "-scheduled_at", "-id"
+            )[:25],
+            "dashboard da factory (antes)": ScheduledPost.objects.filter(
+                Q(job__brand__factory=factory) | Q(auto_cut_corte__analysis__brand__factory=factory),
+                status="DONE",
+            ).order_by("-posted_at", "-id")[:100],
+            "dashboard da factory (depois)": ScheduledPost.objects.filter(factory=factory, status="DONE").order_by(
+                "-posted_at", "-id"
+            )[:100],
+        }
+        for label, qs in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(qs.explain())
@@ -0,0 +1,30 @@
+"""Compacta os arquivos .db do Prometheus multiprocess deixados por processos mortos."""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.metrics_compaction import compact_multiproc_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Soma counters/histogramas de PIDs mortos em <tipo>_archive.db e remove os arquivos de gauges live "
+        "desses PIDs. Rode no mesmo container (namespace de PID) que escreve no diretório."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="",
+            help="Diretório multiprocess; padrão: PROMETHEUS_MULTIPROC_DIR",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+        if not path or not os.path.isdir(path):
+            raise CommandError("Informe --path ou defina PROMETHEUS_MULTIPROC_DIR com um diretório existente.")
+        result = compact_multiproc_dir(path, blocking=True)
+        self.stdout.write(
+            f"{path}: {result.folded_files} arquivos somados ao archive, "
+            f"{result.removed_gauge_files} gauges live removidos, PIDs mortos={len(result.dead_pids)}"
+        )
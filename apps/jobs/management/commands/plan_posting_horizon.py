@@ -0,0 +1,62 @@
+"""Gera (ou pré-visualiza) os planos diários de vários dias para uma factory."""
+from datetime import date
+from zoneinfo import ZoneInfo
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.brands.models import Factory
+from apps.jobs.services.daily_posting_plan_service import DailyPostingPlanService
+
+
+class Command(BaseCommand):
+    help = "Gera o plano de postagens dos próximos N dias de todas as brands de uma factory em lote"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--factory", type=int, required=True, help="ID da factory")
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--start", type=str, default="", help="Primeiro dia (YYYY-MM-DD); padrão: hoje local")
+        parser.add_argument("--brand", type=int, action="append", dest="brands", help="Restringe a brand(s)")
+        parser.add_argument("--dry-run", action="store_true", help="Só mostra os slots, sem gravar")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenera planos já gerados (exceto os com itens consumidos)",
+        )
+
+    def handle(self, *args, **options):
+        factory = Factory.objects.filter(pk=options["factory"]).first()
+        if factory is None:
+            raise CommandError(f"Factory {options['factory']} não encontrada.")
+        tz = ZoneInfo(factory.timezone or "America/Sao_Paulo")
+        if options["start"]:
+            try:
+                start = date.fromisoformat(options["start"])
+            except ValueError as exc:
+                raise CommandError("--start deve estar no formato YYYY-MM-DD.") from exc
+        else:
+            start = timezone.now().astimezone(tz).date()
+
+        entries = DailyPostingPlanService.generate_horizon(
+            factory,
+            start,
+            options["days"],
+            brand_ids=options["brands"],
+            dry_run=options["dry_run"],
+            force_regenerate=options["force"],
+        )
+        for entry in entries:
+            header = f"brand={entry.brand_id} {entry.plan_date} {entry.action} {entry.status}"
+            if entry.last_error:
+                header += f" ({entry.last_error})"
+            self.stdout.write(self.style.MIGRATE_HEADING(header))
+            added, removed = entry.diff()
+            for dt, video_type in removed:
+                self.stdout.write(self.style.ERROR(f"  - {dt.astimezone(tz):%H:%M} {video_type}"))
+            for dt, video_type in added:
+                self.stdout.write(self.style.SUCCESS(f"  + {dt.astimezone(tz):%H:%M} {video_type}"))
+            if not added and not removed:
+                for dt, video_type in entry.slots:
+                    self.stdout.write(f"    {dt.astimezone(tz):%H:%M} {video_type}")
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{len(entries)} plano(s) processado(s)."))
@@ -0,0 +1,144 @@
+"""Simula backlog, slots perdidos e utilização dos workers para uma frota e um mix de inventário."""
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.brands.models import Factory
+from apps.jobs.services.capacity_simulator import (
+    SIM_STAGES,
+    CapacitySimulator,
+    SimulationConfig,
+    build_profiles,
+    profiles_from_metrics_text,
+    profiles_from_stage_executions,
+    slots_for_brands,
+    slots_for_factory,
+    synthetic_brands,
+)
+
+
+def _key_values(items, *, cast, option: str) -> dict:
+    out = {}
+    for item in items or []:
+        for part in item.split(","):
+            key, sep, value = part.partition("=")
+            if not sep or not key.strip():
+                raise CommandError(f"{option} espera chave=valor (recebido: {part!r}).")
+            try:
+                out[key.strip()] = cast(value)
+            except ValueError as exc:
+                raise CommandError(f"{option}: valor inválido em {part!r}.") from exc
+    return out
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulador de capacidade determinístico (eventos discretos) com o planejamento real e "
+        "durações gravadas (StageExecution / task_duration_ms). Saída JSON ou CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=1)
+        parser.add_argument("--start", type=str, default="", help="Primeiro dia (YYYY-MM-DD); padrão: amanhã")
+        parser.add_argument("--factory", type=int, help="Usa as brands e o plano (dry-run) desta factory")
+        parser.add_argument("--brands", type=int, default=1, help="Brands sintéticas (sem --factory)")
+        parser.add_argument("--posts-per-day", type=int, default=10, help="Posts/dia por brand sintética")
+        parser.add_argument("--long-posts-per-day", type=int, default=0, help="Longos/dia por brand sintética")
+        parser.add_argument(
+            "--workers",
+            action="append",
+            help="Concorrência por fila, ex.: transcription=2,render=3,publish=1 (padrão 1 por fila)",
+        )
+        parser.add_argument("--sources-per-day", type=int, default=0, help="Vídeos-fonte que chegam por dia")
+        parser.add_argument("--source-minutes", type=str, default="60", help="Durações dos vídeos-fonte (ciclo)")
+        parser.add_argument("--shorts-per-source", type=int, default=8)
+        parser.add_argument("--longs-per-source", type=int, default=0)
+        parser.add_argument("--initial-inventory", action="append", help="Estoque inicial por brand, ex.: SHORT=20,LONG=2")
+        parser.add_argument(
+            "--profile",
+            action="append",
+            help=f"Fixa a duração (ms) de uma etapa: {', '.join(SIM_STAGES)}",
+        )
+        parser.add_argument("--metrics-file", type=str, help="Texto do /metrics/ com o histograma task_duration_ms")
+        parser.add_argument("--history-days", type=int, default=30, help="Janela de StageExecution (0 = ignorar)")
+        parser.add_argument("--late-after-minutes", type=int, default=15)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--format", choices=["json", "csv"], default="json")
+        parser.add_argument("--output", type=str, help="Arquivo de saída (padrão: stdout)")
+
+    def handle(self, *args, **options):
+        if options["start"]:
+            try:
+                start = date.fromisoformat(options["start"])
+            except ValueError as exc:
+                raise CommandError("--start deve estar no formato YYYY-MM-DD.") from exc
+        else:
+            start = timezone.localdate() + timedelta(days=1)
+        days = max(1, options["days"])
+
+        tz = "America/Sao_Paulo"
+        if options["factory"]:
+            factory = Factory.objects.filter(pk=options["factory"]).first()
+            if factory is None:
+                raise CommandError(f"Factory {options['factory']} não encontrada.")
+            tz = factory.timezone or tz
+            slots = slots_for_factory(factory, start, days)
+        else:
+            brands = synthetic_brands(
+                max(1, options["brands"]),
+                posts_per_day=options["posts_per_day"],
+                long_posts_per_day=options["long_posts_per_day"],
+            )
+            slots = slots_for_brands(brands, start, days)
+
+        recorded = {}
+        if options["history_days"] > 0:
+            since = timezone.now() - timedelta(days=options["history_days"])
+            recorded.update(profiles_from_stage_executions(since=since))
+        if options["metrics_file"]:
+            with open(options["metrics_file"], encoding="utf-8") as fh:
+                for stage, profile in profiles_from_metrics_text(fh.read()).items():
+                    recorded.setdefault(stage, profile)
+        overrides = _key_values(options["profile"], cast=float, option="--profile")
+        unknown = set(overrides) - set(SIM_STAGES)
+        if unknown:
+            raise CommandError(f"--profile: etapa(s) desconhecida(s): {', '.join(sorted(unknown))}.")
+
+        try:
+            source_minutes = [float(x) for x in options["source_minutes"].split(",") if x.strip()]
+        except ValueError as exc:
+            raise CommandError("--source-minutes espera números separados por vírgula.") from exc
+        config = SimulationConfig(
+            start_day=start,
+            days=days,
+            workers=_key_values(options["workers"], cast=int, option="--workers"),
+            sources_per_day=max(0, options["sources_per_day"]),
+            source_minutes=source_minutes or [60.0],
+            shorts_per_source=max(0, options["shorts_per_source"]),
+            longs_per_source=max(0, options["longs_per_source"]),
+            initial_inventory=_key_values(options["initial_inventory"], cast=int, option="--initial-inventory"),
+            late_after_minutes=options["late_after_minutes"],
+            seed=options["seed"],
+        )
+        simulator = CapacitySimulator(config, build_profiles(recorded=recorded, overrides=overrides), slots)
+        summary = simulator.run(tz=tz)
+
+        out = open(options["output"], "w", encoding="utf-8", newline="") if options["output"] else None
+        stream = out or self.stdout
+        try:
+            if options["format"] == "json":
+                stream.write(json.dumps(summary, ensure_ascii=False, indent=2) + "\n")
+            else:
+                rows = simulator.timeline
+                buf = io.StringIO()
+                writer = csv.DictWriter(buf, fieldnames=list(rows[0]) if rows else ["at"])
+                writer.writeheader()
+                writer.writerows(rows)
+                stream.write(buf.getvalue())
+        finally:
+            if out:
+                out.close()
@@ -0,0 +1,94 @@
+"""Consolida o ledger diário de performance por etapa e aponta regressões contra uma baseline."""
+import json
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.jobs.models import StagePerformanceDaily
+from apps.jobs.services.stage_performance import detect_stage_regressions, rollup_stage_performance
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o ledger (StagePerformanceDaily) dos últimos dias e compara a janela atual com a "
+        "baseline por etapa/host/encoder (custo por segundo de mídia ou duração)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=str, default="", help="Último dia da janela (YYYY-MM-DD); padrão: hoje")
+        parser.add_argument("--rollup-days", type=int, default=2, help="Dias a reconsolidar antes do relatório")
+        parser.add_argument("--window-days", type=int, default=1)
+        parser.add_argument("--baseline-days", type=int, default=14)
+        parser.add_argument("--threshold", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%)")
+        parser.add_argument("--min-samples", type=int, default=5)
+        parser.add_argument("--format", choices=["text", "json"], default="text")
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Sai com erro quando houver regressão (uso em CI/cron)",
+        )
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            try:
+                end_day = date.fromisoformat(options["date"])
+            except ValueError as exc:
+                raise CommandError("--date deve estar no formato YYYY-MM-DD.") from exc
+        else:
+            end_day = timezone.localdate()
+
+        for offset in range(max(0, options["rollup_days"])):
+            rollup_stage_performance(end_day - timedelta(days=offset))
+
+        regressions = detect_stage_regressions(
+            end_day=end_day,
+            window_days=options["window_days"],
+            baseline_days=options["baseline_days"],
+            threshold=options["threshold"],
+            min_samples=options["min_samples"],
+        )
+
+        if options["format"] == "json":
+            rows = StagePerformanceDaily.objects.filter(day=end_day, worker_host=StagePerformanceDaily.ALL)
+            self.stdout.write(
+                json.dumps(
+                    {
+                        "day": str(end_day),
+                        "stages": {
+                            r.stage_name: {
+                                "samples": r.samples,
+                                "failures": r.failures,
+                                "duration_p50_ms": r.duration_p50_ms,
+                                "duration_p95_ms": r.duration_p95_ms,
+                                "cost_p50": r.cost_p50,
+                                "cost_p95": r.cost_p95,
+                            }
+                            for r in rows
+                        },
+                        "regressions": [r.as_dict() for r in regressions],
+                    },
+                    ensure_ascii=False,
+                    indent=2,
+                )
+                + "\n"
+            )
+        else:
+            for row in StagePerformanceDaily.objects.filter(day=end_day).order_by("stage_name", "worker_host", "encoder"):
+                cost = f" custo p50={row.cost_p50:.1f} ms/s" if row.cost_p50 is not None else ""
+                self.stdout.write(
+                    f"{row.stage_name:<16} {row.worker_host or '-':<20} {row.encoder or '-':<6} "
+                    f"n={row.samples} falhas={row.failures} p50={row.duration_p50_ms} p95={row.duration_p95_ms}{cost}"
+                )
+            for reg in regressions:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"REGRESSÃO {reg.stage_name} {reg.worker_host}/{reg.encoder} {reg.metric}: "
+                        f"{reg.baseline:.1f} -> {reg.current:.1f} (+{reg.change_pct:.0f}%)"
+                    )
+                )
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("Sem regressões."))
+
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regressão(ões) de performance detectada(s).")
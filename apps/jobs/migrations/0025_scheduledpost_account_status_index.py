@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0024_pipelineexecution_attempt_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(
+                fields=['social_account', 'status', 'scheduled_at'],
+                name='jobs_sp_acct_status_at_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0025_scheduledpost_account_status_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postedvideolog',
+            index=models.Index(fields=['posted_at', 'id'], name='jobs_pvl_posted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(fields=['scheduled_at', 'id'], name='jobs_sp_sched_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoinventoryitem',
+            index=models.Index(fields=['created_at', 'id'], name='jobs_inv_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_scope(apps, schema_editor):
+    ScheduledPost = apps.get_model("jobs", "ScheduledPost")
+    Job = apps.get_model("jobs", "Job")
+    AutoCutCorte = apps.get_model("auto_cuts", "AutoCutCorte")
+
+    job = Job.objects.filter(pk=OuterRef("job_id"))
+    ScheduledPost.objects.filter(job__isnull=False).update(
+        owner_user_id=Subquery(job.values("user_id")[:1]),
+        brand_id=Subquery(job.values("brand_id")[:1]),
+        factory_id=Subquery(job.values("brand__factory_id")[:1]),
+    )
+    corte = AutoCutCorte.objects.filter(pk=OuterRef("auto_cut_corte_id"))
+    ScheduledPost.objects.filter(job__isnull=True, auto_cut_corte__isnull=False).update(
+        owner_user_id=Subquery(corte.values("analysis__user_id")[:1]),
+        brand_id=Subquery(corte.values("analysis__brand_id")[:1]),
+        factory_id=Subquery(corte.values("analysis__brand__factory_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_cuts', '0033_keyset_pagination_indexes'),
+        ('brands', '0034_alter_brand_long_slot_times'),
+        ('jobs', '0026_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduledpost',
+            name='brand',
+            field=models.ForeignKey(blank=True, db_index=False, help_text='Brand da origem (job.brand ou corte.analysis.brand).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='brands.brand'),
+        ),
+        migrations.AddField(
+            model_name='scheduledpost',
+            name='factory',
+            field=models.ForeignKey(blank=True, db_index=False, help_text='Factory da brand de origem.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='brands.factory'),
+        ),
+        migrations.AddField(
+            model_name='scheduledpost',
+            name='owner_user',
+            field=models.ForeignKey(blank=True, db_index=False, help_text='Dono da origem (job.user ou corte.analysis.user).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(fields=['status', 'scheduled_at'], name='jobs_sp_status_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(fields=['owner_user', 'scheduled_at', 'id'], name='jobs_sp_owner_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(fields=['brand', 'status', 'scheduled_at'], name='jobs_sp_brand_status_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(fields=['factory', 'status', 'scheduled_at'], name='jobs_sp_fac_status_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledpost',
+            index=models.Index(fields=['factory', 'status', 'posted_at'], name='jobs_sp_fac_status_post_idx'),
+        ),
+        migrations.RunPython(backfill_scope, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0027_scheduledpost_scope'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stageexecution',
+            name='encoder',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='stageexecution',
+            name='media_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stageexecution',
+            name='worker_host',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.CreateModel(
+            name='StagePerformanceDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('stage_name', models.CharField(max_length=64)),
+                ('worker_host', models.CharField(blank=True, default='', max_length=255)),
+                ('encoder', models.CharField(blank=True, default='', max_length=32)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('duration_p50_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('duration_p95_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('duration_p99_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('cost_samples', models.PositiveIntegerField(default=0)),
+                ('cost_p50', models.FloatField(blank=True, null=True)),
+                ('cost_p95', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-day', 'stage_name', 'worker_host', 'encoder'],
+                'indexes': [models.Index(fields=['stage_name', 'day'], name='jobs_stage_perf_stage_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'stage_name', 'worker_host', 'encoder'), name='jobs_stage_perf_day_uniq')],
+            },
+        ),
+    ]
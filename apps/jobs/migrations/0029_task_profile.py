@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0028_stage_performance_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(db_index=True, max_length=255)),
+                ('task_name', models.CharField(max_length=255)),
+                ('queue_name', models.CharField(blank=True, default='', max_length=64)),
+                ('status', models.CharField(blank=True, default='', max_length=16)),
+                ('mode', models.CharField(default='sampler', max_length=16)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('db_queries', models.PositiveIntegerField(default=0)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('phases', models.JSONField(blank=True, default=dict)),
+                ('profile_text', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['task_name', 'created_at'], name='jobs_task_profile_name_idx')],
+            },
+        ),
+    ]
@@ -218,6 +218,10 @@ class StageExecution(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    # Contexto para o ledger de performance (custo normalizado por segundo de mídia).
+    worker_host = models.CharField(max_length=255, blank=True, default="")
+    encoder = models.CharField(max_length=32, blank=True, default="")
+    media_seconds = models.FloatField(null=True, blank=True)
     input_payload = models.JSONField(default=dict, blank=True)
     output_payload = models.JSONField(default=dict, blank=True)
     error_class = models.CharField(max_length=255, blank=True, default="")
@@ -248,6 +252,76 @@ class StageExecution(models.Model):
         return f"{self.pipeline_execution_id}:{self.stage_name} ({self.status})"
 
 
+class StagePerformanceDaily(models.Model):
+    """
+    Ledger diário de performance por etapa, host e encoder (percentis de duração e de custo
+    normalizado). Linhas com ``worker_host``/``encoder`` = ``"*"`` agregam todos os nós.
+    """
+
+    ALL = "*"
+
+    day = models.DateField()
+    stage_name = models.CharField(max_length=64)
+    worker_host = models.CharField(max_length=255, blank=True, default="")
+    encoder = models.CharField(max_length=32, blank=True, default="")
+    samples = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    duration_p50_ms = models.PositiveIntegerField(null=True, blank=True)
+    duration_p95_ms = models.PositiveIntegerField(null=True, blank=True)
+    duration_p99_ms = models.PositiveIntegerField(null=True, blank=True)
+    # ms de processamento por segundo de mídia (transcrição: RTF x 1000; render: ms por s de saída).
+    cost_samples = models.PositiveIntegerField(default=0)
+    cost_p50 = models.FloatField(null=True, blank=True)
+    cost_p95 = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "stage_name", "worker_host", "encoder"],
+                name="jobs_stage_perf_day_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["stage_name", "day"], name="jobs_stage_perf_stage_idx"),
+        ]
+        ordering = ["-day", "stage_name", "worker_host", "encoder"]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.stage_name} {self.worker_host}/{self.encoder}"
+
+
+class TaskProfile(models.Model):
+    """
+    Perfil amostrado de uma execução de task Celery (apps/common/task_profiling.py).
+
+    ``phases`` guarda ms/chamadas por fase (subprocess, db, http, python); ``profile_text``
+    guarda stacks colapsadas (modo sampler, prontas para flamegraph) ou o relatório pstats.
+    """
+
+    task_id = models.CharField(max_length=255, db_index=True)
+    task_name = models.CharField(max_length=255)
+    queue_name = models.CharField(max_length=64, blank=True, default="")
+    status = models.CharField(max_length=16, blank=True, default="")
+    mode = models.CharField(max_length=16, default="sampler")
+    started_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(default=0)
+    db_queries = models.PositiveIntegerField(default=0)
+    samples = models.PositiveIntegerField(default=0)
+    phases = models.JSONField(default=dict, blank=True)
+    profile_text = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task_name", "created_at"], name="jobs_task_profile_name_idx"),
+        ]
+        ordering = ["-id"]
+
+    def __str__(self) -> str:
+        return f"{self.task_name} {self.task_id} ({self.duration_ms} ms)"
+
+
 class DeadLetterJob(models.Model):
     class Status(models.TextChoices):
         OPEN = "open", "Open"
@@ -410,6 +484,90 @@ class ScheduledPost(models.Model):
     error = models.TextField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     posted_at = models.DateTimeField(null=True, blank=True)
+    # Escopo denormalizado da origem (job ou corte): filtros por dono/brand/factory sem
+    # OR entre dois caminhos de JOIN. Preenchido no save; ``backfill_scheduled_post_scope``
+    # recalcula registros antigos.
+    owner_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+        help_text="Dono da origem (job.user ou corte.analysis.user).",
+    )
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+        help_text="Brand da origem (job.brand ou corte.analysis.brand).",
+    )
+    factory = models.ForeignKey(
+        Factory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+        help_text="Factory da brand de origem.",
+    )
+
+    class Meta:
+        indexes = [
+            # Pool de vídeos recentes por brand (descrição YouTube: bloco "Mais vídeos").
+            models.Index(
+                fields=["social_account", "status", "scheduled_at"],
+                name="jobs_sp_acct_status_at_idx",
+            ),
+            # Paginação keyset da API (cursor em scheduled_at, id).
+            models.Index(fields=["scheduled_at", "id"], name="jobs_sp_sched_at_id_idx"),
+            # Scheduler (PENDING vencidos) e janelas por status.
+            models.Index(fields=["status", "scheduled_at"], name="jobs_sp_status_at_idx"),
+            # Listagem da API por dono (keyset em scheduled_at, id).
+            models.Index(fields=["owner_user", "scheduled_at", "id"], name="jobs_sp_owner_at_id_idx"),
+            models.Index(fields=["brand", "status", "scheduled_at"], name="jobs_sp_brand_status_at_idx"),
+            models.Index(fields=["factory", "status", "scheduled_at"], name="jobs_sp_fac_status_at_idx"),
+            # Dashboard da factory (DONE ordenado por posted_at).
+            models.Index(fields=["factory", "status", "posted_at"], name="jobs_sp_fac_status_post_idx"),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._scope_origin = self._origin_ids()
+
+    def _origin_ids(self) -> tuple[int | None, int | None]:
+        # __dict__ direto: com .only() os ids podem estar adiados e não devem disparar query.
+        return self.__dict__.get("job_id"), self.__dict__.get("auto_cut_corte_id")
+
+    def resolve_scope(self) -> tuple[int | None, int | None, int | None]:
+        """(owner_user_id, brand_id, factory_id) da origem atual, em uma query."""
+        if self.job_id:
+            row = Job.objects.filter(pk=self.job_id).values_list("user_id", "brand_id", "brand__factory_id").first()
+        elif self.auto_cut_corte_id:
+            row = (
+                AutoCutCorte.objects.filter(pk=self.auto_cut_corte_id)
+                .values_list("analysis__user_id", "analysis__brand_id", "analysis__brand__factory_id")
+                .first()
+            )
+        else:
+            row = None
+        return row or (None, None, None)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        origin = self._origin_ids()
+        origin_saved = update_fields is None or bool({"job", "auto_cut_corte"} & set(update_fields))
+        # Só na criação ou troca de origem: saves de status não consultam job/corte de novo
+        # (registros anteriores ao escopo ficam com ``backfill_scheduled_post_scope``).
+        if self._state.adding or (origin_saved and origin != self._scope_origin):
+            self.owner_user_id, self.brand_id, self.factory_id = self.resolve_scope()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"owner_user", "brand", "factory"}
+        super().save(*args, **kwargs)
+        self._scope_origin = origin
 
     def __str__(self) -> str:
         if self.job_id:
@@ -504,6 +662,10 @@ class VideoInventoryItem(models.Model):
 
     class Meta:
         ordering = ["status", "-virality_score", "id"]
+        indexes = [
+            # Paginação keyset da API (cursor em created_at, id).
+            models.Index(fields=["created_at", "id"], name="jobs_inv_created_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.brand} {self.video_type} ({self.status})"
@@ -731,6 +893,9 @@ class PostedVideoLog(models.Model):
 
     class Meta:
         ordering = ["-posted_at", "-id"]
+        indexes = [
+            models.Index(fields=["posted_at", "id"], name="jobs_pvl_posted_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.brand} {self.external_platform} {self.posted_at}"
@@ -0,0 +1,451 @@
+"""
+Simulador de capacidade (eventos discretos, determinístico) do pipeline da fábrica de conteúdo.
+
+Usa o código real de planejamento para gerar a carga:
+
+- slots de postagem: ``DailyPostingPlanService.generate_horizon(dry_run=True)`` para uma
+  factory existente, ou ``_compute_day_plan`` para brands sintéticas (sem gravar nada);
+- transcrição: um job por chunk de ``get_chunk_boundaries`` (como ``analyze_auto_cuts_task``);
+- análise (LLM): uma chamada por chunk de ``chunk_transcript`` sobre o transcript do vídeo;
+- render: um job por corte (shorts/longos) na fila de render;
+- publicação: no horário do slot consome um item AVAILABLE da brand e do tipo do slot (mesma
+  regra de ``generate_daily_schedule_for_factory``); sem item o slot é perdido.
+
+As durações vêm de ``StageExecution.duration_ms`` e/ou do histograma ``task_duration_ms``
+(texto do ``/metrics/``), com padrões conservadores quando não há amostras.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+from apps.auto_cuts.services.transcript import chunk_transcript
+from apps.auto_cuts.services.video_chunks import get_chunk_boundaries
+from apps.brands.models import Brand, Factory
+from apps.jobs.models import DailyPostingPlan, StageExecution
+
+from .channel_schedule_config import ChannelScheduleConfig
+from .daily_posting_plan_service import (
+    DailyPostingPlanService,
+    _compute_day_plan,
+    _rng_for_brand_day,
+)
+
+STAGE_TRANSCRIPTION = "transcription"
+STAGE_ANALYSIS = "analysis"
+STAGE_RENDER = "render"
+STAGE_RENDER_LONG = "render_long"
+STAGE_PUBLISH = "publish"
+SIM_STAGES = (STAGE_TRANSCRIPTION, STAGE_ANALYSIS, STAGE_RENDER, STAGE_RENDER_LONG, STAGE_PUBLISH)
+
+# Durações padrão (ms por tarefa) quando não há histórico.
+DEFAULT_STAGE_MS = {
+    STAGE_TRANSCRIPTION: 240_000.0,
+    STAGE_ANALYSIS: 20_000.0,
+    STAGE_RENDER: 90_000.0,
+    STAGE_RENDER_LONG: 360_000.0,
+    STAGE_PUBLISH: 30_000.0,
+}
+
+# StageExecution.stage_name -> etapa simulada.
+_STAGE_EXECUTION_MAP = {
+    "transcription": STAGE_TRANSCRIPTION,
+    "subtitle_burn": STAGE_RENDER,
+    "job_processing": STAGE_RENDER,
+}
+
+# Sufixo do task_name (label do task_duration_ms) -> etapa simulada.
+_TASK_NAME_MAP = {
+    "generate_subtitles_task": STAGE_TRANSCRIPTION,
+    "burn_subtitles_task": STAGE_RENDER,
+    "process_job": STAGE_RENDER,
+    "finalizar_auto_cut_task": STAGE_RENDER,
+    "post_to_platforms_task": STAGE_PUBLISH,
+}
+
+_BUCKET_RE = re.compile(r"^task_duration_ms_bucket\{(?P<labels>[^}]*)\}\s+(?P<value>\S+)")
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _stage_queues() -> dict[str, str]:
+    transcription = getattr(settings, "CELERY_QUEUE_TRANSCRIPTION", "transcription")
+    render = getattr(settings, "CELERY_QUEUE_RENDER", "render")
+    return {
+        STAGE_TRANSCRIPTION: transcription,
+        STAGE_ANALYSIS: transcription,
+        STAGE_RENDER: render,
+        STAGE_RENDER_LONG: render,
+        STAGE_PUBLISH: "publish",
+    }
+
+
+@dataclass
+class DurationProfile:
+    """Distribuição empírica (valor em ms, peso) de uma etapa; amostrada com o rng da simulação."""
+
+    values: list[float] = field(default_factory=list)
+    weights: list[float] = field(default_factory=list)
+    source: str = "default"
+
+    def add(self, value_ms: float, weight: float = 1.0) -> None:
+        if value_ms > 0 and weight > 0:
+            self.values.append(float(value_ms))
+            self.weights.append(float(weight))
+
+    def sample(self, rng) -> float:
+        if len(self.values) == 1:
+            return self.values[0]
+        return rng.choices(self.values, weights=self.weights, k=1)[0]
+
+    def mean(self) -> float:
+        total = sum(self.weights)
+        return sum(v * w for v, w in zip(self.values, self.weights, strict=True)) / total if total else 0.0
+
+
+def profiles_from_stage_executions(*, since: datetime | None = None) -> dict[str, DurationProfile]:
+    """Amostras de ``StageExecution.duration_ms`` (etapas concluídas)."""
+    qs = StageExecution.objects.filter(
+        status=StageExecution.Status.COMPLETED,
+        duration_ms__isnull=False,
+        stage_name__in=list(_STAGE_EXECUTION_MAP),
+    )
+    if since is not None:
+        qs = qs.filter(completed_at__gte=since)
+    profiles: dict[str, DurationProfile] = {}
+    for stage_name, duration_ms in qs.values_list("stage_name", "duration_ms").iterator():
+        stage = _STAGE_EXECUTION_MAP[stage_name]
+        profiles.setdefault(stage, DurationProfile(source="stage_execution")).add(duration_ms)
+    return profiles
+
+
+def profiles_from_metrics_text(text: str) -> dict[str, DurationProfile]:
+    """
+    Converte os buckets cumulativos de ``task_duration_ms`` (formato texto do Prometheus)
+    em distribuições: cada bucket vira o ponto médio entre os limites, pesado pela contagem.
+    """
+    buckets: dict[str, dict[float, float]] = {}
+    for line in text.splitlines():
+        m = _BUCKET_RE.match(line.strip())
+        if not m:
+            continue
+        labels = dict(_LABEL_RE.findall(m.group("labels")))
+        stage = _TASK_NAME_MAP.get(labels.get("task_name", "").rsplit(".", 1)[-1])
+        if stage is None or "le" not in labels:
+            continue
+        le = math.inf if labels["le"] in ("+Inf", "inf") else float(labels["le"])
+        per_stage = buckets.setdefault(stage, {})
+        per_stage[le] = per_stage.get(le, 0.0) + float(m.group("value"))
+
+    profiles: dict[str, DurationProfile] = {}
+    for stage, cumulative in buckets.items():
+        profile = DurationProfile(source="task_duration_ms")
+        previous_le, previous_count = 0.0, 0.0
+        for le in sorted(cumulative):
+            count = cumulative[le] - previous_count
+            value = previous_le * 2 if math.isinf(le) else (previous_le + le) / 2
+            profile.add(value, count)
+            previous_count = cumulative[le]
+            if not math.isinf(le):
+                previous_le = le
+        if profile.values:
+            profiles[stage] = profile
+    return profiles
+
+
+def build_profiles(
+    *,
+    recorded: dict[str, DurationProfile] | None = None,
+    overrides: dict[str, float] | None = None,
+) -> dict[str, DurationProfile]:
+    """Completa as etapas sem amostras: override > histórico > padrão (render longo = 4x render)."""
+    recorded = recorded or {}
+    overrides = overrides or {}
+    profiles: dict[str, DurationProfile] = {}
+    for stage in SIM_STAGES:
+        if stage in overrides:
+            profile = DurationProfile(source="override")
+            profile.add(overrides[stage])
+        elif recorded.get(stage) and recorded[stage].values:
+            profile = recorded[stage]
+        elif stage == STAGE_RENDER_LONG and STAGE_RENDER in profiles and profiles[STAGE_RENDER].source != "default":
+            base = profiles[STAGE_RENDER]
+            profile = DurationProfile(values=[v * 4 for v in base.values], weights=list(base.weights), source="render x4")
+        else:
+            profile = DurationProfile(source="default")
+            profile.add(DEFAULT_STAGE_MS[stage])
+        profiles[stage] = profile
+    return profiles
+
+
+@dataclass
+class SimulationConfig:
+    start_day: date
+    days: int = 1
+    workers: dict[str, int] = field(default_factory=dict)  # fila -> slots de concorrência
+    sources_per_day: int = 0
+    source_minutes: list[float] = field(default_factory=lambda: [60.0])
+    shorts_per_source: int = 8
+    longs_per_source: int = 0
+    initial_inventory: dict[str, int] = field(default_factory=dict)  # SHORT/LONG por brand
+    late_after_minutes: int = 15
+    seed: int = 0
+
+
+@dataclass
+class Slot:
+    brand_id: int
+    video_type: str
+    at: datetime
+
+
+def slots_for_factory(factory: Factory, start_day: date, days: int, *, brand_ids=None) -> list[Slot]:
+    """Slots do horizonte de uma factory real, via planejador em dry-run (nada é gravado)."""
+    entries = DailyPostingPlanService.generate_horizon(factory, start_day, days, brand_ids=brand_ids, dry_run=True)
+    return [
+        Slot(brand_id=e.brand_id, video_type=vt, at=dt)
+        for e in entries
+        if e.status == DailyPostingPlan.Status.GENERATED
+        for dt, vt in e.slots
+    ]
+
+
+def synthetic_brands(
+    count: int,
+    *,
+    posts_per_day: int,
+    long_posts_per_day: int = 0,
+    start: time = time(8, 0),
+    end: time = time(22, 0),
+    min_gap_minutes: int = 30,
+) -> list[Brand]:
+    """Brands em memória (não salvas) com a configuração de agenda informada."""
+    return [
+        Brand(
+            id=-(i + 1),
+            name=f"sim-{i + 1}",
+            slug=f"sim-{i + 1}",
+            base_start_time=start,
+            base_end_time=end,
+            daily_min_posts=posts_per_day,
+            daily_max_posts=posts_per_day,
+            daily_min_long_posts=long_posts_per_day,
+            daily_max_long_posts=long_posts_per_day,
+            min_gap_minutes=min_gap_minutes,
+            max_gap_minutes=max(min_gap_minutes, 240),
+            active_weekdays=list(range(7)),
+        )
+        for i in range(count)
+    ]
+
+
+def slots_for_brands(brands: list[Brand], start_day: date, days: int) -> list[Slot]:
+    """Slots de brands (reais ou sintéticas) com a mesma regra do plano diário, sem banco."""
+    slots: list[Slot] = []
+    for brand in brands:
+        cfg = ChannelScheduleConfig.from_brand(brand)
+        yesterday = None
+        for i in range(days):
+            day = start_day + timedelta(days=i)
+            draft = _compute_day_plan(brand, cfg, day, _rng_for_brand_day(brand.id, day), yesterday_count=yesterday)
+            generated = draft.status == DailyPostingPlan.Status.GENERATED
+            yesterday = draft.planned_posts_count if generated else None
+            slots.extend(Slot(brand_id=brand.id, video_type=vt, at=dt.astimezone(UTC)) for dt, vt in draft.pairs)
+    return slots
+
+
+def _synthetic_segments(duration_sec: float, step_sec: float = 10.0) -> list[dict]:
+    n = max(1, int(math.ceil(duration_sec / step_sec)))
+    return [
+        {"start": i * step_sec, "end": min(duration_sec, (i + 1) * step_sec), "text": "."}
+        for i in range(n)
+    ]
+
+
+@dataclass
+class _QueueState:
+    workers: int
+    pending: deque = field(default_factory=deque)
+    running: int = 0
+    tasks: int = 0
+    busy_ms: float = 0.0
+    max_backlog: int = 0
+    waits_ms: list[float] = field(default_factory=list)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(math.ceil(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+class CapacitySimulator:
+    """
+    Fila por nome (como no Celery), cada uma com N slots de worker; tarefas FIFO. O tempo
+    avança por eventos (chegada de vídeo, fim de tarefa, horário de slot) num heap.
+    """
+
+    def __init__(self, config: SimulationConfig, profiles: dict[str, DurationProfile], slots: list[Slot]):
+        import random
+
+        self.config = config
+        self.profiles = profiles
+        self.slots = sorted(slots, key=lambda s: (s.at, s.brand_id))
+        self.rng = random.Random(config.seed)
+        self.stage_queues = _stage_queues()
+        self.queues: dict[str, _QueueState] = {}
+        for queue in dict.fromkeys(self.stage_queues.values()):
+            self.queues[queue] = _QueueState(workers=max(0, int(config.workers.get(queue, 1))))
+        self.brand_ids = sorted({s.brand_id for s in self.slots}) or [0]
+        self.inventory: dict[tuple[int, str], int] = {}
+        for brand_id in self.brand_ids:
+            for video_type, n in config.initial_inventory.items():
+                self.inventory[(brand_id, video_type)] = int(n)
+        self._events: list = []
+        self._end_ms = 0.0
+        self._seq = 0
+        self.slot_stats = {"planned": len(self.slots), "published": 0, "missed": 0, "late": 0}
+        self.timeline: list[dict] = []
+
+    def _push(self, at: float, kind: str, payload) -> None:
+        self._seq += 1
+        heapq.heappush(self._events, (at, self._seq, kind, payload))
+
+    def _submit(self, now: float, stage: str, payload: dict) -> None:
+        queue = self.queues[self.stage_queues[stage]]
+        queue.pending.append((now, stage, payload))
+        queue.max_backlog = max(queue.max_backlog, len(queue.pending))
+        self._dispatch(now, self.stage_queues[stage])
+
+    def _dispatch(self, now: float, queue_name: str) -> None:
+        queue = self.queues[queue_name]
+        while queue.pending and queue.running < queue.workers:
+            enqueued_at, stage, payload = queue.pending.popleft()
+            duration = self.profiles[stage].sample(self.rng)
+            queue.running += 1
+            queue.tasks += 1
+            queue.busy_ms += max(0.0, min(duration, self._end_ms - now))
+            queue.waits_ms.append(now - enqueued_at)
+            self._push(now + duration, "done", (queue_name, stage, payload))
+
+    def _on_source(self, now: float, payload: dict) -> None:
+        duration_sec = payload["duration_sec"]
+        boundaries = get_chunk_boundaries(duration_sec)
+        analysis_calls = len(chunk_transcript(_synthetic_segments(duration_sec)))
+        source = {**payload, "pending_chunks": len(boundaries), "analysis_calls": analysis_calls}
+        for _ in boundaries:
+            self._submit(now, STAGE_TRANSCRIPTION, source)
+
+    def _on_done(self, now: float, stage: str, payload: dict) -> None:
+        if stage == STAGE_TRANSCRIPTION:
+            payload["pending_chunks"] -= 1
+            if payload["pending_chunks"] == 0:
+                payload["pending_calls"] = payload["analysis_calls"]
+                for _ in range(payload["analysis_calls"]):
+                    self._submit(now, STAGE_ANALYSIS, payload)
+        elif stage == STAGE_ANALYSIS:
+            payload["pending_calls"] -= 1
+            if payload["pending_calls"] == 0:
+                brand_id = payload["brand_id"]
+                for _ in range(self.config.shorts_per_source):
+                    self._submit(now, STAGE_RENDER, {"brand_id": brand_id, "video_type": "SHORT"})
+                for _ in range(self.config.longs_per_source):
+                    self._submit(now, STAGE_RENDER_LONG, {"brand_id": brand_id, "video_type": "LONG"})
+        elif stage in (STAGE_RENDER, STAGE_RENDER_LONG):
+            key = (payload["brand_id"], payload["video_type"])
+            self.inventory[key] = self.inventory.get(key, 0) + 1
+        elif stage == STAGE_PUBLISH:
+            if now - payload["slot_ms"] > self.config.late_after_minutes * 60_000:
+                self.slot_stats["late"] += 1
+            self.slot_stats["published"] += 1
+
+    def _on_slot(self, now: float, slot: Slot) -> None:
+        key = (slot.brand_id, slot.video_type)
+        if self.inventory.get(key, 0) <= 0:
+            self.slot_stats["missed"] += 1
+            return
+        self.inventory[key] -= 1
+        self._submit(now, STAGE_PUBLISH, {"slot_ms": now})
+
+    def _snapshot(self, now: float) -> None:
+        row = {"at": self._to_datetime(now).isoformat()}
+        for name, queue in self.queues.items():
+            row[f"backlog_{name}"] = len(queue.pending)
+            row[f"running_{name}"] = queue.running
+        row["inventory_short"] = sum(n for (_, vt), n in self.inventory.items() if vt == "SHORT")
+        row["inventory_long"] = sum(n for (_, vt), n in self.inventory.items() if vt == "LONG")
+        row["slots_missed"] = self.slot_stats["missed"]
+        self.timeline.append(row)
+
+    def _to_ms(self, dt: datetime) -> float:
+        return (dt - self._origin).total_seconds() * 1000.0
+
+    def _to_datetime(self, ms: float) -> datetime:
+        return self._origin + timedelta(milliseconds=ms)
+
+    def run(self, *, tz: str = "America/Sao_Paulo") -> dict:
+        cfg = self.config
+        self._origin = datetime.combine(cfg.start_day, time(0, 0), tzinfo=ZoneInfo(tz)).astimezone(UTC)
+        end_ms = self._end_ms = cfg.days * 86_400_000.0
+        for d in range(cfg.days):
+            for i in range(cfg.sources_per_day):
+                at = d * 86_400_000.0 + (i + 0.5) * 86_400_000.0 / cfg.sources_per_day
+                minutes = cfg.source_minutes[(d * cfg.sources_per_day + i) % len(cfg.source_minutes)]
+                brand_id = self.brand_ids[(d * cfg.sources_per_day + i) % len(self.brand_ids)]
+                self._push(at, "source", {"brand_id": brand_id, "duration_sec": minutes * 60.0})
+        for slot in self.slots:
+            self._push(self._to_ms(slot.at), "slot", slot)
+        for h in range(cfg.days * 24 + 1):
+            self._push(h * 3_600_000.0, "tick", None)
+
+        while self._events and self._events[0][0] <= end_ms:
+            now, _, kind, payload = heapq.heappop(self._events)
+            if kind == "source":
+                self._on_source(now, payload)
+            elif kind == "slot":
+                self._on_slot(now, payload)
+            elif kind == "tick":
+                self._snapshot(now)
+            else:
+                queue_name, stage, task_payload = payload
+                self.queues[queue_name].running -= 1
+                self._on_done(now, stage, task_payload)
+                self._dispatch(now, queue_name)
+        return self.summary(end_ms)
+
+    def summary(self, horizon_ms: float) -> dict:
+        queues = {}
+        for name, queue in self.queues.items():
+            capacity = queue.workers * horizon_ms
+            queues[name] = {
+                "workers": queue.workers,
+                "tasks_started": queue.tasks,
+                "utilization": round(min(1.0, queue.busy_ms / capacity), 4) if capacity else None,
+                "max_backlog": queue.max_backlog,
+                "backlog_at_end": len(queue.pending) + queue.running,
+                "wait_p50_ms": round(_percentile(queue.waits_ms, 50)),
+                "wait_p95_ms": round(_percentile(queue.waits_ms, 95)),
+            }
+        return {
+            "start_day": str(self.config.start_day),
+            "days": self.config.days,
+            "seed": self.config.seed,
+            "profiles": {
+                stage: {"source": p.source, "mean_ms": round(p.mean())} for stage, p in self.profiles.items()
+            },
+            "queues": queues,
+            "slots": dict(self.slot_stats),
+            "inventory_at_end": {
+                "SHORT": sum(n for (_, vt), n in self.inventory.items() if vt == "SHORT"),
+                "LONG": sum(n for (_, vt), n in self.inventory.items() if vt == "LONG"),
+            },
+        }
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import logging
+from dataclasses import dataclass, field
 from datetime import UTC, date, datetime, time, timedelta
 from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
@@ -11,7 +12,7 @@ from zoneinfo import ZoneInfo
 from django.conf import settings
 from django.db import transaction
 
-from apps.brands.models import Brand
+from apps.brands.models import Brand, Factory
 from apps.jobs.logging_utils import log_event
 from apps.jobs.models import DailyPostingPlan, DailyPostingPlanItem
 
@@ -23,13 +24,16 @@ from .posting_window_calculator import (
 )
 
 if TYPE_CHECKING:
-    pass
+    from collections.abc import Iterable
 
 logger = logging.getLogger(__name__)
 
 # Penalidade suave: evita repetir o mesmo volume vários dias seguidos (não é regra rígida).
 _REPEAT_PENALTY_WEIGHT = 0.35
 
+# Sentinela: volume de ontem ainda não conhecido (consultar o banco).
+_YESTERDAY_FROM_DB = object()
+
 
 def _rng_for_brand_day(brand_id: int, day: date, attempt: int = 0):
     import random
@@ -60,7 +64,13 @@ def _yesterday_planned_count(brand_id: int, day: date) -> int | None:
     return int(row)
 
 
-def _pick_target_total(cfg: ChannelScheduleConfig, brand_id: int, day: date, rng) -> int:
+def _pick_target_total(
+    cfg: ChannelScheduleConfig,
+    brand_id: int,
+    day: date,
+    rng,
+    yesterday=_YESTERDAY_FROM_DB,
+) -> int:
     lo = max(0, cfg.daily_min_posts)
     hi = max(lo, cfg.daily_max_posts)
     if hi == 0:
@@ -68,7 +78,8 @@ def _pick_target_total(cfg: ChannelScheduleConfig, brand_id: int, day: date, rng
     candidates = list(range(lo, hi + 1))
     if not candidates:
         return 0
-    yesterday = _yesterday_planned_count(brand_id, day)
+    if yesterday is _YESTERDAY_FROM_DB:
+        yesterday = _yesterday_planned_count(brand_id, day)
     weights = []
     for c in candidates:
         w = 1.0
@@ -386,6 +397,149 @@ def _verify_sorted_chain_min_gap(times: list[datetime], min_gap_minutes: int) ->
     return True
 
 
+@dataclass
+class DayPlanDraft:
+    """Plano de um dia calculado em memória (status, horários locais e tipos), sem escrita."""
+
+    status: str
+    planned_posts_count: int = 0
+    last_error: str = ""
+    pairs: list[tuple[datetime, str]] = field(default_factory=list)
+    log_event: str = "daily_plan_generated"
+    log_fields: dict = field(default_factory=dict)
+
+
+def _skipped_draft(reason: str) -> DayPlanDraft:
+    return DayPlanDraft(
+        status=DailyPostingPlan.Status.SKIPPED,
+        log_event="daily_plan_skipped",
+        log_fields={"reason": reason},
+    )
+
+
+def _error_draft(error: str, **log_fields) -> DayPlanDraft:
+    return DayPlanDraft(
+        status=DailyPostingPlan.Status.ERROR,
+        last_error=error,
+        log_event="daily_plan_error",
+        log_fields={"error": error, **log_fields},
+    )
+
+
+def _compute_day_plan(
+    brand: Brand,
+    cfg: ChannelScheduleConfig,
+    day: date,
+    rng,
+    *,
+    yesterday_count=_YESTERDAY_FROM_DB,
+) -> DayPlanDraft:
+    """
+    Calcula o plano do dia (janela, volume, longos ancorados, horários). Sem acesso ao
+    banco além do volume de ontem quando ``yesterday_count`` não é informado.
+    """
+    if not cfg.enabled or cfg.paused:
+        return _skipped_draft("disabled_or_paused")
+    if day.weekday() not in cfg.active_weekdays:
+        return _skipped_draft("weekday_not_active")
+
+    win, err = compute_effective_window(cfg=cfg, day=day, rng=rng)
+    if err or win is None:
+        return _error_draft(err or "invalid_window")
+
+    wmin = window_length_minutes(win)
+    max_fit = max_posts_for_window(window_minutes=wmin, min_gap_minutes=cfg.min_gap_minutes)
+
+    target_total = _pick_target_total(cfg, brand.id, day, rng, yesterday_count)
+    if target_total > max_fit:
+        target_total = max_fit
+    if target_total < cfg.daily_min_posts and cfg.daily_min_posts <= max_fit:
+        target_total = cfg.daily_min_posts
+    if target_total > cfg.daily_max_posts:
+        target_total = cfg.daily_max_posts
+    if target_total > max_fit:
+        target_total = max_fit
+    if target_total <= 0:
+        return _error_draft(
+            "janela_operacional_insuficiente_para_min_posts",
+            window_minutes=wmin,
+            max_fit=max_fit,
+        )
+
+    long_n = _pick_long_count(cfg, target_total, rng)
+    long_n = min(long_n, target_total)
+
+    slot_strings = _long_slot_strings_from_brand(brand)
+    if slot_strings and long_n > 0:
+        merged, merge_err = _generate_times_with_long_anchors(
+            win_start=win.window_start_local,
+            win_end=win.window_end_local,
+            target_total=target_total,
+            long_n=long_n,
+            slot_strings=slot_strings,
+            day=day,
+            tzname=cfg.timezone,
+            cfg=cfg,
+            rng=rng,
+        )
+        if merge_err or merged is None:
+            return _error_draft(merge_err or "falha_plano_com_ancoras_longas")
+        pairs = merged
+    else:
+        times = _generate_uneven_times(
+            start=win.window_start_local,
+            end=win.window_end_local,
+            n=target_total,
+            min_gap_minutes=cfg.min_gap_minutes,
+            max_gap_minutes=cfg.max_gap_minutes,
+            rng=rng,
+        )
+        if times is None or len(times) != target_total:
+            return _error_draft("falha_ao_distribuir_horarios_na_janela")
+        types = _assign_video_types(target_total, long_n, rng)
+        pairs = list(zip(times, types, strict=True))
+
+    return DayPlanDraft(
+        status=DailyPostingPlan.Status.GENERATED,
+        planned_posts_count=target_total,
+        pairs=pairs,
+    )
+
+
+def _plan_items(plan: DailyPostingPlan, pairs: list[tuple[datetime, str]]) -> list[DailyPostingPlanItem]:
+    return [
+        DailyPostingPlanItem(
+            plan=plan,
+            order_index=i,
+            video_type=vt,
+            scheduled_at=dt.astimezone(UTC),
+            status=DailyPostingPlanItem.Status.PLANNED,
+        )
+        for i, (dt, vt) in enumerate(pairs)
+    ]
+
+
+@dataclass
+class HorizonEntry:
+    """Resultado do planejador de horizonte para uma brand/dia (também usado no dry-run)."""
+
+    brand_id: int
+    plan_date: date
+    action: str  # reuse | create | regenerate | blocked
+    status: str
+    slots: list[tuple[datetime, str]] = field(default_factory=list)
+    previous_slots: list[tuple[datetime, str]] = field(default_factory=list)
+    last_error: str = ""
+    # Plano gravado (None em create/regenerate no dry-run): o scheduler usa direto, sem recarregar.
+    plan: DailyPostingPlan | None = field(default=None, repr=False)
+
+    def diff(self) -> tuple[list[tuple[datetime, str]], list[tuple[datetime, str]]]:
+        """(slots novos, slots removidos) em relação ao plano gravado."""
+        before = set(self.previous_slots)
+        after = set(self.slots)
+        return sorted(after - before), sorted(before - after)
+
+
 class DailyPostingPlanService:
     """Get-or-create seguro do plano diário (sem recriar destrutivamente)."""
 
@@ -409,6 +563,10 @@ class DailyPostingPlanService:
         rng = _rng_for_brand_day(brand.id, day, attempt=attempt)
         cfg = ChannelScheduleConfig.from_brand(brand)
 
+        # Mesma ordem de locks do generate_horizon (Factory, depois planos): um create por
+        # brand não corre com o bulk_create do horizonte da factory.
+        if brand.factory_id:
+            Factory.objects.select_for_update().filter(pk=brand.factory_id).values_list("pk", flat=True).first()
         plan = (
             DailyPostingPlan.objects.select_for_update()
             .filter(brand=brand, plan_date=day)
@@ -478,157 +636,24 @@ class DailyPostingPlanService:
         plan.generated_at = datetime.now(UTC)
         plan.last_error = ""
 
-        if not cfg.enabled or cfg.paused:
-            plan.status = DailyPostingPlan.Status.SKIPPED
-            plan.planned_posts_count = 0
-            plan.save()
-            log_event(
-                logger,
-                event="daily_plan_skipped",
-                correlation_id=correlation_id,
-                brand_id=brand.id,
-                plan_date=str(day),
-                reason="disabled_or_paused",
-            )
-            return plan
-
-        if day.weekday() not in cfg.active_weekdays:
-            plan.status = DailyPostingPlan.Status.SKIPPED
-            plan.planned_posts_count = 0
-            plan.save()
-            log_event(
-                logger,
-                event="daily_plan_skipped",
-                correlation_id=correlation_id,
-                brand_id=brand.id,
-                plan_date=str(day),
-                reason="weekday_not_active",
-            )
-            return plan
-
-        win, err = compute_effective_window(cfg=cfg, day=day, rng=rng)
-        if err or win is None:
-            plan.status = DailyPostingPlan.Status.ERROR
-            plan.planned_posts_count = 0
-            plan.last_error = err or "invalid_window"
-            plan.save()
-            log_event(
-                logger,
-                event="daily_plan_error",
-                correlation_id=correlation_id,
-                brand_id=brand.id,
-                plan_date=str(day),
-                error=plan.last_error,
-            )
-            return plan
-
-        wmin = window_length_minutes(win)
-        max_fit = max_posts_for_window(window_minutes=wmin, min_gap_minutes=cfg.min_gap_minutes)
-
-        target_total = _pick_target_total(cfg, brand.id, day, rng)
-        if target_total > max_fit:
-            target_total = max_fit
-        if target_total < cfg.daily_min_posts and cfg.daily_min_posts <= max_fit:
-            target_total = cfg.daily_min_posts
-        if target_total > cfg.daily_max_posts:
-            target_total = cfg.daily_max_posts
-        if target_total > max_fit:
-            target_total = max_fit
-        if target_total <= 0:
-            plan.status = DailyPostingPlan.Status.ERROR
-            plan.planned_posts_count = 0
-            plan.last_error = "janela_operacional_insuficiente_para_min_posts"
-            plan.save()
+        draft = _compute_day_plan(brand, cfg, day, rng)
+        plan.status = draft.status
+        plan.planned_posts_count = draft.planned_posts_count
+        plan.last_error = draft.last_error
+        plan.save()
+        if draft.status != DailyPostingPlan.Status.GENERATED:
             log_event(
                 logger,
-                event="daily_plan_error",
+                event=draft.log_event,
                 correlation_id=correlation_id,
                 brand_id=brand.id,
                 plan_date=str(day),
-                error=plan.last_error,
-                window_minutes=wmin,
-                max_fit=max_fit,
+                **draft.log_fields,
             )
             return plan
 
-        long_n = _pick_long_count(cfg, target_total, rng)
-        long_n = min(long_n, target_total)
-
-        slot_strings = _long_slot_strings_from_brand(brand)
-        use_long_anchors = bool(slot_strings) and long_n > 0
-
-        if use_long_anchors:
-            merged, merge_err = _generate_times_with_long_anchors(
-                win_start=win.window_start_local,
-                win_end=win.window_end_local,
-                target_total=target_total,
-                long_n=long_n,
-                slot_strings=slot_strings,
-                day=day,
-                tzname=cfg.timezone,
-                cfg=cfg,
-                rng=rng,
-            )
-            if merge_err or merged is None:
-                plan.status = DailyPostingPlan.Status.ERROR
-                plan.planned_posts_count = 0
-                plan.last_error = merge_err or "falha_plano_com_ancoras_longas"
-                plan.save()
-                log_event(
-                    logger,
-                    event="daily_plan_error",
-                    correlation_id=correlation_id,
-                    brand_id=brand.id,
-                    plan_date=str(day),
-                    error=plan.last_error,
-                )
-                return plan
-            pairs = merged
-        else:
-            times = _generate_uneven_times(
-                start=win.window_start_local,
-                end=win.window_end_local,
-                n=target_total,
-                min_gap_minutes=cfg.min_gap_minutes,
-                max_gap_minutes=cfg.max_gap_minutes,
-                rng=rng,
-            )
-            if times is None or len(times) != target_total:
-                plan.status = DailyPostingPlan.Status.ERROR
-                plan.planned_posts_count = 0
-                plan.last_error = "falha_ao_distribuir_horarios_na_janela"
-                plan.save()
-                log_event(
-                    logger,
-                    event="daily_plan_error",
-                    correlation_id=correlation_id,
-                    brand_id=brand.id,
-                    plan_date=str(day),
-                    error=plan.last_error,
-                )
-                return plan
-
-            types = _assign_video_types(target_total, long_n, rng)
-            pairs = list(zip(times, types, strict=True))
-
-        plan.status = DailyPostingPlan.Status.GENERATED
-        plan.planned_posts_count = target_total
-        plan.save()
-
         DailyPostingPlanItem.objects.filter(plan=plan).delete()
-        items = []
-        for i, (dt, vt) in enumerate(pairs):
-            at_utc = dt.astimezone(UTC)
-            items.append(
-                DailyPostingPlanItem(
-                    plan=plan,
-                    order_index=i,
-                    video_type=vt,
-                    scheduled_at=at_utc,
-                    status=DailyPostingPlanItem.Status.PLANNED,
-                )
-            )
-        DailyPostingPlanItem.objects.bulk_create(items)
+        DailyPostingPlanItem.objects.bulk_create(_plan_items(plan, draft.pairs))
 
         log_event(
             logger,
@@ -637,8 +662,187 @@ class DailyPostingPlanService:
             brand_id=brand.id,
             plan_id=plan.id,
             plan_date=str(day),
-            planned_posts=target_total,
-            long_posts=sum(1 for _, vt in pairs if vt == "LONG"),
+            planned_posts=draft.planned_posts_count,
+            long_posts=sum(1 for _, vt in draft.pairs if vt == "LONG"),
             status="success",
         )
         return DailyPostingPlan.objects.select_related("brand").prefetch_related("items").get(pk=plan.pk)
+
+    @staticmethod
+    @transaction.atomic
+    def generate_horizon(
+        factory: Factory,
+        start_day: date,
+        days: int,
+        *,
+        brand_ids: Iterable[int] | None = None,
+        dry_run: bool = False,
+        force_regenerate: bool = False,
+        correlation_id: str | None = None,
+    ) -> list[HorizonEntry]:
+        """
+        Gera os planos de ``days`` dias a partir de ``start_day`` para todas as brands da
+        factory numa única transação, com a mesma seed/regra de get_or_generate_for_day.
+
+        Ordem de locks única: linha da Factory e depois os planos existentes por
+        (brand_id, plan_date), a mesma do caminho por brand; horizontes e gerações por
+        brand da mesma factory se serializam sem deadlock nem IntegrityError no bulk_create. Leituras e escritas em lote: um SELECT por tabela,
+        um DELETE dos itens regenerados, bulk_update/bulk_create dos planos e um
+        bulk_create dos itens. Com ``dry_run`` nada é gravado nem travado; o retorno
+        (com ``diff()``) permite pré-visualizar os slots.
+        """
+        days = max(0, int(days))
+        day_list = [start_day + timedelta(days=i) for i in range(days)]
+        brands_qs = Brand.objects.filter(factory=factory).select_related("factory").order_by("id")
+        if brand_ids is not None:
+            brands_qs = brands_qs.filter(id__in=list(brand_ids))
+        if not dry_run:
+            Factory.objects.select_for_update().filter(pk=factory.pk).values_list("pk", flat=True).first()
+        brands = list(brands_qs)
+        if not brands or not day_list:
+            return []
+
+        plans_qs = DailyPostingPlan.objects.filter(
+            brand_id__in=[b.id for b in brands],
+            plan_date__gte=day_list[0],
+            plan_date__lte=day_list[-1],
+        ).order_by("brand_id", "plan_date")
+        if not dry_run:
+            plans_qs = plans_qs.select_for_update()
+        existing = {(p.brand_id, p.plan_date): p for p in plans_qs}
+
+        items_by_plan: dict[int, list[tuple[datetime, str]]] = {}
+        consumed_plan_ids: set[int] = set()
+        if existing:
+            rows = (
+                DailyPostingPlanItem.objects.filter(plan_id__in=[p.id for p in existing.values()])
+                .order_by("plan_id", "order_index", "id")
+                .values_list("plan_id", "scheduled_at", "video_type", "status")
+            )
+            for plan_id, scheduled_at, video_type, item_status in rows:
+                items_by_plan.setdefault(plan_id, []).append((scheduled_at, video_type))
+                if item_status == DailyPostingPlanItem.Status.CONSUMED:
+                    consumed_plan_ids.add(plan_id)
+
+        # Volume de ontem (penalidade de repetição): só o dia anterior ao horizonte vem do
+        # banco; os demais encadeiam o resultado do próprio horizonte.
+        yesterday_by_brand: dict[int, int | None] = dict(
+            DailyPostingPlan.objects.filter(
+                brand_id__in=[b.id for b in brands],
+                plan_date=day_list[0] - timedelta(days=1),
+                status=DailyPostingPlan.Status.GENERATED,
+            ).values_list("brand_id", "planned_posts_count")
+        )
+
+        entries: list[HorizonEntry] = []
+        to_update: list[DailyPostingPlan] = []
+        to_create: list[DailyPostingPlan] = []
+        pairs_by_key: dict[tuple[int, date], list[tuple[datetime, str]]] = {}
+        now = datetime.now(UTC)
+        for brand in brands:
+            cfg = ChannelScheduleConfig.from_brand(brand)
+            snap = cfg.to_snapshot_dict()
+            yesterday = yesterday_by_brand.get(brand.id)
+            for day in day_list:
+                plan = existing.get((brand.id, day))
+                previous = items_by_plan.get(plan.id, []) if plan else []
+                reusable = plan is not None and (
+                    (plan.status == DailyPostingPlan.Status.GENERATED and previous)
+                    or plan.status == DailyPostingPlan.Status.SKIPPED
+                )
+                if plan is not None and (
+                    (reusable and not force_regenerate) or (force_regenerate and plan.id in consumed_plan_ids)
+                ):
+                    action = "reuse" if reusable and not force_regenerate else "blocked"
+                    entries.append(
+                        HorizonEntry(
+                            brand_id=brand.id,
+                            plan_date=day,
+                            action=action,
+                            status=plan.status,
+                            slots=list(previous),
+                            previous_slots=list(previous),
+                            last_error=plan.last_error,
+                            plan=plan,
+                        )
+                    )
+                    yesterday = (
+                        plan.planned_posts_count if plan.status == DailyPostingPlan.Status.GENERATED else None
+                    )
+                    continue
+
+                draft = _compute_day_plan(
+                    brand, cfg, day, _rng_for_brand_day(brand.id, day), yesterday_count=yesterday
+                )
+                slots = [(dt.astimezone(UTC), vt) for dt, vt in draft.pairs]
+                entries.append(
+                    HorizonEntry(
+                        brand_id=brand.id,
+                        plan_date=day,
+                        action="regenerate" if plan is not None else "create",
+                        status=draft.status,
+                        slots=slots,
+                        previous_slots=list(previous),
+                        last_error=draft.last_error,
+                    )
+                )
+                yesterday = (
+                    draft.planned_posts_count if draft.status == DailyPostingPlan.Status.GENERATED else None
+                )
+                if plan is None:
+                    plan = DailyPostingPlan(brand=brand, plan_date=day)
+                    to_create.append(plan)
+                else:
+                    to_update.append(plan)
+                plan.timezone = cfg.timezone
+                plan.config_snapshot = snap
+                plan.generated_at = now
+                plan.status = draft.status
+                plan.planned_posts_count = draft.planned_posts_count
+                plan.last_error = draft.last_error
+                pairs_by_key[(brand.id, day)] = draft.pairs
+                if not dry_run:
+                    entries[-1].plan = plan
+
+        if not dry_run and (to_update or to_create):
+            if to_update:
+                DailyPostingPlanItem.objects.filter(plan_id__in=[p.id for p in to_update]).delete()
+                DailyPostingPlan.objects.bulk_update(
+                    to_update,
+                    ["timezone", "config_snapshot", "generated_at", "status", "planned_posts_count", "last_error"],
+                )
+            if to_create:
+                DailyPostingPlan.objects.bulk_create(to_create)
+                if any(p.pk is None for p in to_create):
+                    # Backends sem RETURNING: recupera os ids pela chave única.
+                    ids = {
+                        (b_id, d): pk
+                        for pk, b_id, d in DailyPostingPlan.objects.filter(
+                            brand_id__in={p.brand_id for p in to_create},
+                            plan_date__in={p.plan_date for p in to_create},
+                        ).values_list("id", "brand_id", "plan_date")
+                    }
+                    for p in to_create:
+                        p.pk = ids[(p.brand_id, p.plan_date)]
+            items: list[DailyPostingPlanItem] = []
+            for plan in (*to_update, *to_create):
+                if plan.status == DailyPostingPlan.Status.GENERATED:
+                    items.extend(_plan_items(plan, pairs_by_key[(plan.brand_id, plan.plan_date)]))
+            DailyPostingPlanItem.objects.bulk_create(items, batch_size=1000)
+
+        counts: dict[str, int] = {}
+        for e in entries:
+            counts[e.action] = counts.get(e.action, 0) + 1
+        log_event(
+            logger,
+            event="daily_plan_horizon_generated",
+            correlation_id=correlation_id,
+            factory_id=factory.id,
+            start_date=str(start_day),
+            days=days,
+            brands=len(brands),
+            dry_run=dry_run,
+            planned_posts=sum(len(e.slots) for e in entries if e.action != "reuse"),
+            **counts,
+        )
+        return entries
@@ -6,10 +6,12 @@ from dataclasses import dataclass
 from datetime import UTC, date, datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
 from apps.brands.models import Brand, BrandSocialAccount, Factory
+from apps.common.metrics import posting_slots_total
 from apps.jobs.logging_utils import Timer, log_event
 from apps.jobs.models import (
     DailyPostingPlan,
@@ -20,6 +22,7 @@ from apps.jobs.models import (
     VideoInventoryItem,
 )
 from apps.jobs.services.daily_posting_plan_service import DailyPostingPlanService
+from apps.jobs.services.task_priority import last_brand_priority_class
 from apps.social.services.title_humanizer import humanize_title
 
 # Jitter aplicado ao slot para nao postar sempre no mesmo minuto exato.
@@ -253,9 +256,13 @@ def _schedule_brand_for_day(
     enqueue_immediately: bool,
     correlation_id: str | None,
     attempt: int,
+    day_plan: DailyPostingPlan | None = None,
+    plan_items: list[DailyPostingPlanItem] | None = None,
 ) -> tuple[str, int]:
     """
     Processa uma brand para o dia informado.
+    day_plan/plan_items: plano do dia já gerado pelo horizonte (e seus itens PLANNED);
+    sem eles (retentativas), o plano é obtido/regenerado por brand.
     Retorna (status, created_count):
       status = "ok" | "skipped" | "disabled" | "error".
     """
@@ -270,13 +277,15 @@ def _schedule_brand_for_day(
         )
         return "disabled", 0
 
-    day_plan = DailyPostingPlanService.get_or_generate_for_day(
-        brand,
-        local_day,
-        correlation_id=correlation_id,
-        force_regenerate=False,
-        attempt=attempt,
-    )
+    if day_plan is None:
+        day_plan = DailyPostingPlanService.get_or_generate_for_day(
+            brand,
+            local_day,
+            correlation_id=correlation_id,
+            force_regenerate=False,
+            attempt=attempt,
+        )
+        plan_items = None
     if day_plan.status == DailyPostingPlan.Status.SKIPPED:
         return "skipped", 0
     if day_plan.status == DailyPostingPlan.Status.ERROR:
@@ -292,8 +301,12 @@ def _schedule_brand_for_day(
         )
         return "error", 0
 
+    if plan_items is None:
+        plan_items = list(
+            day_plan.items.filter(status=DailyPostingPlanItem.Status.PLANNED).order_by("order_index", "id")
+        )
     plans: list[SlotPlan] = []
-    for dpi in day_plan.items.filter(status=DailyPostingPlanItem.Status.PLANNED).order_by("order_index", "id"):
+    for dpi in plan_items:
         slot_local = dpi.scheduled_at.astimezone(tz)
         if not enqueue_immediately and slot_local < now_local:
             continue
@@ -340,10 +353,14 @@ def _schedule_brand_for_day(
     long_queue = _order_with_source_diversity(long_items)
 
     created_count = 0
+    # Taxa de slots perdidos por classe de prioridade do último auto-cut enfileirado para a brand.
+    priority_class = last_brand_priority_class(brand.id) if plans else ""
     for slot_plan in plans:
         queue = short_queue if slot_plan.video_type == "SHORT" else long_queue
         if not queue:
+            posting_slots_total.labels(priority_class=priority_class, outcome="missed").inc()
             continue
+        posting_slots_total.labels(priority_class=priority_class, outcome="filled").inc()
         item = queue.pop(0)
         allocate_inventory_item_to_slot(
             factory=factory,
@@ -410,8 +427,29 @@ def generate_daily_schedule_for_factory(
         brands_qs = brands_qs.filter(id=brand_id)
     brands = list(brands_qs)
 
+    # Planos de todas as brands ativas num lote só; o loop abaixo apenas os reutiliza.
+    horizon = DailyPostingPlanService.generate_horizon(
+        factory,
+        local_day,
+        max(1, int(getattr(settings, "DAILY_PLAN_HORIZON_DAYS", 1))),
+        brand_ids=[
+            b.id
+            for b in brands
+            if getattr(b, "scheduler_enabled", True) and not getattr(b, "scheduler_paused", False)
+        ],
+        correlation_id=correlation_id,
+    )
+    day_plans = {e.brand_id: e.plan for e in horizon if e.plan_date == local_day and e.plan is not None}
+    items_by_plan: dict[int, list[DailyPostingPlanItem]] = {plan.id: [] for plan in day_plans.values()}
+    for dpi in DailyPostingPlanItem.objects.filter(
+        plan_id__in=list(items_by_plan),
+        status=DailyPostingPlanItem.Status.PLANNED,
+    ).order_by("plan_id", "order_index", "id"):
+        items_by_plan[dpi.plan_id].append(dpi)
+
     failed_brands: list[Brand] = []
     for brand in brands:
+        day_plan = day_plans.get(brand.id)
         status, count = _schedule_brand_for_day(
             factory=factory,
             brand=brand,
@@ -423,6 +461,8 @@ def generate_daily_schedule_for_factory(
             enqueue_immediately=enqueue_immediately,
             correlation_id=correlation_id,
             attempt=0,
+            day_plan=day_plan,
+            plan_items=items_by_plan[day_plan.id] if day_plan is not None else None,
         )
         created_count += count
         if status == "error":
@@ -1,9 +1,11 @@
-import subprocess
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 
 from django.conf import settings
 
+from .ffmpeg_runner import FfmpegProgress, run_process
+
 
 def resilient_decode_options() -> list[str]:
     """
@@ -39,21 +41,50 @@ def input_args_with_resilience(paths: list[Path]) -> list[str]:
 class CmdResult:
     ok: bool
     stdout: str
-    stderr: str
+    stderr: str  # tail only (FFMPEG_STDERR_TAIL_LINES)
     returncode: int
-
-def run_cmd(cmd: list[str], cwd: Path | None = None) -> CmdResult:
-    p = subprocess.run(
+    timed_out: str = ""
+    duration_ms: float = 0.0
+    cpu_seconds: float | None = None
+    max_rss_bytes: int | None = None
+
+def run_cmd(
+    cmd: list[str],
+    cwd: Path | None = None,
+    *,
+    operation: str | None = None,
+    timeout_s: float | None = None,
+    stall_timeout_s: float | None = None,
+    total_s: float | None = None,
+    on_progress: Callable[[FfmpegProgress], None] | None = None,
+) -> CmdResult:
+    """
+    Run ffmpeg/ffprobe via ``ffmpeg_runner.run_process``: streamed output, bounded stderr,
+    wall/stall timeouts (FFMPEG_TIMEOUT_SEC, FFMPEG_STALL_TIMEOUT_SEC, FFPROBE_TIMEOUT_SEC)
+    and per-``operation`` duration/CPU/RSS metrics. A killed process returns ``ok=False``.
+    """
+    p = run_process(
         cmd,
-        cwd=str(cwd) if cwd else None,
-        capture_output=True,
-        text=True,
-        shell=False,
+        cwd=cwd,
+        operation=operation,
+        timeout_s=timeout_s,
+        stall_timeout_s=stall_timeout_s,
+        total_s=total_s,
+        on_progress=on_progress,
+    )
+    return CmdResult(
+        ok=p.returncode == 0 and not p.timed_out,
+        stdout=p.stdout,
+        stderr=p.stderr,
+        returncode=p.returncode,
+        timed_out=p.timed_out,
+        duration_ms=p.duration_ms,
+        cpu_seconds=p.cpu_seconds,
+        max_rss_bytes=p.max_rss_bytes,
     )
-    return CmdResult(ok=p.returncode == 0, stdout=p.stdout, stderr=p.stderr, returncode=p.returncode)
 
 def has_nvenc() -> bool:
-    res = run_cmd([settings.FFMPEG_BIN, "-hide_banner", "-encoders"])
+    res = run_cmd([settings.FFMPEG_BIN, "-hide_banner", "-encoders"], operation="has_nvenc")
     return res.ok and ("h264_nvenc" in res.stdout)
 
 def input_has_audio(input_file: Path) -> bool:
@@ -64,7 +95,7 @@ def input_has_audio(input_file: Path) -> bool:
         "-of", "csv=p=0",
         str(input_file),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="input_has_audio")
     return res.ok and res.stdout.strip() != ""
 
 def video_encode_args(use_gpu: bool) -> list[str]:
@@ -132,7 +163,7 @@ def overlay_logo(
         *common_mp4_flags(),
         str(output_path),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="overlay_logo")
     if not res.ok:
         raise RuntimeError(f"overlay logo failed: {res.stderr}")
 
@@ -188,7 +219,7 @@ def overlay_animation(
         *common_mp4_flags(),
         str(output_path),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="overlay_animation")
     if not res.ok:
         raise RuntimeError(f"overlay animation failed: {res.stderr}")
 
@@ -266,7 +297,7 @@ def overlay_long_right(
             str(output_path),
         ]
     )
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="overlay_long_right")
     if not res.ok:
         raise RuntimeError(f"overlay_long_right failed: {res.stderr}")
 
@@ -283,7 +314,7 @@ def cut_clip(input_file: Path, start_tc: str, end_tc: str, output_file: Path, us
         *common_mp4_flags(),
         str(output_file),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="cut_clip")
     if not res.ok:
         raise RuntimeError(f"cut failed: {res.stderr}")
 
@@ -310,7 +341,7 @@ def make_vertical_blur(input_file: Path, output_file: Path, use_gpu: bool) -> No
         *common_mp4_flags(),
         str(output_file),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="make_vertical_blur")
     if not res.ok:
         raise RuntimeError(f"vertical failed: {res.stderr}")
 
@@ -354,7 +385,7 @@ def normalize_part_for_concat(
             *common_mp4_flags(),
             str(output_file),
         ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="normalize_part_for_concat")
     if not res.ok:
         raise RuntimeError(f"normalize failed: {res.stderr}")
 
@@ -377,7 +408,7 @@ def concat_videos(files: list[Path], output_file: Path, workdir: Path, use_gpu:
         *common_mp4_flags(),
         str(output_file),
     ]
-    res = run_cmd(cmd, cwd=workdir)
+    res = run_cmd(cmd, cwd=workdir, operation="concat_videos")
     if not res.ok:
         raise RuntimeError(f"concat failed: {res.stderr}")
 
@@ -432,7 +463,7 @@ def normalize_video_to_canvas(
             str(output_path),
         ]
     )
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="normalize_video_to_canvas")
     if not res.ok:
         raise RuntimeError(f"normalize_video_to_canvas failed: {res.stderr}")
 
@@ -490,7 +521,7 @@ def concat_with_xfade(
         *common_mp4_flags(),
         str(output_file),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="concat_with_xfade")
     if not res.ok:
         raise RuntimeError(f"concat(xfade) failed: {res.stderr}")
 
@@ -513,7 +544,7 @@ def concat_videos_copy(files: list[Path], output_file: Path, workdir: Path) -> N
         *common_mp4_flags(),
         str(output_file),
     ]
-    res = run_cmd(cmd, cwd=workdir)
+    res = run_cmd(cmd, cwd=workdir, operation="concat_videos_copy")
     if not res.ok:
         raise RuntimeError(f"concat(copy) failed: {res.stderr}")
 
@@ -524,7 +555,7 @@ def ffprobe_duration(input_file: Path) -> float:
         "-of", "default=noprint_wrappers=1:nokey=1",
         str(input_file),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="ffprobe_duration")
     if not res.ok:
         raise RuntimeError(f"ffprobe duration failed: {res.stderr}")
     return float(res.stdout.strip())
@@ -562,7 +593,7 @@ def ffprobe_video_info(input_file: Path) -> dict:
         "-of", "json",
         str(input_file),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="ffprobe_video_info")
     if not res.ok:
         raise RuntimeError(f"ffprobe failed: {res.stderr}")
 
@@ -679,6 +710,6 @@ def concat_videos_filter(parts: list[Path], output_file: Path, use_gpu: bool) ->
         str(output_file),
     ]
 
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="concat_videos_filter")
     if not res.ok:
         raise RuntimeError(f"concat(filter) failed: {res.stderr}")
\ No newline at end of file
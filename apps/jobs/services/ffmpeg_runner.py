@@ -0,0 +1,328 @@
+"""
+Streaming subprocess runner for ffmpeg/ffprobe.
+
+Replaces ``subprocess.run(capture_output=True)``:
+
+- stdout and stderr are read line by line by two reader threads. Only the last
+  ``FFMPEG_STDERR_TAIL_LINES`` stderr lines are kept, because ``-err_detect ignore_err``
+  renders can emit megabytes of warnings;
+- ffmpeg commands with inputs get ``-progress pipe:1 -nostats``. The ``key=value`` blocks
+  are parsed into ``FfmpegProgress`` (out_time, speed, percent, ETA) for an optional
+  callback and a throttled ``ffmpeg_progress`` log line;
+- a wall-clock timeout and a stall timeout (no progress and no stderr for N seconds)
+  kill the process;
+- the child is reaped with ``os.wait4`` so its CPU time and max RSS are recorded per
+  operation (``ffmpeg_cpu_seconds`` / ``ffmpeg_max_rss_bytes``).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.common.metrics import (
+    ffmpeg_cpu_seconds,
+    ffmpeg_duration_ms,
+    ffmpeg_max_rss_bytes,
+    ffmpeg_runs_total,
+)
+from apps.common.task_profiling import profile_phase
+from apps.jobs.logging_utils import log_event
+
+logger = logging.getLogger(__name__)
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+_PROGRESS_KEYS = frozenset(
+    {
+        "frame",
+        "fps",
+        "bitrate",
+        "total_size",
+        "out_time_us",
+        "out_time_ms",
+        "out_time",
+        "dup_frames",
+        "drop_frames",
+        "speed",
+        "progress",
+    }
+)
+_REAP_POLL_S = 0.25
+
+
+@dataclass
+class FfmpegProgress:
+    out_time_s: float = 0.0
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+    total_s: float | None = None
+    finished: bool = False
+
+    @property
+    def percent(self) -> float | None:
+        if not self.total_s:
+            return None
+        return max(0.0, min(100.0, self.out_time_s / self.total_s * 100.0))
+
+    @property
+    def eta_s(self) -> float | None:
+        if not self.total_s or self.speed <= 0:
+            return None
+        return max(0.0, (self.total_s - self.out_time_s) / self.speed)
+
+
+@dataclass
+class ProcessRun:
+    returncode: int
+    stdout: str
+    stderr: str
+    duration_ms: float
+    timed_out: str = ""  # "" | "timeout" | "stalled"
+    cpu_seconds: float | None = None
+    max_rss_bytes: int | None = None
+    progress: FfmpegProgress = field(default_factory=FfmpegProgress)
+
+    @property
+    def outcome(self) -> str:
+        if self.timed_out:
+            return self.timed_out
+        return "ok" if self.returncode == 0 else "error"
+
+
+def _seconds_arg(value: str) -> float | None:
+    try:
+        if ":" in value:
+            h, m, s = value.split(":")
+            return int(h) * 3600 + int(m) * 60 + float(s)
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _output_limit_seconds(cmd: list[str]) -> float | None:
+    """``-t`` (input or output option) bounds the produced duration (used for percent/ETA)."""
+    for i, arg in enumerate(cmd[:-1]):
+        if arg == "-t":
+            return _seconds_arg(cmd[i + 1])
+    return None
+
+
+def with_progress_args(cmd: list[str]) -> list[str]:
+    """Add ``-progress pipe:1 -nostats`` to ffmpeg commands that read inputs and write files."""
+    if not cmd or "-i" not in cmd or "-progress" in cmd:
+        return cmd
+    if Path(cmd[0]).name != Path(settings.FFMPEG_BIN).name:
+        return cmd
+    if cmd[-1] in ("-", "pipe:", "pipe:1"):
+        return cmd
+    return [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+
+
+def default_operation(cmd: list[str]) -> str:
+    return Path(cmd[0]).stem if cmd else "unknown"
+
+
+def default_timeouts(cmd: list[str]) -> tuple[float, float]:
+    """(wall, stall) in seconds from settings; 0 disables. Stall only applies to ffmpeg with progress."""
+    if cmd and Path(cmd[0]).name == Path(settings.FFPROBE_BIN).name:
+        return float(getattr(settings, "FFPROBE_TIMEOUT_SEC", 120)), 0.0
+    return (
+        float(getattr(settings, "FFMPEG_TIMEOUT_SEC", 21600)),
+        float(getattr(settings, "FFMPEG_STALL_TIMEOUT_SEC", 600)),
+    )
+
+
+class _Reader(threading.Thread):
+    def __init__(self, stream, on_line: Callable[[str], None]):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.on_line = on_line
+
+    def run(self) -> None:
+        try:
+            for raw in iter(self.stream.readline, b""):
+                try:
+                    self.on_line(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+                except Exception:
+                    # Keep draining the pipe: a full pipe would block (and stall) the child.
+                    logger.exception("ffmpeg_runner_line_handler_failed")
+        finally:
+            self.stream.close()
+
+
+def _reap(proc: subprocess.Popen, *, block: bool):
+    """Wait for the child; returns rusage when ``os.wait4`` exists (POSIX), else None."""
+    if hasattr(os, "wait4"):
+        pid, status, rusage = os.wait4(proc.pid, 0 if block else os.WNOHANG)
+        if pid == 0:
+            return False, None
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return True, rusage
+    if block:
+        proc.wait()
+    return proc.poll() is not None, None
+
+
+def run_process(
+    cmd: list[str],
+    *,
+    cwd: Path | None = None,
+    operation: str | None = None,
+    timeout_s: float | None = None,
+    stall_timeout_s: float | None = None,
+    total_s: float | None = None,
+    on_progress: Callable[[FfmpegProgress], None] | None = None,
+) -> ProcessRun:
+    """Run ``cmd`` streaming its output; see the module docstring. Never raises on exit status."""
+    operation = operation or default_operation(cmd)
+    default_wall, default_stall = default_timeouts(cmd)
+    timeout_s = default_wall if timeout_s is None else timeout_s
+    stall_timeout_s = default_stall if stall_timeout_s is None else stall_timeout_s
+    cmd = with_progress_args(cmd)
+    track_progress = "-progress" in cmd
+    tail_lines = max(1, int(getattr(settings, "FFMPEG_STDERR_TAIL_LINES", 200)))
+    log_every_s = float(getattr(settings, "FFMPEG_PROGRESS_LOG_SEC", 30))
+
+    progress = FfmpegProgress(total_s=total_s or _output_limit_seconds(cmd))
+    stdout_lines: list[str] = []
+    stderr_tail: deque[str] = deque(maxlen=tail_lines)
+    block: dict[str, str] = {}
+    state = {"activity": time.monotonic(), "logged": time.monotonic()}
+
+    def on_stdout(line: str) -> None:
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not (track_progress and sep and (key in _PROGRESS_KEYS or key.startswith("stream_"))):
+            stdout_lines.append(line)
+            return
+        block[key] = value.strip()
+        if key != "progress":
+            return
+        _apply_progress_block(progress, block)
+        block.clear()
+        state["activity"] = time.monotonic()
+        if on_progress is not None:
+            on_progress(progress)
+        if log_every_s > 0 and time.monotonic() - state["logged"] >= log_every_s:
+            state["logged"] = time.monotonic()
+            log_event(
+                logger,
+                event="ffmpeg_progress",
+                operation=operation,
+                out_time_s=round(progress.out_time_s, 1),
+                speed=progress.speed,
+                percent=None if progress.percent is None else round(progress.percent, 1),
+                eta_s=None if progress.eta_s is None else round(progress.eta_s),
+            )
+
+    def on_stderr(line: str) -> None:
+        if progress.total_s is None:
+            match = _DURATION_RE.search(line)
+            if match:
+                h, m, s = match.groups()
+                progress.total_s = int(h) * 3600 + int(m) * 60 + float(s)
+        stderr_tail.append(line)
+        state["activity"] = time.monotonic()
+
+    timed_out = ""
+    rusage = None
+    with profile_phase("subprocess"):
+        started = time.monotonic()
+        proc = subprocess.Popen(
+            cmd,
+            cwd=str(cwd) if cwd else None,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=False,
+        )
+        readers = [_Reader(proc.stdout, on_stdout), _Reader(proc.stderr, on_stderr)]
+        for reader in readers:
+            reader.start()
+        try:
+            while True:
+                done, rusage = _reap(proc, block=False)
+                if done:
+                    break
+                now = time.monotonic()
+                if timeout_s and now - started > timeout_s:
+                    timed_out = "timeout"
+                elif track_progress and stall_timeout_s and now - state["activity"] > stall_timeout_s:
+                    timed_out = "stalled"
+                if timed_out:
+                    proc.kill()
+                    _, rusage = _reap(proc, block=True)
+                    break
+                # Pipes hit EOF when the process exits: poll fast after that, slow before.
+                alive = [r for r in readers if r.is_alive()]
+                if alive:
+                    alive[0].join(_REAP_POLL_S)
+                else:
+                    time.sleep(0.005)
+        except BaseException:
+            # SoftTimeLimitExceeded & co.: never leave the child running (subprocess.run semantics).
+            proc.kill()
+            _reap(proc, block=True)
+            for reader in readers:
+                reader.join(5.0)
+            raise
+        for reader in readers:
+            reader.join(5.0)
+        duration_ms = (time.monotonic() - started) * 1000.0
+
+    stderr = "\n".join(stderr_tail)
+    if timed_out:
+        limit = timeout_s if timed_out == "timeout" else stall_timeout_s
+        stderr += f"\n[ffmpeg_runner] {operation} killed: {timed_out} after {limit:g}s"
+    run = ProcessRun(
+        returncode=proc.returncode,
+        stdout="\n".join(stdout_lines) + ("\n" if stdout_lines else ""),
+        stderr=stderr,
+        duration_ms=duration_ms,
+        timed_out=timed_out,
+        progress=progress,
+    )
+    if rusage is not None:
+        run.cpu_seconds = rusage.ru_utime + rusage.ru_stime
+        # ru_maxrss: KiB on Linux, bytes on macOS.
+        run.max_rss_bytes = int(rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024)
+    _observe(operation, run)
+    return run
+
+
+def _apply_progress_block(progress: FfmpegProgress, block: dict[str, str]) -> None:
+    out_us = block.get("out_time_us") or block.get("out_time_ms")  # both are µs in ffmpeg
+    if out_us and out_us.lstrip("-").isdigit():
+        progress.out_time_s = max(progress.out_time_s, int(out_us) / 1_000_000.0)
+    try:
+        progress.frame = int(block.get("frame", progress.frame))
+        progress.fps = float(block.get("fps", progress.fps))
+    except ValueError:
+        pass
+    speed = block.get("speed", "").rstrip("x").strip()
+    try:
+        progress.speed = float(speed) if speed and speed != "N/A" else progress.speed
+    except ValueError:
+        pass
+    progress.finished = block.get("progress") == "end"
+
+
+def _observe(operation: str, run: ProcessRun) -> None:
+    ffmpeg_runs_total.labels(operation=operation, outcome=run.outcome).inc()
+    ffmpeg_duration_ms.labels(operation=operation).observe(run.duration_ms)
+    if run.cpu_seconds is not None:
+        ffmpeg_cpu_seconds.labels(operation=operation).observe(run.cpu_seconds)
+    if run.max_rss_bytes is not None:
+        ffmpeg_max_rss_bytes.labels(operation=operation).observe(run.max_rss_bytes)
@@ -10,6 +10,7 @@ from .ffmpeg import (
     concat_videos_copy,
     concat_with_xfade,
     cut_clip,
+    ffprobe_duration,
     has_nvenc,
     make_vertical_blur,
     normalize_part_for_concat,
@@ -26,7 +27,8 @@ def _set_progress(job: Job, value: int) -> None:
     job.save(update_fields=["progress"])
 
 
-def run_job(job_id: int) -> None:
+def run_job(job_id: int) -> dict:
+    """Executa o job; retorna {"encoder", "media_seconds"} para o ledger de performance."""
     job = Job.objects.select_related(
         "intro_asset", "outro_asset"
     ).prefetch_related("job_cuts__cut__source").get(id=job_id)
@@ -131,6 +133,10 @@ def run_job(job_id: int) -> None:
 
         final_path = final_dir / export_tmp.name
         shutil.copy2(export_tmp, final_path)
+        try:
+            media_seconds = ffprobe_duration(final_path)
+        except (RuntimeError, ValueError, OSError):
+            media_seconds = None
 
         out = RenderOutput.objects.filter(job=job).first() or RenderOutput(job=job)
         out.file.name = f"exports/{final_path.name}"
@@ -150,6 +156,7 @@ def run_job(job_id: int) -> None:
         job.finished_at = timezone.now()
         job.save(update_fields=["status", "finished_at"])
         _append_log(job, f"[DONE] {out.file.name}")
+        return {"encoder": "gpu" if use_gpu else "cpu", "media_seconds": media_seconds}
 
     except Exception as e:
         job.status = "FAILED"
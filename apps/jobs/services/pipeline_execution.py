@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import socket
 from typing import Any
 
 from django.db import IntegrityError, transaction
@@ -29,6 +30,10 @@ def _normalize_payload(payload: dict[str, Any] | None) -> dict[str, Any]:
     return payload or {}
 
 
+def _worker_host() -> str:
+    return socket.gethostname()[:255]
+
+
 def _get_or_create_stage_locked(
     *,
     pipeline_execution: PipelineExecution,
@@ -238,6 +243,10 @@ def start_stage(
         stage_execution.started_at = now
         stage_execution.completed_at = None
         stage_execution.duration_ms = None
+        stage_execution.worker_host = _worker_host()
+        # Retentativa pode trocar de encoder (fallback para CPU): não herda o da anterior.
+        stage_execution.encoder = ""
+        stage_execution.media_seconds = None
         stage_execution.input_payload = _normalize_payload(input_payload)
         stage_execution.output_payload = {}
         stage_execution.error_class = ""
@@ -252,6 +261,9 @@ def start_stage(
                 "started_at",
                 "completed_at",
                 "duration_ms",
+                "worker_host",
+                "encoder",
+                "media_seconds",
                 "input_payload",
                 "output_payload",
                 "error_class",
@@ -285,7 +297,13 @@ def complete_stage(
     *,
     stage_name: str,
     output_payload: dict[str, Any] | None = None,
+    media_seconds: float | None = None,
+    encoder: str = "",
 ) -> StageExecution:
+    """
+    media_seconds: duração da mídia processada (áudio transcrito / vídeo gerado), usada pelo
+    ledger para normalizar o custo; encoder: "gpu" | "cpu" (ou o codec) usado na etapa.
+    """
     now = timezone.now()
     with transaction.atomic():
         pipeline_execution = PipelineExecution.objects.select_for_update().get(
@@ -301,6 +319,9 @@ def complete_stage(
         stage_execution.status = StageExecution.Status.COMPLETED
         stage_execution.completed_at = now
         stage_execution.duration_ms = _duration_ms(stage_execution.started_at, now)
+        stage_execution.media_seconds = media_seconds if media_seconds and media_seconds > 0 else None
+        stage_execution.encoder = (encoder or stage_execution.encoder)[:32]
+        stage_execution.worker_host = stage_execution.worker_host or _worker_host()
         stage_execution.output_payload = _normalize_payload(output_payload)
         stage_execution.error_class = ""
         stage_execution.error_message = ""
@@ -311,6 +332,9 @@ def complete_stage(
                 "started_at",
                 "completed_at",
                 "duration_ms",
+                "media_seconds",
+                "encoder",
+                "worker_host",
                 "output_payload",
                 "error_class",
                 "error_message",
@@ -334,7 +358,9 @@ def fail_stage(
     error: Exception | None = None,
     error_class: str = "",
     error_message: str = "",
+    encoder: str = "",
 ) -> StageExecution:
+    """encoder: como em ``complete_stage``; o host entra sempre (relatório de regressão por nó)."""
     now = timezone.now()
     with transaction.atomic():
         pipeline_execution = PipelineExecution.objects.select_for_update().get(
@@ -359,6 +385,8 @@ def fail_stage(
         stage_execution.duration_ms = _duration_ms(stage_execution.started_at, now)
         stage_execution.error_class = resolved_error_class
         stage_execution.error_message = resolved_error_message
+        stage_execution.encoder = (encoder or stage_execution.encoder)[:32]
+        stage_execution.worker_host = stage_execution.worker_host or _worker_host()
         _save_with_updated_at(
             stage_execution,
             [
@@ -366,6 +394,8 @@ def fail_stage(
                 "started_at",
                 "completed_at",
                 "duration_ms",
+                "encoder",
+                "worker_host",
                 "error_class",
                 "error_message",
             ],
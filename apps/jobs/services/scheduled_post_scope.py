@@ -0,0 +1,40 @@
+"""Escopo denormalizado de ScheduledPost (owner_user, brand, factory): backfill em lote."""
+
+from django.db.models import OuterRef, Q, Subquery
+
+from apps.auto_cuts.models import AutoCutCorte
+from apps.jobs.models import Job, ScheduledPost
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _scope_subqueries(model, prefix: str, ref: str) -> dict:
+    source = model.objects.filter(pk=OuterRef(ref))
+    return {
+        "owner_user_id": Subquery(source.values(f"{prefix}user_id")[:1]),
+        "brand_id": Subquery(source.values(f"{prefix}brand_id")[:1]),
+        "factory_id": Subquery(source.values(f"{prefix}brand__factory_id")[:1]),
+    }
+
+
+def backfill_scheduled_post_scope(*, batch_size: int = BACKFILL_BATCH_SIZE, only_missing: bool = True) -> int:
+    """
+    Recalcula owner_user/brand/factory a partir do job (ou do corte) com UPDATEs por faixa
+    de id, sem carregar os posts em memória. Retorna quantas linhas foram atualizadas.
+    """
+    qs = ScheduledPost.objects.all()
+    if only_missing:
+        qs = qs.filter(owner_user__isnull=True)
+    qs = qs.filter(Q(job__isnull=False) | Q(auto_cut_corte__isnull=False))
+    ids = list(qs.order_by("id").values_list("id", flat=True))
+    updated = 0
+    for start in range(0, len(ids), batch_size):
+        lo, hi = ids[start], ids[min(start + batch_size, len(ids)) - 1]
+        batch = ScheduledPost.objects.filter(id__gte=lo, id__lte=hi)
+        if only_missing:
+            batch = batch.filter(owner_user__isnull=True)
+        updated += batch.filter(job__isnull=False).update(**_scope_subqueries(Job, "", "job_id"))
+        updated += batch.filter(job__isnull=True, auto_cut_corte__isnull=False).update(
+            **_scope_subqueries(AutoCutCorte, "analysis__", "auto_cut_corte_id")
+        )
+    return updated
@@ -0,0 +1,178 @@
+"""
+Ledger de performance por etapa (StageExecution -> StagePerformanceDaily) e detecção de regressão.
+
+O custo normalizado é ``duration_ms / media_seconds``: ms de processamento por segundo de mídia
+(na transcrição equivale a RTF x 1000; no render, ms por segundo de vídeo gerado). O rollup é
+idempotente por dia; a comparação usa só o ledger, então continua válida depois que
+StageExecution antigas forem limpas.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.jobs.models import StageExecution, StagePerformanceDaily
+
+ALL = StagePerformanceDaily.ALL
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(math.ceil(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(day, time(0, 0), tzinfo=tz)
+    return start, start + timedelta(days=1)
+
+
+@transaction.atomic
+def rollup_stage_performance(day: date) -> int:
+    """Recalcula as linhas do ledger de ``day`` (por host/encoder e o total ``*``). Retorna quantas."""
+    start, end = _day_bounds(day)
+    rows = StageExecution.objects.filter(
+        completed_at__gte=start,
+        completed_at__lt=end,
+        status__in=[StageExecution.Status.COMPLETED, StageExecution.Status.FAILED],
+    ).values_list("stage_name", "worker_host", "encoder", "status", "duration_ms", "media_seconds")
+
+    groups: dict[tuple[str, str, str], dict[str, list]] = defaultdict(
+        lambda: {"durations": [], "costs": [], "failures": [0]}
+    )
+    for stage_name, host, encoder, status, duration_ms, media_seconds in rows.iterator():
+        for key in ((stage_name, host or "", encoder or ""), (stage_name, ALL, ALL)):
+            group = groups[key]
+            if status == StageExecution.Status.FAILED:
+                group["failures"][0] += 1
+                continue
+            if duration_ms is None:
+                continue
+            group["durations"].append(duration_ms)
+            if media_seconds:
+                group["costs"].append(duration_ms / media_seconds)
+
+    StagePerformanceDaily.objects.filter(day=day).delete()
+    ledger = []
+    for (stage_name, host, encoder), group in groups.items():
+        durations, costs = group["durations"], group["costs"]
+        p50, p95, p99 = (_percentile(durations, p) for p in (50, 95, 99))
+        ledger.append(
+            StagePerformanceDaily(
+                day=day,
+                stage_name=stage_name,
+                worker_host=host[:255],
+                encoder=encoder[:32],
+                samples=len(durations),
+                failures=group["failures"][0],
+                duration_p50_ms=None if p50 is None else int(p50),
+                duration_p95_ms=None if p95 is None else int(p95),
+                duration_p99_ms=None if p99 is None else int(p99),
+                cost_samples=len(costs),
+                cost_p50=_percentile(costs, 50),
+                cost_p95=_percentile(costs, 95),
+            )
+        )
+    StagePerformanceDaily.objects.bulk_create(ledger)
+    return len(ledger)
+
+
+@dataclass
+class StageRegression:
+    stage_name: str
+    worker_host: str
+    encoder: str
+    metric: str  # cost_p50 | cost_p95 | duration_p50_ms | duration_p95_ms
+    baseline: float
+    current: float
+    baseline_samples: int
+    current_samples: int
+
+    @property
+    def change_pct(self) -> float:
+        return (self.current / self.baseline - 1.0) * 100.0 if self.baseline else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "stage_name": self.stage_name,
+            "worker_host": self.worker_host,
+            "encoder": self.encoder,
+            "metric": self.metric,
+            "baseline": round(self.baseline, 2),
+            "current": round(self.current, 2),
+            "change_pct": round(self.change_pct, 1),
+            "baseline_samples": self.baseline_samples,
+            "current_samples": self.current_samples,
+        }
+
+
+def _weighted(rows: list[StagePerformanceDaily], field: str, weight_field: str) -> tuple[float | None, int]:
+    """Média dos percentis diários pesada pelo número de amostras do dia."""
+    total = 0.0
+    weight = 0
+    for row in rows:
+        value = getattr(row, field)
+        n = getattr(row, weight_field)
+        if value is None or not n:
+            continue
+        total += value * n
+        weight += n
+    return (total / weight if weight else None), weight
+
+
+def detect_stage_regressions(
+    *,
+    end_day: date | None = None,
+    window_days: int = 1,
+    baseline_days: int = 14,
+    threshold: float = 0.2,
+    min_samples: int = 5,
+) -> list[StageRegression]:
+    """
+    Compara a janela ``[end_day - window_days + 1, end_day]`` com os ``baseline_days``
+    anteriores, por (etapa, host, encoder). Usa o custo normalizado quando as duas janelas
+    têm ``min_samples`` amostras com duração de mídia; senão, a duração bruta.
+    """
+    end_day = end_day or timezone.localdate()
+    window_start = end_day - timedelta(days=max(1, window_days) - 1)
+    baseline_start = window_start - timedelta(days=max(1, baseline_days))
+    rows = StagePerformanceDaily.objects.filter(day__gte=baseline_start, day__lte=end_day)
+
+    current: dict[tuple, list] = defaultdict(list)
+    baseline: dict[tuple, list] = defaultdict(list)
+    for row in rows:
+        key = (row.stage_name, row.worker_host, row.encoder)
+        (current if row.day >= window_start else baseline)[key].append(row)
+
+    regressions: list[StageRegression] = []
+    for key, current_rows in sorted(current.items()):
+        baseline_rows = baseline.get(key)
+        if not baseline_rows:
+            continue
+        for metrics, weight_field in (
+            (("cost_p50", "cost_p95"), "cost_samples"),
+            (("duration_p50_ms", "duration_p95_ms"), "samples"),
+        ):
+            found = []
+            enough = True
+            for metric in metrics:
+                base_value, base_n = _weighted(baseline_rows, metric, weight_field)
+                cur_value, cur_n = _weighted(current_rows, metric, weight_field)
+                if base_value is None or cur_value is None or base_n < min_samples or cur_n < min_samples:
+                    enough = False
+                    break
+                if cur_value > base_value * (1.0 + threshold):
+                    found.append(StageRegression(*key, metric, base_value, cur_value, base_n, cur_n))
+            if enough:
+                regressions.extend(found)
+                break
+    return regressions
@@ -1,5 +1,6 @@
 """Subtitle generation and burn-in with Whisper and FFmpeg."""
 
+import bisect
 import logging
 import os
 import re
@@ -75,21 +76,22 @@ def align_edited_to_original_words(edited_text: str, original_words: list[dict])
     return result
 
 
+def _segment_to_dict(s, offset: float = 0.0) -> dict:
+    seg = {"start": s.start - offset, "end": s.end - offset, "text": s.text.strip()}
+    if s.words:
+        seg["words"] = [
+            {"start": w.start - offset, "end": w.end - offset, "word": w.word}
+            for w in s.words
+        ]
+    return seg
+
+
 def _transcribe_with_model(model, path: str, lang: str) -> list[dict]:
     """Transcribe file with an already-loaded Whisper model."""
     segments, _ = model.transcribe(
         path, language=lang, word_timestamps=True, without_timestamps=False
     )
-    result = []
-    for s in segments:
-        seg = {"start": s.start, "end": s.end, "text": s.text.strip()}
-        if s.words:
-            seg["words"] = [
-                {"start": w.start, "end": w.end, "word": w.word}
-                for w in s.words
-            ]
-        result.append(seg)
-    return result
+    return [_segment_to_dict(s) for s in segments]
 
 
 def load_whisper_model(
@@ -220,6 +222,133 @@ def generate_subtitles(
         raise
 
 
+def _is_cuda_error(exc: BaseException) -> bool:
+    err_str = str(exc).lower()
+    return any(x in err_str for x in ("cublas", "cuda", "dll", "cudnn", "out of memory", "cuda error"))
+
+
+def _speech_windows(audio, sampling_rate: int, chunk_length: int) -> list[tuple[int, int]]:
+    """
+    VAD regions of one clip merged into contiguous windows of at most ``chunk_length`` s
+    (sample indexes relative to the clip). A window never crosses a clip boundary.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    regions = get_speech_timestamps(
+        audio,
+        VadOptions(max_speech_duration_s=chunk_length, min_silence_duration_ms=160),
+    )
+    max_len = chunk_length * sampling_rate
+    windows: list[tuple[int, int]] = []
+    for region in regions:
+        start, end = int(region["start"]), int(region["end"])
+        if windows and end - windows[-1][0] <= max_len:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def _transcribe_audios_batched(model, audios: list, language: str, batch_size: int) -> list[list[dict]]:
+    """One ``BatchedInferencePipeline`` pass over the VAD windows of all ``audios``."""
+    import numpy as np
+    from faster_whisper import BatchedInferencePipeline
+
+    sampling_rate = model.feature_extractor.sampling_rate
+    chunk_length = model.feature_extractor.chunk_length
+    starts: list[float] = []
+    clip_timestamps: list[dict] = []
+    position = 0
+    for audio in audios:
+        starts.append(position / sampling_rate)
+        for start, end in _speech_windows(audio, sampling_rate, chunk_length):
+            clip_timestamps.append(
+                {"start": (position + start) / sampling_rate, "end": (position + end) / sampling_rate}
+            )
+        position += len(audio)
+
+    results: list[list[dict]] = [[] for _ in audios]
+    if not clip_timestamps:
+        return results
+    segments, _ = BatchedInferencePipeline(model=model).transcribe(
+        np.concatenate(audios),
+        language=language,
+        clip_timestamps=clip_timestamps,
+        batch_size=batch_size,
+        word_timestamps=True,
+        without_timestamps=False,
+    )
+    for s in segments:
+        idx = max(0, bisect.bisect_right(starts, s.start) - 1)
+        results[idx].append(_segment_to_dict(s, starts[idx]))
+    return results
+
+
+def generate_subtitles_batch(
+    video_paths: list[Path],
+    language: str = "pt",
+    *,
+    model=None,
+    batch_size: int | None = None,
+    max_audio_seconds: float | None = None,
+) -> list[list[dict]]:
+    """
+    Transcribe many short clips with one model load and cross-clip batched inference.
+
+    Each clip's audio is decoded (16 kHz) and split by VAD into windows of at most 30 s;
+    the windows of all clips in a group run through faster-whisper's
+    ``BatchedInferencePipeline`` ``batch_size`` at a time, and segments are mapped back to
+    their clip (timestamps relative to the clip). Groups are capped at
+    ``WHISPER_BATCH_MAX_AUDIO_SEC`` of decoded audio to bound memory. Returns one segment
+    list per path, in order (same format as ``generate_subtitles``). Falls back to
+    sequential transcription with the shared model when the installed faster-whisper has
+    no batched pipeline. Like ``generate_subtitles``, a CUDA error (cuBLAS/cuDNN/OOM)
+    reloads the model on CPU (int8) and retries the group, unless ``WHISPER_DEBUG_GPU``.
+    """
+    if not video_paths:
+        return []
+    if model is None:
+        model, _ = load_whisper_model()
+    debug_gpu = os.getenv("WHISPER_DEBUG_GPU", "").strip() in ("1", "true", "yes")
+    batch_size = batch_size or int(os.getenv("WHISPER_BATCH_SIZE", "16") or 16)
+    if max_audio_seconds is None:
+        max_audio_seconds = float(os.getenv("WHISPER_BATCH_MAX_AUDIO_SEC", "1800") or 1800)
+    try:
+        from faster_whisper import BatchedInferencePipeline, decode_audio  # noqa: F401
+    except ImportError:
+        logger.warning("Whisper: BatchedInferencePipeline unavailable; transcribing clips sequentially")
+        return [_transcribe_with_model(model, str(p), language) for p in video_paths]
+
+    sampling_rate = model.feature_extractor.sampling_rate
+    max_samples = int(max_audio_seconds * sampling_rate)
+    results: list[list[dict]] = []
+    group: list = []
+
+    def _flush() -> None:
+        nonlocal model
+        logger.info("Whisper: batched transcription of %d clips (batch_size=%d)", len(group), batch_size)
+        try:
+            group_results = _transcribe_audios_batched(model, group, language, batch_size)
+        except (RuntimeError, OSError) as e:
+            logger.exception("Whisper: batched transcription error - %s: %s", type(e).__name__, e)
+            on_cpu = getattr(getattr(model, "model", None), "device", None) == "cpu"
+            if debug_gpu or on_cpu or not _is_cuda_error(e):
+                raise
+            logger.warning("Whisper: falling back to CPU (int8)")
+            model, _ = load_whisper_model(device="cpu")
+            group_results = _transcribe_audios_batched(model, group, language, batch_size)
+        results.extend(group_results)
+        group.clear()
+
+    for p in video_paths:
+        audio = decode_audio(str(p), sampling_rate=sampling_rate)
+        if group and sum(len(a) for a in group) + len(audio) > max_samples:
+            _flush()
+        group.append(audio)
+    _flush()
+    return results
+
+
 def _sec_to_ass_tc(sec: float) -> str:
     """Seconds to ASS timecode: H:MM:SS.cc"""
     h = int(sec // 3600)
@@ -487,6 +616,6 @@ def burn_subtitles(
         "-movflags", "+faststart",
         str(output_path),
     ]
-    res = run_cmd(cmd)
+    res = run_cmd(cmd, operation="burn_subtitles")
     if not res.ok:
         raise RuntimeError(f"burn subtitles failed: {res.stderr}")
@@ -0,0 +1,305 @@
+"""
+Prioridade das tarefas de auto-cut nas filas de transcrição e render (broker Redis).
+
+O transporte Redis do kombu guarda cada prioridade numa lista própria (passos 0/3/6/9, com 0
+sendo a mais alta) e o worker consome sempre a lista de menor passo primeiro. A classe de
+``analyze_auto_cuts_task`` e ``finalizar_auto_cut_task`` vem do déficit de inventário das
+brands de destino, ou seja, slots PLANNED do ``DailyPostingPlan`` nas próximas
+``TASK_PRIORITY_HORIZON_HOURS`` contra os ``VideoInventoryItem`` AVAILABLE:
+
+- ``urgent`` (0): há um slot sem inventário dentro de ``TASK_PRIORITY_URGENT_HOURS``;
+- ``high`` (3): há déficit dentro do horizonte;
+- ``normal`` (6): sem déficit, análise disparada por um usuário (e as demais tarefas das filas);
+- ``bulk`` (9): sem déficit, análise automática (auto-fetch/backfill).
+
+A classe é aplicada pelo router ``route_by_inventory_deficit`` (``config/celery.py``), então
+as chamadas ``delay``/``apply_async`` existentes não mudam. O déficit não é calculado na
+publicação: o beat de 60s (``refresh_deficit_snapshot``) grava no cache o prazo do primeiro
+slot descoberto de cada brand com déficit e o router só lê esse snapshot. Sem snapshot
+(beat parado), as tarefas caem em ``normal``/``bulk``. Para que nenhuma classe fique parada,
+``promote_aged_messages`` sobe um passo as mensagens que já esperaram demais: idade acima de
+``TASK_PRIORITY_AGING_SEC`` no passo 9, 2x no 6 e 3x no 3. Assim qualquer mensagem chega ao
+topo com no máximo 3x esse tempo de espera.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.common.broker_telemetry import PRIORITY_STEPS, priority_queue_key
+from apps.common.metrics import queue_priority_assigned_total, queue_priority_promoted_total
+from apps.common.queue_backlog import get_broker_redis_client
+from apps.common.task_observability import TASK_ENQUEUED_AT_MS_HEADER
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_URGENT = 0
+PRIORITY_HIGH = 3
+PRIORITY_NORMAL = 6
+PRIORITY_BULK = 9
+PRIORITY_CLASSES = {
+    PRIORITY_URGENT: "urgent",
+    PRIORITY_HIGH: "high",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BULK: "bulk",
+}
+NO_PRIORITY_CLASS = "none"
+
+PRIORITIZED_TASKS = frozenset(
+    {
+        "apps.auto_cuts.tasks.analyze_auto_cuts_task",
+        "apps.auto_cuts.tasks.finalizar_auto_cut_task",
+    }
+)
+
+_BRAND_CLASS_CACHE_KEY = "task_priority:brand:{}"
+_BRAND_CLASS_CACHE_TTL = 2 * 24 * 3600
+# {brand_id: epoch do primeiro slot descoberto}, só brands com déficit. Refeito a cada minuto;
+# o TTL cobre algumas execuções perdidas do beat.
+_DEFICIT_SNAPSHOT_CACHE_KEY = "task_priority:deficit_deadlines:v1"
+_DEFICIT_SNAPSHOT_TTL = 5 * 60
+
+
+@dataclass
+class BrandUrgency:
+    brand_id: int
+    deficit: int = 0
+    # Primeiro slot que o inventário AVAILABLE não cobre.
+    deadline: datetime | None = None
+
+    def priority(self, *, now: datetime, urgent_hours: float, fallback: int) -> int:
+        if self.deadline is not None and self.deadline - now <= timedelta(hours=urgent_hours):
+            return PRIORITY_URGENT
+        if self.deficit > 0:
+            return PRIORITY_HIGH
+        return fallback
+
+
+def priority_class(priority: int) -> str:
+    return PRIORITY_CLASSES.get(priority, NO_PRIORITY_CLASS)
+
+
+def brand_urgencies(brand_ids=None, *, now: datetime | None = None) -> dict[int, BrandUrgency]:
+    """
+    Déficit de inventário e prazo do primeiro slot descoberto por brand (2 consultas).
+    ``brand_ids=None``: todas as brands com slot no horizonte.
+    """
+    from apps.jobs.models import DailyPostingPlanItem, VideoInventoryItem
+
+    now = now or timezone.now()
+    horizon = now + timedelta(hours=float(getattr(settings, "TASK_PRIORITY_HORIZON_HOURS", 48)))
+    slots_qs = DailyPostingPlanItem.objects.filter(
+        status=DailyPostingPlanItem.Status.PLANNED,
+        scheduled_at__gte=now,
+        scheduled_at__lt=horizon,
+    )
+    inventory_qs = VideoInventoryItem.objects.filter(status="AVAILABLE")
+    urgencies: dict[int, BrandUrgency] = {}
+    if brand_ids is not None:
+        brand_ids = sorted({int(b) for b in brand_ids if b})
+        urgencies = {brand_id: BrandUrgency(brand_id=brand_id) for brand_id in brand_ids}
+        if not brand_ids:
+            return urgencies
+        slots_qs = slots_qs.filter(plan__brand_id__in=brand_ids)
+        inventory_qs = inventory_qs.filter(brand_id__in=brand_ids)
+
+    slots: dict[tuple[int, str], list[datetime]] = defaultdict(list)
+    for brand_id, video_type, scheduled_at in slots_qs.order_by("scheduled_at").values_list(
+        "plan__brand_id", "video_type", "scheduled_at"
+    ):
+        slots[(brand_id, video_type)].append(scheduled_at)
+    if brand_ids is None:
+        urgencies = {brand_id: BrandUrgency(brand_id=brand_id) for brand_id, _ in slots}
+        if not urgencies:
+            return urgencies
+        inventory_qs = inventory_qs.filter(brand_id__in=sorted(urgencies))
+    available = {
+        (row["brand_id"], row["video_type"]): row["n"]
+        for row in inventory_qs.values("brand_id", "video_type").annotate(n=Count("id"))
+    }
+
+    for (brand_id, video_type), times in slots.items():
+        uncovered = times[available.get((brand_id, video_type), 0):]
+        if not uncovered:
+            continue
+        urgency = urgencies[brand_id]
+        urgency.deficit += len(uncovered)
+        if urgency.deadline is None or uncovered[0] < urgency.deadline:
+            urgency.deadline = uncovered[0]
+    return urgencies
+
+
+def refresh_deficit_snapshot(*, now: datetime | None = None) -> dict[int, float]:
+    """Recalcula o prazo do primeiro slot descoberto das brands com déficit e grava no cache."""
+    snapshot = {
+        brand_id: urgency.deadline.timestamp()
+        for brand_id, urgency in brand_urgencies(now=now).items()
+        if urgency.deadline is not None
+    }
+    cache.set(_DEFICIT_SNAPSHOT_CACHE_KEY, snapshot, _DEFICIT_SNAPSHOT_TTL)
+    return snapshot
+
+
+def _deficit_snapshot() -> dict[int, float]:
+    try:
+        return cache.get(_DEFICIT_SNAPSHOT_CACHE_KEY) or {}
+    except Exception:
+        return {}
+
+
+def _analysis_brand_ids(analysis) -> list[int]:
+    """Brands que recebem os cortes: a de destino, ou todas da factory (modo theme/distribute)."""
+    if analysis.target_brand_id:
+        return [analysis.target_brand_id]
+    from apps.brands.models import Brand
+
+    factory_id = Brand.objects.filter(pk=analysis.brand_id).values_list("factory_id", flat=True).first()
+    if factory_id:
+        return list(Brand.objects.filter(factory_id=factory_id).values_list("id", flat=True))
+    return [analysis.brand_id]
+
+
+def analysis_priority(analysis_id: int, *, now: datetime | None = None) -> int:
+    """
+    Prioridade (passo do Redis) de uma tarefa de auto-cut pelo snapshot de déficit (sem
+    consultar slots nem inventário); registra a classe de cada brand.
+    """
+    from apps.auto_cuts.models import AutoCutAnalysis
+
+    analysis = (
+        AutoCutAnalysis.objects.filter(pk=analysis_id)
+        .only("id", "user_id", "brand_id", "target_brand_id")
+        .first()
+    )
+    if analysis is None:
+        return PRIORITY_NORMAL
+    now = now or timezone.now()
+    urgent_hours = float(getattr(settings, "TASK_PRIORITY_URGENT_HOURS", 12))
+    fallback = PRIORITY_NORMAL if analysis.user_id else PRIORITY_BULK
+    deadlines = _deficit_snapshot()
+    per_brand = {}
+    for brand_id in _analysis_brand_ids(analysis):
+        deadline = deadlines.get(brand_id)
+        urgency = BrandUrgency(brand_id=brand_id)
+        if deadline is not None:
+            urgency.deficit = 1
+            urgency.deadline = datetime.fromtimestamp(deadline, tz=UTC)
+        per_brand[brand_id] = urgency.priority(now=now, urgent_hours=urgent_hours, fallback=fallback)
+    if per_brand:
+        cache.set_many(
+            {_BRAND_CLASS_CACHE_KEY.format(b): priority_class(p) for b, p in per_brand.items()},
+            _BRAND_CLASS_CACHE_TTL,
+        )
+    return min(per_brand.values(), default=fallback)
+
+
+def last_brand_priority_class(brand_id: int) -> str:
+    """Classe da última tarefa de auto-cut enfileirada para a brand ("none" se não houve)."""
+    try:
+        return cache.get(_BRAND_CLASS_CACHE_KEY.format(brand_id)) or NO_PRIORITY_CLASS
+    except Exception:
+        return NO_PRIORITY_CLASS
+
+
+def prioritized_queue_names() -> tuple[str, ...]:
+    return tuple(
+        getattr(settings, "TASK_PRIORITY_QUEUES", None)
+        or (settings.CELERY_QUEUE_TRANSCRIPTION, settings.CELERY_QUEUE_RENDER)
+    )
+
+
+def route_by_inventory_deficit(name, args, kwargs, options, task=None, **kw):
+    """
+    Router do Celery: para tarefas das filas priorizadas devolve a rota estática com
+    ``priority``. Nas demais retorna None, e a tabela ``CELERY_TASK_ROUTES`` decide.
+    """
+    route = dict((getattr(settings, "CELERY_TASK_ROUTES", {}) or {}).get(name) or {})
+    queue = (options or {}).get("queue") or route.get("queue")
+    queue_name = getattr(queue, "name", queue)
+    if not queue_name or queue_name not in prioritized_queue_names():
+        return None
+    priority = PRIORITY_NORMAL
+    if name in PRIORITIZED_TASKS and args:
+        try:
+            priority = analysis_priority(int(args[0]))
+        except Exception:
+            logger.warning("task_priority_resolution_failed", extra={"task_name": name}, exc_info=True)
+    queue_priority_assigned_total.labels(queue_name=queue_name, priority_class=priority_class(priority)).inc()
+    route["queue"] = queue_name
+    route["priority"] = priority
+    return route
+
+
+# Move de KEYS[1] (passo menor) para o fim de consumo de KEYS[2] as mensagens mais antigas
+# que ARGV[1] (ms). As mensagens sem x-enqueued-at-ms param a varredura.
+_PROMOTE_SCRIPT = """
+local moved = 0
+local limit = tonumber(ARGV[2])
+while moved < limit do
+  local raw = redis.call('LINDEX', KEYS[1], -1)
+  if not raw then break end
+  local ok, msg = pcall(cjson.decode, raw)
+  local ts = nil
+  if ok and type(msg) == 'table' then
+    for _, field in ipairs({'headers', 'properties'}) do
+      local m = msg[field]
+      if ts == nil and type(m) == 'table' then ts = tonumber(m[ARGV[3]]) end
+    end
+  end
+  if ts == nil or ts > tonumber(ARGV[1]) then break end
+  redis.call('RPOP', KEYS[1])
+  redis.call('RPUSH', KEYS[2], raw)
+  moved = moved + 1
+end
+return moved
+"""
+
+
+def promote_aged_messages(
+    queue_names=None,
+    *,
+    redis_client=None,
+    aging_s: float | None = None,
+    now_ms: float | None = None,
+    limit: int = 500,
+) -> dict[str, int]:
+    """
+    Sobe um passo as mensagens que esperam além do limite do seu passo (proteção contra
+    starvation). Vão para o fim de consumo da lista de cima, então saem antes das que já
+    estavam lá. Retorna quantas foram movidas por fila.
+    """
+    aging_s = float(getattr(settings, "TASK_PRIORITY_AGING_SEC", 1800) if aging_s is None else aging_s)
+    if aging_s <= 0:
+        return {}
+    client = redis_client or get_broker_redis_client(settings.CELERY_BROKER_URL)
+    now_ms = time.time() * 1000.0 if now_ms is None else now_ms
+    script = client.register_script(_PROMOTE_SCRIPT)
+    steps = (0, *PRIORITY_STEPS)
+    moved: dict[str, int] = {}
+    for queue_name in queue_names or prioritized_queue_names():
+        total = 0
+        # De cima para baixo: cada mensagem sobe no máximo um passo por execução.
+        for index in range(1, len(steps)):
+            src, dst = steps[index], steps[index - 1]
+            cutoff_ms = now_ms - aging_s * 1000.0 * (len(steps) - index)
+            count = int(
+                script(
+                    keys=[priority_queue_key(queue_name, src), priority_queue_key(queue_name, dst)],
+                    args=[cutoff_ms, limit, TASK_ENQUEUED_AT_MS_HEADER],
+                )
+                or 0
+            )
+            if count:
+                queue_priority_promoted_total.labels(queue_name=queue_name, from_class=priority_class(src)).inc(count)
+                total += count
+        moved[queue_name] = total
+    return moved
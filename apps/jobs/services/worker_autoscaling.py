@@ -0,0 +1,454 @@
+"""
+Autoscaling de concorrência dos workers Celery guiado pelo backlog das filas.
+
+A cada ciclo o controlador lê a telemetria do broker (``collect_broker_telemetry``: prontas,
+unacked, retidas por ETA e idade da mais antiga) e o custo médio por tarefa de cada fila
+(histograma ``task_duration_ms``). Com isso calcula quantos slots cada fila quer para drenar
+o trabalho pendente em ``AUTOSCALE_TARGET_DRAIN_SEC``. Depois distribui os orçamentos de
+CPU, RAM e sessões NVENC do nó (``plan_concurrency``): cada fila recebe primeiro seu
+``min_slots``, e os slots restantes vão, um a um, para a fila mais atrasada que ainda cabe
+no orçamento. Assim os núcleos de uma fila ociosa passam para a fila que está para trás.
+
+A histerese (``AutoscaleController``) sobe na hora e só desce depois de
+``AUTOSCALE_SCALE_DOWN_DELAY_SEC`` com o alvo abaixo do atual, um slot por vez.
+
+Dois jeitos de aplicar:
+
+- ``BacklogAutoscaler`` (``CELERY_WORKER_AUTOSCALER``): usado pelos workers prefork iniciados
+  com ``--autoscale=max,min``. Cada worker aplica a soma do plano das filas que consome;
+- ``manage.py autoscale_workers``: mostra o plano e, com ``--apply``, ajusta via
+  ``pool_grow``/``pool_shrink`` os workers prefork sem ``--autoscale``.
+
+Workers ``-P solo`` (Windows, ``start_celery*.bat``) não mudam de concorrência; o comando
+apenas os ignora.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import math
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from celery.worker.autoscale import Autoscaler
+from django.conf import settings
+
+from apps.common.broker_telemetry import QueueTelemetry, collect_broker_telemetry
+from apps.common.metrics import task_duration_ms
+
+logger = logging.getLogger(__name__)
+
+TASK_DURATION_METRIC = "task_duration_ms"
+
+
+@dataclass(frozen=True)
+class QueueProfile:
+    """Custo de um slot (processo do pool) da fila e limites de concorrência."""
+
+    queue_name: str
+    cpu: float = 1.0
+    ram_mb: float = 0.0
+    nvenc: int = 0
+    min_slots: int = 1
+    max_slots: int = 4
+    # Custo por tarefa (s) enquanto o histograma não tem amostras.
+    default_task_sec: float = 60.0
+
+
+@dataclass(frozen=True)
+class ResourceBudget:
+    """Orçamento do nó; 0 = sem limite naquele recurso."""
+
+    cpu: float = 0.0
+    ram_mb: float = 0.0
+    nvenc: int = 0
+
+    def fits(self, used: dict[str, float], profile: QueueProfile) -> bool:
+        for resource, limit in (("cpu", self.cpu), ("ram_mb", self.ram_mb), ("nvenc", self.nvenc)):
+            need = getattr(profile, resource)
+            if limit and need and used[resource] + need > limit + 1e-9:
+                return False
+        return True
+
+
+@dataclass
+class QueueDemand:
+    queue_name: str
+    ready: int = 0
+    # Entregues a um worker e não retidas por ETA (executando ou em prefetch).
+    running: int = 0
+    oldest_age_s: float = 0.0
+    task_sec: float = 60.0
+
+    @property
+    def outstanding(self) -> int:
+        return self.ready + self.running
+
+
+@dataclass
+class QueuePlan:
+    queue_name: str
+    wanted: int
+    slots: int
+    late: bool = False
+    drain_s: float = 0.0
+    limited_by: str = ""
+
+
+def load_queue_profiles() -> dict[str, QueueProfile]:
+    raw = getattr(settings, "AUTOSCALE_QUEUE_PROFILES", None) or {}
+    profiles = {}
+    for queue_name, values in raw.items():
+        values = {k: v for k, v in (values or {}).items() if k in QueueProfile.__dataclass_fields__}
+        values.pop("queue_name", None)
+        profiles[queue_name] = QueueProfile(queue_name=queue_name, **values)
+    return profiles
+
+
+def _physical_ram_mb() -> float:
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):  # Windows
+        return 0.0
+
+
+def load_budget() -> ResourceBudget:
+    cpu = float(getattr(settings, "AUTOSCALE_CPU_CORES", 0) or 0) or float(os.cpu_count() or 1)
+    ram_mb = float(getattr(settings, "AUTOSCALE_RAM_MB", 0) or 0) or _physical_ram_mb()
+    nvenc = int(getattr(settings, "AUTOSCALE_NVENC_SESSIONS", 0) or 0)
+    return ResourceBudget(cpu=cpu, ram_mb=ram_mb, nvenc=nvenc)
+
+
+# ---------------------------------------------------------------------------
+# Custo por tarefa (task_duration_ms)
+# ---------------------------------------------------------------------------
+
+
+def _duration_families() -> Iterable:
+    """
+    Famílias do ``task_duration_ms``: todos os diretórios sob ``PROMETHEUS_MULTIPROC_ROOT_DIR``
+    (um por container), o ``PROMETHEUS_MULTIPROC_DIR`` do processo ou o registry local.
+    """
+    root = os.environ.get("PROMETHEUS_MULTIPROC_ROOT_DIR")
+    own = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if root and os.path.isdir(root):
+        files = glob.glob(os.path.join(root, "*", "histogram_*.db"))
+    elif own and os.path.isdir(own):
+        files = glob.glob(os.path.join(own, "histogram_*.db"))
+    else:
+        return getattr(task_duration_ms, "collect", list)()
+    from prometheus_client import multiprocess
+
+    # Só com accumulate=True o merge gera o _count do histograma.
+    return multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+
+
+def task_duration_totals(families: Iterable | None = None) -> dict[str, tuple[float, float]]:
+    """Soma (ms) e contagem acumuladas do ``task_duration_ms`` por ``queue_name``."""
+    totals: dict[str, list[float]] = {}
+    for family in _duration_families() if families is None else families:
+        if family.name != TASK_DURATION_METRIC:
+            continue
+        for sample in family.samples:
+            queue_name = sample.labels.get("queue_name")
+            if not queue_name:
+                continue
+            item = totals.setdefault(queue_name, [0.0, 0.0])
+            if sample.name.endswith("_sum"):
+                item[0] += sample.value
+            elif sample.name.endswith("_count"):
+                item[1] += sample.value
+    return {queue_name: (s, c) for queue_name, (s, c) in totals.items()}
+
+
+class TaskCostTracker:
+    """
+    Custo médio (s) por tarefa e fila. Começa na média acumulada do histograma e depois
+    segue uma média móvel exponencial dos intervalos com amostras novas.
+    """
+
+    def __init__(self, *, alpha: float = 0.3) -> None:
+        self.alpha = alpha
+        self._last: dict[str, tuple[float, float]] = {}
+        self.cost_s: dict[str, float] = {}
+
+    def update(self, totals: dict[str, tuple[float, float]]) -> dict[str, float]:
+        for queue_name, (sum_ms, count) in totals.items():
+            prev_sum, prev_count = self._last.get(queue_name, (0.0, 0.0))
+            self._last[queue_name] = (sum_ms, count)
+            if count < prev_count:  # diretório multiprocess zerado (restart do web): recomeça
+                prev_sum, prev_count = 0.0, 0.0
+            delta_count = count - prev_count
+            if delta_count <= 0:
+                continue
+            window_s = (sum_ms - prev_sum) / delta_count / 1000.0
+            current = self.cost_s.get(queue_name)
+            self.cost_s[queue_name] = (
+                window_s if current is None else current + self.alpha * (window_s - current)
+            )
+        return dict(self.cost_s)
+
+
+# ---------------------------------------------------------------------------
+# Plano
+# ---------------------------------------------------------------------------
+
+
+def build_demands(
+    telemetry: dict[str, QueueTelemetry],
+    costs_s: dict[str, float],
+    profiles: dict[str, QueueProfile],
+) -> dict[str, QueueDemand]:
+    demands = {}
+    for queue_name, profile in profiles.items():
+        item = telemetry.get(queue_name) or QueueTelemetry()
+        demands[queue_name] = QueueDemand(
+            queue_name=queue_name,
+            ready=item.ready,
+            running=max(0, item.unacked - item.scheduled),
+            oldest_age_s=item.oldest_age_s or 0.0,
+            task_sec=costs_s.get(queue_name) or profile.default_task_sec,
+        )
+    return demands
+
+
+def wanted_slots(demand: QueueDemand, profile: QueueProfile, *, target_drain_s: float, max_wait_s: float) -> int:
+    """Slots para drenar o pendente em ``target_drain_s`` (+1 se a mais antiga já passou de ``max_wait_s``)."""
+    outstanding = demand.outstanding
+    if outstanding <= 0:
+        return profile.min_slots
+    wanted = math.ceil(outstanding * demand.task_sec / max(1.0, target_drain_s))
+    if max_wait_s and demand.oldest_age_s > max_wait_s:
+        wanted += 1
+    return max(profile.min_slots, min(profile.max_slots, outstanding, wanted))
+
+
+def plan_concurrency(
+    demands: dict[str, QueueDemand],
+    profiles: dict[str, QueueProfile],
+    budget: ResourceBudget,
+    *,
+    target_drain_s: float,
+    max_wait_s: float,
+) -> dict[str, QueuePlan]:
+    """
+    Distribui o orçamento entre as filas. Os mínimos entram sempre (mesmo acima do orçamento);
+    cada slot extra vai para a fila que levaria mais tempo para drenar com o que já tem (filas
+    atrasadas primeiro), enquanto ela quiser mais e couber no orçamento.
+    """
+    plans: dict[str, QueuePlan] = {}
+    used = {"cpu": 0.0, "ram_mb": 0.0, "nvenc": 0.0}
+    for queue_name, profile in profiles.items():
+        demand = demands.get(queue_name) or QueueDemand(queue_name=queue_name, task_sec=profile.default_task_sec)
+        plans[queue_name] = QueuePlan(
+            queue_name=queue_name,
+            wanted=wanted_slots(demand, profile, target_drain_s=target_drain_s, max_wait_s=max_wait_s),
+            slots=profile.min_slots,
+            late=bool(max_wait_s and demand.oldest_age_s > max_wait_s),
+        )
+        for resource in used:
+            used[resource] += getattr(profile, resource) * profile.min_slots
+
+    def backlog_s(queue_name: str) -> float:
+        demand = demands.get(queue_name)
+        if demand is None:
+            return 0.0
+        return demand.outstanding * demand.task_sec / max(1, plans[queue_name].slots)
+
+    while True:
+        candidates = [p for p in plans.values() if p.slots < p.wanted]
+        if not candidates:
+            break
+        granted = False
+        for plan in sorted(candidates, key=lambda p: (p.late, backlog_s(p.queue_name)), reverse=True):
+            profile = profiles[plan.queue_name]
+            if not budget.fits(used, profile):
+                continue
+            plan.slots += 1
+            for resource in used:
+                used[resource] += getattr(profile, resource)
+            granted = True
+            break
+        if not granted:
+            break
+
+    for plan in plans.values():
+        plan.drain_s = backlog_s(plan.queue_name)
+        if plan.slots < plan.wanted:
+            profile = profiles[plan.queue_name]
+            plan.limited_by = next(
+                (
+                    resource
+                    for resource, limit in (("cpu", budget.cpu), ("ram_mb", budget.ram_mb), ("nvenc", budget.nvenc))
+                    if limit and getattr(profile, resource) and used[resource] + getattr(profile, resource) > limit
+                ),
+                "",
+            )
+    return plans
+
+
+class AutoscaleController:
+    """Histerese: sobe imediatamente; desce um slot por vez após ``scale_down_delay_s`` abaixo do alvo."""
+
+    def __init__(self, *, scale_down_delay_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.scale_down_delay_s = scale_down_delay_s
+        self._clock = clock
+        self.current: dict[str, int] = {}
+        self._below_since: dict[str, float] = {}
+
+    def step(self, targets: dict[str, int]) -> dict[str, int]:
+        now = self._clock()
+        for queue_name, target in targets.items():
+            current = self.current.get(queue_name)
+            if current is None or target >= current:
+                self.current[queue_name] = target
+                self._below_since.pop(queue_name, None)
+                continue
+            since = self._below_since.setdefault(queue_name, now)
+            if now - since >= self.scale_down_delay_s:
+                self.current[queue_name] = current - 1
+                self._below_since[queue_name] = now
+        return dict(self.current)
+
+
+@dataclass
+class BacklogScaler:
+    """Telemetria + custo + plano + histerese; um por processo (worker ou comando)."""
+
+    profiles: dict[str, QueueProfile] = field(default_factory=load_queue_profiles)
+    budget: ResourceBudget = field(default_factory=load_budget)
+    target_drain_s: float = field(default_factory=lambda: float(getattr(settings, "AUTOSCALE_TARGET_DRAIN_SEC", 600)))
+    max_wait_s: float = field(default_factory=lambda: float(getattr(settings, "AUTOSCALE_MAX_WAIT_SEC", 900)))
+    controller: AutoscaleController = field(
+        default_factory=lambda: AutoscaleController(
+            scale_down_delay_s=float(getattr(settings, "AUTOSCALE_SCALE_DOWN_DELAY_SEC", 300))
+        )
+    )
+    costs: TaskCostTracker = field(default_factory=TaskCostTracker)
+    last_plan: dict[str, QueuePlan] = field(default_factory=dict)
+
+    def tick(self, *, telemetry: dict[str, QueueTelemetry] | None = None, totals=None) -> dict[str, int]:
+        if telemetry is None:
+            telemetry = collect_broker_telemetry(queue_names=list(self.profiles))
+        if not telemetry:
+            # Broker fora do ar / não-Redis: mantém o que está.
+            return dict(self.controller.current)
+        try:
+            costs_s = self.costs.update(task_duration_totals() if totals is None else totals)
+        except Exception:
+            logger.warning("autoscale_task_cost_read_failed", exc_info=True)
+            costs_s = dict(self.costs.cost_s)
+        self.last_plan = plan_concurrency(
+            build_demands(telemetry, costs_s, self.profiles),
+            self.profiles,
+            self.budget,
+            target_drain_s=self.target_drain_s,
+            max_wait_s=self.max_wait_s,
+        )
+        return self.controller.step({q: p.slots for q, p in self.last_plan.items()})
+
+
+def worker_target(slots: dict[str, int], queue_names: Iterable[str], workers_per_queue: dict[str, int] | None = None) -> int:
+    """Concorrência de um worker: soma das filas que consome, dividida entre os workers de cada fila."""
+    workers_per_queue = workers_per_queue or {}
+    return sum(
+        math.ceil(slots[q] / max(1, workers_per_queue.get(q, 1))) for q in queue_names if q in slots
+    )
+
+
+class BacklogAutoscaler(Autoscaler):
+    """
+    Autoscaler do worker Celery (``--autoscale=max,min``) guiado pelo plano em vez das
+    tarefas reservadas. ``max``/``min`` do worker continuam sendo os limites. Se a
+    telemetria falhar (ou antes do primeiro plano), cai no comportamento padrão do Celery.
+
+    O plano (HSCAN do broker e merge dos histogramas de todos os containers) roda numa
+    thread à parte: ``maybe_scale`` é chamado no loop de eventos do worker e só aplica o
+    último alvo calculado, sem bloquear consumo e heartbeats.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._scaler: BacklogScaler | None = None
+        self._interval_s = float(getattr(settings, "AUTOSCALE_INTERVAL_SEC", 15))
+        self._next_tick = 0.0
+        self._target: int | None = None
+        self._refresh_thread: threading.Thread | None = None
+
+    def _queue_names(self) -> list[str]:
+        try:
+            names = list(self.worker.app.amqp.queues.consume_from or {})
+        except AttributeError:
+            names = []
+        return names or [getattr(settings, "CELERY_TASK_DEFAULT_QUEUE", "celery")]
+
+    def _refresh_target(self) -> None:
+        now = time.monotonic()
+        if now < self._next_tick or (self._refresh_thread is not None and self._refresh_thread.is_alive()):
+            return
+        self._next_tick = now + self._interval_s
+        self._refresh_thread = threading.Thread(
+            target=self._compute_target, name="backlog-autoscaler", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def _compute_target(self) -> None:
+        try:
+            if self._scaler is None:
+                self._scaler = BacklogScaler()
+            slots = self._scaler.tick()
+        except Exception:
+            logger.warning("autoscale_plan_failed", exc_info=True)
+            self._target = None
+            return
+        queue_names = [q for q in self._queue_names() if q in slots]
+        self._target = worker_target(slots, queue_names) if queue_names else None
+
+    def _maybe_scale(self, req=None):
+        self._refresh_target()
+        if self._target is None:
+            return super()._maybe_scale(req)
+        procs = self.processes
+        target = max(self.min_concurrency, min(self.max_concurrency, self._target))
+        if target > procs:
+            self.scale_up(target - procs)
+            return True
+        if target < procs:
+            # A histerese já está no plano; _shrink só remove processos ociosos.
+            self._shrink(procs - target)
+            return True
+        return None
+
+
+def apply_to_workers(control, slots: dict[str, int], *, timeout: float = 2.0) -> list[tuple[str, int, int]]:
+    """
+    Ajusta via ``pool_grow``/``pool_shrink`` os workers prefork vivos para o plano.
+    Retorna ``(worker, atual, alvo)`` de cada ajuste enviado; workers solo são ignorados.
+    """
+    inspect = control.inspect(timeout=timeout)
+    active = inspect.active_queues() or {}
+    stats = inspect.stats() or {}
+    workers_per_queue: dict[str, int] = {}
+    for queues in active.values():
+        for queue in queues:
+            workers_per_queue[queue["name"]] = workers_per_queue.get(queue["name"], 0) + 1
+
+    changes = []
+    for worker, queues in sorted(active.items()):
+        pool = (stats.get(worker) or {}).get("pool") or {}
+        if "prefork" not in str(pool.get("implementation", "")):
+            continue
+        current = len(pool.get("processes") or []) or int(pool.get("max-concurrency") or 0)
+        target = worker_target(slots, [q["name"] for q in queues], workers_per_queue)
+        if not target or not current or target == current:
+            continue
+        if target > current:
+            control.pool_grow(target - current, destination=[worker])
+        else:
+            control.pool_shrink(current - target, destination=[worker])
+        changes.append((worker, current, target))
+    return changes
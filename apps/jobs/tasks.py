@@ -14,12 +14,12 @@ from apps.common.metrics import (
     transcription_failures_total,
     transcription_jobs_total,
 )
-from apps.common.task_observability import resolve_task_observation_labels
+from apps.common.task_observability import instrument_celery_task, resolve_task_observation_labels
 
 from . import tasks_auto_fetch  # noqa: F401 - registra check_and_fetch_new_videos_task
 from .logging_utils import Timer, ensure_job_correlation_id, log_event
 from .services.dead_letter import create_dead_letter_job
-from .services.ffmpeg import has_nvenc
+from .services.ffmpeg import ffprobe_duration, has_nvenc
 from .services.pipeline import run_job
 from .services.pipeline_execution import (
     STAGE_JOB_PROCESSING,
@@ -50,6 +50,14 @@ def _whisper_workload_type() -> str:
     return "cpu" if force_cpu else "gpu"
 
 
+def _probe_media_seconds(path: Path) -> float | None:
+    """Duração do arquivo gerado (ledger de performance); None se o ffprobe falhar."""
+    try:
+        return ffprobe_duration(path)
+    except (RuntimeError, ValueError, OSError):
+        return None
+
+
 def _resolve_task_context(task) -> tuple[str, str]:
     return resolve_task_observation_labels(
         task=task,
@@ -64,6 +72,7 @@ def _fail_stage_and_pipeline(
     error: Exception | None = None,
     error_class: str = "",
     error_message: str = "",
+    encoder: str = "",
 ) -> None:
     stage_execution = fail_stage(
         pipeline_execution,
@@ -71,6 +80,7 @@ def _fail_stage_and_pipeline(
         error=error,
         error_class=error_class,
         error_message=error_message,
+        encoder=encoder,
     )
     mark_pipeline_failed(
         pipeline_execution,
@@ -123,7 +133,7 @@ def process_job(self, job_id: int) -> None:
     )
 
     try:
-        run_job(job_id)
+        stats = run_job(job_id) or {}
     except Exception as exc:
         _fail_stage_and_pipeline(
             pipeline_execution,
@@ -136,6 +146,8 @@ def process_job(self, job_id: int) -> None:
         pipeline_execution,
         stage_name=STAGE_JOB_PROCESSING,
         output_payload={"job_status": "DONE"},
+        media_seconds=stats.get("media_seconds"),
+        encoder=stats.get("encoder", ""),
     )
     mark_pipeline_completed(
         pipeline_execution,
@@ -240,6 +252,8 @@ def generate_subtitles_task(self, job_id: int) -> None:
                 "segments_count": len(segments),
                 "subtitle_status": job.subtitle_status,
             },
+            media_seconds=max((float(s.get("end") or 0) for s in segments), default=None),
+            encoder=_workload,
         )
         transcription_duration_ms.labels(workload_type=_workload).observe(_timer.elapsed_ms())
         log_event(
@@ -272,6 +286,7 @@ def generate_subtitles_task(self, job_id: int) -> None:
             pipeline_execution,
             stage_name=STAGE_TRANSCRIPTION,
             error=e,
+            encoder=_workload,
         )
         raise
 
@@ -394,6 +409,7 @@ def burn_subtitles_task(self, job_id: int) -> None:
             final_name = f"job_{job.id}_subs.mp4"
             final_path = final_dir / final_name
             shutil.copy2(output_tmp, final_path)
+        media_seconds = _probe_media_seconds(final_path)
         from django.db import transaction
 
         old_file_name = out.file.name
@@ -419,6 +435,8 @@ def burn_subtitles_task(self, job_id: int) -> None:
                 "output_file": out.file.name,
                 "subtitle_status": job.subtitle_status,
             },
+            media_seconds=media_seconds,
+            encoder=_workload,
         )
         mark_pipeline_completed(
             pipeline_execution,
@@ -455,5 +473,34 @@ def burn_subtitles_task(self, job_id: int) -> None:
             pipeline_execution,
             stage_name=STAGE_SUBTITLE_BURN,
             error=e,
+            encoder=_workload,
         )
         raise
+
+
+@shared_task(soft_time_limit=600, time_limit=660)
+@instrument_celery_task
+def rollup_stage_performance_task() -> dict:
+    """Reconsolida o ledger de performance de ontem e de hoje (idempotente)."""
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from .services.stage_performance import rollup_stage_performance
+
+    today = timezone.localdate()
+    rows = rollup_stage_performance(today - timedelta(days=1)) + rollup_stage_performance(today)
+    return {"rows": rows}
+
+
+@shared_task(soft_time_limit=50, time_limit=60)
+@instrument_celery_task
+def promote_aged_queue_messages_task() -> dict:
+    """
+    Atualiza o snapshot de déficit de inventário lido pelo router e sobe um passo de
+    prioridade as mensagens que esperam demais nas filas priorizadas.
+    """
+    from .services.task_priority import promote_aged_messages, refresh_deficit_snapshot
+
+    deficits = refresh_deficit_snapshot()
+    return {"brands_with_deficit": len(deficits), "promoted": promote_aged_messages()}
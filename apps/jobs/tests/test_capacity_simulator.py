@@ -0,0 +1,103 @@
+"""Testes do simulador de capacidade (determinismo, perfis de duração e comando)."""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.jobs.models import PipelineExecution, StageExecution
+from apps.jobs.services.capacity_simulator import (
+    STAGE_PUBLISH,
+    STAGE_RENDER,
+    STAGE_RENDER_LONG,
+    STAGE_TRANSCRIPTION,
+    CapacitySimulator,
+    SimulationConfig,
+    build_profiles,
+    profiles_from_metrics_text,
+    profiles_from_stage_executions,
+    slots_for_brands,
+    synthetic_brands,
+)
+
+START = date(2026, 11, 2)
+
+
+def _run(**overrides):
+    brands = synthetic_brands(5, posts_per_day=10)
+    cfg = SimulationConfig(start_day=START, days=1, sources_per_day=12, shorts_per_source=6, **overrides)
+    simulator = CapacitySimulator(cfg, build_profiles(), slots_for_brands(brands, START, 1))
+    return simulator.run()
+
+
+class CapacitySimulatorTests(TestCase):
+    def test_deterministic_for_same_seed(self):
+        self.assertEqual(_run(seed=7), _run(seed=7))
+
+    def test_more_render_workers_reduce_render_wait(self):
+        one = _run(workers={"render": 1})
+        four = _run(workers={"render": 4})
+        self.assertGreater(one["queues"]["render"]["wait_p95_ms"], four["queues"]["render"]["wait_p95_ms"])
+        self.assertGreater(four["queues"]["render"]["utilization"], 0)
+
+    def test_slots_missed_without_inventory(self):
+        brands = synthetic_brands(2, posts_per_day=4)
+        slots = slots_for_brands(brands, START, 1)
+        self.assertEqual(len(slots), 8)
+        summary = CapacitySimulator(SimulationConfig(start_day=START), build_profiles(), slots).run()
+        self.assertEqual(summary["slots"], {"planned": 8, "published": 0, "missed": 8, "late": 0})
+
+        stocked = SimulationConfig(start_day=START, initial_inventory={"SHORT": 10})
+        summary = CapacitySimulator(stocked, build_profiles(), slots).run()
+        self.assertEqual(summary["slots"]["published"], 8)
+        self.assertEqual(summary["inventory_at_end"]["SHORT"], 12)
+
+
+class DurationProfileTests(TestCase):
+    def test_profiles_from_stage_executions(self):
+        pe = PipelineExecution.objects.create(pipeline_type="job_pipeline", aggregate_type="job", aggregate_id=1)
+        StageExecution.objects.create(
+            pipeline_execution=pe, stage_name="transcription", status="completed", duration_ms=1000
+        )
+        StageExecution.objects.create(
+            pipeline_execution=pe, stage_name="subtitle_burn", status="completed", duration_ms=5000
+        )
+        StageExecution.objects.create(pipeline_execution=pe, stage_name="job_processing", status="failed", duration_ms=9)
+        profiles = build_profiles(recorded=profiles_from_stage_executions())
+        self.assertEqual(profiles[STAGE_TRANSCRIPTION].values, [1000.0])
+        self.assertEqual(profiles[STAGE_RENDER].values, [5000.0])
+        self.assertEqual(profiles[STAGE_RENDER_LONG].values, [20000.0])
+        self.assertEqual(profiles[STAGE_PUBLISH].source, "default")
+
+    def test_profiles_from_histogram_text(self):
+        text = "\n".join(
+            [
+                '# TYPE task_duration_ms histogram',
+                'task_duration_ms_bucket{queue_name="publish",task_name="apps.social.tasks.post_to_platforms_task",le="1000.0"} 2.0',
+                'task_duration_ms_bucket{queue_name="publish",task_name="apps.social.tasks.post_to_platforms_task",le="5000.0"} 5.0',
+                'task_duration_ms_bucket{queue_name="publish",task_name="apps.social.tasks.post_to_platforms_task",le="+Inf"} 6.0',
+                'task_duration_ms_bucket{queue_name="x",task_name="apps.other.unknown_task",le="1000.0"} 3.0',
+            ]
+        )
+        profiles = profiles_from_metrics_text(text)
+        self.assertEqual(list(profiles), [STAGE_PUBLISH])
+        self.assertEqual(profiles[STAGE_PUBLISH].values, [500.0, 3000.0, 10000.0])
+        self.assertEqual(profiles[STAGE_PUBLISH].weights, [2.0, 3.0, 1.0])
+
+    def test_command_json_and_csv(self):
+        args = ["simulate_capacity", "--start", str(START), "--brands", "2", "--posts-per-day", "3"]
+        out = StringIO()
+        call_command(*args, "--sources-per-day", "4", "--workers", "render=2", stdout=out)
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["queues"]["render"]["workers"], 2)
+        self.assertEqual(summary["slots"]["planned"], 6)
+
+        out = StringIO()
+        call_command(*args, "--format", "csv", stdout=out)
+        lines = out.getvalue().strip().splitlines()
+        self.assertTrue(lines[0].startswith("at,backlog_"))
+        self.assertEqual(len(lines), 26)
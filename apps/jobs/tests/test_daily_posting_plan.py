@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
-from datetime import date, time
+from datetime import date, time, timedelta
+from io import StringIO
 from zoneinfo import ZoneInfo
 
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from apps.brands.models import Brand, Factory
-from apps.jobs.models import DailyPostingPlan
+from apps.jobs.models import DailyPostingPlan, DailyPostingPlanItem
 from apps.jobs.services.channel_schedule_config import ChannelScheduleConfig
 from apps.jobs.services.daily_posting_plan_service import (
     DailyPostingPlanService,
@@ -199,3 +203,95 @@ class DailyPostingPlanServiceTests(TestCase):
 class MaxPostsForWindowTests(TestCase):
     def test_max_posts_formula(self):
         self.assertEqual(max_posts_for_window(window_minutes=120, min_gap_minutes=60), 3)
+
+
+class DailyPostingPlanHorizonTests(TestCase):
+    def setUp(self):
+        self.factory = Factory.objects.create(name="FH", timezone="America/Sao_Paulo")
+        self.brands = []
+        for i in range(3):
+            brand = Brand.objects.create(name=f"BH{i}", slug=f"bh{i}", factory=self.factory)
+            brand.base_start_time = time(8, 0)
+            brand.base_end_time = time(22, 0)
+            brand.daily_min_posts = 2
+            brand.daily_max_posts = 4
+            brand.daily_max_long_posts = 1
+            brand.min_gap_minutes = 30
+            brand.max_gap_minutes = 120
+            brand.active_weekdays = [0, 1, 2, 3, 4]
+            brand.save()
+            self.brands.append(brand)
+        self.start = date(2026, 4, 6)  # segunda
+
+    def _slots(self, plan):
+        return [(i.scheduled_at, i.video_type) for i in plan.items.order_by("order_index")]
+
+    def test_horizon_matches_single_day_generation(self):
+        entries = DailyPostingPlanService.generate_horizon(self.factory, self.start, 7)
+        self.assertEqual(len(entries), 21)
+        self.assertEqual({e.action for e in entries}, {"create"})
+        horizon = {
+            (p.brand_id, p.plan_date): (p.status, p.planned_posts_count, self._slots(p))
+            for p in DailyPostingPlan.objects.all()
+        }
+        self.assertEqual(len(horizon), 21)
+        self.assertEqual(horizon[(self.brands[0].id, self.start + timedelta(days=5))][0], "SKIPPED")
+
+        DailyPostingPlan.objects.all().delete()
+        for brand in self.brands:
+            for i in range(7):
+                day = self.start + timedelta(days=i)
+                plan = DailyPostingPlanService.get_or_generate_for_day(brand, day)
+                self.assertEqual(horizon[(brand.id, day)], (plan.status, plan.planned_posts_count, self._slots(plan)))
+
+    def test_dry_run_writes_nothing(self):
+        entries = DailyPostingPlanService.generate_horizon(self.factory, self.start, 3, dry_run=True)
+        self.assertEqual(len(entries), 9)
+        self.assertTrue(all(e.slots for e in entries))
+        self.assertFalse(DailyPostingPlan.objects.exists())
+        added, removed = entries[0].diff()
+        self.assertEqual(added, sorted(entries[0].slots))
+        self.assertEqual(removed, [])
+
+    def test_reuses_existing_and_blocks_consumed_on_force(self):
+        DailyPostingPlanService.generate_horizon(self.factory, self.start, 2)
+        item_ids = set(DailyPostingPlanItem.objects.values_list("id", flat=True))
+        entries = DailyPostingPlanService.generate_horizon(self.factory, self.start, 2)
+        self.assertEqual({e.action for e in entries}, {"reuse"})
+        self.assertEqual(set(DailyPostingPlanItem.objects.values_list("id", flat=True)), item_ids)
+
+        consumed = DailyPostingPlanItem.objects.filter(
+            plan__brand=self.brands[0], plan__plan_date=self.start
+        ).first()
+        consumed.status = DailyPostingPlanItem.Status.CONSUMED
+        consumed.save(update_fields=["status"])
+        entries = DailyPostingPlanService.generate_horizon(self.factory, self.start, 2, force_regenerate=True)
+        actions = {(e.brand_id, e.plan_date): e.action for e in entries}
+        self.assertEqual(actions.pop((self.brands[0].id, self.start)), "blocked")
+        self.assertEqual(set(actions.values()), {"regenerate"})
+        self.assertTrue(DailyPostingPlanItem.objects.filter(pk=consumed.pk).exists())
+
+    def test_query_count_does_not_grow_with_horizon(self):
+        with CaptureQueriesContext(connection) as short:
+            DailyPostingPlanService.generate_horizon(self.factory, self.start, 1)
+        DailyPostingPlan.objects.all().delete()
+        with CaptureQueriesContext(connection) as long:
+            DailyPostingPlanService.generate_horizon(self.factory, self.start, 14)
+        self.assertEqual(len(short.captured_queries), len(long.captured_queries))
+
+    def test_command_dry_run_prints_slots(self):
+        out = StringIO()
+        call_command(
+            "plan_posting_horizon",
+            "--factory",
+            str(self.factory.id),
+            "--start",
+            str(self.start),
+            "--days",
+            "2",
+            "--dry-run",
+            stdout=out,
+        )
+        self.assertIn("[dry-run] 6 plano(s)", out.getvalue())
+        self.assertIn(" + ", out.getvalue())
+        self.assertFalse(DailyPostingPlan.objects.exists())
@@ -5,13 +5,30 @@ from __future__ import annotations
 from datetime import UTC, date, datetime, time
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from apps.brands.models import Brand, Factory
 from apps.jobs.models import DailyPostingPlan, DailyPostingPlanItem
 from apps.jobs.services import factory_scheduler
 from apps.jobs.services.factory_scheduler import generate_daily_schedule_for_factory
 
+_original_horizon = factory_scheduler.DailyPostingPlanService.generate_horizon
+
+
+def _horizon_with_error(error):
+    """generate_horizon cujo plano sai em ERROR (falha na primeira tentativa do run)."""
+
+    def horizon(*args, **kwargs):
+        entries = _original_horizon(*args, **kwargs)
+        for entry in entries:
+            entry.plan.items.all().delete()
+            entry.plan.status = DailyPostingPlan.Status.ERROR
+            entry.plan.last_error = error
+            entry.plan.save()
+        return entries
+
+    return horizon
+
 
 class FactoryScheduleRetryTests(TestCase):
     def setUp(self):
@@ -37,23 +54,8 @@ class FactoryScheduleRetryTests(TestCase):
         original = factory_scheduler.DailyPostingPlanService.get_or_generate_for_day
         calls: list[int] = []
 
-        def flaky(brand, day, *, correlation_id=None, force_regenerate=False, attempt=0):
+        def tracked(brand, day, *, correlation_id=None, force_regenerate=False, attempt=0):
             calls.append(attempt)
-            if attempt == 0:
-                plan, _ = DailyPostingPlan.objects.get_or_create(
-                    brand=brand,
-                    plan_date=day,
-                    defaults={
-                        "timezone": "America/Sao_Paulo",
-                        "status": DailyPostingPlan.Status.ERROR,
-                        "planned_posts_count": 0,
-                        "last_error": "falha_ao_distribuir_shorts_em_segmento",
-                    },
-                )
-                plan.status = DailyPostingPlan.Status.ERROR
-                plan.last_error = "falha_ao_distribuir_shorts_em_segmento"
-                plan.save()
-                return plan
             return original(
                 brand,
                 day,
@@ -65,7 +67,11 @@ class FactoryScheduleRetryTests(TestCase):
         with patch.object(
             factory_scheduler.DailyPostingPlanService,
             "get_or_generate_for_day",
-            side_effect=flaky,
+            side_effect=tracked,
+        ), patch.object(
+            factory_scheduler.DailyPostingPlanService,
+            "generate_horizon",
+            side_effect=_horizon_with_error("falha_ao_distribuir_shorts_em_segmento"),
         ):
             result = generate_daily_schedule_for_factory(
                 self.factory,
@@ -77,8 +83,8 @@ class FactoryScheduleRetryTests(TestCase):
 
         self.assertEqual(result["retried_recovered"], 1)
         self.assertEqual(result["retried_exhausted"], 0)
-        self.assertIn(0, calls)
-        self.assertIn(1, calls)
+        # Primeira passada usa o plano do horizonte; só a retentativa gera por brand.
+        self.assertEqual(calls, [1])
         plan = DailyPostingPlan.objects.get(brand=self.brand, plan_date=target)
         self.assertEqual(plan.status, DailyPostingPlan.Status.GENERATED)
         items_total = (
@@ -111,6 +117,10 @@ class FactoryScheduleRetryTests(TestCase):
             factory_scheduler.DailyPostingPlanService,
             "get_or_generate_for_day",
             side_effect=always_error,
+        ), patch.object(
+            factory_scheduler.DailyPostingPlanService,
+            "generate_horizon",
+            side_effect=_horizon_with_error("falha_persistente"),
         ):
             result = generate_daily_schedule_for_factory(
                 self.factory,
@@ -122,3 +132,23 @@ class FactoryScheduleRetryTests(TestCase):
 
         self.assertEqual(result["retried_recovered"], 0)
         self.assertEqual(result["retried_exhausted"], 1)
+
+    @override_settings(DAILY_PLAN_HORIZON_DAYS=3)
+    def test_first_pass_reuses_horizon_plans_without_per_brand_generation(self):
+        target = date(2026, 4, 20)
+        now_utc = datetime(2026, 4, 20, 11, 0, tzinfo=UTC)
+
+        with patch.object(
+            factory_scheduler.DailyPostingPlanService,
+            "get_or_generate_for_day",
+        ) as per_brand:
+            result = generate_daily_schedule_for_factory(
+                self.factory,
+                now_utc=now_utc,
+                target_date=target,
+                correlation_id="test-cid",
+            )
+
+        per_brand.assert_not_called()
+        self.assertEqual(result["retried_exhausted"], 0)
+        self.assertEqual(DailyPostingPlan.objects.filter(brand=self.brand).count(), 3)
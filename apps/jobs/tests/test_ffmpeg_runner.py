@@ -0,0 +1,117 @@
+"""Testes do runner de subprocessos do ffmpeg (progress, tail de stderr, timeouts, rusage)."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.jobs.services import ffmpeg_runner
+from apps.jobs.services.ffmpeg import run_cmd
+from apps.jobs.services.ffmpeg_runner import run_process, with_progress_args
+
+_FAKE_FFMPEG = """\
+#!{python}
+import sys, time
+assert sys.argv[1:4] == ["-progress", "pipe:1", "-nostats"], sys.argv
+sys.stderr.write("  Duration: 00:00:10.00, start: 0.000000, bitrate: 128 kb/s\\n")
+for i in range(1, {blocks} + 1):
+    sys.stdout.write(
+        "frame=%d\\nfps=30.0\\nstream_0_0_q=23.0\\nout_time_us=%d\\nspeed=2.0x\\nprogress=%s\\n"
+        % (i * 30, i * 2_500_000, "end" if i == {blocks} else "continue")
+    )
+    sys.stdout.flush()
+time.sleep({sleep})
+"""
+
+
+class FfmpegRunnerTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _fake_ffmpeg(self, *, blocks=4, sleep=0.0) -> str:
+        path = self.tmp / "ffmpeg"
+        path.write_text(textwrap.dedent(_FAKE_FFMPEG).format(python=sys.executable, blocks=blocks, sleep=sleep))
+        os.chmod(path, 0o755)
+        return str(path)
+
+    def test_progress_is_parsed_and_kept_out_of_stdout(self):
+        ffmpeg = self._fake_ffmpeg()
+        seen = []
+        with override_settings(FFMPEG_BIN=ffmpeg):
+            run = run_process(
+                [ffmpeg, "-y", "-i", "in.mp4", "out.mp4"],
+                operation="test_render",
+                on_progress=lambda p: seen.append(p.percent),
+            )
+
+        self.assertEqual(run.returncode, 0)
+        self.assertEqual(run.outcome, "ok")
+        self.assertEqual(run.stdout, "")
+        self.assertEqual(run.progress.total_s, 10.0)
+        self.assertTrue(run.progress.finished)
+        self.assertEqual(run.progress.speed, 2.0)
+        self.assertEqual(seen, [25.0, 50.0, 75.0, 100.0])
+        self.assertEqual(run.progress.eta_s, 0.0)
+
+    def test_stderr_is_bounded_and_stdout_kept(self):
+        script = "import sys\nfor i in range(5000): sys.stderr.write('warn %d\\n' % i)\nprint('{\"ok\": 1}')"
+        with override_settings(FFMPEG_STDERR_TAIL_LINES=10):
+            res = run_cmd([sys.executable, "-c", script], operation="test_probe")
+
+        self.assertTrue(res.ok)
+        self.assertEqual(res.stdout, '{"ok": 1}\n')
+        self.assertEqual(res.stderr.splitlines(), [f"warn {i}" for i in range(4990, 5000)])
+        if hasattr(os, "wait4"):
+            self.assertIsNotNone(res.cpu_seconds)
+            self.assertGreater(res.max_rss_bytes, 0)
+
+    def test_wall_clock_timeout_kills_process(self):
+        res = run_cmd([sys.executable, "-c", "import time; time.sleep(30)"], timeout_s=0.3)
+
+        self.assertFalse(res.ok)
+        self.assertEqual(res.timed_out, "timeout")
+        self.assertIn("killed: timeout", res.stderr)
+        self.assertLess(res.duration_ms, 10_000)
+
+    def test_stall_timeout_when_progress_stops(self):
+        ffmpeg = self._fake_ffmpeg(blocks=1, sleep=30)
+        with override_settings(FFMPEG_BIN=ffmpeg):
+            res = run_cmd([ffmpeg, "-i", "in.mp4", "out.mp4"], stall_timeout_s=0.3)
+
+        self.assertFalse(res.ok)
+        self.assertEqual(res.timed_out, "stalled")
+
+    def test_exception_while_waiting_kills_child(self):
+        real_reap = ffmpeg_runner._reap
+        procs = []
+
+        def reap(proc, *, block):
+            procs.append(proc)
+            if not block:
+                raise KeyboardInterrupt("soft time limit")
+            return real_reap(proc, block=block)
+
+        with mock.patch.object(ffmpeg_runner, "_reap", side_effect=reap):
+            with self.assertRaises(KeyboardInterrupt):
+                run_process([sys.executable, "-c", "import time; time.sleep(30)"], operation="test_abort")
+
+        self.assertEqual(procs[0].returncode, -9)  # killed and reaped, not left sleeping
+
+    def test_progress_args_only_for_ffmpeg_writing_files(self):
+        with override_settings(FFMPEG_BIN="ffmpeg"):
+            self.assertEqual(
+                with_progress_args(["ffmpeg", "-y", "-i", "a.mp4", "b.mp4"])[:4],
+                ["ffmpeg", "-progress", "pipe:1", "-nostats"],
+            )
+            for cmd in (["ffmpeg", "-hide_banner", "-encoders"], ["ffmpeg", "-i", "a.mp4", "-f", "wav", "-"]):
+                self.assertEqual(with_progress_args(cmd), cmd)
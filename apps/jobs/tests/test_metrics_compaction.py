@@ -0,0 +1,117 @@
+"""Testes da compactação do store multiprocess do Prometheus e do cache do /metrics/."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import RequestFactory, SimpleTestCase
+from prometheus_client import multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+from apps.common.metrics_compaction import compact_multiproc_dir, multiproc_lock
+from social_automation import metrics_view
+
+
+def _write(path: str, filename: str, samples: dict[tuple[str, str], float]) -> None:
+    d = MmapedDict(os.path.join(path, filename))
+    for (metric, sample), value in samples.items():
+        d.write_value(json.dumps([metric, sample, {"queue": "q"}, "help"]), value, 0.0)
+    d.close()
+
+
+def _merged(path: str) -> dict[str, float]:
+    files = [os.path.join(path, f) for f in os.listdir(path) if f.endswith(".db")]
+    return {
+        s.name: s.value
+        for metric in multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+        for s in metric.samples
+        if metric.type != "gauge"
+    }
+
+
+class MultiprocCompactionTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _seed(self, pid: int, jobs: float) -> None:
+        _write(self.path, f"counter_{pid}.db", {("jobs", "jobs_total"): jobs})
+        _write(self.path, f"histogram_{pid}.db", {("lat", "lat_sum"): jobs * 10, ("lat", "lat_count"): jobs})
+        _write(self.path, f"gauge_livesum_{pid}.db", {("busy", "busy"): 1})
+
+    def test_dead_pid_files_are_folded_without_changing_merged_values(self):
+        for pid, jobs in ((101, 3), (102, 4), (200, 5)):
+            self._seed(pid, jobs)
+        before = _merged(self.path)
+
+        result = compact_multiproc_dir(self.path, is_alive=lambda pid: pid == 200)
+
+        self.assertEqual(result.dead_pids, [101, 102])
+        self.assertEqual((result.folded_files, result.removed_gauge_files), (4, 2))
+        self.assertEqual(
+            sorted(f for f in os.listdir(self.path) if f.endswith(".db")),
+            ["counter_200.db", "counter_archive.db", "gauge_livesum_200.db", "histogram_200.db", "histogram_archive.db"],
+        )
+        self.assertEqual(_merged(self.path), before)
+        self.assertEqual(before["jobs_total"], 12)
+
+        # Uma segunda rodada soma ao archive existente.
+        self._seed(103, 6)
+        compact_multiproc_dir(self.path, is_alive=lambda pid: pid == 200)
+        self.assertEqual(_merged(self.path)["jobs_total"], 18)
+
+    def test_busy_directory_is_skipped_without_blocking(self):
+        self._seed(101, 1)
+        with multiproc_lock(self.path, shared=True):
+            result = compact_multiproc_dir(self.path, is_alive=lambda pid: False)
+        self.assertTrue(result.skipped)
+        self.assertTrue(os.path.exists(os.path.join(self.path, "counter_101.db")))
+
+
+class MetricsViewScrapeCacheTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        _write(self._tmp.name, "counter_101.db", {("jobs", "jobs_total"): 7})
+        metrics_view._scrape_cache.update(key=None, data=b"", at=0.0)
+        env = patch.dict(
+            os.environ,
+            {"PROMETHEUS_MULTIPROC_DIR": self._tmp.name, "PROMETHEUS_MULTIPROC_COMPACT": "0"},
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        backlog = patch.object(metrics_view, "_register_queue_backlog_collector")
+        backlog.start()
+        self.addCleanup(backlog.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_merged_output_is_cached_and_reports_store_size(self):
+        request = RequestFactory().get("/metrics/")
+        with patch.object(
+            metrics_view, "_generate_multiproc_latest", wraps=metrics_view._generate_multiproc_latest
+        ) as generate:
+            first = metrics_view.prometheus_metrics(request).content.decode()
+            second = metrics_view.prometheus_metrics(request).content.decode()
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIn('jobs_total{queue="q"} 7.0', first)
+        self.assertIn('prometheus_multiproc_files{kind="pid"} 1.0', first)
+        self.assertIn("prometheus_scrape_duration_seconds", first)
+
+    def test_cache_can_be_disabled(self):
+        request = RequestFactory().get("/metrics/")
+        with (
+            patch.dict(os.environ, {"PROMETHEUS_SCRAPE_CACHE_SEC": "0"}),
+            patch.object(metrics_view, "_generate_multiproc_latest", return_value=b"") as generate,
+        ):
+            metrics_view.prometheus_metrics(request)
+            metrics_view.prometheus_metrics(request)
+        self.assertEqual(generate.call_count, 2)
@@ -0,0 +1,88 @@
+"""Escopo denormalizado de ScheduledPost (owner_user, brand, factory)."""
+
+from __future__ import annotations
+
+import io
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.auto_cuts.models import AutoCutAnalysis, AutoCutCorte, AutoCutSuggestion
+from apps.brands.models import Brand, Factory
+from apps.jobs.models import Job, ScheduledPost
+from apps.jobs.services.scheduled_post_scope import backfill_scheduled_post_scope
+
+User = get_user_model()
+
+
+class ScheduledPostScopeTests(TestCase):
+    def setUp(self):
+        self.factory = Factory.objects.create(name="FS")
+        self.brand = Brand.objects.create(name="BS", slug="bs", factory=self.factory)
+        self.other_factory = Factory.objects.create(name="FS2")
+        self.other_brand = Brand.objects.create(name="BS2", slug="bs2", factory=self.other_factory)
+        self.user = User.objects.create_user(username="scope", password="securepass1")
+        self.job = Job.objects.create(user=self.user, brand=self.brand, name="J")
+        analysis = AutoCutAnalysis.objects.create(user=self.user, brand=self.other_brand, name="A")
+        suggestion = AutoCutSuggestion.objects.create(
+            analysis=analysis, cut_type="short", start_tc="0:00", end_tc="0:10", title="S"
+        )
+        self.corte = AutoCutCorte.objects.create(analysis=analysis, suggestion=suggestion)
+
+    def _post(self, **kwargs):
+        return ScheduledPost.objects.create(platforms=["YT"], scheduled_at=timezone.now() + timedelta(hours=1), **kwargs)
+
+    def test_scope_filled_on_create_from_job_or_corte(self):
+        from_job = self._post(job=self.job)
+        from_corte = self._post(auto_cut_corte=self.corte)
+
+        self.assertEqual(
+            (from_job.owner_user_id, from_job.brand_id, from_job.factory_id),
+            (self.user.id, self.brand.id, self.factory.id),
+        )
+        self.assertEqual(
+            (from_corte.owner_user_id, from_corte.brand_id, from_corte.factory_id),
+            (self.user.id, self.other_brand.id, self.other_factory.id),
+        )
+
+    def test_scope_follows_origin_change_and_skips_unrelated_saves(self):
+        post = ScheduledPost.objects.get(pk=self._post(job=self.job).pk)
+
+        with self.assertNumQueries(1):
+            post.status = "FAILED"
+            post.save(update_fields=["status"])
+
+        post.job = None
+        post.auto_cut_corte = self.corte
+        post.save(update_fields=["job", "auto_cut_corte"])
+        post.refresh_from_db()
+        self.assertEqual(post.factory_id, self.other_factory.id)
+
+    def test_post_without_owner_does_not_resolve_scope_on_status_saves(self):
+        ownerless = Job.objects.create(user=None, brand=None, name="Sem dono")
+        post = ScheduledPost.objects.get(pk=self._post(job=ownerless).pk)
+        self.assertIsNone(post.owner_user_id)
+
+        with self.assertNumQueries(2):
+            post.status = "POSTING"
+            post.save(update_fields=["status"])
+            post.status = "DONE"
+            post.save()
+
+    def test_backfill_fills_rows_written_without_scope(self):
+        a = self._post(job=self.job)
+        b = self._post(auto_cut_corte=self.corte)
+        ScheduledPost.objects.update(owner_user=None, brand=None, factory=None)
+
+        self.assertEqual(backfill_scheduled_post_scope(batch_size=1), 2)
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.brand_id, a.factory_id), (self.brand.id, self.factory.id))
+        self.assertEqual((b.owner_user_id, b.brand_id), (self.user.id, self.other_brand.id))
+
+        out = io.StringIO()
+        call_command("backfill_scheduled_post_scope", "--explain", stdout=out)
+        self.assertIn("listagem por dono (depois)", out.getvalue())
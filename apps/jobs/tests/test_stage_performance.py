@@ -0,0 +1,134 @@
+"""Testes do ledger de performance por etapa (rollup diário e regressões)."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.jobs.models import PipelineExecution, StageExecution, StagePerformanceDaily
+from apps.jobs.services.pipeline_execution import complete_stage, fail_stage, start_stage
+from apps.jobs.services.stage_performance import detect_stage_regressions, rollup_stage_performance
+
+DAY = date(2026, 10, 1)
+
+
+class StagePerformanceLedgerTests(TestCase):
+    def setUp(self):
+        self._aggregate_id = 0
+
+    def _stage(self, day, *, duration_ms, media_seconds=None, host="node-a", encoder="gpu", status="completed"):
+        self._aggregate_id += 1
+        pe = PipelineExecution.objects.create(
+            pipeline_type="job_pipeline", aggregate_type="job", aggregate_id=self._aggregate_id
+        )
+        completed = datetime.combine(day, time(12, 0), tzinfo=timezone.get_current_timezone())
+        return StageExecution.objects.create(
+            pipeline_execution=pe,
+            stage_name="subtitle_burn",
+            status=status,
+            completed_at=completed,
+            duration_ms=duration_ms,
+            media_seconds=media_seconds,
+            worker_host=host,
+            encoder=encoder,
+        )
+
+    def test_complete_stage_records_context(self):
+        pe = PipelineExecution.objects.create(pipeline_type="job_pipeline", aggregate_type="job", aggregate_id=99)
+        start_stage(pe, stage_name="transcription")
+        stage = complete_stage(pe, stage_name="transcription", media_seconds=120.0, encoder="cpu")
+        stage.refresh_from_db()
+        self.assertEqual(stage.media_seconds, 120.0)
+        self.assertEqual(stage.encoder, "cpu")
+        self.assertTrue(stage.worker_host)
+
+    def test_failed_stage_keeps_host_and_retry_resets_encoder(self):
+        pe = PipelineExecution.objects.create(pipeline_type="job_pipeline", aggregate_type="job", aggregate_id=98)
+        StageExecution.objects.create(pipeline_execution=pe, stage_name="subtitle_burn", status="pending")
+        failed = fail_stage(pe, stage_name="subtitle_burn", error=RuntimeError("nvenc"), encoder="gpu")
+        failed.refresh_from_db()
+        self.assertTrue(failed.worker_host)
+        self.assertEqual(failed.encoder, "gpu")
+
+        retry = start_stage(pe, stage_name="subtitle_burn")
+        retry.refresh_from_db()
+        self.assertEqual((retry.encoder, retry.retry_count), ("", 1))
+
+    def test_rollup_per_node_and_total(self):
+        for ms in (1000, 2000, 3000, 4000):
+            self._stage(DAY, duration_ms=ms, media_seconds=10)
+        self._stage(DAY, duration_ms=9000, host="node-b", encoder="cpu")
+        self._stage(DAY, duration_ms=50, status="failed")
+        self._stage(DAY + timedelta(days=1), duration_ms=1)
+
+        self.assertEqual(rollup_stage_performance(DAY), 3)
+        self.assertEqual(rollup_stage_performance(DAY), 3)
+        node_a = StagePerformanceDaily.objects.get(day=DAY, worker_host="node-a")
+        self.assertEqual((node_a.samples, node_a.failures), (4, 1))
+        self.assertEqual((node_a.duration_p50_ms, node_a.duration_p95_ms), (2000, 4000))
+        self.assertEqual((node_a.cost_samples, node_a.cost_p50), (4, 200.0))
+        total = StagePerformanceDaily.objects.get(day=DAY, worker_host=StagePerformanceDaily.ALL)
+        self.assertEqual((total.samples, total.failures, total.cost_samples), (5, 1, 4))
+
+    def _ledger(self, day, *, cost, host="node-a", samples=10):
+        StagePerformanceDaily.objects.create(
+            day=day,
+            stage_name="subtitle_burn",
+            worker_host=host,
+            encoder="gpu",
+            samples=samples,
+            duration_p50_ms=5000,
+            duration_p95_ms=8000,
+            cost_samples=samples if cost is not None else 0,
+            cost_p50=cost,
+            cost_p95=None if cost is None else cost * 1.5,
+        )
+
+    def test_regression_detected_against_baseline(self):
+        for i in range(1, 8):
+            self._ledger(DAY - timedelta(days=i), cost=100.0)
+            self._ledger(DAY - timedelta(days=i), cost=100.0, host="node-b")
+        self._ledger(DAY, cost=150.0)
+        self._ledger(DAY, cost=110.0, host="node-b")
+
+        regressions = detect_stage_regressions(end_day=DAY, baseline_days=7)
+        self.assertEqual({(r.worker_host, r.metric) for r in regressions}, {("node-a", "cost_p50"), ("node-a", "cost_p95")})
+        self.assertAlmostEqual(regressions[0].change_pct, 50.0)
+
+    def test_falls_back_to_duration_without_media_seconds(self):
+        self._ledger(DAY - timedelta(days=1), cost=None)
+        StagePerformanceDaily.objects.create(
+            day=DAY,
+            stage_name="subtitle_burn",
+            worker_host="node-a",
+            encoder="gpu",
+            samples=10,
+            duration_p50_ms=9000,
+            duration_p95_ms=9000,
+        )
+        regressions = detect_stage_regressions(end_day=DAY)
+        # p95 subiu só 12,5% (abaixo do limiar de 20%).
+        self.assertEqual([r.metric for r in regressions], ["duration_p50_ms"])
+
+    def test_command_fails_on_regression(self):
+        for i in range(1, 4):
+            for _ in range(5):
+                self._stage(DAY - timedelta(days=i), duration_ms=1000, media_seconds=10)
+        for _ in range(5):
+            self._stage(DAY, duration_ms=3000, media_seconds=10)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command(
+                "stage_performance_report",
+                "--date",
+                str(DAY),
+                "--rollup-days",
+                "4",
+                "--fail-on-regression",
+                stdout=out,
+            )
+        self.assertIn("REGRESSÃO subtitle_burn node-a/gpu cost_p50", out.getvalue())
@@ -0,0 +1,117 @@
+"""Testes da transcrição em lote de cortes curtos (janelas VAD por corte, segmentos por arquivo)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.jobs.services import subtitles
+from apps.jobs.services.subtitles import generate_subtitles_batch
+
+SR = 16000
+MODEL = SimpleNamespace(feature_extractor=SimpleNamespace(sampling_rate=SR, chunk_length=30))
+CPU_MODEL = SimpleNamespace(feature_extractor=MODEL.feature_extractor, model=SimpleNamespace(device="cpu"))
+CLIP_SECONDS = {"a.mp4": 10, "b.mp4": 50, "c.mp4": 5}
+# Regiões de fala por corte (segundos, relativas ao corte).
+SPEECH = {10: [(1, 4), (5, 9)], 50: [(0, 20), (22, 29), (31, 48)], 5: []}
+
+
+def _decode(path, sampling_rate):
+    return np.zeros(CLIP_SECONDS[Path(path).name] * sampling_rate, dtype="float32")
+
+
+def _speech(audio, vad_options):
+    return [{"start": s * SR, "end": e * SR} for s, e in SPEECH[len(audio) // SR]]
+
+
+class _FakePipeline:
+    calls: list[dict] = []
+    # Erro levantado quando o pipeline roda sobre o MODEL (GPU); o CPU_MODEL sempre funciona.
+    gpu_error: Exception | None = None
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, **kwargs):
+        if self.model is MODEL and _FakePipeline.gpu_error is not None:
+            raise _FakePipeline.gpu_error
+        _FakePipeline.calls.append({"samples": len(audio), **kwargs})
+        segments = []
+        for w in kwargs["clip_timestamps"]:
+            word = SimpleNamespace(start=w["start"] + 0.5, end=w["start"] + 1.0, word=" oi")
+            segments.append(
+                SimpleNamespace(start=w["start"] + 0.5, end=w["end"], text=f" {w['start']:g} ", words=[word])
+            )
+        return iter(segments), None
+
+
+class GenerateSubtitlesBatchTests(SimpleTestCase):
+    def setUp(self):
+        _FakePipeline.calls = []
+        _FakePipeline.gpu_error = None
+        patchers = [
+            patch("faster_whisper.decode_audio", side_effect=_decode),
+            patch("faster_whisper.vad.get_speech_timestamps", side_effect=_speech),
+            patch("faster_whisper.BatchedInferencePipeline", _FakePipeline),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_all_clips_share_one_batched_pass_and_segments_map_back(self):
+        results = generate_subtitles_batch(
+            [Path("a.mp4"), Path("b.mp4"), Path("c.mp4")], language="pt", model=MODEL, batch_size=8
+        )
+
+        self.assertEqual(len(_FakePipeline.calls), 1)
+        call = _FakePipeline.calls[0]
+        self.assertEqual(call["batch_size"], 8)
+        self.assertEqual(call["samples"], 65 * SR)
+        # a: 1 janela (1-9); b: 0-29 numa janela, 31-48 em outra (janela <= 30 s).
+        self.assertEqual(
+            call["clip_timestamps"],
+            [{"start": 1.0, "end": 9.0}, {"start": 10.0, "end": 39.0}, {"start": 41.0, "end": 58.0}],
+        )
+        self.assertEqual([len(r) for r in results], [1, 2, 0])
+        self.assertEqual(results[1][0]["start"], 0.5)
+        self.assertEqual(results[1][1]["start"], 31.5)
+        self.assertEqual(results[1][1]["end"], 48.0)
+        self.assertEqual(results[1][1]["words"][0]["start"], 31.5)
+        self.assertEqual(results[0][0]["text"], "1")
+
+    def test_groups_are_capped_by_audio_seconds(self):
+        results = generate_subtitles_batch(
+            [Path("a.mp4"), Path("b.mp4"), Path("c.mp4")], model=MODEL, max_audio_seconds=55
+        )
+
+        self.assertEqual([c["samples"] for c in _FakePipeline.calls], [10 * SR, 55 * SR])
+        self.assertEqual([len(r) for r in results], [1, 2, 0])
+        self.assertEqual(results[1][0]["start"], 0.5)
+
+    def test_cuda_error_retries_group_on_cpu(self):
+        _FakePipeline.gpu_error = RuntimeError("CUBLAS_STATUS_ALLOC_FAILED")
+        with patch.object(subtitles, "load_whisper_model", return_value=(CPU_MODEL, "large-v3")) as load:
+            results = generate_subtitles_batch([Path("a.mp4"), Path("b.mp4")], model=MODEL)
+
+        load.assert_called_once_with(device="cpu")
+        self.assertEqual([len(r) for r in results], [1, 2])
+
+    def test_debug_gpu_and_non_cuda_errors_are_not_retried(self):
+        _FakePipeline.gpu_error = RuntimeError("cuDNN failed")
+        with (
+            patch.dict(os.environ, {"WHISPER_DEBUG_GPU": "1"}),
+            patch.object(subtitles, "load_whisper_model") as load,
+            self.assertRaises(RuntimeError),
+        ):
+            generate_subtitles_batch([Path("a.mp4")], model=MODEL)
+        load.assert_not_called()
+
+        _FakePipeline.gpu_error = RuntimeError("invalid input")
+        with patch.object(subtitles, "load_whisper_model") as load, self.assertRaises(RuntimeError):
+            generate_subtitles_batch([Path("a.mp4")], model=MODEL)
+        load.assert_not_called()
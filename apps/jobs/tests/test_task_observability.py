@@ -8,6 +8,8 @@ from django.test import SimpleTestCase, override_settings
 from apps.common.metrics import queue_wait_ms
 from apps.common.task_observability import (
     TASK_ENQUEUED_AT_MS_HEADER,
+    _handle_before_task_publish,
+    _handle_task_prerun,
     observe_celery_task,
     observe_task_queue_wait,
     resolve_task_observation_labels,
@@ -182,3 +184,22 @@ class TaskObservabilityTests(SimpleTestCase):
 
     def test_queue_wait_metric_uses_low_cardinality_labels(self):
         self.assertEqual(tuple(queue_wait_ms._labelnames), ("task_name", "queue_name"))
+
+    @override_settings(CELERY_TASK_DEFAULT_QUEUE="processing")
+    def test_publish_and_start_count_per_queue_throughput(self):
+        enqueued, dequeued = _DummyMetric(), _DummyMetric()
+        task = SimpleNamespace(
+            name="apps.jobs.tasks.process_job",
+            request=SimpleNamespace(delivery_info={"routing_key": "render"}, headers={}),
+        )
+
+        with patch("apps.common.task_observability.queue_enqueued_total", enqueued), patch(
+            "apps.common.task_observability.queue_dequeued_total", dequeued
+        ):
+            _handle_before_task_publish(headers={}, properties={}, routing_key="render")
+            _handle_before_task_publish(headers={}, properties={})
+            _handle_task_prerun(task=task, task_id="t-1")
+
+        self.assertEqual(enqueued.children[(("queue_name", "render"),)].incs, [1])
+        self.assertEqual(enqueued.children[(("queue_name", "processing"),)].incs, [1])
+        self.assertEqual(dequeued.children[(("queue_name", "render"),)].incs, [1])
@@ -0,0 +1,136 @@
+"""Testes da prioridade por déficit de inventário (auto-cut) e da proteção contra starvation."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from apps.auto_cuts.models import AutoCutAnalysis
+from apps.brands.models import Brand, Factory
+from apps.jobs.models import DailyPostingPlan, DailyPostingPlanItem, VideoInventoryItem
+from apps.jobs.services import task_priority as tp
+
+NOW = datetime(2026, 5, 4, 12, 0, tzinfo=UTC)
+ANALYZE = "apps.auto_cuts.tasks.analyze_auto_cuts_task"
+
+
+class AnalysisPriorityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = Factory.objects.create(name="F")
+        self.urgent = Brand.objects.create(name="A", slug="a", factory=self.factory)
+        self.later = Brand.objects.create(name="B", slug="b", factory=self.factory)
+        self.stocked = Brand.objects.create(name="C", slug="c", factory=self.factory)
+        self._slots(self.urgent, [NOW + timedelta(hours=4)])
+        self._slots(self.later, [NOW + timedelta(hours=20), NOW + timedelta(hours=30)])
+        self._slots(self.stocked, [NOW + timedelta(hours=2)])
+        self._inventory(self.later, 1)
+        self._inventory(self.stocked, 1)
+
+    def _slots(self, brand, times):
+        plan = DailyPostingPlan.objects.create(brand=brand, plan_date=NOW.date(), status=DailyPostingPlan.Status.GENERATED)
+        for i, at in enumerate(times):
+            DailyPostingPlanItem.objects.create(plan=plan, order_index=i, video_type="SHORT", scheduled_at=at)
+        DailyPostingPlanItem.objects.create(
+            plan=plan, order_index=len(times), video_type="SHORT", scheduled_at=NOW - timedelta(hours=1)
+        )
+
+    def _inventory(self, brand, n):
+        for _ in range(n):
+            VideoInventoryItem.objects.create(factory=self.factory, brand=brand, video_type="SHORT", status="AVAILABLE")
+
+    def _analysis(self, **kwargs):
+        return AutoCutAnalysis.objects.create(brand=self.stocked, name="x", **kwargs).id
+
+    def test_deficit_and_deadline_per_brand(self):
+        urgencies = tp.brand_urgencies([self.urgent.id, self.later.id, self.stocked.id], now=NOW)
+
+        self.assertEqual((urgencies[self.urgent.id].deficit, urgencies[self.urgent.id].deadline), (1, NOW + timedelta(hours=4)))
+        self.assertEqual((urgencies[self.later.id].deficit, urgencies[self.later.id].deadline), (1, NOW + timedelta(hours=30)))
+        self.assertEqual(urgencies[self.stocked.id].deficit, 0)
+
+    def test_snapshot_keeps_only_brands_with_deficit(self):
+        snapshot = tp.refresh_deficit_snapshot(now=NOW)
+
+        self.assertEqual(
+            snapshot,
+            {
+                self.urgent.id: (NOW + timedelta(hours=4)).timestamp(),
+                self.later.id: (NOW + timedelta(hours=30)).timestamp(),
+            },
+        )
+
+    def test_target_brand_classes_and_bulk_fallback(self):
+        user = get_user_model().objects.create_user(username="u", password="x")
+        tp.refresh_deficit_snapshot(now=NOW)
+
+        self.assertEqual(tp.analysis_priority(self._analysis(target_brand=self.urgent), now=NOW), tp.PRIORITY_URGENT)
+        self.assertEqual(tp.analysis_priority(self._analysis(target_brand=self.later), now=NOW), tp.PRIORITY_HIGH)
+        self.assertEqual(tp.analysis_priority(self._analysis(target_brand=self.stocked), now=NOW), tp.PRIORITY_BULK)
+        self.assertEqual(
+            tp.analysis_priority(self._analysis(target_brand=self.stocked, user=user), now=NOW), tp.PRIORITY_NORMAL
+        )
+        self.assertEqual(tp.last_brand_priority_class(self.later.id), "high")
+
+    def test_distribution_mode_uses_most_urgent_brand_of_factory(self):
+        tp.refresh_deficit_snapshot(now=NOW)
+        self.assertEqual(tp.analysis_priority(self._analysis(), now=NOW), tp.PRIORITY_URGENT)
+        self.assertEqual(tp.last_brand_priority_class(self.stocked.id), "bulk")
+
+    def test_router_sets_priority_only_on_prioritized_queues(self):
+        analysis_id = self._analysis(target_brand=self.urgent)
+        tp.refresh_deficit_snapshot(now=NOW)
+        # Só a analysis é lida: slots e inventário vêm do snapshot do beat.
+        with patch.object(tp.timezone, "now", return_value=NOW), self.assertNumQueries(1):
+            route = tp.route_by_inventory_deficit(ANALYZE, [analysis_id], {}, {})
+        self.assertEqual(route, {"queue": "transcription", "priority": tp.PRIORITY_URGENT})
+
+        route = tp.route_by_inventory_deficit("apps.jobs.tasks.process_job", [1], {}, {})
+        self.assertEqual(route, {"queue": "render", "priority": tp.PRIORITY_NORMAL})
+        self.assertIsNone(tp.route_by_inventory_deficit("apps.social.tasks.post_to_platforms_task", [1], {}, {}))
+
+    def test_missing_snapshot_falls_back_without_deficit(self):
+        self.assertEqual(tp.analysis_priority(self._analysis(target_brand=self.urgent), now=NOW), tp.PRIORITY_BULK)
+
+
+class _FakeScript:
+    def __init__(self, moved):
+        self.moved = moved
+        self.calls = []
+
+    def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        return self.moved.get(keys[0], 0)
+
+
+class _FakeClient:
+    def __init__(self, script):
+        self.script = script
+
+    def register_script(self, source):
+        return self.script
+
+
+class PromoteAgedMessagesTests(SimpleTestCase):
+    def test_each_step_ages_up_one_level_with_growing_threshold(self):
+        script = _FakeScript({"render\x06\x169": 2})
+        moved = tp.promote_aged_messages(
+            ["render"], redis_client=_FakeClient(script), aging_s=100, now_ms=1_000_000
+        )
+
+        self.assertEqual(moved, {"render": 2})
+        self.assertEqual(
+            [(keys, args[0]) for keys, args in script.calls],
+            [
+                (["render\x06\x163", "render"], 700_000),
+                (["render\x06\x166", "render\x06\x163"], 800_000),
+                (["render\x06\x169", "render\x06\x166"], 900_000),
+            ],
+        )
+
+    def test_aging_can_be_disabled(self):
+        self.assertEqual(tp.promote_aged_messages(["render"], redis_client=_FakeClient(None), aging_s=0), {})
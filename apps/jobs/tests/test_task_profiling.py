@@ -0,0 +1,90 @@
+"""Testes do profiling amostrado de tasks (fases, persistência em TaskProfile, poda)."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+
+from apps.common.task_observability import _handle_task_postrun, _handle_task_prerun
+from apps.common.task_profiling import finish_task_profile, should_profile, start_task_profile
+from apps.jobs.models import Job, TaskProfile
+
+TASK = "apps.jobs.tasks.run_job_task"
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@override_settings(TASK_PROFILE_SAMPLE_RATE=1.0, TASK_PROFILE_TASKS=[], TASK_PROFILE_INTERVAL_MS=1)
+class TaskProfilingTests(TestCase):
+    def test_sampler_profile_persists_phases_and_stacks(self):
+        start_task_profile(task_id="t-1", task_name=TASK, queue_name="processing")
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        list(Job.objects.all())
+        _busy(0.05)
+        record = finish_task_profile("t-1", status="SUCCESS")
+
+        self.assertIsNotNone(record)
+        record.refresh_from_db()
+        self.assertEqual(record.task_name, TASK)
+        self.assertEqual(record.mode, "sampler")
+        self.assertEqual(record.phases["subprocess"]["calls"], 1)
+        self.assertGreater(record.phases["subprocess"]["ms"], 0)
+        self.assertGreaterEqual(record.db_queries, 1)
+        self.assertIn("python", record.phases)
+        self.assertGreater(record.samples, 0)
+        self.assertIn("test_task_profiling:_busy", record.profile_text)
+
+    @override_settings(TASK_PROFILE_MODE="cprofile")
+    def test_cprofile_mode_stores_pstats_report(self):
+        start_task_profile(task_id="t-2", task_name=TASK, queue_name="processing")
+        _busy(0.01)
+        record = finish_task_profile("t-2", status="SUCCESS")
+
+        self.assertEqual(record.mode, "cprofile")
+        self.assertIn("function calls", record.profile_text)
+        self.assertEqual(record.samples, 0)
+
+    def test_hooks_are_pass_through_outside_profiled_tasks(self):
+        start_task_profile(task_id="t-3", task_name=TASK, queue_name="processing")
+        finish_task_profile("t-3", status="SUCCESS")
+
+        result = subprocess.run([sys.executable, "-c", "print('ok')"], capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "ok")
+        self.assertIsNone(finish_task_profile("t-3", status="SUCCESS"))
+
+    @override_settings(TASK_PROFILE_SAMPLE_RATE=0)
+    def test_rate_zero_disables_profiling(self):
+        self.assertFalse(should_profile(TASK))
+        self.assertIsNone(start_task_profile(task_id="t-4", task_name=TASK, queue_name="processing"))
+        self.assertIsNone(finish_task_profile("t-4", status="SUCCESS"))
+        self.assertFalse(TaskProfile.objects.exists())
+
+    @override_settings(TASK_PROFILE_TASKS=["render_job_task"])
+    def test_task_allowlist_accepts_short_names(self):
+        self.assertTrue(should_profile("apps.jobs.tasks.render_job_task"))
+        self.assertFalse(should_profile(TASK))
+
+    @override_settings(TASK_PROFILE_KEEP=2)
+    def test_keeps_only_newest_profiles(self):
+        for i in range(4):
+            start_task_profile(task_id=f"k-{i}", task_name=TASK, queue_name="processing")
+            finish_task_profile(f"k-{i}", status="SUCCESS")
+
+        self.assertEqual(list(TaskProfile.objects.values_list("task_id", flat=True)), ["k-3", "k-2"])
+
+    def test_celery_signal_handlers_capture_profile(self):
+        task = SimpleNamespace(name=TASK, request=SimpleNamespace(delivery_info={"routing_key": "processing"}))
+        _handle_task_prerun(sender=task, task=task, task_id="sig-1")
+        _handle_task_postrun(sender=task, task_id="sig-1", state="FAILURE")
+
+        record = TaskProfile.objects.get(task_id="sig-1")
+        self.assertEqual(record.status, "FAILURE")
+        self.assertEqual(record.queue_name, "processing")
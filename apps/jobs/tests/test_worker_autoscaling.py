@@ -0,0 +1,188 @@
+"""Testes do autoscaling de workers guiado pelo backlog (plano, histerese, custo e autoscaler do Celery)."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+from prometheus_client import CollectorRegistry, Histogram, values
+
+from apps.common.broker_telemetry import QueueTelemetry
+from apps.jobs.services import worker_autoscaling as wa
+
+PROFILES = {
+    "transcription": wa.QueueProfile("transcription", cpu=2, ram_mb=2000, min_slots=1, max_slots=4, default_task_sec=240),
+    "render": wa.QueueProfile("render", cpu=1, ram_mb=1000, nvenc=1, min_slots=1, max_slots=4, default_task_sec=90),
+    "publish": wa.QueueProfile("publish", cpu=0.5, min_slots=1, max_slots=2, default_task_sec=30),
+}
+
+
+def _plan(telemetry, budget, costs=None):
+    return wa.plan_concurrency(
+        wa.build_demands(telemetry, costs or {}, PROFILES),
+        PROFILES,
+        budget,
+        target_drain_s=600,
+        max_wait_s=900,
+    )
+
+
+class PlanConcurrencyTests(SimpleTestCase):
+    def test_idle_queues_give_cores_to_the_queue_behind(self):
+        plans = _plan({"transcription": QueueTelemetry(ready=10, unacked=1)}, wa.ResourceBudget(cpu=8))
+
+        self.assertEqual({q: p.slots for q, p in plans.items()}, {"transcription": 3, "render": 1, "publish": 1})
+        self.assertEqual(plans["transcription"].wanted, 4)
+        self.assertEqual(plans["transcription"].limited_by, "cpu")
+
+        # O mesmo orçamento vai para o render quando é ele que está atrasado.
+        plans = _plan({"render": QueueTelemetry(ready=40, oldest_age_s=1200)}, wa.ResourceBudget(cpu=8))
+        self.assertEqual(plans["render"].slots, 4)
+        self.assertTrue(plans["render"].late)
+        self.assertEqual(plans["transcription"].slots, 1)
+
+    def test_nvenc_sessions_cap_render_slots(self):
+        plans = _plan({"render": QueueTelemetry(ready=40)}, wa.ResourceBudget(cpu=16, nvenc=2))
+        self.assertEqual(plans["render"].slots, 2)
+        self.assertEqual(plans["render"].limited_by, "nvenc")
+
+    def test_measured_cost_changes_wanted_slots(self):
+        telemetry = {"render": QueueTelemetry(ready=6)}
+        self.assertEqual(_plan(telemetry, wa.ResourceBudget(cpu=16))["render"].wanted, 1)
+        self.assertEqual(_plan(telemetry, wa.ResourceBudget(cpu=16), {"render": 400.0})["render"].wanted, 4)
+
+
+class AutoscaleControllerTests(SimpleTestCase):
+    def test_scales_up_at_once_and_down_one_step_after_delay(self):
+        now = [0.0]
+        controller = wa.AutoscaleController(scale_down_delay_s=300, clock=lambda: now[0])
+        self.assertEqual(controller.step({"render": 3}), {"render": 3})
+
+        now[0] = 100
+        self.assertEqual(controller.step({"render": 1}), {"render": 3})
+        now[0] = 350
+        self.assertEqual(controller.step({"render": 1}), {"render": 3})
+        now[0] = 400
+        self.assertEqual(controller.step({"render": 1}), {"render": 2})
+        now[0] = 450
+        self.assertEqual(controller.step({"render": 4}), {"render": 4})
+
+
+class TaskCostTests(SimpleTestCase):
+    def test_costs_follow_task_duration_histogram_per_queue(self):
+        registry = CollectorRegistry()
+        hist = Histogram("task_duration_ms", "x", ("task_name", "queue_name"), registry=registry)
+        hist.labels("a", "render").observe(60_000)
+        hist.labels("b", "render").observe(120_000)
+        tracker = wa.TaskCostTracker(alpha=0.5)
+
+        self.assertEqual(tracker.update(wa.task_duration_totals(registry.collect())), {"render": 90.0})
+        hist.labels("a", "render").observe(30_000)
+        self.assertEqual(tracker.update(wa.task_duration_totals(registry.collect())), {"render": 60.0})
+        # Sem amostras novas o custo fica como está.
+        self.assertEqual(tracker.update(wa.task_duration_totals(registry.collect())), {"render": 60.0})
+
+    def test_costs_from_multiprocess_histogram_files(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        env = {"PROMETHEUS_MULTIPROC_DIR": tmpdir}
+        with patch.dict(os.environ, env), patch.object(values, "ValueClass", values.MultiProcessValue(lambda: 4242)):
+            hist = Histogram("task_duration_ms", "x", ("task_name", "queue_name"), registry=None)
+            hist.labels("a", "render").observe(60_000)
+            hist.labels("b", "render").observe(120_000)
+        self.assertTrue(os.path.exists(os.path.join(tmpdir, "histogram_4242.db")))
+
+        with patch.dict(os.environ, env):
+            os.environ.pop("PROMETHEUS_MULTIPROC_ROOT_DIR", None)
+            totals = wa.task_duration_totals()
+        self.assertEqual(totals, {"render": (180_000.0, 2.0)})
+        self.assertEqual(wa.TaskCostTracker().update(totals), {"render": 90.0})
+
+
+class _FakePool:
+    def __init__(self, processes):
+        self.num_processes = processes
+        self.grown = self.shrunk = 0
+
+    def grow(self, n):
+        self.grown += n
+        self.num_processes += n
+
+    def shrink(self, n):
+        self.shrunk += n
+        self.num_processes -= n
+
+    def maintain_pool(self):
+        pass
+
+
+class BacklogAutoscalerTests(SimpleTestCase):
+    def _autoscaler(self, pool, queues):
+        worker = MagicMock()
+        worker.app.amqp.queues.consume_from = dict.fromkeys(queues)
+        return wa.BacklogAutoscaler(pool, 4, 1, worker=worker)
+
+    def _scale(self, autoscaler):
+        # O plano roda em thread própria; a chamada seguinte aplica o alvo calculado.
+        with patch.object(wa.Autoscaler, "_maybe_scale", return_value=None) as default:
+            autoscaler.maybe_scale()
+            autoscaler._refresh_thread.join(timeout=5)
+            autoscaler.maybe_scale()
+        return default
+
+    def test_worker_applies_plan_of_its_queues_within_limits(self):
+        pool = _FakePool(1)
+        autoscaler = self._autoscaler(pool, ["render", "processing"])
+        scaler = MagicMock()
+        scaler.tick.return_value = {"render": 3, "processing": 2, "transcription": 1}
+        with patch.object(wa, "BacklogScaler", return_value=scaler):
+            self._scale(autoscaler)
+        self.assertEqual(pool.num_processes, 4)  # 3 + 2, limitado pelo max=4
+
+        autoscaler._next_tick = 0
+        scaler.tick.return_value = {"render": 1, "processing": 1}
+        self._scale(autoscaler)
+        self.assertEqual(pool.num_processes, 2)
+
+    def test_plan_runs_off_the_event_loop(self):
+        autoscaler = self._autoscaler(_FakePool(1), ["render"])
+        threads = []
+        scaler = MagicMock()
+        scaler.tick.side_effect = lambda: threads.append(threading.current_thread()) or {"render": 2}
+        with patch.object(wa, "BacklogScaler", return_value=scaler):
+            self._scale(autoscaler)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertEqual(autoscaler._target, 2)
+
+    def test_falls_back_to_celery_default_when_plan_fails(self):
+        pool = _FakePool(2)
+        autoscaler = self._autoscaler(pool, ["render"])
+        with patch.object(wa, "BacklogScaler", side_effect=RuntimeError("redis down")):
+            default = self._scale(autoscaler)
+        self.assertEqual(default.call_count, 2)
+        self.assertEqual(pool.num_processes, 2)
+
+    def test_apply_to_workers_splits_queue_slots_and_skips_solo(self):
+        control = MagicMock()
+        control.inspect.return_value.active_queues.return_value = {
+            "render@a": [{"name": "render"}],
+            "render@b": [{"name": "render"}],
+            "publish@a": [{"name": "publish"}],
+        }
+        prefork = "celery.concurrency.prefork:TaskPool"
+        control.inspect.return_value.stats.return_value = {
+            "render@a": {"pool": {"implementation": prefork, "processes": [1]}},
+            "render@b": {"pool": {"implementation": prefork, "processes": [1, 2, 3]}},
+            "publish@a": {"pool": {"implementation": "celery.concurrency.solo:TaskPool", "max-concurrency": 1}},
+        }
+
+        changes = wa.apply_to_workers(control, {"render": 4, "publish": 2})
+
+        self.assertEqual(changes, [("render@a", 1, 2), ("render@b", 3, 2)])
+        control.pool_grow.assert_called_once_with(1, destination=["render@a"])
+        control.pool_shrink.assert_called_once_with(1, destination=["render@b"])
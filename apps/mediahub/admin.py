@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import SourceVideo
+from .models import ResumableUpload, SourceVideo
 
 
 @admin.register(SourceVideo)
@@ -8,3 +8,10 @@ class SourceVideoAdmin(admin.ModelAdmin):
     list_display = ("id", "brand", "title", "created_at")
     list_filter = ("brand", "created_at")
     search_fields = ("title",)
+
+
+@admin.register(ResumableUpload)
+class ResumableUploadAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "target", "filename", "upload_offset", "upload_length", "status", "updated_at")
+    list_filter = ("target", "status")
+    search_fields = ("filename", "file_name")
@@ -0,0 +1,22 @@
+"""Remove uploads retomáveis abandonados (registro + arquivo parcial no diretório final)."""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.mediahub.services.resumable_upload import RESUMABLE_UPLOAD_EXPIRY, discard_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Remove uploads retomáveis não usados e parados há mais de N horas (padrão: RESUMABLE_UPLOAD_EXPIRY_HOURS)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=int(RESUMABLE_UPLOAD_EXPIRY.total_seconds() // 3600),
+            help="Idade mínima (horas desde o último chunk) para remover",
+        )
+
+    def handle(self, *args, **options):
+        removed = discard_stale_uploads(older_than=timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(f"Concluído. {removed} upload(s) removido(s)."))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:33
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediahub', '0002_sourcevideo_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumableUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('cut', 'Corte pronto'), ('job', 'Vídeo pronto (job)'), ('ready_cut', 'Corte pronto (auto-cuts)')], max_length=12)),
+                ('filename', models.CharField(help_text='Nome original enviado pelo cliente.', max_length=255)),
+                ('file_name', models.CharField(help_text='Caminho relativo ao MEDIA_ROOT.', max_length=255)),
+                ('upload_length', models.BigIntegerField()),
+                ('upload_offset', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(blank=True, default='', help_text='SHA-256 do arquivo, calculado enquanto os chunks chegam.', max_length=64)),
+                ('probe', models.JSONField(blank=True, help_text='ffprobe_video_info do arquivo.', null=True)),
+                ('status', models.CharField(choices=[('uploading', 'Enviando'), ('complete', 'Completo'), ('consumed', 'Consumido')], default='uploading', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='resumable_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='mediahub_upload_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediahub', '0003_resumableupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumableupload',
+            name='claim_token',
+            field=models.CharField(blank=True, default='', help_text='PATCH que está gravando o arquivo agora (vazio = livre).', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='resumableupload',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
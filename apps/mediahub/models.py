@@ -1,3 +1,5 @@
+import uuid
+
 from django.conf import settings
 from django.db import models
 
@@ -19,3 +21,60 @@ class SourceVideo(models.Model):
 
     def __str__(self) -> str:
         return f"{self.brand.slug} - {self.title}"
+
+
+class ResumableUpload(models.Model):
+    """
+    Upload retomável (estilo tus): os bytes vão direto para ``file_name`` (já no diretório
+    final do model de destino) e o upload é consumido pelo endpoint de upload correspondente.
+    """
+
+    TARGETS = [
+        ("cut", "Corte pronto"),
+        ("job", "Vídeo pronto (job)"),
+        ("ready_cut", "Corte pronto (auto-cuts)"),
+    ]
+    STATUS = [
+        ("uploading", "Enviando"),
+        ("complete", "Completo"),
+        ("consumed", "Consumido"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="resumable_uploads",
+        null=True,
+        blank=True,
+    )
+    target = models.CharField(max_length=12, choices=TARGETS)
+    filename = models.CharField(max_length=255, help_text="Nome original enviado pelo cliente.")
+    file_name = models.CharField(max_length=255, help_text="Caminho relativo ao MEDIA_ROOT.")
+    upload_length = models.BigIntegerField()
+    upload_offset = models.BigIntegerField(default=0)
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 do arquivo, calculado enquanto os chunks chegam.",
+    )
+    probe = models.JSONField(null=True, blank=True, help_text="ffprobe_video_info do arquivo.")
+    status = models.CharField(max_length=10, choices=STATUS, default="uploading")
+    claim_token = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text="PATCH que está gravando o arquivo agora (vazio = livre).",
+    )
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "updated_at"], name="mediahub_upload_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.target} {self.filename} ({self.upload_offset}/{self.upload_length})"
@@ -0,0 +1,302 @@
+"""
+Uploads retomáveis (protocolo estilo tus: create / HEAD / PATCH com ``Upload-Offset``).
+
+O arquivo é reservado no diretório final do model de destino (``cuts/``, ``exports/``,
+``auto_cuts/ready_chunks/``) e cada PATCH grava direto nele: sem spool do Django em
+/tmp e sem segunda cópia para o ffprobe. O SHA-256 é atualizado chunk a chunk e o
+ffprobe roda assim que há bytes suficientes (MP4 com moov no início) ou no fim.
+Conexão caiu: o cliente faz HEAD, lê o offset e continua dali.
+
+Um PATCH não segura transação nem lock de linha enquanto o corpo chega: uma transação
+curta confere o offset e reserva o upload (``claim_token``), o corpo é gravado fora dela e
+uma segunda transação curta grava o novo offset. A reserva é renovada durante a gravação;
+se o processo morrer, ela expira após ``RESUMABLE_UPLOAD_CLAIM_LEASE_SEC`` e outro PATCH
+pode assumir.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from apps.mediahub.models import ResumableUpload
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_TARGET_DIRS = {
+    "cut": "cuts/",
+    "job": "exports/",
+    "ready_cut": "auto_cuts/ready_chunks/",
+}
+RESUMABLE_UPLOAD_MAX_BYTES = int(os.getenv("RESUMABLE_UPLOAD_MAX_BYTES", str(20 * 1024**3)))
+RESUMABLE_UPLOAD_EXPIRY = timedelta(hours=int(os.getenv("RESUMABLE_UPLOAD_EXPIRY_HOURS", "48")))
+RESUMABLE_UPLOAD_CLAIM_LEASE = timedelta(seconds=int(os.getenv("RESUMABLE_UPLOAD_CLAIM_LEASE_SEC", "120")))
+# A partir de quantos bytes vale tentar o ffprobe no arquivo parcial (moov no início).
+PROBE_MIN_BYTES = 8 * 1024 * 1024
+_WRITE_CHUNK_SIZE = 1024 * 1024
+
+# Estado do SHA-256 por upload neste processo: (offset já hasheado, hasher).
+# Se o PATCH seguinte cair em outro worker, o prefixo é re-hasheado do disco uma vez.
+_HASHERS: dict[str, tuple[int, Any]] = {}
+_HASHERS_LOCK = threading.Lock()
+
+
+class ResumableUploadError(ValueError):
+    """Requisição inválida para o upload (tamanho, alvo, estado)."""
+
+
+class UploadOffsetMismatch(ResumableUploadError):
+    """``Upload-Offset`` do cliente diferente do offset gravado (responder 409)."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload-Offset esperado: {expected}")
+        self.expected = expected
+
+
+class UploadBusy(ResumableUploadError):
+    """Outro PATCH está gravando neste upload (responder 423)."""
+
+    def __init__(self):
+        super().__init__("Outro envio está gravando este upload; tente novamente.")
+
+
+def upload_path(upload: ResumableUpload) -> Path:
+    return Path(default_storage.path(upload.file_name))
+
+
+def create_upload(*, user, target: str, filename: str, length: int) -> ResumableUpload:
+    """Reserva o arquivo (vazio) no diretório final e registra o upload."""
+    if target not in UPLOAD_TARGET_DIRS:
+        raise ResumableUploadError(f"Destino inválido: {target!r}.")
+    if length <= 0:
+        raise ResumableUploadError("Upload-Length deve ser maior que zero.")
+    if length > RESUMABLE_UPLOAD_MAX_BYTES:
+        raise ResumableUploadError("Arquivo maior que o limite de upload.")
+    safe = get_valid_filename(Path(filename or "upload.mp4").name) or "upload.mp4"
+    # storage.save cria o arquivo com O_EXCL e escolhe um nome livre: a reserva é real.
+    file_name = default_storage.save(f"{UPLOAD_TARGET_DIRS[target]}{safe}", ContentFile(b""))
+    return ResumableUpload.objects.create(
+        user=user,
+        target=target,
+        filename=filename or safe,
+        file_name=file_name,
+        upload_length=length,
+    )
+
+
+def get_user_upload(upload_id, *, user) -> ResumableUpload | None:
+    try:
+        return ResumableUpload.objects.filter(pk=upload_id, user=user).first()
+    except (ValueError, ValidationError):
+        return None
+
+
+def _locked_upload(upload_id, *, user) -> ResumableUpload | None:
+    try:
+        return ResumableUpload.objects.select_for_update().filter(pk=upload_id, user=user).first()
+    except (ValueError, ValidationError):
+        return None
+
+
+def _hasher_for(upload: ResumableUpload, path: Path):
+    key = str(upload.pk)
+    with _HASHERS_LOCK:
+        state = _HASHERS.get(key)
+    if state and state[0] == upload.upload_offset:
+        return state[1]
+    hasher = hashlib.sha256()
+    remaining = upload.upload_offset
+    with open(path, "rb") as fh:
+        while remaining > 0:
+            block = fh.read(min(_WRITE_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _try_probe(path: Path) -> dict | None:
+    from apps.jobs.services.ffmpeg import ffprobe_video_info
+
+    try:
+        info = ffprobe_video_info(path)
+    except Exception:
+        return None
+    if not info.get("duration"):
+        return None
+    return info
+
+
+def _claim_chunk(upload_id, *, user, offset: int, content_length: int | None) -> tuple[ResumableUpload, str]:
+    """Confere o offset e reserva o upload para este PATCH (transação curta)."""
+    with transaction.atomic():
+        upload = _locked_upload(upload_id, user=user)
+        if upload is None:
+            raise ResumableUpload.DoesNotExist
+        if upload.status != "uploading":
+            raise ResumableUploadError("Upload já concluído.")
+        if offset != upload.upload_offset:
+            raise UploadOffsetMismatch(upload.upload_offset)
+        remaining = upload.upload_length - offset
+        if content_length is not None and content_length > remaining:
+            raise ResumableUploadError("Chunk ultrapassa o Upload-Length declarado.")
+        now = timezone.now()
+        if upload.claim_token and upload.claimed_at and upload.claimed_at > now - RESUMABLE_UPLOAD_CLAIM_LEASE:
+            raise UploadBusy()
+        upload.claim_token = uuid.uuid4().hex
+        upload.claimed_at = now
+        upload.save(update_fields=["claim_token", "claimed_at", "updated_at"])
+    return upload, upload.claim_token
+
+
+def _renew_claim(upload: ResumableUpload, token: str) -> bool:
+    return ResumableUpload.objects.filter(pk=upload.pk, claim_token=token).update(claimed_at=timezone.now()) == 1
+
+
+def _release_claim(upload: ResumableUpload, token: str) -> None:
+    ResumableUpload.objects.filter(pk=upload.pk, claim_token=token).update(claim_token="", claimed_at=None)
+
+
+def append_chunk(upload_id, *, user, offset: int, stream, content_length: int | None) -> ResumableUpload:
+    """
+    Grava o corpo de um PATCH em ``offset``. Bytes recebidos antes de uma queda de
+    conexão contam: o offset avança até onde chegou.
+    """
+    upload, token = _claim_chunk(upload_id, user=user, offset=offset, content_length=content_length)
+    path = upload_path(upload)
+    remaining = upload.upload_length - offset
+    to_read = remaining if content_length is None else content_length
+    renew_every_s = RESUMABLE_UPLOAD_CLAIM_LEASE.total_seconds() / 3
+    written = 0
+    try:
+        # Cópia: se a gravação falhar, o estado em cache continua valendo para o offset antigo.
+        hasher = _hasher_for(upload, path).copy()
+        renewed_at = time.monotonic()
+        # Erros de write/flush/close (ENOSPC, EIO) sobem: o offset não avança sobre bytes
+        # que talvez não chegaram ao disco.
+        with open(path, "r+b") as fh:
+            fh.seek(offset)
+            while written < to_read:
+                try:
+                    block = stream.read(min(_WRITE_CHUNK_SIZE, to_read - written))
+                except OSError:
+                    # Cliente desconectou no meio do chunk: mantém o que foi gravado.
+                    logger.info("[ResumableUpload] chunk interrompido upload=%s written=%s", upload.pk, written)
+                    break
+                if not block:
+                    break
+                # Confere a reserva antes de gravar: um cliente lento pode ter perdido a vez.
+                if time.monotonic() - renewed_at >= renew_every_s:
+                    if not _renew_claim(upload, token):
+                        raise UploadBusy()
+                    renewed_at = time.monotonic()
+                fh.write(block)
+                hasher.update(block)
+                written += len(block)
+
+        new_offset = offset + written
+        complete = new_offset >= upload.upload_length
+        probe = None
+        if upload.probe is None and (complete or offset < PROBE_MIN_BYTES <= new_offset):
+            probe = _try_probe(path)
+    except BaseException:
+        _release_claim(upload, token)
+        raise
+
+    with transaction.atomic():
+        upload = _locked_upload(upload_id, user=user)
+        if upload is None:
+            raise ResumableUpload.DoesNotExist
+        if upload.claim_token != token:
+            raise UploadBusy()
+        upload.upload_offset = new_offset
+        upload.claim_token = ""
+        upload.claimed_at = None
+        fields = ["upload_offset", "claim_token", "claimed_at", "updated_at"]
+        if probe is not None:
+            upload.probe = probe
+            fields.append("probe")
+        key = str(upload.pk)
+        if complete:
+            upload.status = "complete"
+            upload.sha256 = hasher.hexdigest()
+            fields += ["status", "sha256"]
+            with _HASHERS_LOCK:
+                _HASHERS.pop(key, None)
+        else:
+            with _HASHERS_LOCK:
+                _HASHERS[key] = (upload.upload_offset, hasher)
+        upload.save(update_fields=fields)
+    return upload
+
+
+def probe_upload(upload_id, *, user) -> None:
+    """
+    Roda o ffprobe de um upload completo que ainda não tem ``probe`` (o PATCH final
+    normalmente já fez). Chame antes de ``consume_upload``, fora de transação.
+    """
+    upload = get_user_upload(upload_id, user=user)
+    if upload is None or upload.status != "complete" or upload.probe is not None:
+        return
+    probe = _try_probe(upload_path(upload))
+    if probe is not None:
+        ResumableUpload.objects.filter(pk=upload.pk, probe__isnull=True).update(probe=probe, updated_at=timezone.now())
+
+
+def consume_upload(upload_id, *, user, target: str, require_probe: bool = False) -> ResumableUpload:
+    """
+    Marca um upload completo como usado pelo model de destino e devolve-o
+    (``file_name`` vai direto no FileField; ``probe`` preenchido se o arquivo é vídeo).
+    Com ``require_probe``, um arquivo que o ffprobe não lê não é consumido.
+    Não roda o ffprobe (``probe_upload`` antes, fora da transação): a linha fica travada só
+    pelo tempo do consumo. Chame no mesmo ``transaction.atomic()`` que cria o model de
+    destino: se a criação falhar, o upload volta a ``complete`` e pode ser reenviado ou limpo.
+    """
+    with transaction.atomic():
+        upload = _locked_upload(upload_id, user=user)
+        if upload is None:
+            raise ResumableUploadError("Upload não encontrado.")
+        if upload.target != target:
+            raise ResumableUploadError("Upload criado para outro destino.")
+        if upload.status != "complete":
+            raise ResumableUploadError("Upload ainda não foi concluído.")
+        if require_probe and upload.probe is None:
+            raise ResumableUploadError("Não foi possível analisar o vídeo enviado.")
+        upload.status = "consumed"
+        upload.save(update_fields=["status", "updated_at"])
+    return upload
+
+
+def discard_upload(upload: ResumableUpload) -> None:
+    """Apaga o arquivo parcial e o registro (uploads ainda não consumidos)."""
+    with _HASHERS_LOCK:
+        _HASHERS.pop(str(upload.pk), None)
+    try:
+        default_storage.delete(upload.file_name)
+    except OSError:
+        pass
+    upload.delete()
+
+
+def discard_stale_uploads(*, older_than: timedelta = RESUMABLE_UPLOAD_EXPIRY) -> int:
+    """Remove uploads abandonados (não consumidos e parados há mais de ``older_than``)."""
+    cutoff = timezone.now() - older_than
+    stale = list(ResumableUpload.objects.filter(status__in=["uploading", "complete"], updated_at__lt=cutoff))
+    for upload in stale:
+        discard_upload(upload)
+    return len(stale)
@@ -0,0 +1,82 @@
+"""Pool em cache dos últimos vídeos longos (YTB) publicados por brand.
+
+Usado pelo bloco "Mais vídeos" da descrição do YouTube: a descrição é montada a
+partir do cache, sem varrer ScheduledPost.external_ids a cada chamada. O pool é
+recarregado (consulta indexada por social_account/status/scheduled_at) quando um
+post é marcado DONE com ID YTB, ou no primeiro acesso após expirar.
+"""
+from __future__ import annotations
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+RECENT_UPLOADS_POOL_SIZE = 10
+RECENT_UPLOADS_CACHE_TTL_SECONDS = 6 * 60 * 60
+_CACHE_KEY_PREFIX = "social:recent_ytb_uploads:v1:"
+
+
+def _cache_key(brand_id: int) -> str:
+    return f"{_CACHE_KEY_PREFIX}{int(brand_id)}"
+
+
+def _load_recent_uploads(brand_id: int) -> list[tuple[int | None, str]]:
+    """Consulta os últimos posts DONE com ID YTB da brand (mais recentes primeiro).
+
+    Busca um item a mais que o tamanho do pool para que excluir o corte atual
+    ainda deixe RECENT_UPLOADS_POOL_SIZE candidatos.
+    """
+    from apps.jobs.models import ScheduledPost
+
+    rows = (
+        ScheduledPost.objects.filter(
+            social_account__brand_id=brand_id,
+            status="DONE",
+            external_ids__has_key="YTB",
+        )
+        .order_by("-scheduled_at")
+        .values_list("auto_cut_corte_id", "external_ids")[: RECENT_UPLOADS_POOL_SIZE + 1]
+    )
+    pool: list[tuple[int | None, str]] = []
+    for corte_id, ext in rows:
+        vid = (ext or {}).get("YTB")
+        if isinstance(vid, str) and vid.strip():
+            pool.append((corte_id, vid.strip()))
+    return pool
+
+
+def refresh_recent_youtube_uploads(brand_id: int) -> list[tuple[int | None, str]]:
+    """Recarrega o pool da brand a partir do banco e grava no cache."""
+    pool = _load_recent_uploads(brand_id)
+    cache.set(_cache_key(brand_id), pool, RECENT_UPLOADS_CACHE_TTL_SECONDS)
+    return pool
+
+
+def get_recent_youtube_uploads(brand_id: int) -> list[tuple[int | None, str]]:
+    """Retorna [(auto_cut_corte_id, youtube_video_id), ...] da brand, do cache quando possível."""
+    cached = cache.get(_cache_key(brand_id))
+    if cached is not None:
+        return [tuple(entry) for entry in cached]
+    return refresh_recent_youtube_uploads(brand_id)
+
+
+def record_youtube_upload(post) -> None:
+    """Atualiza o pool da brand quando um ScheduledPost fica DONE com ID YTB.
+
+    Silencioso em caso de erro: o pool é apenas uma otimização da descrição.
+    """
+    if getattr(post, "status", None) != "DONE":
+        return
+    vid = (getattr(post, "external_ids", None) or {}).get("YTB")
+    if not isinstance(vid, str) or not vid.strip():
+        return
+    if not getattr(post, "social_account_id", None):
+        return
+    try:
+        brand_id = post.social_account.brand_id
+        if brand_id:
+            refresh_recent_youtube_uploads(brand_id)
+    except Exception as e:
+        logger.warning("[YT-DESC] Falha ao atualizar pool de vídeos recentes (post=%s): %s", post.id, e)
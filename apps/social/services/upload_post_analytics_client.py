@@ -5,9 +5,11 @@ Autenticação: Authorization: Apikey <UPLOAD_POST_API_KEY> (igual ao publisher
 
 Documentação: https://docs.upload-post.com/api/get-analytics
 
-Inclui: throttle entre requisições, mensagens de erro legíveis, tratamento de HTTP 429,
-corpos JSON de erro mesmo com status 200, e fallback do endpoint total-impressions
-sem parâmetro ``metrics`` quando a API falha ao processar métricas compostas.
+Inclui: sessão HTTP com keep-alive e limite de requisições simultâneas por processo,
+token bucket compartilhado entre processos via Redis (fallback local), mensagens de erro
+legíveis, tratamento de HTTP 429, corpos JSON de erro mesmo com status 200, e fallback do
+endpoint total-impressions sem parâmetro ``metrics`` quando a API falha ao processar
+métricas compostas.
 """
 
 from __future__ import annotations
@@ -21,6 +23,7 @@ from typing import Any
 from urllib.parse import quote
 
 import requests
+import requests.adapters
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -28,38 +31,191 @@ logger = logging.getLogger(__name__)
 UPLOAD_POST_API_ROOT = "https://api.upload-post.com/api"
 
 _UPLOAD_POST_MIN_INTERVAL = float(os.getenv("UPLOAD_POST_ANALYTICS_MIN_INTERVAL_SEC", "0.6"))
+# Rajada tolerada pelo token bucket (1 = espaçamento estrito de MIN_INTERVAL entre requisições).
+_UPLOAD_POST_BURST = max(1, int(os.getenv("UPLOAD_POST_ANALYTICS_BURST", "1")))
 # Pausa global após 429/erro de conexão/5xx para evitar bloqueio de borda (Cloudflare/WAF).
 _UPLOAD_POST_COOLDOWN_SEC = float(os.getenv("UPLOAD_POST_ANALYTICS_COOLDOWN_SEC", "30"))
 # Teto de espera aceitável dentro de uma única chamada — acima disso devolvemos erro
 # imediato em vez de bloquear a request por muito tempo.
 _UPLOAD_POST_MAX_WAIT_SEC = float(os.getenv("UPLOAD_POST_ANALYTICS_MAX_WAIT_SEC", "5"))
+# Requisições simultâneas por processo contra api.upload-post.com (tamanho do pool HTTP).
+UPLOAD_POST_MAX_IN_FLIGHT = max(1, int(os.getenv("UPLOAD_POST_ANALYTICS_MAX_IN_FLIGHT", "4")))
+# Limiter compartilhado entre processos (web + workers) via Redis do broker; 0 = só local.
+_SHARED_LIMITER_ENABLED = os.getenv("UPLOAD_POST_ANALYTICS_SHARED_LIMITER", "1").lower() in ("1", "true", "yes")
+# Após falha no Redis, usa só o limiter local por este intervalo antes de tentar de novo.
+_SHARED_LIMITER_RETRY_SEC = 60.0
+
+_LIMITER_TAT_KEY = "upload_post:analytics:limiter:tat"
+_LIMITER_COOLDOWN_KEY = "upload_post:analytics:limiter:cooldown_until"
+
+# Token bucket na forma GCRA: guarda o "theoretical arrival time" (TAT) da próxima
+# requisição. Usa o relógio do Redis para que todos os hosts compartilhem a mesma base.
+# Retorna {reservado (0/1), espera em segundos}; só reserva se a espera couber no teto.
+_RESERVE_SLOT_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local local_cooldown = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+local cooldown_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+local earliest = math.max(now, tat - (burst - 1) * interval, cooldown_until, now + local_cooldown)
+local wait = earliest - now
+if wait > max_wait then
+  return {0, tostring(wait)}
+end
+local new_tat = math.max(tat, earliest) + interval
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000) + 1000)
+return {1, tostring(wait)}
+"""
+
+_TRIP_COOLDOWN_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local target = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if target > current then
+  redis.call('SET', KEYS[1], tostring(target), 'PX', math.ceil(tonumber(ARGV[1]) * 1000))
+  return 1
+end
+return 0
+"""
 
 _throttle_lock = threading.Lock()
-_last_request_mono: float = 0.0
+_local_tat_mono: float = 0.0
 _cooldown_until_mono: float = 0.0
 
+_session_lock = threading.Lock()
+_session: requests.Session | None = None
+_in_flight = threading.BoundedSemaphore(UPLOAD_POST_MAX_IN_FLIGHT)
+
+_limiter_lock = threading.Lock()
+_limiter_scripts: tuple[Any, Any] | None = None
+_limiter_disabled_until_mono: float = 0.0
+
+
+def _get_session() -> requests.Session:
+    """Sessão HTTP do processo com keep-alive (reaproveita conexões TLS entre chamadas)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=UPLOAD_POST_MAX_IN_FLIGHT,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _upload_post_get(url: str, *, params: dict[str, Any], timeout: float) -> requests.Response:
+    """GET na sessão compartilhada, limitado a UPLOAD_POST_MAX_IN_FLIGHT requisições simultâneas."""
+    with _in_flight:
+        return _get_session().get(url, params=params, headers=_headers(), timeout=timeout)
+
+
+def _shared_limiter_scripts():
+    """Scripts Lua registrados no Redis do broker; None se indisponível (usa limiter local)."""
+    global _limiter_scripts, _limiter_disabled_until_mono
+    if not _SHARED_LIMITER_ENABLED:
+        return None
+    if _limiter_scripts is not None:
+        return _limiter_scripts
+    with _limiter_lock:
+        if _limiter_scripts is not None:
+            return _limiter_scripts
+        if time.monotonic() < _limiter_disabled_until_mono:
+            return None
+        broker_url = str(getattr(settings, "CELERY_BROKER_URL", "") or "").strip()
+        if not broker_url.lower().startswith(("redis://", "rediss://", "unix://")):
+            return None
+        try:
+            from redis import Redis
+
+            client = Redis.from_url(
+                broker_url,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+                retry_on_timeout=False,
+            )
+            _limiter_scripts = (
+                client.register_script(_RESERVE_SLOT_LUA),
+                client.register_script(_TRIP_COOLDOWN_LUA),
+            )
+        except Exception as e:
+            _disable_shared_limiter(e)
+            return None
+        return _limiter_scripts
+
+
+def _disable_shared_limiter(error: Exception) -> None:
+    global _limiter_scripts, _limiter_disabled_until_mono
+    _limiter_scripts = None
+    _limiter_disabled_until_mono = time.monotonic() + _SHARED_LIMITER_RETRY_SEC
+    logger.warning(
+        "[UploadPostAnalytics] limiter compartilhado indisponível por %.0fs, usando local: %s",
+        _SHARED_LIMITER_RETRY_SEC,
+        error,
+    )
+
+
+def _reserve_local_slot(max_wait: float) -> tuple[bool, float]:
+    """Mesmo GCRA do script Lua, restrito ao processo (fallback sem Redis)."""
+    global _local_tat_mono
+    with _throttle_lock:
+        now = time.monotonic()
+        tolerance = (_UPLOAD_POST_BURST - 1) * _UPLOAD_POST_MIN_INTERVAL
+        earliest = max(now, _local_tat_mono - tolerance, _cooldown_until_mono)
+        wait = earliest - now
+        if wait > max_wait:
+            return False, wait
+        _local_tat_mono = max(_local_tat_mono, earliest) + _UPLOAD_POST_MIN_INTERVAL
+        return True, wait
+
+
+def _reserve_shared_slot(max_wait: float) -> tuple[bool, float] | None:
+    scripts = _shared_limiter_scripts()
+    if scripts is None:
+        return None
+    reserve, _trip = scripts
+    local_cooldown = max(0.0, _cooldown_until_mono - time.monotonic())
+    try:
+        ok, wait = reserve(
+            keys=[_LIMITER_TAT_KEY, _LIMITER_COOLDOWN_KEY],
+            args=[_UPLOAD_POST_MIN_INTERVAL, _UPLOAD_POST_BURST, max_wait, local_cooldown],
+        )
+    except Exception as e:
+        _disable_shared_limiter(e)
+        return None
+    return bool(int(ok)), max(float(wait), 0.0)
+
 
 def _throttle_upload_post() -> tuple[bool, float]:
     """
-    Garante intervalo mínimo entre requisições e respeita cooldown global após falhas.
+    Reserva um slot no token bucket (compartilhado via Redis, ou local) e respeita o cooldown.
 
     Retorna ``(ok, wait_needed)``:
-    - ``ok=True``: caller pode prosseguir com a requisição.
-    - ``ok=False``: cooldown ativo e espera estimada seria maior que ``_UPLOAD_POST_MAX_WAIT_SEC``;
+    - ``ok=True``: caller pode prosseguir com a requisição (a espera já foi cumprida).
+    - ``ok=False``: espera estimada seria maior que ``_UPLOAD_POST_MAX_WAIT_SEC``;
       caller deve abortar com erro de rate limit em vez de bloquear.
+
+    A reserva é atômica e o ``sleep`` ocorre fora de qualquer lock, então threads
+    concorrentes aguardam em paralelo os próprios slots em vez de se serializarem.
     """
-    global _last_request_mono
-    with _throttle_lock:
-        now = time.monotonic()
-        wait_interval = _UPLOAD_POST_MIN_INTERVAL - (now - _last_request_mono)
-        wait_cooldown = _cooldown_until_mono - now
-        wait = max(wait_interval, wait_cooldown)
-        if wait > _UPLOAD_POST_MAX_WAIT_SEC:
-            return False, wait
-        if wait > 0:
-            time.sleep(wait)
-        _last_request_mono = time.monotonic()
-        return True, max(wait, 0.0)
+    reserved = _reserve_shared_slot(_UPLOAD_POST_MAX_WAIT_SEC)
+    if reserved is None:
+        reserved = _reserve_local_slot(_UPLOAD_POST_MAX_WAIT_SEC)
+    ok, wait = reserved
+    if not ok:
+        return False, wait
+    if wait > 0:
+        time.sleep(wait)
+    return True, max(wait, 0.0)
 
 
 class _UploadPostCooldownError(Exception):
@@ -71,7 +227,7 @@ class _UploadPostCooldownError(Exception):
 
 
 def _trip_cooldown(reason: str) -> None:
-    """Arma o cooldown global ao detectar 429/5xx/erro de conexão."""
+    """Arma o cooldown global (processo + Redis) ao detectar 429/5xx/erro de conexão."""
     global _cooldown_until_mono
     if _UPLOAD_POST_COOLDOWN_SEC <= 0:
         return
@@ -84,6 +240,12 @@ def _trip_cooldown(reason: str) -> None:
                 _UPLOAD_POST_COOLDOWN_SEC,
                 reason,
             )
+    scripts = _shared_limiter_scripts()
+    if scripts is not None:
+        try:
+            scripts[1](keys=[_LIMITER_COOLDOWN_KEY], args=[_UPLOAD_POST_COOLDOWN_SEC])
+        except Exception as e:
+            _disable_shared_limiter(e)
 
 
 def get_upload_post_api_key() -> str:
@@ -163,12 +325,7 @@ def fetch_profile_platforms_analytics(profile_username: str, platforms: str = "y
         return None, f"Upload Post em cooldown ({wait_needed:.0f}s). Aguarde antes de recarregar."
     url = f"{UPLOAD_POST_API_ROOT}/analytics/{quote(profile_username, safe='')}"
     try:
-        resp = requests.get(
-            url,
-            params={"platforms": platforms},
-            headers=_headers(),
-            timeout=30,
-        )
+        resp = _upload_post_get(url, params={"platforms": platforms}, timeout=30)
     except requests.RequestException as e:
         logger.warning("[UploadPostAnalytics] rede profile=%s: %s", profile_username, e)
         _trip_cooldown(f"network:{type(e).__name__}")
@@ -229,7 +386,7 @@ def _fetch_total_impressions_request(
         params["end_date"] = end_date
     if metrics:
         params["metrics"] = metrics
-    return requests.get(url, params=params, headers=_headers(), timeout=30)
+    return _upload_post_get(url, params=params, timeout=30)
 
 
 def fetch_total_impressions(
@@ -349,12 +506,7 @@ def fetch_post_analytics(request_id: str, platform: str = "youtube") -> tuple[di
         return None, f"Upload Post em cooldown ({wait_needed:.0f}s). Aguarde antes de recarregar."
     url = f"{UPLOAD_POST_API_ROOT}/uploadposts/post-analytics/{quote(rid, safe='')}"
     try:
-        resp = requests.get(
-            url,
-            params={"platform": platform},
-            headers=_headers(),
-            timeout=25,
-        )
+        resp = _upload_post_get(url, params={"platform": platform}, timeout=25)
     except requests.RequestException as e:
         _trip_cooldown(f"network:{type(e).__name__}")
         return None, f"Erro de rede: {e}"
@@ -5,6 +5,8 @@ import re
 import unicodedata
 from pathlib import Path
 
+from apps.social.services.recent_uploads_pool import get_recent_youtube_uploads
+
 logger = logging.getLogger(__name__)
 
 _TIMESTAMP_RE = re.compile(r"^\d{1,2}:\d{2}(?::\d{2})?$")
@@ -125,32 +127,18 @@ def _is_english_corte(corte) -> bool:
 def _build_related_links_block(brand, exclude_corte_id, is_en: bool) -> str:
     """Monta bloco com 1-2 links rotativos de videos ja publicados da mesma brand.
 
-    Pega os ultimos videos DONE com YTB video_id, escolhe aleatoriamente ate
-    _RELATED_LINKS_CHOICE_COUNT para montar um bloco "Mais videos".
+    Usa o pool em cache dos ultimos videos DONE com YTB video_id (ver
+    recent_uploads_pool), escolhe aleatoriamente ate _RELATED_LINKS_CHOICE_COUNT
+    para montar um bloco "Mais videos".
     Falha silenciosamente se nao houver historico suficiente.
     """
     if not brand or not getattr(brand, "id", None):
         return ""
     try:
-        from apps.jobs.models import ScheduledPost
-    except Exception:
-        return ""
-    try:
-        qs = (
-            ScheduledPost.objects.filter(
-                social_account__brand_id=brand.id,
-                status="DONE",
-                external_ids__has_key="YTB",
-            )
-            .exclude(auto_cut_corte_id=exclude_corte_id)
-            .order_by("-scheduled_at")
-            .values_list("external_ids", flat=True)[:_RELATED_LINKS_POOL_SIZE]
-        )
-        candidates: list[str] = []
-        for ext in qs:
-            vid = (ext or {}).get("YTB")
-            if isinstance(vid, str) and vid.strip():
-                candidates.append(vid.strip())
+        pool = get_recent_youtube_uploads(brand.id)
+        candidates: list[str] = [
+            vid for corte_id, vid in pool if corte_id != exclude_corte_id
+        ][:_RELATED_LINKS_POOL_SIZE]
     except Exception as e:
         logger.warning("[YT-DESC] Falha ao buscar videos relacionados (brand=%s): %s", brand.id, e)
         return ""
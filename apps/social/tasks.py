@@ -55,6 +55,7 @@ from apps.social.services.idempotency import (
     mark_idempotency_failed,
     mark_idempotency_success,
 )
+from apps.social.services.recent_uploads_pool import record_youtube_upload
 
 logger = logging.getLogger(__name__)
 YOUTUBE_PLATFORM_CODES = {"YT", "YTB"}
@@ -191,6 +192,20 @@ def _resolve_post_target_brand(post: ScheduledPost):
     return None
 
 
+def _resolve_post_target_brand_id(post: ScheduledPost) -> int | None:
+    """Como _resolve_post_target_brand, só o id: usa o escopo denormalizado, sem ler job/corte."""
+    try:
+        schedule = getattr(post, "factory_schedule", None)
+    except Exception:
+        schedule = None
+    if schedule and getattr(schedule, "brand_id", None):
+        return schedule.brand_id
+    if post.brand_id or not (post.job_id or post.auto_cut_corte_id):
+        return post.brand_id
+    brand = _resolve_post_target_brand(post)
+    return brand.id if brand else None
+
+
 def _list_ordered_youtube_credentials(brand):
     if not brand:
         return []
@@ -403,6 +418,7 @@ def _youtube_day_video_index(
 
 
 def _sync_factory_posting_schedule(post: ScheduledPost) -> None:
+    record_youtube_upload(post)
     schedule = FactoryPostingSchedule.objects.filter(scheduled_post=post).select_related(
         "inventory_item", "factory", "brand"
     ).first()
@@ -834,6 +850,7 @@ def _mark_factory_posting_verified(post: ScheduledPost, *, platform: str, extern
     post.posted_at = post.posted_at or now
     post.error = ""
     post.save(update_fields=["status", "posted_at", "error", "updated_at"])
+    record_youtube_upload(post)
     schedule.status = "DONE"
     schedule.attempt_count = int(post.retry_count or 0)
     schedule.next_retry_at = None
@@ -1189,11 +1206,7 @@ def _upload_post_end_of_queue_delay_seconds(
     """
     if not brand:
         return max(int(minimum_seconds or 0), UPLOAD_INTERVAL_SECONDS)
-    brand_scope = (
-        Q(factory_schedule__brand_id=brand.id)
-        | Q(job__brand_id=brand.id)
-        | Q(auto_cut_corte__analysis__brand_id=brand.id)
-    )
+    brand_scope = Q(factory_schedule__brand_id=brand.id) | Q(brand_id=brand.id)
     pending_count = (
         ScheduledPost.objects.filter(status="PENDING")
         .filter(brand_scope)
@@ -1916,21 +1929,22 @@ def check_scheduled_posts_task():
     )
     # Skip posts without source — do not enqueue to avoid failure loops
     has_origin = Q(job_id__isnull=False) | Q(auto_cut_corte_id__isnull=False)
-    due_posts = ScheduledPost.objects.filter(
+    # Só ids/campos usados aqui: o filtro (status, scheduled_at) usa o índice composto.
+    due_post_ids = ScheduledPost.objects.filter(
         status="PENDING",
         scheduled_at__lte=now,
-    ).filter(has_origin).select_related("job", "job__brand", "social_account").order_by(
+    ).filter(has_origin).order_by(
         "social_account__brand_id",
         "scheduled_at",
         "id",
-    )[:BATCH_LIMIT_PER_TICK]
+    ).values_list("id", flat=True)[:BATCH_LIMIT_PER_TICK]
     # Janela antecipada do YouTube/Upload Post: envia aproximadamente 1h antes do slot final.
     future_candidates = ScheduledPost.objects.filter(
         status="PENDING",
         scheduled_at__gt=now,
         scheduled_at__lte=now + timedelta(seconds=YOUTUBE_PREPUBLISH_WINDOW_SECONDS),
-    ).filter(has_origin).select_related("job", "job__brand", "social_account")
-    post_ids = {post.id for post in due_posts}
+    ).filter(has_origin).only("id", "platforms", "external_ids")
+    post_ids = set(due_post_ids)
     for post in future_candidates:
         if _platforms_are_youtube_only(post.platforms):
             if ((post.external_ids or {}).get("upload_post_reconciliation_state") or "") == "pending":
@@ -1942,23 +1956,14 @@ def check_scheduled_posts_task():
 
     posts = list(
         ScheduledPost.objects.filter(id__in=post_ids_list)
-        .select_related(
-            "job",
-            "job__brand",
-            "social_account",
-            "social_account__brand",
-            "auto_cut_corte",
-            "auto_cut_corte__analysis",
-            "factory_schedule",
-        )
+        .select_related("auto_cut_corte", "factory_schedule")
         .order_by("social_account__brand_id", "scheduled_at", "id")
     )
 
     # Group by brand
     brand_to_posts: dict[int, list] = {}
     for p in posts:
-        brand = _resolve_post_target_brand(p)
-        bid = brand.id if brand else 0
+        bid = _resolve_post_target_brand_id(p) or 0
         brand_to_posts.setdefault(bid, []).append(p.id)
 
     total_brands = len([b for b in brand_to_posts if b > 0])
@@ -1984,8 +1989,8 @@ def check_scheduled_posts_task():
     brand_to_last_index: dict[int, int] = {}
     brand_to_post_ids: dict[int, list[int]] = {}
     for i, p in enumerate(posts):
-        brand = _resolve_post_target_brand(p)
-        if not brand:
+        target_brand_id = _resolve_post_target_brand_id(p)
+        if not target_brand_id:
             continue
         has_thumb = (
             getattr(p, "auto_cut_corte_id", None)
@@ -1997,8 +2002,8 @@ def check_scheduled_posts_task():
         is_short = "YT" in platforms and "YTB" not in platforms
         if is_short:
             continue
-        brand_to_last_index[brand.id] = i
-        brand_to_post_ids.setdefault(brand.id, []).append(p.id)
+        brand_to_last_index[target_brand_id] = i
+        brand_to_post_ids.setdefault(target_brand_id, []).append(p.id)
     for bid, last_i in brand_to_last_index.items():
         countdown = (last_i + 1) * UPLOAD_INTERVAL_SECONDS + THUMBNAIL_BATCH_DELAY_SEC
         upload_thumbnails_after_batch_task.apply_async(
@@ -2008,7 +2013,7 @@ def check_scheduled_posts_task():
         )
 
     return {
-        "checked_due": due_posts.count(),
+        "checked_due": due_post_ids.count(),
         "queued": len(post_ids_list),
         "brands": total_brands,
     }
@@ -2370,9 +2375,7 @@ def reconcile_youtube_full_scan_task(factory_id: int | None = None, day_iso: str
                 "factory_schedule",
                 "factory_schedule__brand",
             ).filter(
-                Q(factory_schedule__brand=brand)
-                | Q(job__brand=brand)
-                | Q(auto_cut_corte__analysis__brand=brand),
+                Q(factory_schedule__brand=brand) | Q(brand=brand),
                 scheduled_at__gte=day_start_utc,
                 scheduled_at__lte=day_end_utc,
                 status__in=["PENDING", "POSTING", "DONE"],
@@ -0,0 +1,83 @@
+"""Pool em cache de vídeos YTB recentes por brand (bloco "Mais vídeos")."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.brands.models import Brand, BrandSocialAccount, Factory
+from apps.jobs.models import ScheduledPost
+from apps.social.services.recent_uploads_pool import (
+    RECENT_UPLOADS_POOL_SIZE,
+    get_recent_youtube_uploads,
+    record_youtube_upload,
+)
+
+
+class RecentUploadsPoolTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = Factory.objects.create(name="Factory Pool")
+        self.brand = Brand.objects.create(name="Brand Pool", slug="brand-pool", factory=self.factory)
+        self.account = BrandSocialAccount.objects.create(
+            brand=self.brand,
+            platform="YTB",
+            channel_id="channel-pool",
+            account_name="Canal Pool",
+        )
+
+    def _post(self, *, video_id: str, minutes_ago: int, status: str = "DONE") -> ScheduledPost:
+        return ScheduledPost.objects.create(
+            social_account=self.account,
+            platforms=["YTB"],
+            scheduled_at=timezone.now() - timedelta(minutes=minutes_ago),
+            status=status,
+            external_ids={"YTB": video_id} if video_id else {},
+        )
+
+    def test_loads_newest_first_and_skips_non_done(self):
+        self._post(video_id="old", minutes_ago=30)
+        self._post(video_id="new", minutes_ago=5)
+        self._post(video_id="pending", minutes_ago=1, status="PENDING")
+        self._post(video_id="", minutes_ago=2)
+
+        pool = get_recent_youtube_uploads(self.brand.id)
+
+        self.assertEqual([vid for _, vid in pool], ["new", "old"])
+
+    def test_second_read_is_served_from_cache(self):
+        self._post(video_id="a1", minutes_ago=5)
+        get_recent_youtube_uploads(self.brand.id)
+
+        with self.assertNumQueries(0):
+            pool = get_recent_youtube_uploads(self.brand.id)
+        self.assertEqual([vid for _, vid in pool], ["a1"])
+
+    def test_record_upload_refreshes_cached_pool(self):
+        self._post(video_id="a1", minutes_ago=10)
+        self.assertEqual(len(get_recent_youtube_uploads(self.brand.id)), 1)
+
+        post = self._post(video_id="b2", minutes_ago=1)
+        record_youtube_upload(post)
+
+        with self.assertNumQueries(0):
+            pool = get_recent_youtube_uploads(self.brand.id)
+        self.assertEqual([vid for _, vid in pool], ["b2", "a1"])
+
+    def test_record_upload_ignores_posts_without_ytb_id(self):
+        get_recent_youtube_uploads(self.brand.id)
+        post = self._post(video_id="", minutes_ago=1)
+        post.external_ids = {"YT": "short1"}
+        with self.assertNumQueries(0):
+            record_youtube_upload(post)
+
+    def test_pool_keeps_one_spare_entry_for_exclusion(self):
+        for i in range(RECENT_UPLOADS_POOL_SIZE + 3):
+            self._post(video_id=f"v{i}", minutes_ago=100 - i)
+
+        pool = get_recent_youtube_uploads(self.brand.id)
+
+        self.assertEqual(len(pool), RECENT_UPLOADS_POOL_SIZE + 1)
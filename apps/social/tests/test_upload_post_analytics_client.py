@@ -0,0 +1,82 @@
+"""Rate limit do cliente de analytics Upload Post (token bucket local e compartilhado)."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from apps.social.services import upload_post_analytics_client as client
+
+_MODULE = "apps.social.services.upload_post_analytics_client"
+
+
+class LocalTokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self._patches = [
+            patch(f"{_MODULE}._shared_limiter_scripts", return_value=None),
+            patch(f"{_MODULE}._local_tat_mono", 0.0),
+            patch(f"{_MODULE}._cooldown_until_mono", 0.0),
+            patch(f"{_MODULE}._UPLOAD_POST_MIN_INTERVAL", 1.0),
+            patch(f"{_MODULE}._UPLOAD_POST_BURST", 1),
+            patch(f"{_MODULE}._UPLOAD_POST_MAX_WAIT_SEC", 2.5),
+            patch(f"{_MODULE}.time.monotonic", return_value=100.0),
+        ]
+        for p in self._patches:
+            p.start()
+        self.addCleanup(lambda: [p.stop() for p in self._patches])
+
+    def test_concurrent_callers_get_spaced_slots(self):
+        with patch(f"{_MODULE}.time.sleep") as mock_sleep:
+            results = [client._throttle_upload_post() for _ in range(3)]
+
+        self.assertEqual(results, [(True, 0.0), (True, 1.0), (True, 2.0)])
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1.0, 2.0])
+
+    def test_rejects_without_reserving_when_wait_exceeds_ceiling(self):
+        with patch(f"{_MODULE}.time.sleep"):
+            for _ in range(3):
+                client._throttle_upload_post()
+            ok, wait = client._throttle_upload_post()
+            self.assertFalse(ok)
+            self.assertEqual(wait, 3.0)
+            # A rejeição não consome slot: o TAT continua onde estava.
+            self.assertEqual(client._local_tat_mono, 103.0)
+
+    def test_cooldown_pushes_next_slot(self):
+        with patch(f"{_MODULE}._UPLOAD_POST_COOLDOWN_SEC", 30.0):
+            client._trip_cooldown("http_429")
+        ok, wait = client._throttle_upload_post()
+        self.assertFalse(ok)
+        self.assertEqual(wait, 30.0)
+
+
+class SharedTokenBucketTests(SimpleTestCase):
+    def test_uses_redis_reservation_when_available(self):
+        reserve = MagicMock(return_value=[1, "0.4"])
+        with (
+            patch(f"{_MODULE}._shared_limiter_scripts", return_value=(reserve, MagicMock())),
+            patch(f"{_MODULE}.time.sleep") as mock_sleep,
+        ):
+            ok, wait = client._throttle_upload_post()
+
+        self.assertTrue(ok)
+        self.assertAlmostEqual(wait, 0.4)
+        mock_sleep.assert_called_once_with(0.4)
+        self.assertEqual(
+            reserve.call_args.kwargs["keys"],
+            [client._LIMITER_TAT_KEY, client._LIMITER_COOLDOWN_KEY],
+        )
+
+    def test_redis_failure_falls_back_to_local_limiter(self):
+        reserve = MagicMock(side_effect=ConnectionError("redis down"))
+        with (
+            patch(f"{_MODULE}._shared_limiter_scripts", return_value=(reserve, MagicMock())),
+            patch(f"{_MODULE}._disable_shared_limiter") as mock_disable,
+            patch(f"{_MODULE}._reserve_local_slot", return_value=(True, 0.0)) as mock_local,
+        ):
+            ok, _wait = client._throttle_upload_post()
+
+        self.assertTrue(ok)
+        mock_disable.assert_called_once()
+        mock_local.assert_called_once()
@@ -11,6 +11,8 @@ from apps.social.services.youtube_description import (
     build_youtube_description,
 )
 
+_MODULE = "apps.social.services.youtube_description"
+
 
 class BuildYoutubeDescriptionTests(SimpleTestCase):
     def test_override_wins(self):
@@ -192,23 +194,28 @@ class RelatedLinksBlockTests(SimpleTestCase):
 
     def test_returns_empty_when_no_history(self):
         brand = MagicMock(id=1)
-        with patch("apps.jobs.models.ScheduledPost") as mock_sp:
-            mock_sp.objects.filter.return_value.exclude.return_value.order_by.return_value.values_list.return_value.__getitem__.return_value = []
+        with patch(f"{_MODULE}.get_recent_youtube_uploads", return_value=[]):
             self.assertEqual(_build_related_links_block(brand, 123, False), "")
 
     def test_returns_links_when_history_present(self):
         brand = MagicMock(id=1)
-        ext_history = [{"YTB": "abc111"}, {"YTB": "def222"}, {"YTB": "ghi333"}]
-        with patch("apps.jobs.models.ScheduledPost") as mock_sp:
-            mock_sp.objects.filter.return_value.exclude.return_value.order_by.return_value.values_list.return_value.__getitem__.return_value = ext_history
+        pool = [(10, "abc111"), (11, "def222"), (12, "ghi333")]
+        with patch(f"{_MODULE}.get_recent_youtube_uploads", return_value=pool):
             out = _build_related_links_block(brand, 123, False)
         self.assertIn("▶️ Mais vídeos:", out)
         self.assertEqual(out.count("https://youtu.be/"), 2)
 
+    def test_excludes_current_corte(self):
+        brand = MagicMock(id=1)
+        pool = [(123, "self999"), (11, "def222"), (12, "ghi333")]
+        with patch(f"{_MODULE}.get_recent_youtube_uploads", return_value=pool):
+            out = _build_related_links_block(brand, 123, False)
+        self.assertNotIn("self999", out)
+        self.assertEqual(out.count("https://youtu.be/"), 2)
+
     def test_english_header(self):
         brand = MagicMock(id=1)
-        ext_history = [{"YTB": "abc111"}, {"YTB": "def222"}]
-        with patch("apps.jobs.models.ScheduledPost") as mock_sp:
-            mock_sp.objects.filter.return_value.exclude.return_value.order_by.return_value.values_list.return_value.__getitem__.return_value = ext_history
+        pool = [(10, "abc111"), (11, "def222")]
+        with patch(f"{_MODULE}.get_recent_youtube_uploads", return_value=pool):
             out = _build_related_links_block(brand, 123, True)
         self.assertIn("▶️ More videos:", out)
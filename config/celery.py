@@ -8,6 +8,15 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "social_automation.settings")
 app = Celery("social_automation")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+# Priority from brand inventory deficit on the transcription/render queues, then the static table.
+# settings.CELERY_TASK_ROUTES stays a plain dict (queue observability reads it); with the CELERY
+# namespace the prefixed key is the one Celery resolves, so it is the one overridden here.
+app.conf.update(
+    CELERY_TASK_ROUTES=(
+        "apps.jobs.services.task_priority.route_by_inventory_deficit",
+        app.conf.task_routes,
+    )
+)
 
 app.conf.beat_schedule = {
     "check-scheduled-posts": {
@@ -28,6 +37,21 @@ app.conf.beat_schedule = {
         "task": "apps.jobs.tasks_auto_fetch.check_and_fetch_new_videos_task",
         "schedule": 900.0,  # every 15 min
     },
+    # Factory YouTube dashboard snapshots (views answer from cache with as_of).
+    "precompute-factory-youtube-snapshots": {
+        "task": "apps.api.tasks.precompute_factory_youtube_snapshots_task",
+        "schedule": 600.0,  # every 10 min (= dashboard fresh TTL)
+    },
+    # Ledger de performance por etapa (StagePerformanceDaily), ontem + hoje.
+    "rollup-stage-performance": {
+        "task": "apps.jobs.tasks.rollup_stage_performance_task",
+        "schedule": crontab(minute=20),  # every hour
+    },
+    # Starvation protection for the priority lists of the transcription/render queues.
+    "promote-aged-queue-messages": {
+        "task": "apps.jobs.tasks.promote_aged_queue_messages_task",
+        "schedule": 60.0,
+    },
     # Cleanup of media for already-posted videos (cuts, job output, analysis).
     # Re-enabled after hardening (Passos A/B/C): gates em DONE posts, AutoCutReadyChunk
     # em refs, mtime guard 24h e canary tests.
@@ -5,15 +5,41 @@ process. When multiple containers share the same multiprocess root, use a
 service-specific subdirectory per container and expose the shared parent in
 ``PROMETHEUS_MULTIPROC_ROOT_DIR`` so the Django scrape can aggregate all
 worker/web metrics without PID filename collisions.
+
+The merged multiprocess output is cached for ``PROMETHEUS_SCRAPE_CACHE_SEC``
+(default 5 s; 0 disables). Files of dead pids are folded into per-type archives
+by ``apps.common.metrics_compaction`` (Celery children on start, and the web
+dir here at most every ``PROMETHEUS_COMPACT_INTERVAL_SEC``).
 """
 
 import glob
 import os
+import threading
+import time
+from contextlib import ExitStack
 
 from django.http import HttpResponse
 
+from apps.common.metrics_compaction import (
+    ARCHIVE_TAG,
+    file_pid,
+    maybe_compact_current_dir,
+    multiproc_lock,
+)
+
 _DEFAULT_QUEUE_BACKLOG_COLLECTOR_REGISTERED = False
 
+_SCRAPE_CACHE_LOCK = threading.Lock()
+_scrape_cache: dict = {"key": None, "data": b"", "at": 0.0}
+_last_scrape_duration_s = 0.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
 
 def _collect_multiproc_paths(current_dir: str, root_dir: str | None) -> list[str]:
     paths: list[str] = []
@@ -33,6 +59,42 @@ def _collect_multiproc_paths(current_dir: str, root_dir: str | None) -> list[str
     return paths
 
 
+def _count_multiproc_files(paths: list[str]) -> dict[str, int]:
+    counts = {"pid": 0, "archive": 0}
+    for path in paths:
+        for f in glob.glob(os.path.join(path, "*.db")):
+            if file_pid(f) is not None:
+                counts["pid"] += 1
+            elif os.path.basename(f).endswith(f"_{ARCHIVE_TAG}.db"):
+                counts["archive"] += 1
+    return counts
+
+
+class _ScrapeStatsCollector:
+    """Scrape cost of the multiprocess store: last merge duration and files merged."""
+
+    def __init__(self, paths: list[str]) -> None:
+        self._paths = paths
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        duration = GaugeMetricFamily(
+            "prometheus_scrape_duration_seconds",
+            "Time spent merging multiprocess files and rendering the previous uncached /metrics/ response",
+        )
+        duration.add_metric([], _last_scrape_duration_s)
+        yield duration
+        files = GaugeMetricFamily(
+            "prometheus_multiproc_files",
+            "Multiprocess .db files merged per scrape (pid = one process, archive = compacted dead processes)",
+            labels=["kind"],
+        )
+        for kind, count in _count_multiproc_files(self._paths).items():
+            files.add_metric([kind], count)
+        yield files
+
+
 class _MultiProcessDirsCollector:
     def __init__(self, paths: list[str], multiprocess_module) -> None:
         self._paths = paths
@@ -46,21 +108,45 @@ class _MultiProcessDirsCollector:
 
 
 def _register_queue_backlog_collector(registry) -> None:
-    from apps.common.queue_backlog import QueueBacklogCollector
+    from apps.common.broker_telemetry import BrokerTelemetryCollector
 
-    registry.register(QueueBacklogCollector())
+    registry.register(BrokerTelemetryCollector())
 
 
 def _ensure_default_queue_backlog_collector_registered(default_registry) -> None:
     global _DEFAULT_QUEUE_BACKLOG_COLLECTOR_REGISTERED
     if _DEFAULT_QUEUE_BACKLOG_COLLECTOR_REGISTERED:
         return
-    from apps.common.queue_backlog import QueueBacklogCollector
+    from apps.common.broker_telemetry import BrokerTelemetryCollector
 
-    default_registry.register(QueueBacklogCollector())
+    default_registry.register(BrokerTelemetryCollector())
     _DEFAULT_QUEUE_BACKLOG_COLLECTOR_REGISTERED = True
 
 
+def _generate_multiproc_latest(multiproc_dir, multiproc_root, registry_cls, generate_latest, multiprocess) -> bytes:
+    global _last_scrape_duration_s
+    maybe_compact_current_dir(min_interval_s=_env_float("PROMETHEUS_COMPACT_INTERVAL_SEC", 300.0))
+    started = time.perf_counter()
+    registry = registry_cls()
+    paths = _collect_multiproc_paths(multiproc_dir, multiproc_root)
+    if len(paths) <= 1:
+        multiprocess.MultiProcessCollector(
+            registry,
+            path=paths[0] if paths else multiproc_dir,
+        )
+    else:
+        registry.register(_MultiProcessDirsCollector(paths, multiprocess))
+    _register_queue_backlog_collector(registry)
+    registry.register(_ScrapeStatsCollector(paths or [multiproc_dir]))
+    with ExitStack() as stack:
+        # Shared lock per dir: compaction never moves values between files mid-merge.
+        for path in paths:
+            stack.enter_context(multiproc_lock(path, shared=True))
+        data = generate_latest(registry)
+    _last_scrape_duration_s = time.perf_counter() - started
+    return data
+
+
 def prometheus_metrics(request):
     try:
         from prometheus_client import (
@@ -79,18 +165,16 @@ def prometheus_metrics(request):
 
     multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
     if multiproc_dir:
-        registry = CollectorRegistry()
         multiproc_root = os.environ.get("PROMETHEUS_MULTIPROC_ROOT_DIR")
-        paths = _collect_multiproc_paths(multiproc_dir, multiproc_root)
-        if len(paths) <= 1:
-            multiprocess.MultiProcessCollector(
-                registry,
-                path=paths[0] if paths else multiproc_dir,
+        ttl = _env_float("PROMETHEUS_SCRAPE_CACHE_SEC", 5.0)
+        cache_key = (multiproc_dir, multiproc_root)
+        with _SCRAPE_CACHE_LOCK:
+            if ttl > 0 and _scrape_cache["key"] == cache_key and time.monotonic() - _scrape_cache["at"] < ttl:
+                return HttpResponse(_scrape_cache["data"], content_type=CONTENT_TYPE_LATEST)
+            data = _generate_multiproc_latest(
+                multiproc_dir, multiproc_root, CollectorRegistry, generate_latest, multiprocess
             )
-        else:
-            registry.register(_MultiProcessDirsCollector(paths, multiprocess))
-        _register_queue_backlog_collector(registry)
-        data = generate_latest(registry)
+            _scrape_cache.update(key=cache_key, data=data, at=time.monotonic())
     else:
         _ensure_default_queue_backlog_collector_registered(default_registry=REGISTRY)
         data = generate_latest()
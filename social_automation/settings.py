@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -177,6 +178,11 @@ STATIC_URL = 'static/'
 _media = os.getenv("MEDIA_ROOT", "storage/media")
 MEDIA_ROOT = Path(_media) if Path(_media).is_absolute() else BASE_DIR / _media
 MEDIA_URL = "/media/"
+# Entrega de mídia autenticada (downloads/preview): "" = Django serve (com Range/ETag);
+# "x-accel-redirect" (nginx, location internal em MEDIA_ACCEL_REDIRECT_PREFIX apontando
+# para MEDIA_ROOT) ou "x-sendfile" (Apache/lighttpd, caminho absoluto) delegam ao proxy.
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", "").strip().lower()
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/_protected_media/")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -193,7 +199,14 @@ if DEBUG:
             "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
             "OPTIONS": {"MAX_ENTRIES": 100},
             "TIMEOUT": CACHE_TIMEOUT,
-        }
+        },
+        # Respostas do Grok em disco: sobrevivem a restart do worker (dev sem Redis).
+        "grok": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(BASE_DIR / "storage" / "grok_cache"),
+            "OPTIONS": {"MAX_ENTRIES": 2000},
+            "TIMEOUT": None,
+        },
     }
 else:
     # Prod: Redis. DB 1 (broker Celery usa DB 0) para não colidir.
@@ -205,9 +218,18 @@ else:
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
             "LOCATION": os.getenv("CACHE_REDIS_URL", _cache_default_url),
             "TIMEOUT": CACHE_TIMEOUT,
-        }
+        },
+        "grok": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_REDIS_URL", _cache_default_url),
+            "KEY_PREFIX": "grok",
+            "TIMEOUT": None,
+        },
     }
 
+# Cache de respostas do Grok (hash de modelo + prompts), em segundos; 0 = desligado.
+GROK_RESPONSE_CACHE_TTL = int(os.getenv("GROK_RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+
 # Celery
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "django-db")
@@ -220,6 +242,8 @@ CELERY_ENABLE_UTC = os.getenv("CELERY_ENABLE_UTC", "0").lower() in ("1", "true",
 # CELERY_EAGER=1: run tasks in-process (no Redis). Useful for dev without Docker.
 CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_EAGER", "").lower() in ("1", "true", "yes")
 CELERY_TASK_DEFAULT_QUEUE = "processing"
+# /metrics/ broker telemetry: max entries of the Redis "unacked" hash inspected per scrape (0 = skip).
+BROKER_TELEMETRY_UNACKED_SCAN_LIMIT = int(os.getenv("BROKER_TELEMETRY_UNACKED_SCAN_LIMIT", "2000"))
 # Queue names (override via env for custom deployments)
 CELERY_QUEUE_TRANSCRIPTION = os.getenv("CELERY_QUEUE_TRANSCRIPTION", "transcription")
 CELERY_QUEUE_RENDER = os.getenv("CELERY_QUEUE_RENDER", "render")
@@ -232,6 +256,7 @@ CELERY_TASK_ROUTES = {
     "apps.social.tasks.reconcile_youtube_schedules_task": {"queue": "publish"},
     "apps.social.tasks.upload_thumbnails_after_batch_task": {"queue": "publish"},
     "apps.social.tasks.cleanup_posted_media_task": {"queue": "processing"},
+    "apps.jobs.tasks.promote_aged_queue_messages_task": {"queue": "publish"},
     # Transcription (CPU) can run while another worker encodes on GPU (render queue)
     "apps.auto_cuts.tasks.analyze_auto_cuts_task": {"queue": CELERY_QUEUE_TRANSCRIPTION},
     "apps.jobs.tasks.generate_subtitles_task": {"queue": CELERY_QUEUE_TRANSCRIPTION},
@@ -240,8 +265,46 @@ CELERY_TASK_ROUTES = {
     "apps.jobs.tasks.process_job": {"queue": CELERY_QUEUE_RENDER},
     "apps.jobs.tasks.burn_subtitles_task": {"queue": CELERY_QUEUE_RENDER},
 }
+# Auto-cut priority on the Redis broker (apps/jobs/services/task_priority.py; 0 = highest, steps 0/3/6/9).
+# Prefetch stays at Celery's default here; the transcription/render workers start with
+# --prefetch-multiplier=1 (docker-compose.yml) so they do not reserve low-priority messages
+# ahead of urgent ones.
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "4"))
+TASK_PRIORITY_QUEUES = [CELERY_QUEUE_TRANSCRIPTION, CELERY_QUEUE_RENDER]
+TASK_PRIORITY_HORIZON_HOURS = float(os.getenv("TASK_PRIORITY_HORIZON_HOURS", "48"))
+TASK_PRIORITY_URGENT_HOURS = float(os.getenv("TASK_PRIORITY_URGENT_HOURS", "12"))
+# Starvation protection: waiting messages move up one step per this many seconds (0 = off).
+TASK_PRIORITY_AGING_SEC = float(os.getenv("TASK_PRIORITY_AGING_SEC", "1800"))
+# Daily posting plans generated in one batch per factory scheduler run (1 = only the run's day).
+DAILY_PLAN_HORIZON_DAYS = max(1, int(os.getenv("DAILY_PLAN_HORIZON_DAYS", "1")))
+# Backlog-driven autoscaling (apps/jobs/services/worker_autoscaling.py). Used by prefork workers
+# started with --autoscale=max,min and by `manage.py autoscale_workers`.
+CELERY_WORKER_AUTOSCALER = "apps.jobs.services.worker_autoscaling:BacklogAutoscaler"
+# Node budget split across queues (0 = os.cpu_count() / physical RAM / no NVENC limit).
+AUTOSCALE_CPU_CORES = float(os.getenv("AUTOSCALE_CPU_CORES", "0") or 0)
+AUTOSCALE_RAM_MB = float(os.getenv("AUTOSCALE_RAM_MB", "0") or 0)
+AUTOSCALE_NVENC_SESSIONS = int(os.getenv("AUTOSCALE_NVENC_SESSIONS", "3") or 0)
+AUTOSCALE_TARGET_DRAIN_SEC = float(os.getenv("AUTOSCALE_TARGET_DRAIN_SEC", "600"))
+AUTOSCALE_MAX_WAIT_SEC = float(os.getenv("AUTOSCALE_MAX_WAIT_SEC", "900"))
+AUTOSCALE_INTERVAL_SEC = float(os.getenv("AUTOSCALE_INTERVAL_SEC", "15"))
+AUTOSCALE_SCALE_DOWN_DELAY_SEC = float(os.getenv("AUTOSCALE_SCALE_DOWN_DELAY_SEC", "300"))
+# Per-slot cost and slot limits per queue; AUTOSCALE_QUEUE_PROFILES_JSON overrides per queue.
+AUTOSCALE_QUEUE_PROFILES = {
+    CELERY_QUEUE_TRANSCRIPTION: {"cpu": 2, "ram_mb": 2500, "min_slots": 1, "max_slots": 4, "default_task_sec": 240},
+    CELERY_QUEUE_RENDER: {"cpu": 1, "ram_mb": 1000, "nvenc": 1, "min_slots": 1, "max_slots": 3, "default_task_sec": 90},
+    "processing": {"cpu": 1, "ram_mb": 800, "min_slots": 1, "max_slots": 2, "default_task_sec": 60},
+    "publish": {"cpu": 0.5, "ram_mb": 300, "min_slots": 1, "max_slots": 2, "default_task_sec": 30},
+}
+for _queue_name, _profile in json.loads(os.getenv("AUTOSCALE_QUEUE_PROFILES_JSON", "") or "{}").items():
+    AUTOSCALE_QUEUE_PROFILES[_queue_name] = {**AUTOSCALE_QUEUE_PROFILES.get(_queue_name, {}), **_profile}
 # Whisper: always CPU so GPU is free for NVENC (set WHISPER_FORCE_CPU=0 to allow .env / CUDA)
 WHISPER_FORCE_CPU = os.getenv("WHISPER_FORCE_CPU", "1").lower() in ("1", "true", "yes")
+# Sampled task profiling (0 = off). Mode: "sampler" (collapsed stacks for flame graphs) or "cprofile".
+TASK_PROFILE_SAMPLE_RATE = float(os.getenv("TASK_PROFILE_SAMPLE_RATE", "0") or 0)
+TASK_PROFILE_TASKS = [t.strip() for t in os.getenv("TASK_PROFILE_TASKS", "").split(",") if t.strip()]
+TASK_PROFILE_MODE = os.getenv("TASK_PROFILE_MODE", "sampler")
+TASK_PROFILE_INTERVAL_MS = float(os.getenv("TASK_PROFILE_INTERVAL_MS", "5"))
+TASK_PROFILE_KEEP = int(os.getenv("TASK_PROFILE_KEEP", "500"))
 
 
 # FFmpeg
@@ -256,6 +319,15 @@ FFMPEG_LIBX264_BURN_PRESET = os.getenv("FFMPEG_LIBX264_BURN_PRESET", FFMPEG_LIBX
 # Side overlay on long video: step sensitive to artifacts — heavier default (slow + CRF 16).
 FFMPEG_LIBX264_OVERLAY_LONG_CRF = int(os.getenv("FFMPEG_LIBX264_OVERLAY_LONG_CRF", "16"))
 FFMPEG_LIBX264_OVERLAY_LONG_PRESET = os.getenv("FFMPEG_LIBX264_OVERLAY_LONG_PRESET", "slow")
+# Subprocess runner: wall-clock / stall (no progress) timeouts in seconds (0 = off), stderr tail kept.
+FFMPEG_TIMEOUT_SEC = float(os.getenv("FFMPEG_TIMEOUT_SEC", "21600"))
+FFMPEG_STALL_TIMEOUT_SEC = float(os.getenv("FFMPEG_STALL_TIMEOUT_SEC", "600"))
+FFPROBE_TIMEOUT_SEC = float(os.getenv("FFPROBE_TIMEOUT_SEC", "120"))
+FFMPEG_STDERR_TAIL_LINES = int(os.getenv("FFMPEG_STDERR_TAIL_LINES", "200"))
+FFMPEG_PROGRESS_LOG_SEC = float(os.getenv("FFMPEG_PROGRESS_LOG_SEC", "30"))
+# Auto thumbnails: frames grabbed per ffmpeg process (one input per timestamp), composition processes.
+THUMBNAIL_FRAMES_PER_PROCESS = int(os.getenv("THUMBNAIL_FRAMES_PER_PROCESS", "16"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
 
 # REST Framework
 REST_FRAMEWORK = {